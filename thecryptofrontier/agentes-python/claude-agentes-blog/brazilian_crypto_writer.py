@@ -7,6 +7,12 @@ import re
 from typing import Dict, List
 from datetime import datetime
 
+from crewai_src import add_to_path
+
+add_to_path()
+
+from utils.keyword_matcher import get_matcher
+
 class BrazilianCryptoWriter:
     """Escritor especializado no mercado crypto brasileiro"""
     
@@ -275,23 +281,13 @@ class BrazilianCryptoWriter:
         """Gera tags relevantes em português"""
         tags = ['criptomoedas', 'blockchain', 'investimento']
         
-        # Adicionar moedas mencionadas
-        if 'bitcoin' in content.lower():
-            tags.append('bitcoin')
-        if 'ethereum' in content.lower():
-            tags.append('ethereum')
-        if 'defi' in content.lower():
-            tags.append('defi')
-        if 'nft' in content.lower():
-            tags.append('nft')
-        
-        # Tags baseadas no conteúdo
-        if 'previsão' in title.lower() or 'preço' in title.lower():
-            tags.append('análise-de-preço')
-        if 'mercado' in content.lower():
-            tags.append('análise-mercado')
-        if 'brasil' in content.lower():
-            tags.append('mercado-brasileiro')
+        # Casamento por palavra inteira (trie do keyword_matcher): "definição"
+        # não vira "defi" nem "Brasília" vira "mercado-brasileiro"
+        matcher = get_matcher("pt_tags")
+        content_hits = matcher.scan(content)
+        tags += content_hits["coin_tag"]
+        tags += matcher.scan(title)["title_tag"]
+        tags += content_hits["market_tag"]
         
         return tags[:8]  # Limitar a 8 tags
     
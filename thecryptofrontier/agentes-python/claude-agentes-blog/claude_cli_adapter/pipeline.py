@@ -4,17 +4,16 @@ RSS → Tradução → Formatação → Publicação
 """
 
 import os
-import json
 import logging
 import time
 from pathlib import Path
-from datetime import datetime
 from typing import List, Dict, Optional
 
 from .claude_agent import ClaudeAgent
 from .tools.rss_reader import RSSReader
 from .tools.file_manager import FileManager
 from .tools.publisher import StrapiPublisher
+from processed_ledger import ProcessedLedger
 
 # Configuração de logging
 logging.basicConfig(
@@ -77,21 +76,13 @@ class SimplePipeline:
         for dir_path in dirs:
             dir_path.mkdir(parents=True, exist_ok=True)
     
-    def _load_processed_ids(self) -> set:
+    def _load_processed_ids(self) -> ProcessedLedger:
         """Carrega IDs de artigos já processados"""
-        if self.processed_file.exists():
-            with open(self.processed_file, 'r') as f:
-                data = json.load(f)
-                return set(data.get('ids', []))
-        return set()
+        return ProcessedLedger(self.processed_file)
     
     def _save_processed_ids(self):
-        """Salva IDs de artigos processados"""
-        with open(self.processed_file, 'w') as f:
-            json.dump({
-                'ids': list(self.processed_ids),
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        """Cada `add` já grava o ID no registro; aqui só relemos o que outros processos marcaram"""
+        self.processed_ids.refresh()
     
     def run(self, limit: int = 5, publish: bool = True) -> Dict:
         """
@@ -127,7 +118,8 @@ class SimplePipeline:
             articles = self.rss_reader.fetch_articles(limit=limit * 2)  # Buscar mais para filtrar
             logger.info(f"Encontrados {len(articles)} artigos")
             
-            # 2. Filtrar artigos não processados
+            # 2. Filtrar artigos não processados (incluindo os marcados por outros processos)
+            self.processed_ids.refresh()
             new_articles = [a for a in articles if a['id'] not in self.processed_ids]
             logger.info(f"📋 {len(new_articles)} artigos novos para processar")
             
@@ -201,9 +193,6 @@ class SimplePipeline:
                         }
                     })
                     
-                    # Salvar progresso
-                    self._save_processed_ids()
-                    
                     # Delay entre artigos
                     if idx < len(articles_to_process):
                         time.sleep(3)
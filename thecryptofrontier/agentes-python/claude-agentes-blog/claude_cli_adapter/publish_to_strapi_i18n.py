@@ -5,11 +5,15 @@ Baseado nas instruções do agente especializado em Strapi
 """
 import os
 import json
+import time
 import requests
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+
+from strapi_publisher import format_locale_timing, run_locale_fanout
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -20,13 +24,19 @@ STRAPI_API_TOKEN = os.getenv('STRAPI_API_TOKEN', '')
 class StrapiI18nPublisher:
     """Publicador com suporte a múltiplos idiomas"""
     
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, pool_size: int = 8):
         self.url = url.rstrip('/')
         self.token = token
         self.headers = {
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
+        
+        # Sessão compartilhada: as escritas por idioma reaproveitam conexões keep-alive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def create_post(self, article_data: Dict, locale: str = 'pt') -> Optional[Dict]:
         """
@@ -60,7 +70,7 @@ class StrapiI18nPublisher:
         print(f"📤 Criando artigo em {locale}: {article_data['title']}")
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.url}/api/posts",
                 headers=self.headers,
                 json=strapi_data
@@ -105,7 +115,7 @@ class StrapiI18nPublisher:
         print(f"🔄 Atualizando versão em {locale} para documento {document_id}")
         
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.url}/api/posts/{document_id}?locale={locale}",
                 headers=self.headers,
                 json=strapi_data
@@ -144,7 +154,7 @@ class StrapiI18nPublisher:
         locale_param = f"?locale={locale}" if locale != '*' else ""
         
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.url}/api/posts/{document_id}/publish{locale_param}",
                 headers=self.headers,
                 json=publish_data
@@ -155,7 +165,7 @@ class StrapiI18nPublisher:
                 return True
             else:
                 # Tentar alternativa: atualizar com status published
-                response = requests.put(
+                response = self.session.put(
                     f"{self.url}/api/posts/{document_id}{locale_param}",
                     headers=self.headers,
                     json=publish_data
@@ -218,51 +228,57 @@ def translate_article(article: Dict, target_locale: str) -> Dict:
     
     return translated_article
 
-def publish_multilingual_article(article_path: str, locales: List[str] = ['pt', 'en']) -> Dict:
+def _translate_for_locale(article: Dict, locale: str) -> Dict:
+    """Traduz o artigo, exceto para PT (idioma original)"""
+    if locale == 'pt':
+        return article
+    print(f"🔄 Traduzindo artigo para {locale}...")
+    return translate_article(article, locale)
+
+def publish_multilingual_article(article_path: str, locales: List[str] = ['pt', 'en'], max_workers: int = 4) -> Dict:
     """
     Publica um artigo em múltiplos idiomas
     
+    As traduções rodam em paralelo e cada versão é gravada assim que fica
+    pronta; a publicação de todas as versões só ocorre se todos os idiomas
+    forem gravados com sucesso.
+    
     Args:
         article_path: Caminho para o arquivo JSON do artigo
         locales: Lista de idiomas para publicar
+        max_workers: Máximo de traduções/escritas simultâneas
     """
     # Ler artigo
     with open(article_path, 'r', encoding='utf-8') as f:
         article = json.load(f)
     
-    publisher = StrapiI18nPublisher(STRAPI_URL, STRAPI_API_TOKEN)
+    publisher = StrapiI18nPublisher(STRAPI_URL, STRAPI_API_TOKEN, pool_size=max_workers)
     
-    results = {}
-    document_id = None
+    print(f"\n{'='*50}")
+    print(f"🌍 Processando idiomas: {', '.join(locales)}")
+    print(f"{'='*50}\n")
     
-    for i, locale in enumerate(locales):
-        print(f"\n{'='*50}")
-        print(f"🌍 Processando idioma: {locale}")
-        print(f"{'='*50}\n")
-        
-        # Se não for PT, traduzir
-        if locale != 'pt':
-            print(f"🔄 Traduzindo artigo para {locale}...")
-            article_locale = translate_article(article, locale)
-        else:
-            article_locale = article
-        
-        if i == 0:
-            # Criar o primeiro post
-            result = publisher.create_post(article_locale, locale)
-            if result:
-                document_id = result['data']['documentId']
-                results[locale] = result
-        else:
-            # Criar versões adicionais de idioma
-            if document_id:
-                result = publisher.update_locale_version(document_id, article_locale, locale)
-                results[locale] = result
+    started = time.perf_counter()
+    document_id, results, timings = run_locale_fanout(
+        article,
+        locales,
+        _translate_for_locale,
+        publisher.create_post,
+        publisher.update_locale_version,
+        max_workers=max_workers
+    )
     
     # Publicar todas as versões
-    if document_id:
-        print(f"\n📢 Publicando todas as versões...")
+    if document_id and all(results.get(locale) for locale in locales):
+        print("\n📢 Publicando todas as versões...")
         publisher.publish_locale(document_id, '*')
+    elif document_id:
+        print("\n⚠️ Publicação adiada: nem todos os idiomas foram gravados")
+    
+    print("\n⏱️ Tempos por idioma:")
+    for locale in locales:
+        print(f"  - {locale}:{format_locale_timing(timings[locale]) or ' -'}")
+    print(f"  Total: {time.perf_counter() - started:.1f}s")
     
     return results
 
@@ -297,7 +313,7 @@ def main():
     )
     
     print("\n✨ Publicação multilíngue completa!")
-    print(f"\n📊 Resumo:")
+    print("\n📊 Resumo:")
     for locale, result in results.items():
         if result:
             print(f"  - {locale}: ✅ Sucesso")
@@ -7,15 +7,207 @@ Publisher unificado para Strapi v5 com suporte a:
 """
 import os
 import json
+import time
+import base64
+import hashlib
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Validade assumida quando o JWT não traz `exp` (padrão do users-permissions)
+DEFAULT_JWT_TTL = 30 * 24 * 3600
+
+# Renovar quando faltar esta fração da validade (ou no mínimo REFRESH_MIN_MARGIN)
+REFRESH_FRACTION = 0.1
+REFRESH_MIN_MARGIN = 300
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    """Lê o campo `exp` do payload do JWT (sem validar a assinatura)"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+class _FileLock:
+    """flock exclusivo/compartilhado em um arquivo .lock (no-op sem fcntl)"""
+    
+    def __init__(self, path: Path, shared: bool = False):
+        self.path = path
+        self.shared = shared
+        self._fd = None
+    
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+class JWTTokenProvider:
+    """
+    Cache de JWT compartilhado entre processos.
+    
+    O token fica em disco junto com a expiração, protegido por flock: um
+    processo novo reutiliza o token válido sem refazer o login, e apenas um
+    processo por vez renova. Um timer em background renova o token antes de
+    expirar; `invalidate` força a renovação após um 401.
+    """
+    
+    def __init__(self, url: str, email: str, password: str, cache_path: Optional[str] = None):
+        self.url = url
+        self.email = email
+        self.password = password
+        
+        if cache_path is None:
+            cache_path = os.getenv('STRAPI_JWT_CACHE')
+        if cache_path is None:
+            digest = hashlib.sha256(f"{url}|{email}".encode('utf-8')).hexdigest()[:16]
+            cache_path = Path.home() / '.cache' / 'strapi_publisher' / f'jwt-{digest}.json'
+        self.cache_path = Path(cache_path)
+        self.lock_path = self.cache_path.with_suffix('.lock')
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.token: Optional[str] = None
+        self.expires_at = 0.0
+        self.issued_at = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+    
+    def _refresh_at(self) -> float:
+        margin = max(REFRESH_MIN_MARGIN, (self.expires_at - self.issued_at) * REFRESH_FRACTION)
+        return self.expires_at - margin
+    
+    def _is_fresh(self) -> bool:
+        return bool(self.token) and time.time() < self._refresh_at()
+    
+    def _load_cache(self) -> bool:
+        """Adota o token do disco, se ainda estiver dentro da validade"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if cached.get('url') != self.url or cached.get('identifier') != self.email:
+            return False
+        if cached.get('expires_at', 0) <= time.time():
+            return False
+        
+        self.token = cached['jwt']
+        self.expires_at = cached['expires_at']
+        self.issued_at = cached.get('issued_at', time.time())
+        return True
+    
+    def _save_cache(self):
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': self.url,
+                'identifier': self.email,
+                'jwt': self.token,
+                'issued_at': self.issued_at,
+                'expires_at': self.expires_at
+            }, f)
+        os.replace(tmp_path, self.cache_path)
+        
+        # Compatibilidade com scripts que leem o token puro de .jwt_token
+        with open('.jwt_token', 'w') as f:
+            f.write(self.token)
+    
+    def _login(self) -> bool:
+        response = requests.post(
+            f"{self.url}/api/auth/local",
+            json={
+                "identifier": self.email,
+                "password": self.password
+            },
+            timeout=30
+        )
+        
+        if response.status_code != 200:
+            print(f"❌ Erro no login: {response.status_code}")
+            print(response.text)
+            return False
+        
+        self.token = response.json()['jwt']
+        self.issued_at = time.time()
+        self.expires_at = _jwt_expiry(self.token) or self.issued_at + DEFAULT_JWT_TTL
+        print("✅ Login realizado com sucesso")
+        return True
+    
+    def _schedule_refresh(self):
+        if self._timer:
+            self._timer.cancel()
+        delay = max(1.0, self._refresh_at() - time.time())
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Erro ao renovar JWT em background: {e}")
+    
+    def refresh(self, stale_token: Optional[str] = None) -> Optional[str]:
+        """
+        Renova o token sob lock exclusivo. Se outro processo já renovou
+        (o token em disco é válido e diferente de `stale_token`), adota-o.
+        """
+        with self._lock, _FileLock(self.lock_path):
+            if self._load_cache() and self.token != stale_token and self._is_fresh():
+                self._schedule_refresh()
+                return self.token
+            
+            if not self._login():
+                return None
+            self._save_cache()
+            self._schedule_refresh()
+            return self.token
+    
+    def get_token(self) -> Optional[str]:
+        """Token válido, usando memória, depois disco, e por último login"""
+        if self._is_fresh():
+            return self.token
+        
+        with self._lock, _FileLock(self.lock_path, shared=True):
+            loaded = self._load_cache()
+        if loaded and self._is_fresh():
+            self._schedule_refresh()
+            return self.token
+        
+        return self.refresh(stale_token=self.token)
+    
+    def invalidate(self, token: Optional[str]) -> Optional[str]:
+        """Descarta um token recusado pelo servidor (401) e obtém outro"""
+        return self.refresh(stale_token=token)
+    
+    def close(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
 class StrapiAuth:
     """Gerenciador de autenticação para Strapi"""
     
@@ -25,6 +217,9 @@ class StrapiAuth:
         self.email = os.getenv('STRAPI_EMAIL')
         self.password = os.getenv('STRAPI_PASSWORD')
         self.jwt_token = None
+        self.token_provider = None
+        if not self.api_token and self.email and self.password:
+            self.token_provider = JWTTokenProvider(self.url, self.email, self.password)
         
     def get_headers(self) -> Dict[str, str]:
         """Retorna headers com autenticação apropriada"""
@@ -33,46 +228,43 @@ class StrapiAuth:
         # Preferir API Token se disponível
         if self.api_token:
             headers['Authorization'] = f'Bearer {self.api_token}'
-        elif self.jwt_token:
-            headers['Authorization'] = f'Bearer {self.jwt_token}'
-        else:
-            # Tentar fazer login se tiver credenciais
-            if self.email and self.password:
-                self.login()
-                if self.jwt_token:
-                    headers['Authorization'] = f'Bearer {self.jwt_token}'
+        elif self.token_provider:
+            try:
+                self.jwt_token = self.token_provider.get_token()
+            except Exception as e:
+                print(f"❌ Erro de conexão no login: {e}")
+            if self.jwt_token:
+                headers['Authorization'] = f'Bearer {self.jwt_token}'
         
         return headers
     
+    def handle_unauthorized(self, headers: Dict[str, str]) -> bool:
+        """
+        Chamado após um 401: renova o JWT usado na requisição.
+        Retorna True se vale repetir a requisição com novos headers.
+        """
+        if not self.token_provider:
+            return False
+        used = headers.get('Authorization', '').replace('Bearer ', '', 1) or None
+        try:
+            self.jwt_token = self.token_provider.invalidate(used)
+        except Exception as e:
+            print(f"❌ Erro ao renovar JWT: {e}")
+            return False
+        return bool(self.jwt_token)
+    
     def login(self) -> bool:
         """Faz login e obtém JWT token"""
         if not self.email or not self.password:
             print("❌ Email e senha não configurados")
             return False
+        
+        if self.token_provider is None:
+            self.token_provider = JWTTokenProvider(self.url, self.email, self.password)
             
         try:
-            response = requests.post(
-                f"{self.url}/api/auth/local",
-                json={
-                    "identifier": self.email,
-                    "password": self.password
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.jwt_token = data['jwt']
-                print("✅ Login realizado com sucesso")
-                
-                # Salvar JWT para uso futuro
-                with open('.jwt_token', 'w') as f:
-                    f.write(self.jwt_token)
-                
-                return True
-            else:
-                print(f"❌ Erro no login: {response.status_code}")
-                print(response.text)
-                return False
+            self.jwt_token = self.token_provider.refresh(stale_token=self.jwt_token)
+            return self.jwt_token is not None
                 
         except Exception as e:
             print(f"❌ Erro de conexão no login: {e}")
@@ -81,10 +273,24 @@ class StrapiAuth:
 class StrapiPublisher:
     """Publisher com suporte completo para Strapi v5"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 8):
         self.auth = StrapiAuth()
         self.url = self.auth.url
         
+        # Sessão compartilhada: as escritas por idioma reaproveitam conexões keep-alive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def _request(self, method: str, url: str, headers: Dict[str, str], **kwargs) -> requests.Response:
+        """Envia a requisição; após um 401 renova o JWT e tenta uma única vez mais"""
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        if response.status_code == 401 and self.auth.handle_unauthorized(headers):
+            print("🔑 JWT recusado - token renovado, repetindo requisição")
+            response = self.session.request(method, url, headers=self.auth.get_headers(), **kwargs)
+        return response
+        
     def create_post(self, article: Dict, locale: str = 'pt') -> Optional[Dict]:
         """
         Cria novo post em idioma específico
@@ -120,7 +326,8 @@ class StrapiPublisher:
         print(f"\n📤 Criando artigo em {locale}: {article['title']}")
         
         try:
-            response = requests.post(
+            response = self._request(
+                'post',
                 f"{self.url}/api/posts",
                 headers=headers,
                 json=strapi_data
@@ -187,7 +394,8 @@ class StrapiPublisher:
         
         try:
             # Tentar PUT com locale
-            response = requests.put(
+            response = self._request(
+                'put',
                 f"{self.url}/api/posts/{document_id}?locale={locale}",
                 headers=headers,
                 json=strapi_data
@@ -219,7 +427,8 @@ class StrapiPublisher:
         }
         
         try:
-            response = requests.put(
+            response = self._request(
+                'put',
                 f"{self.url}/api/posts/{document_id}?locale=all",
                 headers=headers,
                 json=publish_data
@@ -277,70 +486,139 @@ def translate_with_claude(article: Dict, target_locale: str) -> Dict:
     
     return translated
 
-def publish_multilingual(article_path: str, locales: List[str] = ['pt', 'en']) -> bool:
+def _timed(func: Callable, *args) -> Tuple[object, float]:
+    """Executa func(*args) e retorna (resultado, segundos)"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def run_locale_fanout(
+    article: Dict,
+    locales: List[str],
+    translate: Callable[[Dict, str], Dict],
+    create: Callable[[Dict, str], Optional[Dict]],
+    update: Callable[[str, Dict, str], Optional[Dict]],
+    max_workers: int = 4
+) -> Tuple[Optional[str], Dict[str, Optional[Dict]], Dict[str, Dict[str, float]]]:
+    """
+    Traduz e grava as versões de idioma de um artigo em paralelo.
+    
+    Todas as traduções são disparadas juntas num pool limitado. O documento
+    base (primeiro idioma) é criado assim que sua tradução fica pronta, e
+    cada variante é enviada logo que a sua termina, sem esperar as demais.
+    
+    Returns:
+        (document_id, resultado por idioma, tempos por idioma em segundos)
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    timings: Dict[str, Dict[str, float]] = {locale: {} for locale in locales}
+    document_id = None
+    
+    translate_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate')
+    write_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='strapi-write')
+    
+    try:
+        translations = {
+            locale: translate_pool.submit(_timed, translate, article, locale)
+            for locale in locales
+        }
+        
+        # Documento base
+        first_locale = locales[0]
+        try:
+            article_first, timings[first_locale]['translate'] = translations[first_locale].result()
+        except Exception as e:
+            print(f"❌ Erro ao traduzir para {first_locale}: {e}")
+            results[first_locale] = None
+            return None, results, timings
+        
+        result, timings[first_locale]['write'] = _timed(create, article_first, first_locale)
+        results[first_locale] = result
+        if not (result and result.get('data')):
+            return None, results, timings
+        document_id = result['data'].get('documentId') or result['data'].get('id')
+        
+        # Variantes: cada uma é gravada assim que sua tradução termina
+        pending = {translations[locale]: locale for locale in locales[1:]}
+        writes = {}
+        for future in as_completed(pending):
+            locale = pending[future]
+            try:
+                article_locale, timings[locale]['translate'] = future.result()
+            except Exception as e:
+                print(f"❌ Erro ao traduzir para {locale}: {e}")
+                results[locale] = None
+                continue
+            writes[write_pool.submit(_timed, update, document_id, article_locale, locale)] = locale
+        
+        for future in as_completed(writes):
+            locale = writes[future]
+            try:
+                results[locale], timings[locale]['write'] = future.result()
+            except Exception as e:
+                print(f"❌ Erro ao gravar {locale}: {e}")
+                results[locale] = None
+    finally:
+        translate_pool.shutdown(wait=False, cancel_futures=True)
+        write_pool.shutdown(wait=True)
+    
+    return document_id, results, timings
+
+def format_locale_timing(timing: Dict[str, float]) -> str:
+    """Formata os tempos de um idioma para o resumo"""
+    parts = []
+    if 'translate' in timing:
+        parts.append(f"tradução {timing['translate']:.1f}s")
+    if 'write' in timing:
+        parts.append(f"escrita {timing['write']:.1f}s")
+    return f" ({', '.join(parts)})" if parts else ""
+
+def publish_multilingual(article_path: str, locales: List[str] = ['pt', 'en'], max_workers: int = 4) -> bool:
     """
     Publica artigo em múltiplos idiomas
     
     Args:
         article_path: Caminho do arquivo JSON
         locales: Lista de idiomas para publicar
+        max_workers: Máximo de traduções/escritas simultâneas
     """
     # Ler artigo
     with open(article_path, 'r', encoding='utf-8') as f:
         article = json.load(f)
     
-    publisher = StrapiPublisher()
+    publisher = StrapiPublisher(pool_size=max_workers)
     
     print(f"\n{'='*60}")
     print(f"📚 Publicação Multilíngue: {article['title']}")
     print(f"🌍 Idiomas: {', '.join(locales)}")
     print(f"{'='*60}")
     
-    results = {}
-    document_id = None
-    
-    # Publicar primeiro idioma (criar documento)
-    first_locale = locales[0]
-    
-    if first_locale != 'pt':
-        article_first = translate_with_claude(article, first_locale)
-    else:
-        article_first = article
-    
-    result = publisher.create_post(article_first, first_locale)
-    if result and result.get('data'):
-        document_id = result['data'].get('documentId') or result['data'].get('id')
-        results[first_locale] = True
-    else:
-        results[first_locale] = False
-        return False
-    
-    # Criar versões nos outros idiomas
-    for locale in locales[1:]:
-        print(f"\n{'─'*40}")
-        
-        if locale != 'pt':
-            article_locale = translate_with_claude(article, locale)
-        else:
-            article_locale = article
-        
-        result = publisher.update_locale_version(document_id, article_locale, locale)
-        results[locale] = result is not None
-    
-    # Publicar todas as versões
-    if document_id and all(results.values()):
+    started = time.perf_counter()
+    document_id, results, timings = run_locale_fanout(
+        article,
+        locales,
+        translate_with_claude,
+        publisher.create_post,
+        publisher.update_locale_version,
+        max_workers=max_workers
+    )
+    success = {locale: results.get(locale) is not None for locale in locales}
+    
+    # Publicar todas as versões apenas se todos os idiomas foram gravados
+    if document_id and all(success.values()):
         print(f"\n{'─'*40}")
         publisher.publish_all_locales(document_id)
     
     # Resumo
     print(f"\n{'='*60}")
     print("📊 Resumo da publicação:")
-    for locale, success in results.items():
-        status = "✅ Sucesso" if success else "❌ Falhou"
-        print(f"   {locale}: {status}")
+    for locale in locales:
+        status = "✅ Sucesso" if success[locale] else "❌ Falhou"
+        print(f"   {locale}: {status}{format_locale_timing(timings[locale])}")
+    print(f"   Tempo total: {time.perf_counter() - started:.1f}s")
     print(f"{'='*60}\n")
     
-    return all(results.values())
+    return all(success.values())
 
 def test_connection():
     """Testa conexão e autenticação com Strapi"""
@@ -380,6 +658,7 @@ def main():
     parser.add_argument('--test', action='store_true', help='Testar conexão')
     parser.add_argument('--file', type=str, help='Arquivo JSON para publicar')
     parser.add_argument('--locales', type=str, default='pt,en', help='Idiomas (ex: pt,en,es)')
+    parser.add_argument('--workers', type=int, default=4, help='Traduções/escritas simultâneas')
     
     args = parser.parse_args()
     
@@ -389,7 +668,7 @@ def main():
     
     if args.file:
         locales = args.locales.split(',')
-        publish_multilingual(args.file, locales)
+        publish_multilingual(args.file, locales, max_workers=args.workers)
         return
     
     # Modo padrão: publicar primeiro arquivo em staging
@@ -11,6 +11,11 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,8 +80,11 @@ class FileManager:
         
         # Salvar JSON
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(article, f, ensure_ascii=False, indent=2)
+            if orjson:
+                filepath.write_bytes(orjson.dumps(article, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(article, f, ensure_ascii=False, indent=2)
             
             logger.info(f"Arquivo salvo: {filepath.name}")
             return filepath
@@ -96,6 +104,8 @@ class FileManager:
             Dados do artigo
         """
         try:
+            if orjson:
+                return orjson.loads(Path(filepath).read_bytes())
             with open(filepath, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
@@ -0,0 +1,23 @@
+"""
+Acesso aos utilitários do crewai-agentes-blog
+
+Módulos que os dois projetos precisam compartilhar (o registro de artigos
+processados, o matcher de palavras-chave) têm uma única implementação, em
+crewai-agentes-blog/src/utils. Este módulo coloca aquele `src` no fim do
+sys.path, então os módulos locais continuam tendo precedência.
+
+Uso:
+    from crewai_src import add_to_path
+    add_to_path()
+    from utils.processed_ledger import ProcessedLedger
+"""
+import sys
+from pathlib import Path
+
+CREWAI_SRC = Path(__file__).resolve().parent.parent / "crewai-agentes-blog" / "src"
+
+def add_to_path() -> Path:
+    """Garante o src do crewai-agentes-blog no sys.path; devolve o diretório"""
+    if str(CREWAI_SRC) not in sys.path:
+        sys.path.append(str(CREWAI_SRC))
+    return CREWAI_SRC
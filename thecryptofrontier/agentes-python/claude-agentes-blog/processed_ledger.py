@@ -0,0 +1,13 @@
+"""
+Registro de IDs já processados (deduplicação do RSS)
+
+Os dois projetos gravam o mesmo processed_articles.json, então usam a mesma
+implementação: crewai-agentes-blog/src/utils/processed_ledger.py.
+"""
+from crewai_src import add_to_path
+
+add_to_path()
+
+from utils.processed_ledger import COMPACT_MIN_LINES, LEGACY_KEYS, ProcessedLedger
+
+__all__ = ["COMPACT_MIN_LINES", "LEGACY_KEYS", "ProcessedLedger"]
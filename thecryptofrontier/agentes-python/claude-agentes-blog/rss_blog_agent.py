@@ -4,17 +4,17 @@ Agente RSS para Blog - Integração sem API Keys externas
 Monitora feeds RSS e cria posts automaticamente no Strapi
 """
 import os
-import json
 import feedparser
 import asyncio
 import aiohttp
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List
 import hashlib
 import re
 from pathlib import Path
 import logging
 from multilingual_config import MultilingualConfig
+from processed_ledger import ProcessedLedger
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -43,27 +43,15 @@ class RSSBlogAgent:
         
         # Arquivo para rastrear posts processados
         self.processed_file = Path('processed_rss_posts.json')
-        self.processed_guids: Set[str] = self.load_processed_guids()
+        self.processed_guids: ProcessedLedger = self.load_processed_guids()
         
-    def load_processed_guids(self) -> Set[str]:
+    def load_processed_guids(self) -> ProcessedLedger:
         """Carrega GUIDs já processados"""
-        if self.processed_file.exists():
-            try:
-                with open(self.processed_file, 'r') as f:
-                    data = json.load(f)
-                    return set(data.get('guids', []))
-            except:
-                pass
-        return set()
+        return ProcessedLedger(self.processed_file)
     
     def save_processed_guids(self):
-        """Salva GUIDs processados"""
-        data = {
-            'guids': list(self.processed_guids),
-            'last_update': datetime.now().isoformat()
-        }
-        with open(self.processed_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Cada `add` já grava o GUID no registro; aqui só relemos o que outros processos marcaram"""
+        self.processed_guids.refresh()
     
     def generate_slug(self, title: str) -> str:
         """Gera slug a partir do título"""
@@ -322,7 +310,6 @@ class RSSBlogAgent:
                                 result = await response.json()
                                 logger.info(f"Post atualizado com sucesso: {llm_output.get('title')} (ID: {post_id}, Locale: {locale_code})")
                                 self.processed_guids.add(article['guid'])
-                                self.save_processed_guids()
                                 # Retorna o resultado da atualização para o run_import
                                 return result['data']
                             else:
@@ -341,7 +328,6 @@ class RSSBlogAgent:
                                 
                                 # Marca como processado
                                 self.processed_guids.add(article['guid'])
-                                self.save_processed_guids()
                                 
                                 # Retorna o resultado da criação para o run_import
                                 return result['data']
@@ -442,7 +428,6 @@ async def main():
     
     elif command == 'clear':
         agent.processed_guids.clear()
-        agent.save_processed_guids()
         print("Cache de artigos processados limpo!")
     
     else:
@@ -11,9 +11,9 @@ import os
 from pathlib import Path
 
 # Adicionar diretório src ao path
-sys.path.append(str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from src.core.content_api_client import get_content_client, ContentAPIClient
+from core.content_api_client import get_content_client, ContentAPIClient
 import json
 from datetime import datetime
 
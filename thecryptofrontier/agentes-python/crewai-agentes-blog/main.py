@@ -12,11 +12,13 @@ Comandos disponíveis:
     monitor-rss         Monitorar feeds RSS
     publish-posts       Publicar posts pendentes
     sync-algolia        Sincronizar com Algolia
+    export-metrics      Exportar métricas (Prometheus) para jobs de cron
     
 Exemplos:
     python main.py run-crew
     python main.py simple-pipeline --limit 5
     python main.py monitor-rss --continuous
+    python main.py export-metrics --output /var/lib/node_exporter/blog_crew.prom
 """
 
 import sys
@@ -55,7 +57,7 @@ def simple_pipeline(args):
     os.environ["GENERATE_IMAGES"] = "true" if args.with_images else "false"
     
     # Importar e executar
-    from src.pipelines.simple.strapi_pipeline import main as simple_main
+    from pipelines.simple.strapi_pipeline import main as simple_main
     simple_main()
 
 
@@ -79,24 +81,48 @@ def publish_posts(args):
 def sync_algolia(args):
     """Sincronizar com Algolia"""
     logger.info("Sincronizando com Algolia...")
-    from src.tools.sync_direct_algolia import main as sync_main
+    from tools.sync_direct_algolia import main as sync_main
     sync_main()
 
 
 def sync_strapi_duplicates(args):
     """Deletar duplicatas no Strapi"""
     logger.info("Deletando duplicatas no Strapi...")
-    from src.tools.delete_strapi_duplicates import main as delete_strapi_main
+    from tools.delete_strapi_duplicates import main as delete_strapi_main
     delete_strapi_main()
 
 
 def sync_algolia_duplicates(args):
     """Deletar duplicatas no Algolia"""
     logger.info("Deletando duplicatas no Algolia...")
-    from src.tools.delete_algolia_duplicates import main as delete_algolia_main
+    from tools.delete_algolia_duplicates import main as delete_algolia_main
     delete_algolia_main()
 
 
+def export_metrics(args):
+    """Exportar métricas dos componentes em arquivo .prom / Pushgateway"""
+    from monitoring.metrics_registry import export_metrics as export_main, get_registry
+    from monitoring.metrics_dashboard import MetricsCollector
+    
+    # Os componentes registram seu collector ao serem instanciados; a fila
+    # de imagens é registrada explicitamente
+    registry = get_registry()
+    collector = MetricsCollector(args.metrics_db)
+    try:
+        from utils.api_key_manager import get_api_key_manager
+        get_api_key_manager()
+    except ImportError as e:
+        logger.warning(f"Métricas das chaves Gemini indisponíveis: {e}")
+    try:
+        from tools.image_generation_queue import register_metrics
+        register_metrics(registry)
+    except ImportError as e:
+        logger.warning(f"Métricas da fila de imagens indisponíveis: {e}")
+    
+    export_main(args.output, job=args.job, gateway_url=args.gateway)
+    collector.close()
+
+
 def main():
     """Função principal"""
     parser = argparse.ArgumentParser(
@@ -145,6 +171,14 @@ def main():
     parser_sync_algolia = subparsers.add_parser("sync-algolia-duplicates", help="Deletar duplicatas no Algolia")
     parser_sync_algolia.set_defaults(func=sync_algolia_duplicates)
     
+    # export-metrics
+    parser_metrics = subparsers.add_parser("export-metrics", help="Exportar métricas Prometheus")
+    parser_metrics.add_argument("--output", help="Arquivo .prom (padrão: metrics/<job>.prom)")
+    parser_metrics.add_argument("--job", default="blog_crew", help="Nome do job")
+    parser_metrics.add_argument("--gateway", help="URL do Pushgateway (ou PUSHGATEWAY_URL)")
+    parser_metrics.add_argument("--metrics-db", default="metrics.db", help="Banco do MetricsCollector")
+    parser_metrics.set_defaults(func=export_metrics)
+    
     # Parse argumentos
     args = parser.parse_args()
     
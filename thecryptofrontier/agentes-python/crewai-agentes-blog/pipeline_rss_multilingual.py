@@ -11,7 +11,6 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-import json
 import re
 from typing import List, Dict
 
@@ -34,6 +33,7 @@ sys.path.insert(0, 'src')
 
 # Importar sistema de chaves e integração Strapi
 from utils.api_key_manager import get_api_key_manager
+from utils.processed_ledger import ProcessedLedger
 import requests
 import google.generativeai as genai
 
@@ -90,27 +90,16 @@ class MultilingualRSSPipeline:
         # Carregar artigos já processados
         self.processed_articles = self._load_processed_articles()
         
-    def _load_processed_articles(self) -> set:
+    def _load_processed_articles(self) -> ProcessedLedger:
         """Carrega IDs de artigos já processados"""
-        if self.processed_file.exists():
-            try:
-                with open(self.processed_file, 'r') as f:
-                    data = json.load(f)
-                    return set(data.get('ids', []))
-            except Exception as e:
-                logger.error(f"Erro ao carregar artigos processados: {e}")
-        return set()
+        return ProcessedLedger(self.processed_file)
     
     def _save_processed_articles(self):
-        """Salva IDs de artigos processados"""
+        """Cada `add` já grava o ID no registro; aqui só relemos o que outros processos marcaram"""
         try:
-            with open(self.processed_file, 'w') as f:
-                json.dump({
-                    'ids': list(self.processed_articles),
-                    'updated': datetime.now().isoformat()
-                }, f, indent=2)
+            self.processed_articles.refresh()
         except Exception as e:
-            logger.error(f"Erro ao salvar artigos processados: {e}")
+            logger.error(f"Erro ao atualizar artigos processados: {e}")
     
     def fetch_rss_articles(self, limit: int = 3) -> List[Dict]:
         """Busca artigos do feed RSS"""
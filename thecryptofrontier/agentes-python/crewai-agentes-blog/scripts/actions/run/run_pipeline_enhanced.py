@@ -92,10 +92,11 @@ class EnhancedPipeline:
         articles = get_latest_crypto_news(limit=limit)
         validated_articles = []
         
-        for article in articles:
-            # Validar e sanitizar artigo
-            validation_result = self.feed_validator.validate_and_sanitize_article(article)
-            
+        # Validar e sanitizar em lote (imagens verificadas em paralelo, entradas
+        # inalteradas desde o último poll saem do cache)
+        validation_results = self.feed_validator.validate_articles(articles)
+        
+        for article, validation_result in zip(articles, validation_results):
             if validation_result.is_valid:
                 validated_articles.append(validation_result.sanitized_data)
                 logger.info(
@@ -4,11 +4,15 @@ Update the existing XRP post with new content
 """
 
 import os
+import sys
 import json
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+from utils.portable_text_diff import build_patch_mutations, diff_document
+
 load_dotenv()
 
 STRAPI_PROJECT_ID = "z4sx85c6"
@@ -35,28 +39,34 @@ def update_xrp_post():
     sys.path.append(str(Path(__file__).parent))
     from simple_pipeline import format_content_blocks
     
-    # Use PATCH to update the existing post
-    mutations = {
-        "mutations": [{
-            "patch": {
-                "id": "u2j02c8l4v7yQNRMq6yn20",  # ID do post existente
-                "set": {
-                    "title": article['title_pt'],
-                    "excerpt": article['summary_pt'][:200],
-                    "content": format_content_blocks(article['content_pt'])
-                }
-            }
-        }]
-    }
-    
-    # Send request
-    url = f"https://{STRAPI_PROJECT_ID}.api.strapi.io/v{strapi_API_VERSION}/data/mutate/production"
+    post_id = "u2j02c8l4v7yQNRMq6yn20"  # ID do post existente
+    base_url = f"https://{STRAPI_PROJECT_ID}.api.strapi.io/v{strapi_API_VERSION}/data"
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {strapi_API_TOKEN}"
     }
     
-    response = requests.post(url, headers=headers, json=mutations)
+    # Fetch the current revision so only the changed blocks are sent
+    current = requests.get(
+        f"{base_url}/query/production",
+        headers=headers,
+        params={"query": f'*[_id == "{post_id}"][0]'}
+    ).json().get("result") or {}
+    
+    ops = diff_document(current, {
+        "title": article['title_pt'],
+        "excerpt": article['summary_pt'][:200],
+        "content": format_content_blocks(article['content_pt'])
+    })
+    if not ops:
+        print("✅ Post already up to date")
+        return True
+    
+    # PATCH with ifRevisionID: fails with 409 if the post changed meanwhile
+    mutations = {"mutations": build_patch_mutations(post_id, ops, if_revision_id=current.get("_rev"))}
+    print(f"🧩 {ops.count()} patch operations ({len(json.dumps(mutations))} bytes)")
+    
+    response = requests.post(f"{base_url}/mutate/production", headers=headers, json=mutations)
     
     if response.status_code == 200:
         print(f"✅ Post updated successfully!")
@@ -5,15 +5,17 @@ Verifica novos artigos a cada 10 minutos e processa automaticamente
 """
 
 import feedparser
-import json
+import os
 import time
 import logging
+import argparse
+import threading
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import subprocess
 import sys
 import shutil
-from typing import Dict, Set, List
+from typing import Dict, Iterator, Optional, Set, List
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
@@ -30,11 +32,160 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Utilitários leves do projeto (sem importar o pipeline)
+if str(PROJECT_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT / "src"))
+from utils.article_store import get_article_store
+from utils.processed_ledger import ProcessedLedger
+
+# Tempo máximo de uma execução do pipeline
+PIPELINE_TIMEOUT = 900  # 15 minutos
+
+# Tempo máximo de um artigo no runner em processo
+ARTICLE_TIMEOUT = 300  # 5 minutos
+
+class InProcessPipelineRunner:
+    """
+    Hospeda o pipeline no próprio processo do monitor.
+    
+    Os módulos (feedparser, google.generativeai, openai...) são importados
+    uma única vez e os clientes configurados pelo pipeline continuam
+    aquecidos entre os polls. Cada artigo é processado a partir da entrada
+    que o monitor já leu do feed (sem buscar o RSS de novo) e o resultado
+    é devolvido assim que o artigo termina.
+    
+    Cada artigo roda numa thread daemon com prazo (`article_timeout`): uma
+    chamada travada (Gemini, OpenAI, Strapi) vira um evento de timeout e o
+    monitor segue. A thread abandonada não pode ser interrompida; se ela
+    terminar depois, o próprio worker marca o artigo no registro, e o
+    próximo ciclo o pula.
+    """
+    name = "inprocess"
+    
+    def __init__(self, delay_between: float = 5.0, article_timeout: float = ARTICLE_TIMEOUT):
+        self.delay_between = delay_between  # Pausa entre artigos (rate limit do Gemini)
+        self.article_timeout = article_timeout
+        self._pipeline = None
+        self.abandoned = 0
+    
+    def warm_up(self):
+        """Importa o pipeline (custo pago uma vez por processo)"""
+        if self._pipeline is None:
+            src_dir = str(PROJECT_ROOT / "src")
+            if src_dir not in sys.path:
+                sys.path.insert(0, src_dir)
+            from pipelines.simple import strapi_pipeline
+            self._pipeline = strapi_pipeline
+        return self._pipeline
+    
+    def _load_processed_ids(self) -> ProcessedLedger:
+        """IDs já publicados; só lê o que foi anexado desde a última vez (ex.: execução via cron)"""
+        return self.warm_up().load_processed_articles()
+    
+    def run(self, articles: List[Dict]) -> Iterator[Dict]:
+        """Processa os artigos, emitindo um resultado por artigo"""
+        pipeline = self.warm_up()
+        processed_ids = self._load_processed_ids()
+        
+        for index, article in enumerate(articles):
+            started = time.monotonic()
+            event = {"guid": article["guid"], "success": False}
+            try:
+                item = pipeline.entry_to_article(article["entry"])
+                if item["id"] in processed_ids:
+                    event.update(success=True, skipped=True)
+                else:
+                    event.update(self._process_with_deadline(pipeline, item, processed_ids))
+            except Exception as e:
+                logger.error(f"Erro no pipeline para {article.get('title')}: {e}")
+                event["error"] = str(e)
+            
+            event["elapsed"] = time.monotonic() - started
+            yield event
+            
+            if index < len(articles) - 1 and not event.get("skipped"):
+                time.sleep(self.delay_between)
+
+    def _process_with_deadline(self, pipeline, item: Dict, processed_ids: ProcessedLedger) -> Dict:
+        """Processa `item` numa thread com prazo; devolve os campos do evento"""
+        outcome: Dict = {}
+        
+        def work():
+            try:
+                result = pipeline.process_article(item)
+                if result.get("success"):
+                    # Marcado aqui para valer mesmo se o prazo já tiver acabado
+                    processed_ids.add(item["id"])
+                    outcome["success"] = True
+            except Exception as e:
+                outcome["error"] = str(e)
+        
+        worker = threading.Thread(target=work, name=f"article-{item['id'][:8]}", daemon=True)
+        worker.start()
+        worker.join(self.article_timeout)
+        if worker.is_alive():
+            self.abandoned += 1
+            logger.error(
+                f"Artigo excedeu {self.article_timeout:g}s no pipeline: {item.get('title')} "
+                f"({self.abandoned} worker(s) abandonado(s))"
+            )
+            return {"success": False, "timed_out": True, "error": f"timeout após {self.article_timeout:g}s"}
+        event = {"success": outcome.get("success", False)}
+        if "error" in outcome:
+            logger.error(f"Erro no pipeline para {item.get('title')}: {outcome['error']}")
+            event["error"] = outcome["error"]
+        return event
+
+class SubprocessPipelineRunner:
+    """Executa `main.py simple-pipeline` em um processo novo a cada ciclo (modo anterior)"""
+    name = "subprocess"
+    
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or [sys.executable, "main.py", "simple-pipeline"]
+    
+    def warm_up(self):
+        pass
+    
+    def run(self, articles: List[Dict]) -> Iterator[Dict]:
+        """Repassa a saída do pipeline linha a linha; o resultado vale para o lote todo"""
+        started = time.monotonic()
+        process = subprocess.Popen(
+            [*self.command, "--limit", str(len(articles))],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        watchdog = threading.Timer(PIPELINE_TIMEOUT, process.kill)
+        watchdog.start()
+        try:
+            for line in process.stdout:
+                yield {"line": line.rstrip()}
+            returncode = process.wait()
+        finally:
+            watchdog.cancel()
+        
+        elapsed = time.monotonic() - started
+        for article in articles:
+            event = {"guid": article["guid"], "success": returncode == 0, "elapsed": elapsed}
+            if returncode != 0:
+                event["error"] = f"pipeline terminou com código {returncode}"
+            yield event
+
+def create_pipeline_runner(kind: Optional[str] = None):
+    """Runner do pipeline: em processo (padrão) ou subprocess (PIPELINE_RUNNER=subprocess)"""
+    kind = kind or os.environ.get("PIPELINE_RUNNER", InProcessPipelineRunner.name)
+    if kind == SubprocessPipelineRunner.name:
+        return SubprocessPipelineRunner()
+    return InProcessPipelineRunner()
+
 class RSSMonitor:
-    def __init__(self):
+    def __init__(self, runner=None):
         self.feed_url = "https://thecryptobasic.com/feed/"
         self.processed_file = Path("processed_articles.json")
-        self.processed_guids: Set[str] = set()
+        self.processed_guids: Optional[ProcessedLedger] = None
         self.polling_interval = 600  # 10 minutos em segundos
         self.brazil_tz_offset = timedelta(hours=-3)  # UTC-3
         
@@ -60,32 +211,26 @@ class RSSMonitor:
         self.last_cleanup = datetime.now()
         self.cleanup_interval = 86400  # Limpeza diária
         
+        # Pipeline hospedado no monitor (aquecido uma vez)
+        self.runner = runner or create_pipeline_runner()
+        
         # Carregar artigos já processados
         self.load_processed_articles()
     
     def load_processed_articles(self):
         """Carrega GUIDs de artigos já processados"""
-        if self.processed_file.exists():
-            try:
-                with open(self.processed_file, 'r') as f:
-                    data = json.load(f)
-                    self.processed_guids = set(data.get('guids', []))
-                    logger.info(f"Carregados {len(self.processed_guids)} artigos já processados")
-            except Exception as e:
-                logger.error(f"Erro ao carregar artigos processados: {e}")
-                self.processed_guids = set()
+        self.processed_guids = ProcessedLedger(self.processed_file)
+        logger.info(f"Carregados {len(self.processed_guids)} artigos já processados")
     
     def save_processed_articles(self):
-        """Salva GUIDs de artigos processados"""
+        """
+        Cada `add` já grava o GUID no log do registro (append + fsync); aqui
+        só incorporamos o que outros pipelines marcaram no mesmo arquivo.
+        """
         try:
-            data = {
-                'guids': list(self.processed_guids),
-                'last_update': datetime.now().isoformat()
-            }
-            with open(self.processed_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.processed_guids.refresh()
         except Exception as e:
-            logger.error(f"Erro ao salvar artigos processados: {e}")
+            logger.error(f"Erro ao atualizar artigos processados: {e}")
     
     def parse_rss_date(self, date_str: str) -> datetime:
         """Converte data do RSS para datetime com timezone"""
@@ -151,6 +296,12 @@ class RSSMonitor:
         total_removed = 0
         total_size_freed = 0
         
+        # Store de artigos: um DELETE indexado por (state, updated_at)
+        store = get_article_store()
+        if store:
+            cutoff = (now - timedelta(days=self.cleanup_after_days + 1)).timestamp()
+            total_removed += store.purge([d.name for d in self.temp_dirs], before=cutoff)
+        
         for dir_path in self.temp_dirs:
             if not dir_path.exists():
                 continue
@@ -195,6 +346,10 @@ class RSSMonitor:
             Path("posts_publicados")
         ]
         
+        store = get_article_store()
+        if store:
+            cleaned_count += store.purge([d.name for d in dirs_to_clean], after=cutoff_time.timestamp())
+        
         for dir_path in dirs_to_clean:
             if not dir_path.exists():
                 continue
@@ -250,6 +405,8 @@ class RSSMonitor:
                     pub_date_br = self.convert_to_brazil_time(pub_date_utc)
                     
                     article_info = {
+                        'entry': entry,
+                        'detected_at': time.monotonic(),
                         'guid': guid,
                         'title': title,
                         'link': entry.get('link', ''),
@@ -268,41 +425,72 @@ class RSSMonitor:
             logger.error(f"Erro ao verificar feed: {e}")
             return []
     
-    def process_new_articles(self, articles: List[Dict]):
-        """Processa novos artigos encontrados"""
+    def process_new_articles(self, articles: List[Dict]) -> List[float]:
+        """Processa novos artigos encontrados; devolve a latência (detecção → publicação) dos publicados"""
+        latencies: List[float] = []
         if not articles:
-            return
+            return latencies
         
         logger.info(f"Processando {len(articles)} novos artigos...")
+        by_guid = {article['guid']: article for article in articles}
+        succeeded = 0
         
         try:
             # Executar o pipeline completo atualizado
-            logger.info("Iniciando pipeline completo (RSS → Tradução → Imagens → Publicação)...")
-            result = subprocess.run(
-                ["python", "main.py", "simple-pipeline", "--limit", str(len(articles))],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=900  # 15 minutos de timeout
-            )
-            
-            logger.info("Pipeline executado com sucesso")
-            logger.info(f"Saída: {result.stdout[:500]}...")
+            logger.info(f"Iniciando pipeline completo (RSS → Tradução → Imagens → Publicação) [{self.runner.name}]...")
             
-            # Marcar artigos como processados
-            for article in articles:
-                self.processed_guids.add(article['guid'])
-            
-            self.save_processed_articles()
+            for event in self.runner.run(articles):
+                if "line" in event:
+                    logger.info(f"[pipeline] {event['line']}")
+                    continue
+                
+                article = by_guid.get(event['guid'], {})
+                if event['success']:
+                    # Marcar como processado assim que o artigo termina
+                    self.processed_guids.add(event['guid'])
+                    succeeded += 1
+                    latency = time.monotonic() - article.get('detected_at', time.monotonic())
+                    latencies.append(latency)
+                    logger.info(
+                        f"Artigo concluído: {article.get('title')} "
+                        f"({event['elapsed']:.1f}s no pipeline, {latency:.1f}s desde a detecção)"
+                    )
+                else:
+                    logger.error(f"Erro ao executar pipeline para {article.get('title')}: {event.get('error')}")
             
             # Limpar arquivos temporários após sucesso
-            self.cleanup_immediate_after_success()
+            if succeeded:
+                self.cleanup_immediate_after_success()
             
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Erro ao executar pipeline: {e}")
-            logger.error(f"Saída de erro: {e.stderr}")
         except Exception as e:
             logger.error(f"Erro inesperado ao processar artigos: {e}")
+        
+        return latencies
+    
+    def run_cycle(self) -> List[float]:
+        """Um ciclo de verificação: detecta, processa e salva o estado"""
+        # Rotacionar logs se necessário
+        self.rotate_logs_if_needed()
+        
+        # Limpar arquivos JSON antigos periodicamente
+        self.cleanup_old_json_files()
+        
+        # Verificar novos artigos
+        new_articles = self.check_new_articles()
+        
+        latencies: List[float] = []
+        if new_articles:
+            logger.info(f"Encontrados {len(new_articles)} novos artigos!")
+            latencies = self.process_new_articles(new_articles)
+            # Limpar cache após processamento bem-sucedido
+            self.recent_titles_cache.clear()
+            self.cache_last_update = None
+        else:
+            logger.info("Nenhum artigo novo encontrado")
+        
+        # Salvar estado atualizado
+        self.save_processed_articles()
+        return latencies
     
     def run(self):
         """Loop principal do monitor"""
@@ -310,28 +498,14 @@ class RSSMonitor:
         logger.info(f"Feed: {self.feed_url}")
         logger.info(f"Intervalo de verificação: {self.polling_interval/60} minutos")
         
+        try:
+            self.runner.warm_up()
+        except Exception as e:
+            logger.error(f"Erro ao aquecer o pipeline ({self.runner.name}): {e}")
+        
         while True:
             try:
-                # Rotacionar logs se necessário
-                self.rotate_logs_if_needed()
-                
-                # Limpar arquivos JSON antigos periodicamente
-                self.cleanup_old_json_files()
-                
-                # Verificar novos artigos
-                new_articles = self.check_new_articles()
-                
-                if new_articles:
-                    logger.info(f"Encontrados {len(new_articles)} novos artigos!")
-                    self.process_new_articles(new_articles)
-                    # Limpar cache após processamento bem-sucedido
-                    self.recent_titles_cache.clear()
-                    self.cache_last_update = None
-                else:
-                    logger.info("Nenhum artigo novo encontrado")
-                
-                # Salvar estado atualizado
-                self.save_processed_articles()
+                self.run_cycle()
                 
                 # Aguardar próximo ciclo
                 logger.info(f"Aguardando {self.polling_interval/60} minutos para próxima verificação...")
@@ -347,8 +521,12 @@ class RSSMonitor:
 
 def main():
     """Função principal"""
-    monitor = RSSMonitor()
+    parser = argparse.ArgumentParser(description="Monitor RSS")
+    parser.add_argument("--runner", choices=["inprocess", "subprocess"], help="Como executar o pipeline")
+    args = parser.parse_args()
+    
+    monitor = RSSMonitor(runner=create_pipeline_runner(args.runner))
     monitor.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Mede os backends do json_codec nos posts já processados.
+
+Para cada backend instalado (json, orjson, msgspec) mede o tempo de
+serialização e de leitura do corpus inteiro, nos modos compacto e
+indentado, e o tamanho resultante. Depois compara o tamanho do corpus
+compactado com gzip e zstd (se o pacote zstandard estiver instalado).
+Confere também se todos os backends leem de volta os mesmos dados.
+
+Uso:
+    python scripts/validation/benchmark_json_codec.py [diretório de posts] [repetições]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from utils import json_codec
+
+DEFAULT_CORPUS = ROOT / "src" / "pipelines" / "simple" / "posts_processados"
+
+def load_corpus(directory: Path) -> List[Any]:
+    posts = []
+    for path in sorted(directory.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            posts.append(json.load(f))
+    return posts
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    """Menor tempo (ms) entre `repeat` execuções"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    directory = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    posts = load_corpus(directory)
+    if not posts:
+        print(f"Nenhum post em {directory}")
+        return 1
+
+    original_size = sum(path.stat().st_size for path in directory.glob("*.json"))
+    print(f"Corpus: {len(posts)} posts, {original_size / 1024:.1f} KB em disco ({directory})")
+    print(f"Backend padrão: {json_codec.BACKEND}\n")
+
+    backends = ["json"] + [name for name in ("orjson", "msgspec") if getattr(json_codec, name)]
+    reference = None
+    print(f"{'BACKEND':<9} {'MODO':<9} {'ENCODE ms':>10} {'DECODE ms':>10} {'TAMANHO KB':>11}")
+    for backend in backends:
+        json_codec.BACKEND = backend
+        for pretty in (False, True):
+            encoded = [json_codec.dumps(post, pretty=pretty) for post in posts]
+            encode_ms = best_of(lambda: [json_codec.dumps(post, pretty=pretty) for post in posts], repeat)
+            decode_ms = best_of(lambda: [json_codec.loads(data) for data in encoded], repeat)
+            size = sum(len(data) for data in encoded)
+            print(f"{backend:<9} {'indentado' if pretty else 'compacto':<9} {encode_ms:>10.2f} {decode_ms:>10.2f} {size / 1024:>11.1f}")
+
+            decoded = [json_codec.loads(data) for data in encoded]
+            if reference is None:
+                reference = decoded
+            elif decoded != reference:
+                print(f"  ❌ {backend} leu dados diferentes do json")
+                return 1
+
+    json_codec.BACKEND = backends[-1]
+    archive = json_codec.dumps(posts)
+    print(f"\nArquivo do corpus inteiro ({len(archive) / 1024:.1f} KB compacto):")
+    for compression in ("gzip", "zstd"):
+        if compression == "zstd" and json_codec.zstandard is None:
+            print("  zstd: pacote zstandard não instalado")
+            continue
+        packed = json_codec.compress(archive, compression)
+        compress_ms = best_of(lambda: json_codec.compress(archive, compression), repeat)
+        decompress_ms = best_of(lambda: json_codec.decompress(packed), repeat)
+        assert json_codec.decompress(packed) == archive
+        print(
+            f"  {compression}: {len(packed) / 1024:.1f} KB ({len(packed) / len(archive):.0%}), "
+            f"comprime {compress_ms:.2f} ms, descomprime {decompress_ms:.2f} ms"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Compara os runners do monitor RSS em ciclos completos.
+
+Para cada runner (em processo e subprocess) roda ciclos reais do
+RSSMonitor sobre um feed local que ganha artigos novos a cada ciclo:
+detecção, pipeline (strapi_pipeline), registro e limpeza. Só as chamadas
+externas do pipeline são simuladas: a tradução devolve o texto e a
+publicação no Strapi espera `--publish-delay` e responde sucesso. Mede a
+latência detecção → publicação de cada artigo, o tempo e a CPU (processo
++ filhos) por ciclo. Tudo roda em diretórios temporários.
+
+Uso:
+    python scripts/validation/benchmark_rss_monitor.py [ciclos] [--per-cycle N] [--publish-delay S]
+"""
+
+import argparse
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "scripts" / "monitoring"))
+
+import feedparser
+from rss_monitor import InProcessPipelineRunner, RSSMonitor, SubprocessPipelineRunner
+
+FEED_SIZE = 10  # Entradas no feed, como no feed real
+
+def write_feed(path: Path, first: int, count: int):
+    """Feed RSS com as `FEED_SIZE` entradas mais recentes até a de número `first + count - 1`"""
+    paragraph = "<p>Bitcoin and Ethereum markets moved today as traders reacted to <a href='https://example.com'>news</a>.</p>"
+    items = []
+    for number in range(max(first + count - FEED_SIZE, 0), first + count):
+        link = f"https://example.com/benchmark/article-{number}"
+        items.append(
+            f"<item><title>Benchmark article {number}</title><link>{link}</link>"
+            f"<guid>{link}</guid><pubDate>{formatdate(usegmt=True)}</pubDate>"
+            f"<description>{escape(paragraph)}</description></item>"
+        )
+    path.write_text(
+        f"<?xml version='1.0'?><rss version='2.0'><channel><title>Benchmark</title>{''.join(items)}</channel></rss>",
+        encoding="utf-8"
+    )
+
+def stub_pipeline(pipeline, publish_delay: float):
+    """
+    Troca só as chamadas externas do pipeline; o resto (conversão da
+    entrada, JSON local, registro) roda de verdade.
+    """
+    def publish_to_strapi(article: Dict, image_id: Optional[int] = None) -> bool:
+        time.sleep(publish_delay)
+        return True
+
+    pipeline.translate_text = lambda text, is_title=False: text
+    pipeline.publish_to_strapi = publish_to_strapi
+    pipeline.POSTS_DIR = Path("posts_processados")
+    pipeline.POSTS_DIR.mkdir(exist_ok=True)
+    return pipeline
+
+def run_child(feed_path: str, limit: int, publish_delay: float):
+    """
+    Processo filho do runner subprocess: o mesmo trabalho de
+    `main.py simple-pipeline` (sem a pausa de 5s entre artigos), lendo o
+    feed local e com o publicador simulado.
+    """
+    from pipelines.simple import strapi_pipeline
+    pipeline = stub_pipeline(strapi_pipeline, publish_delay)
+    processed_ids = pipeline.load_processed_articles()
+    articles = [pipeline.entry_to_article(entry) for entry in feedparser.parse(feed_path).entries]
+    for article in [a for a in articles if a["id"] not in processed_ids][:limit]:
+        if pipeline.process_article(article)["success"]:
+            processed_ids.add(article["id"])
+
+def measure(action) -> Dict:
+    wall = time.perf_counter()
+    before_self = resource.getrusage(resource.RUSAGE_SELF)
+    before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    latencies = action()
+    after_self = resource.getrusage(resource.RUSAGE_SELF)
+    after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = sum(
+        (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        for before, after in ((before_self, after_self), (before_children, after_children))
+    )
+    return {"wall": time.perf_counter() - wall, "cpu": cpu, "latencies": latencies}
+
+def benchmark_runner(name: str, cycles: int, per_cycle: int, publish_delay: float) -> List[Dict]:
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix=f"rss_benchmark_{name}_")
+    os.chdir(workdir)
+    try:
+        feed_path = Path(workdir) / "feed.xml"
+        if name == InProcessPipelineRunner.name:
+            runner = InProcessPipelineRunner(delay_between=0)
+            stub_pipeline(runner.warm_up(), publish_delay)
+        else:
+            runner = SubprocessPipelineRunner([
+                sys.executable, str(Path(__file__).resolve()),
+                "--child", str(feed_path), "--publish-delay", str(publish_delay)
+            ])
+
+        monitor = RSSMonitor(runner=runner)
+        monitor.feed_url = str(feed_path)
+        # Consulta ao Strapi fora da medição (seria cache na maioria dos ciclos reais)
+        monitor.get_recent_titles_from_strapi = lambda: set()
+
+        samples = []
+        for cycle in range(cycles):
+            write_feed(feed_path, cycle * per_cycle, per_cycle)
+            samples.append(measure(monitor.run_cycle))
+        return samples
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ciclos completos do monitor RSS por runner")
+    parser.add_argument("cycles", nargs="?", type=int, default=5, help="Ciclos por runner")
+    parser.add_argument("--per-cycle", type=int, default=2, help="Artigos novos por ciclo")
+    parser.add_argument("--publish-delay", type=float, default=0.0, help="Tempo simulado de cada publicação (s)")
+    parser.add_argument("--child", metavar="FEED", help="Modo filho do runner subprocess")
+    parser.add_argument("--limit", type=int, default=FEED_SIZE, help="Artigos por execução no modo filho")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.limit, args.publish_delay)
+        return
+
+    # O log por artigo não entra na medição (nem polui a saída)
+    logging.disable(logging.INFO)
+    results = {
+        name: benchmark_runner(name, args.cycles, args.per_cycle, args.publish_delay)
+        for name in (InProcessPipelineRunner.name, SubprocessPipelineRunner.name)
+    }
+    logging.disable(logging.NOTSET)
+
+    print(f"{args.cycles} ciclos, {args.per_cycle} artigos novos por ciclo, "
+          f"publicação simulada em {args.publish_delay:.3f}s")
+    print(f"{'runner':<12} {'publicados':>10} {'latência média (s)':>19} {'latência máx (s)':>17} "
+          f"{'ciclo (s)':>10} {'CPU/ciclo (s)':>14}")
+    for name, samples in results.items():
+        latencies = [latency for sample in samples for latency in sample["latencies"]]
+        print(
+            f"{name:<12} {len(latencies):>10} "
+            f"{(sum(latencies) / len(latencies) if latencies else 0):>19.4f} "
+            f"{max(latencies, default=0):>17.4f} "
+            f"{sum(s['wall'] for s in samples) / len(samples):>10.4f} "
+            f"{sum(s['cpu'] for s in samples) / len(samples):>14.4f}"
+        )
+
+if __name__ == "__main__":
+    main()
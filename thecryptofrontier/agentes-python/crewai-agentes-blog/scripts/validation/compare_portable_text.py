@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Compara o conversor Portable Text em passada única com a implementação
+anterior (BeautifulSoup + percurso recursivo) nos posts já processados.
+
+Verifica se os blocos gerados são idênticos (as chaves aleatórias dos
+parágrafos da versão antiga são ignoradas) e mede a vazão de cada um.
+
+Uso:
+    python scripts/validation/compare_portable_text.py [diretório de posts]
+"""
+
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, NavigableString
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from utils.portable_text import convert_markdown_to_html, html_to_portable_text
+
+DEFAULT_CORPUS = ROOT / "src" / "pipelines" / "simple" / "posts_processados"
+
+# Casos sintéticos que o corpus não cobre (aninhamento, imagens, links)
+EXTRA_CASES = [
+    '<p>Texto com <a href="https://x.com" target="_blank">link <b>forte</b></a> e <em>ênfase</em></p>',
+    '<blockquote><p>Citação <i>aninhada</i></p> com cauda</blockquote><h2>Título <b>misto</b></h2>',
+    '<figure><img src="a.png" alt=""><figcaption>Legenda <b>1</b></figcaption></figure><img src="a.png"><img src="b.png" alt="B">',
+    '<p>Imagem <img src="c.png"> no meio<!-- nota --></p><p>   </p><p><a>sem href</a> &amp; entidades &eacute;</p>',
+    '<p>aberto <strong>sem fechar<p>outro</p></strong> fim</p></div><h1></h1><h3>ok</h3>',
+    '**Negrito** e `código` com _itálico_ e [texto]\n\n' + 'Parágrafo longo o bastante para passar do limite do fallback. ' * 2,
+]
+
+def legacy_paragraph(element) -> Dict:
+    """Versão antiga de simple_pipeline.process_paragraph_with_links"""
+    block = {
+        "_type": "block",
+        "_key": str(uuid.uuid4())[:8],
+        "style": "normal",
+        "markDefs": [],
+        "children": []
+    }
+    counts = {"span": 0, "mark": 0}
+
+    def process_element(el, parent_marks=[]):
+        if isinstance(el, NavigableString):
+            text = str(el)
+            if text.strip():
+                block["children"].append({
+                    "_type": "span",
+                    "_key": f"span{counts['span']}",
+                    "text": text,
+                    "marks": parent_marks.copy()
+                })
+                counts["span"] += 1
+        elif el.name == 'a':
+            href = el.get('href', '')
+            if href:
+                mark_key = f"link{counts['mark']}"
+                mark_def = {"_type": "link", "_key": mark_key, "href": href}
+                if el.get('target') == '_blank':
+                    mark_def["blank"] = True
+                block["markDefs"].append(mark_def)
+                for child in el.children:
+                    process_element(child, parent_marks + [mark_key])
+                counts["mark"] += 1
+            else:
+                for child in el.children:
+                    process_element(child, parent_marks)
+        elif el.name in ['strong', 'b']:
+            for child in el.children:
+                process_element(child, parent_marks + ['strong'])
+        elif el.name in ['em', 'i']:
+            for child in el.children:
+                process_element(child, parent_marks + ['em'])
+        elif el.name == 'code':
+            for child in el.children:
+                process_element(child, parent_marks + ['code'])
+        else:
+            for child in el.children:
+                process_element(child, parent_marks)
+
+    for child in element.children:
+        process_element(child)
+    return block
+
+def legacy_format_content_blocks(content: str) -> List[Dict]:
+    """Versão antiga de simple_pipeline.format_content_blocks"""
+    soup = BeautifulSoup(convert_markdown_to_html(content), 'html.parser')
+    blocks = []
+    block_count = 0
+    processed_images = set()
+
+    for element in soup.find_all(['p', 'figure', 'img', 'h1', 'h2', 'h3', 'h4', 'blockquote']):
+        if element.name in ('p', 'blockquote'):
+            if element.get_text(strip=True):
+                block = legacy_paragraph(element)
+                if element.name == 'blockquote':
+                    block["style"] = "blockquote"
+                if block["children"]:
+                    blocks.append(block)
+                    block_count += 1
+        elif element.name == 'figure':
+            img_tag = element.find('img')
+            if img_tag and img_tag.get('src'):
+                img_url = img_tag.get('src')
+                if img_url not in processed_images:
+                    processed_images.add(img_url)
+                    caption_elem = element.find('figcaption')
+                    caption = caption_elem.get_text(strip=True) if caption_elem else ''
+                    blocks.append({
+                        "_type": "image",
+                        "_key": f"image{block_count}",
+                        "url": img_url,
+                        "alt": img_tag.get('alt', '') or caption or "Imagem do artigo",
+                        "caption": caption if caption else None
+                    })
+                    block_count += 1
+        elif element.name == 'img':
+            img_url = element.get('src')
+            if img_url and img_url not in processed_images:
+                processed_images.add(img_url)
+                blocks.append({
+                    "_type": "image",
+                    "_key": f"image{block_count}",
+                    "url": img_url,
+                    "alt": element.get('alt', '') or "Imagem do artigo",
+                    "caption": None
+                })
+                block_count += 1
+        else:
+            text = element.get_text(strip=True)
+            if text:
+                blocks.append({
+                    "_type": "block",
+                    "_key": f"block{block_count}",
+                    "style": element.name,
+                    "markDefs": [],
+                    "children": [{
+                        "_type": "span",
+                        "_key": f"span{block_count}",
+                        "text": text,
+                        "marks": []
+                    }]
+                })
+                block_count += 1
+
+    if not blocks:
+        text_content = soup.get_text(separator='\n\n', strip=True)
+        paragraphs = [p.strip() for p in text_content.split('\n\n') if p.strip() and len(p.strip()) > 50]
+        for i, para in enumerate(paragraphs[:15]):
+            blocks.append({
+                "_type": "block",
+                "_key": f"block{i}",
+                "style": "normal",
+                "markDefs": [],
+                "children": [{"_type": "span", "_key": f"span{i}", "text": para, "marks": []}]
+            })
+
+    return blocks
+
+def without_keys(value):
+    """Compara só o conteúdo: as chaves agora vêm de hash, não da posição"""
+    if isinstance(value, dict):
+        return {k: without_keys(v) for k, v in value.items() if k != "_key"}
+    if isinstance(value, list):
+        return [without_keys(v) for v in value]
+    return value
+
+def load_corpus(directory: Path) -> List[str]:
+    documents = []
+    for path in sorted(directory.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            post = json.load(f)
+        for field in ("content_pt", "content", "summary_pt", "summary"):
+            if isinstance(post.get(field), str):
+                documents.append(post[field])
+    return documents
+
+def throughput(convert, documents: List[str], rounds: int) -> float:
+    """Documentos convertidos por segundo"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            convert(document)
+    return rounds * len(documents) / (time.perf_counter() - start)
+
+def main():
+    directory = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CORPUS
+    documents = load_corpus(directory) + EXTRA_CASES
+    print(f"📄 {len(documents)} documentos de {directory}")
+
+    mismatches = 0
+    for index, document in enumerate(documents):
+        new = html_to_portable_text(document)
+        keys = [block["_key"] for block in new]
+        if len(keys) != len(set(keys)):
+            print(f"❌ Documento {index}: chaves duplicadas {keys}")
+            mismatches += 1
+        if without_keys(new) != without_keys(legacy_format_content_blocks(document)):
+            print(f"❌ Documento {index}: saída diferente da versão anterior")
+            mismatches += 1
+        if new != html_to_portable_text(document):
+            print(f"❌ Documento {index}: chaves não determinísticas")
+            mismatches += 1
+
+    if mismatches:
+        print(f"\n{mismatches} divergência(s) encontradas")
+        sys.exit(1)
+    print("✅ Saída idêntica em todos os documentos")
+
+    total_kb = sum(len(d.encode("utf-8")) for d in documents) / 1024
+    rounds = 20
+    legacy = throughput(legacy_format_content_blocks, documents, rounds)
+    streaming = throughput(html_to_portable_text, documents, rounds)
+    print(f"\n{'conversor':<22} {'docs/s':>10} {'KB/s':>10}")
+    for name, rate in (("BeautifulSoup (antigo)", legacy), ("passada única", streaming)):
+        print(f"{name:<22} {rate:>10.0f} {rate * total_kb / len(documents):>10.0f}")
+    print(f"ganho: {streaming / legacy:.1f}x")
+
+if __name__ == "__main__":
+    main()
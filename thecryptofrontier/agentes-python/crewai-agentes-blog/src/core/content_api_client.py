@@ -25,16 +25,32 @@ import re
 import unicodedata
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from functools import wraps
 import time
 
+try:
+    from ..monitoring.latency_histogram import LatencyHistogram, histograms_to_prometheus
+    from ..monitoring.metrics_registry import get_registry
+    from ..monitoring.passive_health import record_call
+    from ..utils.keyword_matcher import analyze_text
+    from ..utils.portable_text import text_to_portable_text
+    from ..utils.portable_text_diff import build_patch_mutations, diff_document
+except ImportError:
+    from monitoring.latency_histogram import LatencyHistogram, histograms_to_prometheus
+    from monitoring.metrics_registry import get_registry
+    from monitoring.passive_health import record_call
+    from utils.keyword_matcher import analyze_text
+    from utils.portable_text import text_to_portable_text
+    from utils.portable_text_diff import build_patch_mutations, diff_document
+
 logger = logging.getLogger("content_api_client")
 
 # Métricas para monitoramento
 class APIMetrics:
     """Classe para registrar métricas de uso da API"""
-    def __init__(self):
+    def __init__(self, service: str = "sanity"):
+        self.service = service
         self.requests = 0
         self.successes = 0
         self.failures = 0
@@ -48,6 +64,8 @@ class APIMetrics:
             'category': 0,
             'author': 0
         }
+        # Histograma de latência por operação
+        self.latencies: Dict[str, LatencyHistogram] = {}
     
     def record_request(self, operation: str, success: bool, duration: float):
         """Registra uma requisição"""
@@ -59,6 +77,12 @@ class APIMetrics:
         self.total_time += duration
         if operation in self.operations:
             self.operations[operation] += 1
+        
+        histogram = self.latencies.get(operation)
+        if histogram is None:
+            histogram = self.latencies.setdefault(operation, LatencyHistogram())
+        histogram.record(duration)
+        record_call(self.service, success, duration)
     
     def get_stats(self) -> Dict:
         """Retorna estatísticas de uso"""
@@ -68,8 +92,27 @@ class APIMetrics:
             'failed_requests': self.failures,
             'success_rate': self.successes / self.requests if self.requests > 0 else 0,
             'average_response_time': self.total_time / self.requests if self.requests > 0 else 0,
-            'operations': self.operations
+            'operations': self.operations,
+            'latency': {
+                operation: histogram.get_stats()
+                for operation, histogram in self.latencies.items()
+            }
         }
+    
+    def to_prometheus(self) -> str:
+        """Exporta as métricas no formato texto do Prometheus"""
+        lines = [
+            "# HELP content_api_requests_total Requisições à API de conteúdo",
+            "# TYPE content_api_requests_total counter",
+            f'content_api_requests_total{{result="success"}} {self.successes}',
+            f'content_api_requests_total{{result="failure"}} {self.failures}',
+        ]
+        return "\n".join(lines) + "\n" + histograms_to_prometheus(
+            "content_api_request_duration_seconds",
+            self.latencies,
+            label="operation",
+            help_text="Latência das operações da API de conteúdo"
+        )
 
 # Decorador para registrar métricas
 def track_metrics(operation: str):
@@ -77,15 +120,15 @@ def track_metrics(operation: str):
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(self, *args, **kwargs)
                 success = result.get('success', False) if isinstance(result, dict) else True
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 self._metrics.record_request(operation, success, duration)
                 return result
             except Exception as e:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 self._metrics.record_request(operation, False, duration)
                 raise e
         return wrapper
@@ -128,6 +171,7 @@ class ContentAPIClient:
             
         # Inicializar métricas
         self._metrics = APIMetrics()
+        get_registry().register_collector("content_api", self._metrics.to_prometheus)
         
         # Cache para evitar requisições desnecessárias
         self._cache = {
@@ -172,98 +216,15 @@ class ContentAPIClient:
     @staticmethod
     def texto_para_portable_text(texto: str) -> List[Dict]:
         """Converte texto simples para formato Portable Text"""
-        # Remover tags HTML
-        texto = re.sub(r'<[^>]*>', '', texto)
-        
-        # Dividir em parágrafos
-        paragrafos = [p.strip() for p in texto.split("\n\n") if p.strip()]
-        
-        # Criar blocos
-        blocos = []
-        for paragrafo in paragrafos:
-            bloco = {
-                "_type": "block",
-                "_key": ContentAPIClient.gerar_chave(),
-                "style": "normal",
-                "markDefs": [],
-                "children": [
-                    {
-                        "_type": "span",
-                        "_key": ContentAPIClient.gerar_chave(),
-                        "text": paragrafo,
-                        "marks": []
-                    }
-                ]
-            }
-            blocos.append(bloco)
-        
-        return blocos
+        return text_to_portable_text(texto)
     
     def detect_categories(self, title: str, content: str) -> List[str]:
         """Detecta categorias baseadas no conteúdo"""
-        text = f"{title} {content}".lower()
-        categories = []
-        
-        # Mapeamento de palavras-chave para categorias
-        category_mappings = {
-            "Bitcoin": ["bitcoin", "btc", "satoshi", "lightning network"],
-            "Ethereum": ["ethereum", "eth", "vitalik", "smart contract", "erc-20"],
-            "DeFi": ["defi", "decentralized finance", "yield", "liquidity", "amm", "dex"],
-            "NFT": ["nft", "non-fungible", "opensea", "digital art", "erc-721"],
-            "Análise de Mercado": ["price", "market", "trading", "análise", "preço", "chart"],
-            "Regulação": ["regulation", "sec", "government", "regulação", "governo", "compliance"],
-            "Tecnologia": ["blockchain", "consensus", "technology", "tecnologia", "protocol"],
-            "Altcoins": ["altcoin", "xrp", "ada", "dot", "bnb", "sol", "avax", "matic"]
-        }
-        
-        for category, keywords in category_mappings.items():
-            for keyword in keywords:
-                if keyword in text:
-                    if category not in categories:
-                        categories.append(category)
-                    break
-        
-        # Se nenhuma categoria específica, usar "Criptomoedas"
-        if not categories:
-            categories.append("Criptomoedas")
-        
-        return categories[:3]  # Máximo 3 categorias
+        return analyze_text(title, content)["categories"]
     
     def extract_tags(self, title: str, content: str) -> List[str]:
         """Extrai tags relevantes do conteúdo"""
-        text = f"{title} {content}".lower()
-        tags = []
-        
-        # Lista de criptomoedas e termos relevantes
-        crypto_tags = [
-            "bitcoin", "ethereum", "xrp", "bnb", "solana", "cardano",
-            "dogecoin", "shiba", "polygon", "avalanche", "chainlink",
-            "tron", "usdt", "usdc", "dai", "maker", "aave", "uniswap",
-            "compound", "sushiswap", "pancakeswap", "curve", "convex"
-        ]
-        
-        # Verificar menções
-        for crypto in crypto_tags:
-            if crypto in text and crypto not in tags:
-                tags.append(crypto)
-        
-        # Tags temáticas
-        theme_tags = {
-            "trading": ["trade", "trading", "exchange", "order book"],
-            "defi": ["defi", "yield", "staking", "farming", "liquidity"],
-            "nft": ["nft", "opensea", "digital art", "collectible"],
-            "web3": ["web3", "metaverse", "dao", "governance"],
-            "mining": ["mining", "miner", "hashrate", "proof of work"],
-            "wallet": ["wallet", "ledger", "metamask", "custody"]
-        }
-        
-        for tag, keywords in theme_tags.items():
-            for keyword in keywords:
-                if keyword in text and tag not in tags:
-                    tags.append(tag)
-                    break
-        
-        return tags[:5]  # Máximo 5 tags
+        return analyze_text(title, content)["tags"]
     
     @track_metrics('author')
     def ensure_author_exists(self, author_name: str = "Crypto Frontier") -> Optional[Dict]:
@@ -509,8 +470,8 @@ class ContentAPIClient:
             
             # Auto-detectar metadados se habilitado
             if auto_metadata:
-                categories = self.detect_categories(post_data["title"], content_text)
-                tags = self.extract_tags(post_data["title"], content_text)
+                detected = analyze_text(post_data["title"], content_text)
+                categories, tags = detected["categories"], detected["tags"]
                 logger.info(f"Metadados detectados - Categorias: {categories}, Tags: {tags}")
             else:
                 categories = post_data.get("categories", [])
@@ -594,13 +555,21 @@ class ContentAPIClient:
             }
     
     @track_metrics('update')
-    def update_post(self, post_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    def update_post(
+        self,
+        post_id: str,
+        updates: Dict[str, Any],
+        current: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Atualiza um post existente
         
         Args:
             post_id: ID do post
             updates: Campos a atualizar
+            current: Documento como lido antes da edição (com `_rev`). Se
+                informado, só as diferenças são enviadas (patch por bloco)
+                e a escrita falha com conflito se o post mudou nesse meio tempo
             
         Returns:
             Dict com resultado da operação
@@ -639,17 +608,32 @@ class ContentAPIClient:
                     patch_doc["tags"] = tag_refs
             
             # Criar mutação
-            mutations = {
-                "mutations": [{
-                    "patch": {
-                        "id": post_id,
-                        "set": patch_doc
+            if current is not None:
+                ops = diff_document(current, patch_doc)
+                if not ops:
+                    return {
+                        "success": True,
+                        "message": "Post já está atualizado",
+                        "post_id": post_id,
+                        "operations": 0
                     }
-                }]
-            }
+                mutations = {
+                    "mutations": build_patch_mutations(post_id, ops, if_revision_id=current.get("_rev"))
+                }
+                logger.info(f"Atualizando post: {post_id} ({ops.count()} operações de patch)")
+            else:
+                ops = None
+                mutations = {
+                    "mutations": [{
+                        "patch": {
+                            "id": post_id,
+                            "set": patch_doc
+                        }
+                    }]
+                }
+                logger.info(f"Atualizando post: {post_id}")
             
             # Enviar requisição
-            logger.info(f"Atualizando post: {post_id}")
             response = requests.post(
                 self.get_api_url(),
                 headers=self.get_headers(),
@@ -661,7 +645,15 @@ class ContentAPIClient:
                 return {
                     "success": True,
                     "message": "Post atualizado com sucesso",
-                    "post_id": post_id
+                    "post_id": post_id,
+                    "operations": ops.count() if ops is not None else 1,
+                    "payload_bytes": len(json.dumps(mutations))
+                }
+            elif response.status_code == 409 and current is not None:
+                return {
+                    "success": False,
+                    "conflict": True,
+                    "error": f"Post modificado desde a leitura (revisão {current.get('_rev')})"
                 }
             else:
                 return {
@@ -676,6 +668,42 @@ class ContentAPIClient:
                 "error": str(e)
             }
     
+    def patch_post(
+        self,
+        post_id: str,
+        updates: Union[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]]],
+        max_attempts: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Lê o post e envia apenas as diferenças, com controle otimista de
+        concorrência: em caso de conflito relê o documento e recalcula o diff
+        
+        Args:
+            post_id: ID do post
+            updates: Campos a atualizar (mesmo formato de update_post) ou
+                função que recebe o post atual e devolve os campos; use a
+                função quando a edição depende do conteúdo (ex.: correção de
+                links), para que seja refeita sobre a versão relida
+            max_attempts: Tentativas em caso de conflito de revisão
+            
+        Returns:
+            Dict com resultado da operação
+        """
+        result: Dict[str, Any] = {"success": False, "error": "Nenhuma tentativa realizada"}
+        for attempt in range(1, max_attempts + 1):
+            current = self.get_post(post_id=post_id)
+            if not current.get("success"):
+                return current
+            
+            post = current["post"]
+            fields = updates(post) if callable(updates) else updates
+            result = self.update_post(post_id, fields, current=post)
+            if not result.get("conflict"):
+                return result
+            logger.warning(f"Conflito ao atualizar {post_id} (tentativa {attempt}/{max_attempts})")
+        
+        return result
+    
     @track_metrics('get')
     def get_post(self, post_id: str = None, slug: str = None) -> Dict[str, Any]:
         """
@@ -834,6 +862,10 @@ class ContentAPIClient:
         """Retorna métricas de uso da API"""
         return self._metrics.get_stats()
     
+    def get_metrics_prometheus(self) -> str:
+        """Retorna métricas de uso da API no formato do Prometheus"""
+        return self._metrics.to_prometheus()
+    
     def reset_cache(self):
         """Limpa o cache interno"""
         self._cache = {
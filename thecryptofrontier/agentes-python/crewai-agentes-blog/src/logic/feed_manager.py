@@ -9,6 +9,11 @@ from pathlib import Path
 import feedparser
 from datetime import datetime
 
+try:
+    from ..utils.article_store import save_json
+except ImportError:
+    from utils.article_store import save_json
+
 # Configuração de logging
 logger = logging.getLogger("feed_manager")
 
@@ -110,18 +115,14 @@ class FeedManager:
     def save_feed_entry(self, entry, output_dir, prefix="article"):
         """Salva uma entrada de feed como um arquivo JSON"""
         try:
-            # Garantir que o diretório existe
-            os.makedirs(output_dir, exist_ok=True)
-            
             # Gerar um nome de arquivo baseado no timestamp
             timestamp = int(datetime.now().timestamp())
             index = entry.get("index", 0)
             filename = f"{prefix}_{timestamp}_{index}.json"
             filepath = os.path.join(output_dir, filename)
             
-            # Salvar no arquivo
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(entry, f, ensure_ascii=False, indent=2)
+            # Salvar (store de artigos ou arquivo; save_json cria o diretório)
+            save_json(filepath, entry)
                 
             logger.info(f"Entrada salva com sucesso: {filepath}")
             return {"success": True, "path": filepath}
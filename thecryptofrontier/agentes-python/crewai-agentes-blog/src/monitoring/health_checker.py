@@ -14,6 +14,13 @@ import os
 from enum import Enum
 import logging
 
+try:
+    from .metrics_registry import get_registry
+    from .passive_health import TrafficHealth, TrafficSignal, get_traffic_health
+except ImportError:
+    from monitoring.metrics_registry import get_registry
+    from monitoring.passive_health import TrafficHealth, TrafficSignal, get_traffic_health
+
 logger = logging.getLogger(__name__)
 
 class ServiceStatus(Enum):
@@ -42,127 +49,195 @@ class APIQuota:
     def __post_init__(self):
         self.percentage_used = (self.used / self.limit * 100) if self.limit > 0 else 0
 
+# Valor exportado por status em service_health_status
+STATUS_GAUGE_VALUES = {
+    ServiceStatus.HEALTHY: 1.0,
+    ServiceStatus.DEGRADED: 0.5,
+    ServiceStatus.UNHEALTHY: 0.0,
+    ServiceStatus.UNKNOWN: -1.0,
+}
+
+# p95 de latência (segundos) acima do qual o serviço é considerado degradado
+LATENCY_THRESHOLDS = {
+    "openai": 30.0,
+    "google_ai": 30.0,
+    "strapi": 5.0,
+}
+
 class HealthChecker:
-    def __init__(self, alert_threshold: float = 80.0):
+    """
+    Health checks derivados do tráfego real.
+    
+    O status vem da taxa de erro e do p95 de latência das chamadas que o
+    pipeline já fez (ver passive_health). Probes sintéticos, em endpoints
+    que não consomem quota, só rodam quando o serviço ficou sem tráfego por
+    `idle_probe_after` segundos. Cada resultado fica em cache por `cache_ttl`.
+    """
+    
+    def __init__(
+        self,
+        alert_threshold: float = 80.0,
+        cache_ttl: float = 60.0,
+        idle_probe_after: float = 900.0,
+        min_calls: int = 3,
+        traffic: Optional[TrafficHealth] = None
+    ):
         self.alert_threshold = alert_threshold
+        self.cache_ttl = cache_ttl
+        self.idle_probe_after = idle_probe_after
+        self.min_calls = min_calls
+        self.traffic = traffic or get_traffic_health()
         self.health_history: List[HealthCheckResult] = []
         self.quota_history: List[APIQuota] = []
         self.alerts: List[Dict] = []
+        self._cache: Dict[str, Tuple[float, HealthCheckResult]] = {}
+        
+        registry = get_registry()
+        self._status_gauge = registry.gauge(
+            "service_health_status",
+            "Status do serviço (1=healthy, 0.5=degraded, 0=unhealthy, -1=unknown)",
+            ["service"]
+        )
+        self._response_gauge = registry.gauge(
+            "service_health_check_duration_seconds", "Duração do último health check", ["service"]
+        )
+        self._checks_total = registry.counter(
+            "service_health_checks_total", "Health checks executados", ["service", "status"]
+        )
+        self._quota_gauge = registry.gauge(
+            "api_quota_used_ratio", "Fração da quota de API utilizada", ["service"]
+        )
+        
+    def _status_from_signal(self, signal: TrafficSignal) -> Tuple[ServiceStatus, Optional[str]]:
+        """Classifica o serviço pela janela de tráfego"""
+        if signal.error_rate >= 0.5:
+            return ServiceStatus.UNHEALTHY, signal.last_error
+        if signal.error_rate >= 0.1:
+            return ServiceStatus.DEGRADED, signal.last_error
+        if signal.throttle_rate >= 0.2:
+            return ServiceStatus.DEGRADED, f"{signal.throttled} respostas de rate limit"
+        threshold = LATENCY_THRESHOLDS.get(signal.service)
+        if threshold and signal.p95_latency > threshold:
+            return ServiceStatus.DEGRADED, f"p95 de {signal.p95_latency:.1f}s"
+        return ServiceStatus.HEALTHY, None
+    
+    def _passive_result(self, service: str, key: str) -> Optional[HealthCheckResult]:
+        """Resultado derivado do tráfego; None se o serviço está ocioso"""
+        signal = self.traffic.get_signal(key)
+        if signal is None or signal.idle_seconds >= self.idle_probe_after:
+            return None
         
+        if signal.calls >= self.min_calls:
+            status, error = self._status_from_signal(signal)
+        elif signal.last_success:
+            # Pouco tráfego na janela: vale o resultado da última chamada
+            status, error = ServiceStatus.HEALTHY, None
+        else:
+            status, error = ServiceStatus.DEGRADED, signal.last_error
+        
+        return HealthCheckResult(
+            service=service,
+            status=status,
+            response_time=signal.p95_latency,
+            error=error,
+            details=signal.to_dict()
+        )
+    
+    async def _check(self, service: str, key: str, probe) -> HealthCheckResult:
+        """Cache -> tráfego real -> probe sintético"""
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+        
+        result = self._passive_result(service, key)
+        if result is None:
+            start_time = time.time()
+            try:
+                result = await probe()
+            except Exception as e:
+                logger.error(f"{service} health check failed: {e}")
+                result = HealthCheckResult(
+                    service=service,
+                    status=ServiceStatus.UNHEALTHY,
+                    response_time=time.time() - start_time,
+                    error=str(e),
+                    details={"source": "probe"}
+                )
+        
+        self._cache[key] = (time.monotonic(), result)
+        return result
+    
     async def check_openai_health(self) -> HealthCheckResult:
         """Verifica saúde da API OpenAI"""
+        return await self._check("OpenAI", "openai", self._probe_openai)
+    
+    async def _probe_openai(self) -> HealthCheckResult:
+        """Probe sem custo: lista de modelos"""
         start_time = time.time()
+        client = openai.OpenAI()
+        await asyncio.to_thread(client.models.list)
         
-        try:
-            client = openai.OpenAI()
-            # Pequena requisição de teste
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=1
-                )
-            )
-            
-            response_time = time.time() - start_time
-            
-            return HealthCheckResult(
-                service="OpenAI",
-                status=ServiceStatus.HEALTHY,
-                response_time=response_time,
-                details={"model": "gpt-3.5-turbo"}
-            )
-            
-        except Exception as e:
-            response_time = time.time() - start_time
-            logger.error(f"OpenAI health check failed: {e}")
-            
-            return HealthCheckResult(
-                service="OpenAI",
-                status=ServiceStatus.UNHEALTHY,
-                response_time=response_time,
-                error=str(e)
-            )
+        return HealthCheckResult(
+            service="OpenAI",
+            status=ServiceStatus.HEALTHY,
+            response_time=time.time() - start_time,
+            details={"source": "probe", "endpoint": "models.list"}
+        )
     
     async def check_google_ai_health(self) -> HealthCheckResult:
         """Verifica saúde da API Google AI"""
+        return await self._check("Google AI", "google_ai", self._probe_google_ai)
+    
+    async def _probe_google_ai(self) -> HealthCheckResult:
+        """Probe sem custo: lista de modelos"""
         start_time = time.time()
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        await asyncio.to_thread(lambda: next(iter(genai.list_models()), None))
         
-        try:
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel('gemini-pro')
-            
-            # Pequena requisição de teste
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: model.generate_content("test")
-            )
-            
-            response_time = time.time() - start_time
-            
-            return HealthCheckResult(
-                service="Google AI",
-                status=ServiceStatus.HEALTHY,
-                response_time=response_time,
-                details={"model": "gemini-pro"}
-            )
-            
-        except Exception as e:
-            response_time = time.time() - start_time
-            logger.error(f"Google AI health check failed: {e}")
-            
-            return HealthCheckResult(
-                service="Google AI",
-                status=ServiceStatus.UNHEALTHY,
-                response_time=response_time,
-                error=str(e)
-            )
+        return HealthCheckResult(
+            service="Google AI",
+            status=ServiceStatus.HEALTHY,
+            response_time=time.time() - start_time,
+            details={"source": "probe", "endpoint": "list_models"}
+        )
     
     async def check_strapi_health(self) -> HealthCheckResult:
         """Verifica saúde do Strapi CMS"""
+        return await self._check("Strapi CMS", "strapi", self._probe_strapi)
+    
+    async def _probe_strapi(self) -> HealthCheckResult:
+        """Probe sem custo: /_health do Strapi configurado (fora do event loop)"""
         start_time = time.time()
+        base_url = os.getenv("STRAPI_URL", "http://localhost:1337").rstrip("/")
+        headers = {}
+        api_token = os.getenv("STRAPI_API_TOKEN")
+        if api_token:
+            headers["Authorization"] = f"Bearer {api_token}"
         
-        try:
-            project_id = os.getenv("STRAPI_PROJECT_ID")
-            dataset = os.getenv("strapi_DATASET", "production")
-            
-            response = requests.get(
-                f"https://{project_id}.api.strapi.io/v2021-10-21/data/query/{dataset}",
-                params={"query": "*[_type == 'post'][0]"},
-                headers={
-                    "Authorization": f"Bearer {os.getenv('strapi_API_TOKEN')}"
-                },
-                timeout=5
-            )
-            
-            response_time = time.time() - start_time
-            
-            if response.status_code == 200:
-                status = ServiceStatus.HEALTHY
-                error = None
-            else:
-                status = ServiceStatus.DEGRADED
-                error = f"HTTP {response.status_code}"
-            
-            return HealthCheckResult(
-                service="Strapi CMS",
-                status=status,
-                response_time=response_time,
-                error=error,
-                details={"status_code": response.status_code}
-            )
-            
-        except Exception as e:
-            response_time = time.time() - start_time
-            logger.error(f"Strapi health check failed: {e}")
-            
-            return HealthCheckResult(
-                service="Strapi CMS",
-                status=ServiceStatus.UNHEALTHY,
-                response_time=response_time,
-                error=str(e)
-            )
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{base_url}/_health",
+            headers=headers,
+            timeout=5
+        )
+        
+        response_time = time.time() - start_time
+        
+        # O Strapi responde 204 No Content no /_health
+        if response.status_code in (200, 204):
+            status = ServiceStatus.HEALTHY
+            error = None
+        else:
+            status = ServiceStatus.DEGRADED
+            error = f"HTTP {response.status_code}"
+        
+        return HealthCheckResult(
+            service="Strapi CMS",
+            status=status,
+            response_time=response_time,
+            error=error,
+            details={"source": "probe", "endpoint": "/_health", "status_code": response.status_code}
+        )
     
     async def check_redis_health(self, host: str = "localhost", port: int = 6379) -> HealthCheckResult:
         """Verifica saúde do Redis"""
@@ -170,13 +245,14 @@ class HealthChecker:
         
         try:
             import redis
-            r = redis.Redis(host=host, port=port, socket_connect_timeout=2)
-            r.ping()
+            r = redis.Redis(host=host, port=port, socket_connect_timeout=2, socket_timeout=2)
+            # Cliente síncrono: roda fora do event loop, como os outros probes
+            await asyncio.to_thread(r.ping)
             
             response_time = time.time() - start_time
             
             # Obter informações do Redis
-            info = r.info()
+            info = await asyncio.to_thread(r.info)
             memory_used = info.get('used_memory_human', 'unknown')
             
             return HealthCheckResult(
@@ -226,12 +302,20 @@ class HealthChecker:
         
         # Armazenar no histórico
         self.health_history.extend(processed_results)
+        self._record_metrics(processed_results)
         
         # Verificar alertas
         self._check_alerts(processed_results)
         
         return processed_results
     
+    def _record_metrics(self, results: List[HealthCheckResult]):
+        """Atualiza as métricas de saúde no registro"""
+        for result in results:
+            self._status_gauge.set(STATUS_GAUGE_VALUES[result.status], service=result.service)
+            self._response_gauge.set(result.response_time, service=result.service)
+            self._checks_total.inc(service=result.service, status=result.status.value)
+    
     def _check_alerts(self, results: List[HealthCheckResult]):
         """Verifica se deve gerar alertas"""
         for result in results:
@@ -271,6 +355,7 @@ class HealthChecker:
         
         # Verificar alertas de quota
         for quota in quotas:
+            self._quota_gauge.set(quota.percentage_used / 100, service=quota.service)
             if quota.percentage_used >= self.alert_threshold:
                 alert = {
                     "timestamp": datetime.now(),
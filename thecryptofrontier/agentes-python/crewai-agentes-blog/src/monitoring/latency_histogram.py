@@ -0,0 +1,223 @@
+"""
+Histogramas de Latência com Buckets Logarítmicos e Janela Deslizante
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Limites (segundos) exportados no formato Prometheus (le="...")
+PROMETHEUS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf")
+)
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+class _Slice:
+    """Fatia de tempo da janela deslizante"""
+    __slots__ = ("slot", "counts", "count", "total", "max")
+
+    def __init__(self, num_buckets: int):
+        self.slot = -1
+        self.counts = [0] * num_buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def reset(self, slot: int):
+        self.slot = slot
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+class LatencyHistogram:
+    """
+    Histograma de latência estilo HDR.
+
+    Os valores são agrupados em buckets logarítmicos (erro relativo de
+    no máximo `growth - 1`). Além dos totais acumulados, mantém uma
+    janela deslizante composta por `slices` fatias de tempo, usada para
+    os percentis recentes.
+    """
+
+    def __init__(
+        self,
+        min_value: float = 0.001,
+        max_value: float = 600.0,
+        growth: float = 1.05,
+        window_seconds: float = 300.0,
+        slices: int = 10,
+        prometheus_buckets: Sequence[float] = PROMETHEUS_BUCKETS
+    ):
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        # Bucket 0 recebe valores <= min_value; o último recebe o overflow
+        self.num_buckets = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2
+
+        self.window_seconds = window_seconds
+        self._slice_width = window_seconds / slices
+        self._slices = [_Slice(self.num_buckets) for _ in range(slices)]
+
+        self.prometheus_buckets = tuple(prometheus_buckets)
+        self._prom_counts = [0] * len(self.prometheus_buckets)
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth) + 1
+        return min(index, self.num_buckets - 1)
+
+    def _bucket_upper(self, index: int) -> float:
+        return self.min_value * (self.growth ** index)
+
+    def record(self, value: float):
+        """Registra uma observação (em segundos)"""
+        index = self._bucket_index(value)
+        prom_index = bisect_left(self.prometheus_buckets, value)
+        slot = int(time.monotonic() // self._slice_width)
+
+        with self._lock:
+            current = self._slices[slot % len(self._slices)]
+            if current.slot != slot:
+                current.reset(slot)
+            current.counts[index] += 1
+            current.count += 1
+            current.total += value
+            if value > current.max:
+                current.max = value
+
+            if prom_index < len(self._prom_counts):
+                self._prom_counts[prom_index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def _window_snapshot(self) -> Tuple[List[int], int, float, float]:
+        """Soma as fatias que ainda estão dentro da janela"""
+        oldest = int(time.monotonic() // self._slice_width) - len(self._slices) + 1
+        counts = [0] * self.num_buckets
+        count = 0
+        total = 0.0
+        maximum = 0.0
+
+        with self._lock:
+            for current in self._slices:
+                if current.slot < oldest or current.count == 0:
+                    continue
+                for i, c in enumerate(current.counts):
+                    if c:
+                        counts[i] += c
+                count += current.count
+                total += current.total
+                maximum = max(maximum, current.max)
+
+        return counts, count, total, maximum
+
+    def _percentile(self, counts: List[int], count: int, percentile: float, maximum: float) -> float:
+        if count == 0:
+            return 0.0
+        rank = math.ceil(count * percentile / 100.0)
+        cumulative = 0
+        for index, c in enumerate(counts):
+            cumulative += c
+            if cumulative >= rank:
+                return min(self._bucket_upper(index), maximum)
+        return maximum
+
+    def percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Percentis da janela deslizante"""
+        counts, count, _total, maximum = self._window_snapshot()
+        return {
+            f"p{p:g}": self._percentile(counts, count, p, maximum)
+            for p in percentiles
+        }
+
+    def get_stats(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict:
+        """Estatísticas da janela deslizante e totais acumulados"""
+        counts, count, total, maximum = self._window_snapshot()
+        stats = {
+            "window_seconds": self.window_seconds,
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            "lifetime_count": self.count,
+            "lifetime_max": self.max,
+        }
+        for p in percentiles:
+            stats[f"p{p:g}"] = self._percentile(counts, count, p, maximum)
+        return stats
+
+    def prometheus_samples(self, name: str, labels: Optional[Dict[str, str]] = None) -> List[str]:
+        """Linhas `_bucket`, `_sum` e `_count` no formato texto do Prometheus"""
+        with self._lock:
+            prom_counts = list(self._prom_counts)
+            count = self.count
+            total = self.total
+
+        lines = []
+        cumulative = 0
+        for upper, c in zip(self.prometheus_buckets, prom_counts):
+            cumulative += c
+            le = "+Inf" if upper == float("inf") else f"{upper:g}"
+            lines.append(f"{name}_bucket{format_labels(labels, le=le)} {cumulative}")
+        if self.prometheus_buckets[-1] != float("inf"):
+            lines.append(f"{name}_bucket{format_labels(labels, le='+Inf')} {count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return lines
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels: Optional[Dict[str, str]] = None, **extra: str) -> str:
+    """Formata labels como `{a="1",b="2"}` (vazio se não houver labels)"""
+    merged = dict(labels or {})
+    merged.update(extra)
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in merged.items()) + "}"
+
+def histograms_to_prometheus(
+    name: str,
+    histograms: Dict[str, LatencyHistogram],
+    label: str = "operation",
+    help_text: str = "",
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> str:
+    """
+    Exporta uma família de histogramas (um por valor de `label`).
+
+    Gera o histograma acumulado e um summary com os percentis da janela
+    deslizante em `<name>_window`.
+    """
+    lines = [
+        f"# HELP {name} {help_text or name}",
+        f"# TYPE {name} histogram",
+    ]
+    for key, histogram in sorted(histograms.items()):
+        lines.extend(histogram.prometheus_samples(name, {label: key}))
+
+    window_name = f"{name}_window"
+    lines.append(f"# HELP {window_name} Percentis na janela deslizante")
+    lines.append(f"# TYPE {window_name} summary")
+    for key, histogram in sorted(histograms.items()):
+        counts, count, total, maximum = histogram._window_snapshot()
+        for p in percentiles:
+            value = histogram._percentile(counts, count, p, maximum)
+            quantile = f"{p / 100:g}"
+            lines.append(f"{window_name}{format_labels({label: key}, quantile=quantile)} {value}")
+        lines.append(f"{window_name}_sum{format_labels({label: key})} {total}")
+        lines.append(f"{window_name}_count{format_labels({label: key})} {count}")
+
+    return "\n".join(lines) + "\n"
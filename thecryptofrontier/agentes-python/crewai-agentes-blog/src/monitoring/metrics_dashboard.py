@@ -2,13 +2,25 @@
 Dashboard de Métricas e Estatísticas
 """
 import json
+import atexit
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import sqlite3
 from dataclasses import dataclass
 import logging
 
+try:
+    from .metrics_registry import get_registry
+    from .passive_health import record_call
+except ImportError:
+    from monitoring.metrics_registry import get_registry
+    from monitoring.passive_health import record_call
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -21,6 +33,8 @@ class MetricsSummary:
     api_calls: Dict[str, int] = None
     errors_by_type: Dict[str, int] = None
     processing_times_by_stage: Dict[str, float] = None
+    latency_percentiles_by_stage: Dict[str, Dict[str, float]] = None
+    api_latency_percentiles: Dict[str, Dict[str, float]] = None
     
     def __post_init__(self):
         if self.api_calls is None:
@@ -29,19 +43,405 @@ class MetricsSummary:
             self.errors_by_type = {}
         if self.processing_times_by_stage is None:
             self.processing_times_by_stage = {}
+        if self.latency_percentiles_by_stage is None:
+            self.latency_percentiles_by_stage = {}
+        if self.api_latency_percentiles is None:
+            self.api_latency_percentiles = {}
+
+# Inserts aceitos pelo writer, indexados pelo nome da tabela
+_INSERT_STATEMENTS = {
+    "article_processing": """
+        INSERT INTO article_processing 
+        (article_id, stage, success, processing_time, error_message, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "api_calls": """
+        INSERT INTO api_calls 
+        (service, endpoint, status_code, response_time, error, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "resource_usage": """
+        INSERT INTO resource_usage 
+        (cpu_percent, memory_percent, disk_usage_percent, active_threads, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+}
+
+def _utc_timestamp() -> str:
+    """Timestamp no mesmo formato de CURRENT_TIMESTAMP do SQLite (UTC)"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+# Limites superiores (segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0, 30.0, 60.0, 120.0, 300.0, float("inf")
+)
+
+PERCENTILES = (50, 95, 99)
+
+@dataclass
+class RetentionPolicy:
+    """Política de retenção dos dados brutos e dos rollups"""
+    raw_days: int = 7
+    minute_hours: int = 48
+    hour_days: int = 90
+    interval: float = 3600.0  # Segundos entre execuções da limpeza
+
+def _truncate_timestamp(timestamp: str, resolution: str) -> str:
+    """Trunca um timestamp 'YYYY-MM-DD HH:MM:SS' para o início do bucket"""
+    if resolution == "minute":
+        return timestamp[:16] + ":00"
+    return timestamp[:13] + ":00:00"
+
+def _format_timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+def percentile_from_buckets(
+    bucket_counts: Dict[int, int],
+    percentile: float,
+    max_value: Optional[float] = None
+) -> float:
+    """
+    Estima um percentil a partir das contagens do histograma,
+    interpolando linearmente dentro do bucket.
+    """
+    total = sum(bucket_counts.values())
+    if total == 0:
+        return 0.0
+    
+    rank = total * percentile / 100.0
+    cumulative = 0
+    for index in sorted(bucket_counts):
+        count = bucket_counts[index]
+        if cumulative + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+            upper = LATENCY_BUCKETS[index]
+            if upper == float("inf"):
+                upper = max_value if max_value is not None else lower
+            value = lower + (upper - lower) * ((rank - cumulative) / count)
+            return min(value, max_value) if max_value is not None else value
+        cumulative += count
+    
+    return max_value or 0.0
+
+def _aggregate_batch(batch: Dict[str, List[Tuple]]) -> Dict[str, Dict]:
+    """Agrega um lote de registros brutos nos deltas dos rollups"""
+    rollups: Dict[Tuple, List] = {}
+    buckets: Dict[Tuple, int] = {}
+    errors: Dict[Tuple, int] = {}
+    seen: Dict[str, str] = {}
+    
+    def add(metric: str, key: str, value: float, success: bool, timestamp: str):
+        index = bisect_left(LATENCY_BUCKETS, value)
+        for resolution in ("minute", "hour"):
+            bucket_start = _truncate_timestamp(timestamp, resolution)
+            rollup_key = (resolution, bucket_start, metric, key)
+            entry = rollups.get(rollup_key)
+            if entry is None:
+                # count, success_count, sum, success_sum, min, max
+                entry = rollups[rollup_key] = [0, 0, 0.0, 0.0, value, value]
+            entry[0] += 1
+            entry[2] += value
+            if success:
+                entry[1] += 1
+                entry[3] += value
+            entry[4] = min(entry[4], value)
+            entry[5] = max(entry[5], value)
+            
+            bucket_key = rollup_key + (index,)
+            buckets[bucket_key] = buckets.get(bucket_key, 0) + 1
+    
+    for row in batch.get("article_processing", []):
+        article_id, stage, success, processing_time, error_message, timestamp = row
+        add("article", stage or "", processing_time or 0.0, bool(success), timestamp)
+        
+        if article_id:
+            seen[article_id] = max(seen.get(article_id, timestamp), timestamp)
+        if not success and error_message:
+            error_key = (_truncate_timestamp(timestamp, "hour"), error_message)
+            errors[error_key] = errors.get(error_key, 0) + 1
+    
+    for row in batch.get("api_calls", []):
+        service, _endpoint, status_code, response_time, error, timestamp = row
+        success = error is None and (status_code or 0) < 400
+        add("api", service or "", response_time or 0.0, success, timestamp)
+    
+    return {"rollups": rollups, "buckets": buckets, "errors": errors, "seen": seen}
+
+def _apply_rollups(conn: sqlite3.Connection, batch: Dict[str, List[Tuple]]):
+    """Atualiza incrementalmente os rollups (na transação do chamador)"""
+    deltas = _aggregate_batch(batch)
+    
+    conn.executemany("""
+        INSERT INTO metric_rollups
+        (resolution, bucket_start, metric, key, count, success_count,
+         sum_time, success_sum_time, min_time, max_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(resolution, bucket_start, metric, key) DO UPDATE SET
+            count = count + excluded.count,
+            success_count = success_count + excluded.success_count,
+            sum_time = sum_time + excluded.sum_time,
+            success_sum_time = success_sum_time + excluded.success_sum_time,
+            min_time = MIN(min_time, excluded.min_time),
+            max_time = MAX(max_time, excluded.max_time)
+    """, [key + tuple(values) for key, values in deltas["rollups"].items()])
+    
+    conn.executemany("""
+        INSERT INTO metric_rollup_buckets
+        (resolution, bucket_start, metric, key, bucket_index, count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(resolution, bucket_start, metric, key, bucket_index) DO UPDATE SET
+            count = count + excluded.count
+    """, [key + (count,) for key, count in deltas["buckets"].items()])
+    
+    conn.executemany("""
+        INSERT INTO error_rollups (bucket_start, error_message, count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(bucket_start, error_message) DO UPDATE SET
+            count = count + excluded.count
+    """, [key + (count,) for key, count in deltas["errors"].items()])
+    
+    conn.executemany("""
+        INSERT INTO articles_seen (article_id, last_seen)
+        VALUES (?, ?)
+        ON CONFLICT(article_id) DO UPDATE SET
+            last_seen = MAX(last_seen, excluded.last_seen)
+    """, list(deltas["seen"].items()))
+
+def _apply_retention(conn: sqlite3.Connection, policy: RetentionPolicy):
+    """Remove dados brutos e rollups fora da janela de retenção"""
+    now = datetime.utcnow()
+    raw_cutoff = _format_timestamp(now - timedelta(days=policy.raw_days))
+    minute_cutoff = _format_timestamp(now - timedelta(hours=policy.minute_hours))
+    hour_cutoff = _format_timestamp(now - timedelta(days=policy.hour_days))
+    
+    with conn:
+        for table in ("article_processing", "api_calls", "resource_usage"):
+            conn.execute(f"DELETE FROM {table} WHERE timestamp < ?", (raw_cutoff,))
+        
+        # Os rollups por hora são mantidos em paralelo, então descartar
+        # os buckets por minuto não perde dados, apenas resolução
+        for table in ("metric_rollups", "metric_rollup_buckets"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE resolution = 'minute' AND bucket_start < ?",
+                (minute_cutoff,)
+            )
+            conn.execute(
+                f"DELETE FROM {table} WHERE resolution = 'hour' AND bucket_start < ?",
+                (hour_cutoff,)
+            )
+        
+        conn.execute("DELETE FROM error_rollups WHERE bucket_start < ?", (hour_cutoff,))
+        conn.execute("DELETE FROM articles_seen WHERE last_seen < ?", (hour_cutoff,))
+
+class MetricsWriter:
+    """
+    Writer de métricas em background.
+    
+    O hot path apenas faz append em um ring buffer (deque); uma thread
+    dedicada grava os registros em lote, numa única transação, usando
+    uma conexão persistente em modo WAL. Na mesma transação os rollups
+    por minuto/hora são atualizados incrementalmente.
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_buffer: int = 10000,
+        retention: Optional[RetentionPolicy] = None
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.retention = retention
+        self._last_retention = 0.0
+        
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self.dropped = 0
+        self.flushed = 0
+        self.flush_count = 0
+        
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def append(self, table: str, row: Tuple):
+        """Enfileira um registro (não bloqueia nem acessa o disco)"""
+        if len(self._buffer) >= self.max_buffer:
+            # deque com maxlen descarta o registro mais antigo
+            self.dropped += 1
+        self._buffer.append((table, row))
+        
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+    
+    def pending(self) -> int:
+        """Número de registros ainda não gravados"""
+        return len(self._buffer)
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Conexão persistente do writer (criada sob demanda)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+    
+    def flush(self) -> int:
+        """Grava tudo que está no buffer em uma única transação"""
+        with self._write_lock:
+            items: List[Tuple[str, Tuple]] = []
+            while True:
+                try:
+                    items.append(self._buffer.popleft())
+                except IndexError:
+                    break
+            
+            if not items:
+                return 0
+            
+            batch: Dict[str, List[Tuple]] = {}
+            for table, row in items:
+                batch.setdefault(table, []).append(row)
+            
+            total = len(items)
+            try:
+                conn = self._get_connection()
+                with conn:
+                    for table, rows in batch.items():
+                        conn.executemany(_INSERT_STATEMENTS[table], rows)
+                    _apply_rollups(conn, batch)
+                self.flushed += total
+                self.flush_count += 1
+            except sqlite3.Error as e:
+                # Ex.: "database is locked" transitório: o lote volta para o
+                # início do buffer e é regravado no próximo flush
+                requeued = self._requeue(items)
+                logger.error(
+                    f"Erro ao gravar {total} métricas ({requeued} reenfileiradas): {e}"
+                )
+                return 0
+            
+            return total
+    
+    def _requeue(self, items: List[Tuple[str, Tuple]]) -> int:
+        """Devolve um lote não gravado ao início do buffer, respeitando max_buffer"""
+        room = self.max_buffer - len(self._buffer)
+        keep = items[-room:] if room > 0 else []
+        # Sem espaço, descarta os registros mais antigos do lote
+        self.dropped += len(items) - len(keep)
+        self._buffer.extendleft(reversed(keep))
+        return len(keep)
+    
+    def _maybe_apply_retention(self):
+        """Executa a política de retenção no máximo uma vez por intervalo"""
+        if self.retention is None:
+            return
+        if time.monotonic() - self._last_retention < self.retention.interval:
+            return
+        
+        with self._write_lock:
+            try:
+                _apply_retention(self._get_connection(), self.retention)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao aplicar retenção de métricas: {e}")
+            self._last_retention = time.monotonic()
+    
+    def _run(self):
+        """Loop da thread: grava por tamanho do lote ou por intervalo"""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            self._maybe_apply_retention()
+    
+    def close(self):
+        """Para a thread, grava o restante e fecha a conexão"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        if self._buffer:
+            logger.error(f"{len(self._buffer)} métricas não gravadas ao encerrar")
+        
+        with self._write_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 class MetricsCollector:
     """Coletor de métricas do sistema"""
     
-    def __init__(self, db_path: str = "metrics.db"):
+    def __init__(
+        self,
+        db_path: str = "metrics.db",
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        retention: Optional[RetentionPolicy] = None
+    ):
         self.db_path = db_path
         self._init_db()
+        self.writer = MetricsWriter(
+            db_path,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            retention=retention or RetentionPolicy()
+        )
+        self._register_metrics()
+    
+    def _register_metrics(self):
+        """Registra as métricas do pipeline no registro do processo"""
+        registry = get_registry()
+        self._stage_total = registry.counter(
+            "pipeline_stage_total", "Etapas de artigos processadas", ["stage", "result"]
+        )
+        self._stage_duration = registry.histogram(
+            "pipeline_stage_duration_seconds", "Duração das etapas do pipeline", ["stage"]
+        )
+        self._api_total = registry.counter(
+            "pipeline_api_calls_total", "Chamadas de API externas", ["service", "status"]
+        )
+        self._api_duration = registry.histogram(
+            "pipeline_api_call_duration_seconds", "Latência das APIs externas", ["service"]
+        )
+        registry.register_collector("metrics_collector", self._collect_prometheus)
+    
+    def _collect_prometheus(self) -> str:
+        """Estado do writer e volume da última hora (lido dos rollups)"""
+        summary = self.get_metrics_summary(hours=1)
+        return "\n".join([
+            "# HELP pipeline_metrics_buffer_pending Métricas aguardando gravação",
+            "# TYPE pipeline_metrics_buffer_pending gauge",
+            f"pipeline_metrics_buffer_pending {self.writer.pending()}",
+            "# HELP pipeline_metrics_dropped_total Métricas descartadas por buffer cheio",
+            "# TYPE pipeline_metrics_dropped_total counter",
+            f"pipeline_metrics_dropped_total {self.writer.dropped}",
+            "# HELP pipeline_articles_last_hour Artigos processados na última hora",
+            "# TYPE pipeline_articles_last_hour gauge",
+            f'pipeline_articles_last_hour{{result="success"}} {summary.successful_articles}',
+            f'pipeline_articles_last_hour{{result="failure"}} {summary.failed_articles}',
+        ]) + "\n"
     
     def _init_db(self):
         """Inicializa banco de dados de métricas"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # WAL permite leituras do dashboard concorrentes com o writer
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Tabela de processamento de artigos
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS article_processing (
@@ -80,9 +480,95 @@ class MetricsCollector:
             )
         """)
         
+        # Índices para filtros por janela de tempo e retenção
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_article_processing_timestamp ON article_processing(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_api_calls_timestamp ON api_calls(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_resource_usage_timestamp ON resource_usage(timestamp)")
+        
+        # Rollups por minuto/hora (metric = 'article' por etapa, 'api' por serviço)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metric_rollups (
+                resolution TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                success_count INTEGER NOT NULL DEFAULT 0,
+                sum_time REAL NOT NULL DEFAULT 0,
+                success_sum_time REAL NOT NULL DEFAULT 0,
+                min_time REAL,
+                max_time REAL,
+                PRIMARY KEY (resolution, bucket_start, metric, key)
+            ) WITHOUT ROWID
+        """)
+        
+        # Histograma de latência de cada rollup (índice em LATENCY_BUCKETS)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metric_rollup_buckets (
+                resolution TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                key TEXT NOT NULL,
+                bucket_index INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, bucket_start, metric, key, bucket_index)
+            ) WITHOUT ROWID
+        """)
+        
+        # Erros por hora
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS error_rollups (
+                bucket_start TEXT NOT NULL,
+                error_message TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket_start, error_message)
+            ) WITHOUT ROWID
+        """)
+        
+        # Última ocorrência de cada artigo (para contagem distinta por janela)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS articles_seen (
+                article_id TEXT PRIMARY KEY,
+                last_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_seen_last_seen ON articles_seen(last_seen)")
+        
         conn.commit()
+        self._backfill_rollups(conn)
         conn.close()
     
+    def _backfill_rollups(self, conn: sqlite3.Connection, chunk_size: int = 5000):
+        """Popula os rollups a partir dos dados brutos de bancos antigos"""
+        has_rollups = conn.execute("SELECT 1 FROM metric_rollups LIMIT 1").fetchone()
+        has_raw = (
+            conn.execute("SELECT 1 FROM article_processing LIMIT 1").fetchone() or
+            conn.execute("SELECT 1 FROM api_calls LIMIT 1").fetchone()
+        )
+        if has_rollups or not has_raw:
+            return
+        
+        logger.info("Gerando rollups de métricas a partir do histórico existente")
+        queries = {
+            "article_processing": """
+                SELECT article_id, stage, success, processing_time, error_message, timestamp
+                FROM article_processing
+            """,
+            "api_calls": """
+                SELECT service, endpoint, status_code, response_time, error, timestamp
+                FROM api_calls
+            """,
+        }
+        
+        with conn:
+            for table, query in queries.items():
+                cursor = conn.execute(query)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    _apply_rollups(conn, {table: rows})
+    
     def record_article_processing(
         self,
         article_id: str,
@@ -92,17 +578,12 @@ class MetricsCollector:
         error_message: Optional[str] = None
     ):
         """Registra processamento de artigo"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO article_processing 
-            (article_id, stage, success, processing_time, error_message)
-            VALUES (?, ?, ?, ?, ?)
-        """, (article_id, stage, success, processing_time, error_message))
-        
-        conn.commit()
-        conn.close()
+        self._stage_total.inc(stage=stage, result="success" if success else "failure")
+        self._stage_duration.observe(processing_time, stage=stage)
+        self.writer.append(
+            "article_processing",
+            (article_id, stage, success, processing_time, error_message, _utc_timestamp())
+        )
     
     def record_api_call(
         self,
@@ -113,96 +594,144 @@ class MetricsCollector:
         error: Optional[str] = None
     ):
         """Registra chamada de API"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO api_calls 
-            (service, endpoint, status_code, response_time, error)
-            VALUES (?, ?, ?, ?, ?)
-        """, (service, endpoint, status_code, response_time, error))
-        
-        conn.commit()
-        conn.close()
+        record_call(
+            service,
+            success=0 < status_code < 400,
+            latency=response_time,
+            throttled=status_code == 429,
+            error=error
+        )
+        self._api_total.inc(service=service, status=str(status_code))
+        self._api_duration.observe(response_time, service=service)
+        self.writer.append(
+            "api_calls",
+            (service, endpoint, status_code, response_time, error, _utc_timestamp())
+        )
     
     def record_resource_usage(self):
         """Registra uso de recursos do sistema"""
         import psutil
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         cpu_percent = psutil.cpu_percent(interval=1)
         memory_percent = psutil.virtual_memory().percent
         disk_usage_percent = psutil.disk_usage('/').percent
         active_threads = len(psutil.Process().threads())
         
-        cursor.execute("""
-            INSERT INTO resource_usage 
-            (cpu_percent, memory_percent, disk_usage_percent, active_threads)
-            VALUES (?, ?, ?, ?)
-        """, (cpu_percent, memory_percent, disk_usage_percent, active_threads))
-        
-        conn.commit()
-        conn.close()
+        self.writer.append(
+            "resource_usage",
+            (cpu_percent, memory_percent, disk_usage_percent, active_threads, _utc_timestamp())
+        )
+    
+    def flush(self) -> int:
+        """Força a gravação das métricas pendentes"""
+        return self.writer.flush()
+    
+    def close(self):
+        """Grava métricas pendentes e encerra o writer"""
+        self.writer.close()
     
     def get_metrics_summary(self, hours: int = 24) -> MetricsSummary:
-        """Obtém resumo das métricas"""
+        """
+        Obtém resumo das métricas a partir dos rollups.
+        
+        A janela é coberta por buckets de hora completos e, na borda
+        inicial, por buckets de minuto; o custo depende do tamanho da
+        janela e não do volume de eventos.
+        """
+        # Garante que métricas ainda no buffer entrem no resumo
+        self.writer.flush()
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cutoff = _format_timestamp(cutoff_time.replace(second=0, microsecond=0))
+        hour_floor = cutoff_time.replace(minute=0, second=0, microsecond=0)
+        if (hour_floor == cutoff_time.replace(second=0, microsecond=0) or
+                hours >= self.writer.retention.minute_hours):
+            # Sem borda parcial, ou buckets por minuto já expirados
+            hour_start = _format_timestamp(hour_floor)
+        else:
+            hour_start = _format_timestamp(hour_floor + timedelta(hours=1))
+        
+        window = """
+            ((resolution = 'hour' AND bucket_start >= :hour_start) OR
+             (resolution = 'minute' AND bucket_start >= :cutoff AND bucket_start < :hour_start))
+        """
+        params = {"cutoff": cutoff, "hour_start": hour_start}
         
         # Total de artigos processados
-        cursor.execute("""
+        cursor.execute(
+            "SELECT COUNT(*) FROM articles_seen WHERE last_seen >= ?",
+            (cutoff,)
+        )
+        total_articles = cursor.fetchone()[0]
+        
+        cursor.execute(f"""
             SELECT 
-                COUNT(DISTINCT article_id) as total,
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful,
-                SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as failed,
-                AVG(processing_time) as avg_time
-            FROM article_processing
-            WHERE timestamp > ?
-        """, (cutoff_time,))
+                SUM(success_count) as successful,
+                SUM(count - success_count) as failed,
+                SUM(sum_time) * 1.0 / SUM(count) as avg_time
+            FROM metric_rollups
+            WHERE metric = 'article' AND {window}
+        """, params)
         
         result = cursor.fetchone()
         summary = MetricsSummary(
-            total_articles_processed=result[0] or 0,
-            successful_articles=result[1] or 0,
-            failed_articles=result[2] or 0,
-            average_processing_time=result[3] or 0.0
+            total_articles_processed=total_articles or 0,
+            successful_articles=result[0] or 0,
+            failed_articles=result[1] or 0,
+            average_processing_time=result[2] or 0.0
         )
         
-        # Tempos por estágio
-        cursor.execute("""
-            SELECT stage, AVG(processing_time) as avg_time
-            FROM article_processing
-            WHERE timestamp > ? AND success = 1
-            GROUP BY stage
-        """, (cutoff_time,))
+        # Tempos por estágio e chamadas de API
+        cursor.execute(f"""
+            SELECT metric, key, SUM(count), SUM(success_count), SUM(success_sum_time), MAX(max_time)
+            FROM metric_rollups
+            WHERE {window}
+            GROUP BY metric, key
+        """, params)
         
-        for row in cursor.fetchall():
-            summary.processing_times_by_stage[row[0]] = row[1]
+        max_times: Dict[Tuple[str, str], float] = {}
+        for metric, key, count, success_count, success_sum, max_time in cursor.fetchall():
+            max_times[(metric, key)] = max_time
+            if metric == "article":
+                if success_count:
+                    summary.processing_times_by_stage[key] = success_sum / success_count
+            else:
+                summary.api_calls[key] = count
         
-        # Chamadas de API
-        cursor.execute("""
-            SELECT service, COUNT(*) as count
-            FROM api_calls
-            WHERE timestamp > ?
-            GROUP BY service
-        """, (cutoff_time,))
+        # Percentis a partir dos histogramas
+        cursor.execute(f"""
+            SELECT metric, key, bucket_index, SUM(count)
+            FROM metric_rollup_buckets
+            WHERE {window}
+            GROUP BY metric, key, bucket_index
+        """, params)
         
-        for row in cursor.fetchall():
-            summary.api_calls[row[0]] = row[1]
+        histograms: Dict[Tuple[str, str], Dict[int, int]] = {}
+        for metric, key, bucket_index, count in cursor.fetchall():
+            histograms.setdefault((metric, key), {})[bucket_index] = count
         
-        # Erros por tipo
+        for (metric, key), bucket_counts in histograms.items():
+            percentiles = {
+                f"p{p}": percentile_from_buckets(bucket_counts, p, max_times.get((metric, key)))
+                for p in PERCENTILES
+            }
+            if metric == "article":
+                summary.latency_percentiles_by_stage[key] = percentiles
+            else:
+                summary.api_latency_percentiles[key] = percentiles
+        
+        # Erros por tipo (granularidade de hora)
         cursor.execute("""
-            SELECT error_message, COUNT(*) as count
-            FROM article_processing
-            WHERE timestamp > ? AND success = 0 AND error_message IS NOT NULL
+            SELECT error_message, SUM(count) as count
+            FROM error_rollups
+            WHERE bucket_start >= ?
             GROUP BY error_message
             ORDER BY count DESC
             LIMIT 10
-        """, (cutoff_time,))
+        """, (_format_timestamp(hour_floor),))
         
         for row in cursor.fetchall():
             error_type = row[0][:50]  # Truncar mensagens longas
@@ -217,9 +746,9 @@ class MetricsDashboard:
     def __init__(self, collector: MetricsCollector):
         self.collector = collector
     
-    def generate_html_report(self, output_path: str = "metrics_dashboard.html"):
+    def generate_html_report(self, output_path: str = "metrics_dashboard.html", hours: int = 24):
         """Gera relatório HTML com métricas"""
-        summary = self.collector.get_metrics_summary(hours=24)
+        summary = self.collector.get_metrics_summary(hours=hours)
         
         html_content = f"""
 <!DOCTYPE html>
@@ -319,7 +848,7 @@ class MetricsDashboard:
             <div class="metric-card">
                 <div class="metric-label">Total de Artigos</div>
                 <div class="metric-value">{summary.total_articles_processed}</div>
-                <div class="metric-label">Últimas 24 horas</div>
+                <div class="metric-label">Últimas {hours} horas</div>
             </div>
             
             <div class="metric-card">
@@ -377,6 +906,23 @@ class MetricsDashboard:
             </table>
         </div>
         
+        <div class="chart-container">
+            <h2>📈 Latência (p50 / p95 / p99)</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Origem</th>
+                        <th>p50 (s)</th>
+                        <th>p95 (s)</th>
+                        <th>p99 (s)</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {self._generate_percentile_rows(summary)}
+                </tbody>
+            </table>
+        </div>
+        
         <div class="chart-container">
             <h2>❌ Principais Erros</h2>
             <table>
@@ -424,12 +970,12 @@ class MetricsDashboard:
         rows = []
         max_time = max(summary.processing_times_by_stage.values()) if summary.processing_times_by_stage else 1
         
-        for stage, time in sorted(summary.processing_times_by_stage.items()):
-            bar_width = int((time / max_time) * 100)
+        for stage, avg_time in sorted(summary.processing_times_by_stage.items()):
+            bar_width = int((avg_time / max_time) * 100)
             rows.append(f"""
                 <tr>
                     <td>{stage}</td>
-                    <td>{time:.2f}</td>
+                    <td>{avg_time:.2f}</td>
                     <td>
                         <div class="progress-bar" style="width: 200px;">
                             <div class="progress-fill" style="width: {bar_width}%"></div>
@@ -457,6 +1003,29 @@ class MetricsDashboard:
         
         return ''.join(rows) if rows else '<tr><td colspan="3">Sem dados</td></tr>'
     
+    def _generate_percentile_rows(self, summary: MetricsSummary) -> str:
+        """Gera linhas da tabela de percentis de latência"""
+        rows = []
+        sources = [
+            (f"Etapa: {stage}", values)
+            for stage, values in sorted(summary.latency_percentiles_by_stage.items())
+        ] + [
+            (f"API: {service}", values)
+            for service, values in sorted(summary.api_latency_percentiles.items())
+        ]
+        
+        for label, values in sources:
+            rows.append(f"""
+                <tr>
+                    <td>{label}</td>
+                    <td>{values['p50']:.2f}</td>
+                    <td>{values['p95']:.2f}</td>
+                    <td>{values['p99']:.2f}</td>
+                </tr>
+            """)
+        
+        return ''.join(rows) if rows else '<tr><td colspan="4">Sem dados</td></tr>'
+    
     def _generate_error_rows(self, summary: MetricsSummary) -> str:
         """Gera linhas da tabela de erros"""
         rows = []
@@ -471,12 +1040,13 @@ class MetricsDashboard:
         
         return ''.join(rows) if rows else '<tr><td colspan="2">Sem erros</td></tr>'
     
-    def generate_json_report(self) -> Dict:
+    def generate_json_report(self, hours: int = 24) -> Dict:
         """Gera relatório JSON com métricas"""
-        summary = self.collector.get_metrics_summary(hours=24)
+        summary = self.collector.get_metrics_summary(hours=hours)
         
         return {
             "timestamp": datetime.now().isoformat(),
+            "window_hours": hours,
             "metrics": {
                 "total_articles": summary.total_articles_processed,
                 "successful": summary.successful_articles,
@@ -486,6 +1056,10 @@ class MetricsDashboard:
             },
             "processing_times": summary.processing_times_by_stage,
             "api_calls": summary.api_calls,
+            "latency_percentiles": {
+                "stages": summary.latency_percentiles_by_stage,
+                "api": summary.api_latency_percentiles
+            },
             "errors": summary.errors_by_type
         }
 
@@ -502,4 +1076,6 @@ if __name__ == "__main__":
     json_report = dashboard.generate_json_report()
     with open("metrics_report.json", "w") as f:
         json.dump(json_report, f, indent=2)
-    print("✅ Relatório JSON gerado: metrics_report.json")
\ No newline at end of file
+    print("✅ Relatório JSON gerado: metrics_report.json")
+    
+    collector.close()
\ No newline at end of file
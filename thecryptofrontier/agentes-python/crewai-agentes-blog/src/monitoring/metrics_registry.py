@@ -0,0 +1,314 @@
+"""
+Registro Unificado de Métricas (formato Prometheus)
+
+Counters, gauges e histogramas ficam em memória no processo. Componentes
+cujo estado já vive em outro lugar (arquivos JSON, SQLite, listas) se
+registram como collectors, que são avaliados apenas no momento da coleta.
+
+Uso:
+    from monitoring.metrics_registry import get_registry
+
+    registry = get_registry()
+    published = registry.counter("posts_published_total", "Posts publicados", ["locale"])
+    published.inc(locale="pt")
+
+    registry.render()                       # texto para o endpoint /metrics
+    registry.write_textfile("metrics.prom")  # drop de arquivo para jobs de cron
+"""
+import os
+import tempfile
+import threading
+import time
+import logging
+import urllib.request
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .latency_histogram import LatencyHistogram, format_labels
+except ImportError:
+    from monitoring.latency_histogram import LatencyHistogram, format_labels
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+class _Metric:
+    """Base das famílias de métricas com labels"""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Labels inválidos para {self.name}: esperado {self.labelnames}, recebido {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Contador monotônico"""
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{format_labels(self._labels(key))} {value:g}"
+            for key, value in items
+        ]
+
+class Gauge(_Metric):
+    """Valor instantâneo (pode subir e descer)"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{format_labels(self._labels(key))} {value:g}"
+            for key, value in items
+        ]
+
+class Histogram(_Metric):
+    """Histograma de latência (um LatencyHistogram por combinação de labels)"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), **histogram_options):
+        super().__init__(name, help_text, labelnames)
+        self._histogram_options = histogram_options
+        self._histograms: Dict[LabelValues, LatencyHistogram] = {}
+
+    def histogram(self, **labels: str) -> LatencyHistogram:
+        key = self._key(labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, LatencyHistogram(**self._histogram_options)
+                )
+        return histogram
+
+    def observe(self, value: float, **labels: str):
+        self.histogram(**labels).record(value)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._histograms.items())
+        lines = self._header()
+        for key, histogram in items:
+            lines.extend(histogram.prometheus_samples(self.name, self._labels(key)))
+        return lines
+
+Collector = Callable[[], str]
+
+class MetricsRegistry:
+    """Registro de métricas do processo"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames: Sequence[str], **options) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrica {name} já registrada com outro tipo ou labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), **options) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, **options)
+
+    def register_collector(self, name: str, collector: Collector):
+        """
+        Registra uma função chamada a cada coleta, que retorna texto no
+        formato Prometheus. Registrar de novo com o mesmo nome substitui
+        o collector anterior.
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str):
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        """Gera o texto de exposição de todas as métricas"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+
+        chunks: List[str] = []
+        for metric in metrics:
+            chunks.append("\n".join(metric.samples()) + "\n")
+
+        for name, collector in collectors:
+            try:
+                text = collector()
+            except Exception as e:
+                logger.error(f"Erro no collector de métricas '{name}': {e}")
+                continue
+            if text:
+                chunks.append(text if text.endswith("\n") else text + "\n")
+
+        return "".join(chunks)
+
+    def write_textfile(self, path: str, extra_labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Grava as métricas em arquivo de forma atômica (compatível com o
+        textfile collector do node_exporter). Retorna o caminho gravado.
+        """
+        content = self.render()
+        if extra_labels:
+            content = _add_labels(content, extra_labels)
+        content += (
+            "# HELP blog_crew_metrics_last_export_timestamp_seconds Momento do último export\n"
+            "# TYPE blog_crew_metrics_last_export_timestamp_seconds gauge\n"
+            f"blog_crew_metrics_last_export_timestamp_seconds{format_labels(extra_labels)} {time.time():.3f}\n"
+        )
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return path
+
+    def push(self, gateway_url: str, job: str, timeout: float = 10.0) -> int:
+        """Envia as métricas para um Pushgateway (PUT substitui o grupo do job)"""
+        url = f"{gateway_url.rstrip('/')}/metrics/job/{job}"
+        request = urllib.request.Request(
+            url,
+            data=self.render().encode("utf-8"),
+            method="PUT",
+            headers={"Content-Type": CONTENT_TYPE}
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+
+def _add_labels(content: str, labels: Dict[str, str]) -> str:
+    """Acrescenta labels fixos (ex.: job) a todas as amostras"""
+    extra = format_labels(labels)[1:-1]
+    lines = []
+    for line in content.splitlines():
+        if not line or line.startswith("#"):
+            lines.append(line)
+        elif "{" in line:
+            name, rest = line.split("{", 1)
+            lines.append(f"{name}{{{extra},{rest}")
+        else:
+            name, value = line.split(" ", 1)
+            lines.append(f"{name}{{{extra}}} {value}")
+    return "\n".join(lines) + "\n"
+
+# Instância global do registro - criada quando necessário
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> MetricsRegistry:
+    """Retorna o registro de métricas do processo"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+def export_metrics(
+    path: Optional[str] = None,
+    job: str = "blog_crew",
+    gateway_url: Optional[str] = None
+) -> Optional[str]:
+    """
+    Exporta as métricas do processo ao final de um job de cron.
+
+    Grava em `path` (ou METRICS_TEXTFILE_DIR/<job>.prom) e, se configurado,
+    envia também para o Pushgateway (PUSHGATEWAY_URL).
+    """
+    registry = get_registry()
+
+    if path is None:
+        directory = os.environ.get("METRICS_TEXTFILE_DIR", "metrics")
+        path = os.path.join(directory, f"{job}.prom")
+
+    written = None
+    try:
+        written = registry.write_textfile(path, extra_labels={"job": job})
+        logger.info(f"Métricas exportadas para {written}")
+    except OSError as e:
+        logger.error(f"Erro ao gravar métricas em {path}: {e}")
+
+    gateway_url = gateway_url or os.environ.get("PUSHGATEWAY_URL")
+    if gateway_url:
+        try:
+            registry.push(gateway_url, job)
+        except Exception as e:
+            logger.error(f"Erro ao enviar métricas para o Pushgateway: {e}")
+
+    return written
@@ -0,0 +1,165 @@
+"""
+Saúde Passiva Derivada do Tráfego Real
+
+As chamadas que o pipeline já faz (retry_with_backoff, APIMetrics,
+MetricsCollector) registram aqui o resultado e a latência. O HealthChecker
+deriva o status de cada serviço da taxa de erro e da latência numa janela
+deslizante, e só recorre a probes sintéticos quando não há tráfego recente.
+
+Uso:
+    from monitoring.passive_health import record_call
+
+    record_call("openai", success=True, latency=1.8)
+"""
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Nomes usados pelos chamadores -> chave canônica do serviço
+SERVICE_ALIASES = {
+    "google ai": "google_ai",
+    "gemini": "google_ai",
+    "strapi cms": "strapi",
+}
+
+def normalize_service(name: str) -> str:
+    key = name.strip().lower()
+    key = SERVICE_ALIASES.get(key, key)
+    return key.replace(" ", "_")
+
+@dataclass
+class TrafficSignal:
+    """Resumo da janela de tráfego de um serviço"""
+    service: str
+    calls: int
+    errors: int
+    throttled: int
+    error_rate: float
+    throttle_rate: float
+    p95_latency: float
+    idle_seconds: float
+    last_success: bool = True
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "source": "traffic",
+            "calls": self.calls,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "error_rate": round(self.error_rate, 4),
+            "throttle_rate": round(self.throttle_rate, 4),
+            "p95_latency": round(self.p95_latency, 4),
+            "idle_seconds": round(self.idle_seconds, 1),
+        }
+
+# (instante monotônico, sucesso, throttled, latência)
+_Sample = Tuple[float, bool, bool, float]
+
+class _ServiceWindow:
+    __slots__ = ("samples", "last_seen", "last_success", "last_error")
+
+    def __init__(self, max_samples: int):
+        self.samples: Deque[_Sample] = deque(maxlen=max_samples)
+        self.last_seen = 0.0
+        self.last_success = True
+        self.last_error: Optional[str] = None
+
+class TrafficHealth:
+    """Janelas deslizantes de resultados de chamadas, por serviço"""
+
+    def __init__(self, window_seconds: float = 300.0, max_samples: int = 2000):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self._windows: Dict[str, _ServiceWindow] = {}
+        self._lock = threading.Lock()
+
+    def record_call(
+        self,
+        service: str,
+        success: bool,
+        latency: float,
+        throttled: bool = False,
+        error: Optional[str] = None
+    ):
+        """Registra o resultado de uma chamada real ao serviço"""
+        key = normalize_service(service)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _ServiceWindow(self.max_samples)
+            window.samples.append((now, success, throttled, latency))
+            window.last_seen = now
+            window.last_success = success or throttled
+            if not success and error:
+                window.last_error = error[:500]
+
+    def get_signal(self, service: str) -> Optional[TrafficSignal]:
+        """Resumo da janela do serviço, ou None se nunca houve tráfego"""
+        key = normalize_service(service)
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                return None
+            while window.samples and window.samples[0][0] < cutoff:
+                window.samples.popleft()
+            samples = list(window.samples)
+            last_seen = window.last_seen
+            last_success = window.last_success
+            last_error = window.last_error
+
+        calls = len(samples)
+        errors = sum(1 for _, ok, throttled, _ in samples if not ok and not throttled)
+        throttled = sum(1 for _, _, t, _ in samples if t)
+
+        p95 = 0.0
+        if samples:
+            latencies = sorted(s[3] for s in samples)
+            p95 = latencies[min(calls - 1, math.ceil(calls * 0.95) - 1)]
+
+        return TrafficSignal(
+            service=key,
+            calls=calls,
+            errors=errors,
+            throttled=throttled,
+            error_rate=errors / calls if calls else 0.0,
+            throttle_rate=throttled / calls if calls else 0.0,
+            p95_latency=p95,
+            idle_seconds=now - last_seen,
+            last_success=last_success,
+            last_error=last_error
+        )
+
+    def services(self) -> List[str]:
+        with self._lock:
+            return sorted(self._windows)
+
+# Instância global - criada quando necessário
+_traffic: Optional[TrafficHealth] = None
+_traffic_lock = threading.Lock()
+
+def get_traffic_health() -> TrafficHealth:
+    """Retorna as janelas de tráfego do processo"""
+    global _traffic
+    if _traffic is None:
+        with _traffic_lock:
+            if _traffic is None:
+                _traffic = TrafficHealth()
+    return _traffic
+
+def record_call(
+    service: str,
+    success: bool,
+    latency: float,
+    throttled: bool = False,
+    error: Optional[str] = None
+):
+    """Atalho para get_traffic_health().record_call(...)"""
+    get_traffic_health().record_call(service, success, latency, throttled, error)
@@ -0,0 +1,486 @@
+"""
+Tracing Leve com Spans (compatível com OTLP/JSON)
+
+O span ativo é propagado por contextvars, então funciona entre tasks do
+asyncio automaticamente. Para threads, use `wrap_context` (ou
+`submit_with_context`) para levar o contexto atual para o worker.
+
+Uso:
+    from monitoring.tracing import configure_tracing, trace, start_span
+
+    configure_tracing(file_path="logs/traces.jsonl")
+
+    @trace("translate_text")
+    def translate_text(text): ...
+
+    with start_span("process_article", {"article.id": article_id}) as span:
+        ...
+        span.set_http(method="POST", url=url, status_code=201)
+
+Os traces concluídos são exportados por uma thread em segundo plano, então
+o span que termina não espera pelo collector. Spans filhos que terminam
+depois do raiz (fan-out assíncrono) saem num lote à parte do mesmo trace;
+traces cujo raiz nunca termina são exportados como estão após
+`PENDING_MAX_AGE` segundos.
+
+CLI (caminho crítico dos artigos mais lentos):
+    python src/monitoring/tracing.py logs/traces.jsonl --top 5
+"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "blog_crew")
+
+# Idade máxima (s) de um trace sem raiz concluído antes de ser exportado assim mesmo
+PENDING_MAX_AGE = 600.0
+# Por quanto tempo (s) um trace exportado ainda aceita spans atrasados
+CLOSED_TRACE_TTL = 600.0
+# Lotes aguardando a thread de exportação; acima disso são descartados
+EXPORT_QUEUE_SIZE = 1024
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "UNSET"
+    status_message: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duração em segundos (até agora, se ainda aberto)"""
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def set_http(self, method: str, url: str, status_code: Optional[int] = None):
+        """Atributos HTTP no padrão das convenções semânticas do OpenTelemetry"""
+        self.attributes["http.method"] = method
+        self.attributes["http.url"] = url
+        if status_code is not None:
+            self.attributes["http.status_code"] = status_code
+            if status_code >= 400:
+                self.set_error(f"HTTP {status_code}")
+
+    def set_error(self, message: str):
+        self.status = "ERROR"
+        self.status_message = message
+
+    def to_otlp(self) -> Dict:
+        """Representação no formato OTLP/JSON"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": {"UNSET": 0, "OK": 1, "ERROR": 2}[self.status]},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+def _otlp_attribute(key: str, value: Any) -> Dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+def _otlp_value(value: Dict) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("doubleValue", "boolValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+def otlp_payload(spans: List[Span]) -> Dict:
+    """Monta um ExportTraceServiceRequest (OTLP/JSON)"""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [_otlp_attribute("service.name", SERVICE_NAME)]
+            },
+            "scopeSpans": [{
+                "scope": {"name": "blog_crew.tracing"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]
+    }
+
+class SpanExporter:
+    """Exportador base (descarta os spans)"""
+
+    def export(self, spans: List[Span]):
+        pass
+
+class JsonFileExporter(SpanExporter):
+    """Grava um payload OTLP/JSON por linha (um por trace concluído)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        line = json.dumps(otlp_payload(spans), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+class OTLPHttpExporter(SpanExporter):
+    """Envia para um collector OTLP/HTTP (ex.: http://localhost:4318)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/")
+        if not self.url.endswith("/v1/traces"):
+            self.url += "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(otlp_payload(spans)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except Exception as e:
+            logger.warning(f"Falha ao exportar trace para {self.url}: {e}")
+
+class Tracer:
+    """
+    Agrupa os spans por trace e exporta quando o span raiz termina.
+
+    A exportação roda numa thread daemon alimentada por uma fila limitada;
+    `flush` espera a fila esvaziar (chamado também no encerramento).
+    """
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        self.exporters = exporters or []
+        # trace_id -> (instante do primeiro span, spans concluídos)
+        self._pending: "OrderedDict[str, Tuple[float, List[Span]]]" = OrderedDict()
+        # trace_id -> instante em que o raiz foi exportado
+        self._closed: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def _on_end(self, span: Span):
+        now = time.monotonic()
+        batches = []
+        with self._lock:
+            if span.trace_id in self._closed:
+                # Filho que terminou depois do raiz: exportado sozinho
+                batches.append([span])
+            elif span.parent_span_id is None:
+                _, spans = self._pending.pop(span.trace_id, (now, []))
+                spans.append(span)
+                batches.append(spans)
+                self._closed[span.trace_id] = now
+            else:
+                self._pending.setdefault(span.trace_id, (now, []))[1].append(span)
+
+            # Traces sem raiz há muito tempo saem como estão; o trace_id segue
+            # em _closed para que spans ainda mais atrasados não reabram o trace
+            while self._pending:
+                trace_id, (started, spans) = next(iter(self._pending.items()))
+                if now - started < PENDING_MAX_AGE:
+                    break
+                del self._pending[trace_id]
+                batches.append(spans)
+                self._closed[trace_id] = now
+            while self._closed and now - next(iter(self._closed.values())) >= CLOSED_TRACE_TTL:
+                self._closed.popitem(last=False)
+
+        for batch in batches:
+            self._enqueue(batch)
+
+    def _enqueue(self, spans: List[Span]):
+        if not self.exporters:
+            return
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                    self._worker.start()
+                    atexit.register(self.flush)
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Fila de exportação cheia; trace {spans[0].trace_id} descartado")
+
+    def _export_loop(self):
+        while True:
+            spans = self._queue.get()
+            try:
+                for exporter in self.exporters:
+                    try:
+                        exporter.export(spans)
+                    except Exception as e:
+                        logger.warning(f"Erro ao exportar trace {spans[0].trace_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Espera a exportação dos traces já concluídos; False se o prazo acabou"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            if span.status == "UNSET":
+                span.status = "OK"
+            _current_span.reset(token)
+            self._on_end(span)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "blog_crew_current_span", default=None
+)
+_tracer = Tracer()
+
+def configure_tracing(
+    file_path: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None
+) -> Tracer:
+    """
+    Configura os exportadores do tracer global.
+
+    Variáveis de ambiente têm precedência: TRACE_EXPORT_FILE e
+    OTEL_EXPORTER_OTLP_ENDPOINT.
+    """
+    file_path = os.environ.get("TRACE_EXPORT_FILE", file_path)
+    otlp_endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", otlp_endpoint)
+
+    exporters: List[SpanExporter] = []
+    if file_path:
+        exporters.append(JsonFileExporter(str(file_path)))
+    if otlp_endpoint:
+        exporters.append(OTLPHttpExporter(otlp_endpoint))
+
+    _tracer.exporters = exporters
+    return _tracer
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+def current_span() -> Optional[Span]:
+    """Span ativo no contexto atual (ou None)"""
+    return _current_span.get()
+
+def current_trace_ids() -> Dict[str, str]:
+    """trace_id/span_id do span ativo, para correlacionar logs"""
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {"trace_id": span.trace_id, "span_id": span.span_id}
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager que abre um span filho do span ativo"""
+    return _tracer.start_span(name, attributes)
+
+def trace(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator que executa a função (sync ou async) dentro de um span"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.start_span(span_name, attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _tracer.start_span(span_name, attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def wrap_context(func: Callable) -> Callable:
+    """Amarra a função ao contexto atual (para rodar em outra thread)"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return wrapper
+
+def submit_with_context(executor: Executor, func: Callable, *args, **kwargs) -> Future:
+    """executor.submit propagando o span ativo para a thread do worker"""
+    return executor.submit(wrap_context(func), *args, **kwargs)
+
+# Análise de traces exportados
+
+def load_traces(path: str) -> Dict[str, List[Span]]:
+    """Lê um arquivo OTLP/JSON (uma linha por payload) agrupando por trace"""
+    traces: Dict[str, List[Span]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            payload = json.loads(line)
+            for resource_spans in payload.get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for raw in scope_spans.get("spans", []):
+                        status = {0: "UNSET", 1: "OK", 2: "ERROR"}[raw.get("status", {}).get("code", 0)]
+                        span = Span(
+                            name=raw["name"],
+                            trace_id=raw["traceId"],
+                            span_id=raw["spanId"],
+                            parent_span_id=raw.get("parentSpanId"),
+                            start_ns=int(raw["startTimeUnixNano"]),
+                            end_ns=int(raw["endTimeUnixNano"]),
+                            attributes={
+                                a["key"]: _otlp_value(a["value"]) for a in raw.get("attributes", [])
+                            },
+                            status=status,
+                            status_message=raw.get("status", {}).get("message"),
+                        )
+                        traces.setdefault(span.trace_id, []).append(span)
+    return traces
+
+def critical_path(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    Caminho crítico de um trace: partindo do fim do span raiz, desce
+    sempre no filho que terminou por último antes do ponto atual. Cada
+    segmento informa o tempo atribuído ao span (excluindo filhos no caminho).
+    """
+    children: Dict[Optional[str], List[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_span_id, []).append(span)
+
+    roots = children.get(None) or [min(spans, key=lambda s: s.start_ns)]
+    root = max(roots, key=lambda s: s.end_ns - s.start_ns)
+    segments: List[Dict[str, Any]] = []
+
+    def walk(span: Span, depth: int):
+        self_time = 0
+        cursor = span.end_ns
+        path_children = []
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.end_ns, reverse=True):
+            if child.end_ns > cursor:
+                continue  # Sobreposto a um filho já escolhido
+            self_time += cursor - child.end_ns
+            path_children.append(child)
+            cursor = child.start_ns
+        self_time += max(cursor - span.start_ns, 0)
+
+        segments.append({
+            "name": span.name,
+            "depth": depth,
+            "duration": (span.end_ns - span.start_ns) / 1e9,
+            "self_time": self_time / 1e9,
+            "status": span.status,
+            "attributes": span.attributes,
+        })
+        for child in reversed(path_children):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return segments
+
+def print_slowest(path: str, top: int = 5, root_name: Optional[str] = None):
+    """Imprime o caminho crítico dos traces mais lentos"""
+    traces = load_traces(path)
+    ranked = []
+    for trace_id, spans in traces.items():
+        roots = [s for s in spans if s.parent_span_id is None]
+        if not roots:
+            continue
+        root = roots[0]
+        if root_name and root.name != root_name:
+            continue
+        ranked.append(((root.end_ns - root.start_ns) / 1e9, trace_id, root, spans))
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    if not ranked:
+        print("Nenhum trace encontrado")
+        return
+
+    for duration, trace_id, root, spans in ranked[:top]:
+        label = root.attributes.get("article.title") or root.attributes.get("article.id") or ""
+        print(f"\n{root.name} {duration:.2f}s trace={trace_id} {label}")
+        for segment in critical_path(spans):
+            share = segment["self_time"] / duration * 100 if duration else 0
+            status = " [ERROR]" if segment["status"] == "ERROR" else ""
+            http = segment["attributes"].get("http.status_code")
+            http = f" http={http}" if http is not None else ""
+            print(
+                f"  {'  ' * segment['depth']}{segment['name']:<30} "
+                f"{segment['duration']:>8.2f}s  self={segment['self_time']:>7.2f}s "
+                f"({share:4.1f}%){http}{status}"
+            )
+
+# CLI
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Caminho crítico dos traces mais lentos")
+    parser.add_argument("file", nargs="?", default="logs/traces.jsonl", help="Arquivo OTLP/JSON")
+    parser.add_argument("--top", type=int, default=5, help="Quantidade de traces")
+    parser.add_argument("--root", default="process_article", help="Nome do span raiz (vazio = todos)")
+    args = parser.parse_args()
+
+    print_slowest(args.file, top=args.top, root_name=args.root or None)
@@ -19,6 +19,10 @@ import hashlib
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup, NavigableString
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from utils.processed_ledger import ProcessedLedger
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -45,18 +49,20 @@ strapi_DATASET = "production"
 strapi_API_TOKEN = os.environ.get("strapi_API_TOKEN")
 strapi_API_VERSION = "2023-05-03"
 
-def load_processed_articles() -> set:
-    """Carrega IDs de artigos já processados"""
-    if PROCESSED_FILE.exists():
-        with open(PROCESSED_FILE, 'r') as f:
-            data = json.load(f)
-            return set(data.get('ids', []))
-    return set()
+_processed_ledger: Optional[ProcessedLedger] = None
+
+def load_processed_articles() -> ProcessedLedger:
+    """IDs de artigos já processados (mesmo registro do simple_pipeline e do RSSMonitor)"""
+    global _processed_ledger
+    if _processed_ledger is None:
+        _processed_ledger = ProcessedLedger(PROCESSED_FILE)
+    else:
+        _processed_ledger.refresh()
+    return _processed_ledger
 
-def save_processed_articles(ids: set):
-    """Salva IDs de artigos processados"""
-    with open(PROCESSED_FILE, 'w') as f:
-        json.dump({'ids': list(ids), 'updated': datetime.now().isoformat()}, f)
+def save_processed_articles(ids):
+    """Marca os IDs ainda não registrados (o ledger já grava a cada `add`)"""
+    load_processed_articles().update(ids)
 
 def fetch_rss_articles() -> List[Dict]:
     """Busca artigos do feed RSS"""
@@ -246,7 +252,6 @@ def main():
         if process_article(article):
             success_count += 1
             processed_ids.add(article['id'])
-            save_processed_articles(processed_ids)
             
         # Pausa entre artigos
         if i < len(new_articles) - 1:
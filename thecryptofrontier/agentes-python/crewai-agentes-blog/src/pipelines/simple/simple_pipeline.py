@@ -18,12 +18,14 @@ from openai import OpenAI
 from typing import List, Dict, Optional
 import hashlib
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup, NavigableString
 
 # Importar o gerenciador de chaves API
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from utils.api_key_manager import get_api_key_manager
+from utils.portable_text import html_to_portable_text
+from utils.processed_ledger import ProcessedLedger
+from monitoring.tracing import configure_tracing, start_span, trace, current_span
 
 # Carregar variáveis de ambiente do diretório do projeto
 env_path = Path(__file__).parent.parent.parent.parent / '.env'
@@ -43,6 +45,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("simple_pipeline")
 
+# Tracing por artigo (TRACE_EXPORT_FILE / OTEL_EXPORTER_OTLP_ENDPOINT sobrescrevem)
+configure_tracing(file_path=LOG_DIR / "traces.jsonl")
+
 # Configurações
 RSS_FEED = "https://thecryptobasic.com/feed/"
 ARTICLE_LIMIT = int(os.environ.get("ARTICLE_LIMIT", "3"))
@@ -66,24 +71,28 @@ strapi_DATASET = "production"
 STRAPI_API_TOKEN = os.environ.get("STRAPI_API_TOKEN")
 strapi_API_VERSION = "2023-05-03"
 
-def load_processed_articles() -> set:
-    """Carrega IDs de artigos já processados"""
-    if PROCESSED_FILE.exists():
-        with open(PROCESSED_FILE, 'r') as f:
-            data = json.load(f)
-            return set(data.get('ids', []))
-    return set()
+_processed_ledger: Optional[ProcessedLedger] = None
+
+def load_processed_articles() -> ProcessedLedger:
+    """IDs de artigos já processados (inclui o que outros processos marcaram)"""
+    global _processed_ledger
+    if _processed_ledger is None:
+        _processed_ledger = ProcessedLedger(PROCESSED_FILE)
+    else:
+        _processed_ledger.refresh()
+    return _processed_ledger
 
-def save_processed_articles(ids: set):
-    """Salva IDs de artigos processados"""
-    with open(PROCESSED_FILE, 'w') as f:
-        json.dump({'ids': list(ids), 'updated': datetime.now().isoformat()}, f)
+def save_processed_articles(ids):
+    """Marca os IDs ainda não registrados (o ledger já grava a cada `add`)"""
+    load_processed_articles().update(ids)
 
+@trace("fetch_rss_articles")
 def fetch_rss_articles() -> List[Dict]:
     """Busca artigos do feed RSS"""
     logger.info(f"Buscando artigos de {RSS_FEED}")
     
     feed = feedparser.parse(RSS_FEED)
+    current_span().set_http(method="GET", url=RSS_FEED, status_code=feed.get('status'))
     articles = []
     
     for entry in feed.entries[:ARTICLE_LIMIT * 2]:  # Pega o dobro para ter margem
@@ -99,8 +108,11 @@ def fetch_rss_articles() -> List[Dict]:
     
     return articles
 
+@trace("translate_text")
 def translate_text(text: str, is_title: bool = False) -> str:
     """Traduz texto usando Gemini com rotação automática de chaves API"""
+    span = current_span()
+    span.set_attributes(is_title=is_title, text_length=len(text or ''))
     
     # Configurar Gemini com gerenciador de chaves
     manager = get_api_key_manager()
@@ -127,6 +139,8 @@ Texto: {text}"""
     except Exception as e:
         error_msg = str(e).lower()
         
+        span.set_error(str(e)[:200])
+        
         # Verificar se é erro de quota exceeded
         if "quota" in error_msg or "rate limit" in error_msg or "429" in error_msg:
             logger.warning(f"🚨 Quota esgotada na chave atual: {e}")
@@ -149,6 +163,7 @@ Texto: {text}"""
             
         return text
 
+@trace("generate_image")
 def generate_image(title: str, summary: str) -> Optional[str]:
     """Gera imagem usando DALL-E 3"""
     global openai_client
@@ -180,19 +195,22 @@ Resolution: High quality, sharp details"""
         
         logger.info(f"Gerando imagem para: {title[:50]}...")
         
-        response = openai_client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1792x1024",
-            quality="hd",
-            n=1,
-        )
+        with start_span("dalle_generate", {"model": "dall-e-3"}):
+            response = openai_client.images.generate(
+                model="dall-e-3",
+                prompt=prompt,
+                size="1792x1024",
+                quality="hd",
+                n=1,
+            )
         
         image_url = response.data[0].url
         
         # Download da imagem
-        img_response = requests.get(image_url)
-        img_response.raise_for_status()
+        with start_span("download_image") as span:
+            img_response = requests.get(image_url)
+            span.set_http(method="GET", url=image_url.split('?')[0], status_code=img_response.status_code)
+            img_response.raise_for_status()
         
         # Salvar localmente
         filename = f"crypto_{int(time.time())}_{hashlib.md5(title.encode()).hexdigest()[:8]}.png"
@@ -208,8 +226,10 @@ Resolution: High quality, sharp details"""
         
     except Exception as e:
         logger.error(f"Erro ao gerar imagem: {e}")
+        current_span().set_error(str(e)[:200])
         return None
 
+@trace("upload_to_strapi")
 def upload_to_strapi(image_path: Path, title: str) -> Optional[str]:
     """Faz upload da imagem para o Strapi usando upload binário"""
     try:
@@ -228,6 +248,7 @@ def upload_to_strapi(image_path: Path, title: str) -> Optional[str]:
         # Upload binário direto
         with open(image_path, 'rb') as f:
             response = requests.post(url, headers=headers, data=f)
+            current_span().set_http(method="POST", url=url, status_code=response.status_code)
             response.raise_for_status()
             
             data = response.json()
@@ -238,6 +259,7 @@ def upload_to_strapi(image_path: Path, title: str) -> Optional[str]:
             
     except Exception as e:
         logger.error(f"Erro no upload para Strapi: {e}")
+        current_span().set_error(str(e)[:200])
         return None
 
 def create_slug(title: str) -> str:
@@ -252,220 +274,11 @@ def create_slug(title: str) -> str:
     slug = re.sub(r'^-+|-+$', '', slug)
     return slug[:80]  # Limita tamanho
 
-def convert_markdown_to_html(text: str) -> str:
-    """
-    Converte sintaxe Markdown básica para HTML
-    Suporta: negrito (**texto**), itálico (*texto*), código (`código`)
-    """
-    # Processar código inline primeiro para proteger de outras conversões
-    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
-    
-    # Negrito: **texto** ou __texto__
-    text = re.sub(r'\*\*([^\*]+)\*\*', r'<strong>\1</strong>', text)
-    text = re.sub(r'__([^_]+)__', r'<strong>\1</strong>', text)
-    
-    # Itálico: *texto* ou _texto_ (evitar conflito com negrito)
-    text = re.sub(r'(?<!\*)\*([^\*]+)\*(?!\*)', r'<em>\1</em>', text)
-    text = re.sub(r'(?<!_)_([^_]+)_(?!_)', r'<em>\1</em>', text)
-    
-    return text
-
-def process_paragraph_with_links(element) -> Dict:
-    """Processa um parágrafo preservando links no formato Strapi"""
-    import uuid
-    block_key = str(uuid.uuid4())[:8]
-    
-    block = {
-        "_type": "block",
-        "_key": block_key,
-        "style": "normal",
-        "markDefs": [],
-        "children": []
-    }
-    
-    span_count = 0
-    mark_count = 0
-    
-    def process_element(el, parent_marks=[]):
-        nonlocal span_count, mark_count
-        
-        if isinstance(el, NavigableString):
-            text = str(el)
-            if text.strip():
-                block["children"].append({
-                    "_type": "span",
-                    "_key": f"span{span_count}",
-                    "text": text,
-                    "marks": parent_marks.copy()
-                })
-                span_count += 1
-        
-        elif el.name == 'a':
-            # Criar markDef para o link
-            href = el.get('href', '')
-            if href:
-                mark_key = f"link{mark_count}"
-                mark_def = {
-                    "_type": "link",
-                    "_key": mark_key,
-                    "href": href
-                }
-                
-                # Adicionar target blank se presente
-                if el.get('target') == '_blank':
-                    mark_def["blank"] = True
-                
-                block["markDefs"].append(mark_def)
-                
-                # Processar conteúdo do link com a marca
-                new_marks = parent_marks + [mark_key]
-                for child in el.children:
-                    process_element(child, new_marks)
-                
-                mark_count += 1
-            else:
-                # Link sem href, processar como texto normal
-                for child in el.children:
-                    process_element(child, parent_marks)
-        
-        elif el.name in ['strong', 'b']:
-            new_marks = parent_marks + ['strong']
-            for child in el.children:
-                process_element(child, new_marks)
-        
-        elif el.name in ['em', 'i']:
-            new_marks = parent_marks + ['em']
-            for child in el.children:
-                process_element(child, new_marks)
-        
-        elif el.name == 'code':
-            new_marks = parent_marks + ['code']
-            for child in el.children:
-                process_element(child, new_marks)
-        
-        else:
-            # Outros elementos, processar filhos
-            for child in el.children:
-                process_element(child, parent_marks)
-    
-    # Processar todos os filhos do elemento
-    for child in element.children:
-        process_element(child)
-    
-    return block
-
 def format_content_blocks(content: str) -> List[Dict]:
     """Formata conteúdo em blocos para o Strapi, preservando imagens e links"""
-    # Converter Markdown para HTML primeiro
-    content = convert_markdown_to_html(content)
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    blocks = []
-    block_count = 0
-    processed_images = set()  # Para evitar duplicatas
-    
-    # Processar todos os elementos relevantes
-    elements = soup.find_all(['p', 'figure', 'img', 'h1', 'h2', 'h3', 'h4', 'blockquote'])
-    
-    for element in elements:
-        if element.name == 'p':
-            # Verificar se tem conteúdo significativo
-            if element.get_text(strip=True):
-                block = process_paragraph_with_links(element)
-                if block["children"]:  # Só adicionar se tiver conteúdo
-                    blocks.append(block)
-                    block_count += 1
-                
-        elif element.name in ['figure']:
-            # Processar figure com img
-            img_tag = element.find('img')
-            if img_tag and img_tag.get('src'):
-                img_url = img_tag.get('src')
-                
-                # Evitar duplicatas
-                if img_url not in processed_images:
-                    processed_images.add(img_url)
-                    
-                    img_alt = img_tag.get('alt', '')
-                    caption_elem = element.find('figcaption')
-                    caption = caption_elem.get_text(strip=True) if caption_elem else ''
-                    
-                    # Criar bloco de imagem do Strapi
-                    blocks.append({
-                        "_type": "image",
-                        "_key": f"image{block_count}",
-                        "url": img_url,
-                        "alt": img_alt or caption or "Imagem do artigo",
-                        "caption": caption if caption else None
-                    })
-                    block_count += 1
-                    
-        elif element.name == 'img':
-            # Processar img solta (não dentro de figure)
-            img_url = element.get('src')
-            if img_url and img_url not in processed_images:
-                processed_images.add(img_url)
-                
-                img_alt = element.get('alt', '')
-                
-                # Criar bloco de imagem do Strapi
-                blocks.append({
-                    "_type": "image",
-                    "_key": f"image{block_count}",
-                    "url": img_url,
-                    "alt": img_alt or "Imagem do artigo",
-                    "caption": None
-                })
-                block_count += 1
-                
-        elif element.name in ['h1', 'h2', 'h3', 'h4']:
-            text = element.get_text(strip=True)
-            if text:
-                blocks.append({
-                    "_type": "block",
-                    "_key": f"block{block_count}",
-                    "style": element.name,
-                    "markDefs": [],
-                    "children": [{
-                        "_type": "span",
-                        "_key": f"span{block_count}",
-                        "text": text,
-                        "marks": []
-                    }]
-                })
-                block_count += 1
-                
-        elif element.name == 'blockquote':
-            # Processar blockquote preservando formatação interna
-            if element.get_text(strip=True):
-                block = process_paragraph_with_links(element)
-                block["style"] = "blockquote"
-                if block["children"]:
-                    blocks.append(block)
-                    block_count += 1
-    
-    # Fallback se não conseguiu processar
-    if not blocks:
-        text_content = soup.get_text(separator='\n\n', strip=True)
-        paragraphs = [p.strip() for p in text_content.split('\n\n') if p.strip() and len(p.strip()) > 50]
-        
-        for i, para in enumerate(paragraphs[:15]):
-            blocks.append({
-                "_type": "block",
-                "_key": f"block{i}",
-                "style": "normal",
-                "markDefs": [],
-                "children": [{
-                    "_type": "span",
-                    "_key": f"span{i}",
-                    "text": para,
-                    "marks": []
-                }]
-            })
-    
-    return blocks
+    return html_to_portable_text(content)
 
+@trace("publish_to_strapi")
 def publish_to_strapi(article: Dict, image_id: Optional[str] = None) -> bool:
     """Publica artigo no Strapi com suporte a i18n"""
     try:
@@ -506,14 +319,28 @@ def publish_to_strapi(article: Dict, image_id: Optional[str] = None) -> bool:
             return True
         else:
             logger.error(f"❌ Erro ao publicar: {result['error']}")
+            current_span().set_error(str(result['error'])[:200])
             return False
         
     except Exception as e:
         logger.error(f"Erro ao publicar no Strapi: {e}")
+        current_span().set_error(str(e)[:200])
         return False
 
 def process_article(article: Dict) -> bool:
     """Processa um artigo completo"""
+    # Um trace por artigo: todas as etapas abaixo viram spans filhos
+    with start_span("process_article", {
+        "article.id": article.get('id', ''),
+        "article.title": (article.get('title') or '')[:120],
+    }) as span:
+        success = _process_article(article)
+        if not success:
+            span.set_error("processamento falhou")
+        return success
+
+def _process_article(article: Dict) -> bool:
+    """Etapas do processamento de um artigo"""
     try:
         logger.info(f"\n{'='*60}")
         logger.info(f"Processando: {article['title']}")
@@ -523,9 +350,10 @@ def process_article(article: Dict) -> bool:
         
         # 1. Traduzir
         logger.info("1. Traduzindo...")
-        article['title_pt'] = translate_text(article['title'], is_title=True)
-        article['summary_pt'] = translate_text(article['summary'])
-        article['content_pt'] = translate_text(article['content'])
+        with start_span("translate_article"):
+            article['title_pt'] = translate_text(article['title'], is_title=True)
+            article['summary_pt'] = translate_text(article['summary'])
+            article['content_pt'] = translate_text(article['content'])
         
         # Salvar versão traduzida
         filename = f"post_{timestamp}_{create_slug(article['title_pt'])}.json"
@@ -592,7 +420,6 @@ def main():
         if process_article(article):
             success_count += 1
             processed_ids.add(article['id'])
-            save_processed_articles(processed_ids)
             
         # Pausa entre artigos
         if i < len(new_articles) - 1:
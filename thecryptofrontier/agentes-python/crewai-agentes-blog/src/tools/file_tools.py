@@ -7,11 +7,16 @@ import json
 import logging
 from crewai.tools import tool
 
+try:
+    from ..utils.article_store import exists, load_json, move, save_json, stage_of
+except ImportError:
+    from utils.article_store import exists, load_json, move, save_json, stage_of
+
 logger = logging.getLogger("file_tools")
 
 @tool
-def save_to_file(data=None, file_path=None, **kwargs):
-    """Salva dados em um arquivo JSON. Requer 'data' (conteúdo) e 'file_path' (caminho do arquivo)."""
+def save_to_file(data=None, file_path=None, source_path=None, **kwargs):
+    """Salva dados em um arquivo JSON. Requer 'data' (conteúdo) e 'file_path' (caminho do arquivo). Opcional 'source_path': artigo da etapa anterior, que é movido para 'file_path' (em vez de copiado)."""
     try:
         # Nova lógica para tentar extrair de uma string JSON no primeiro argumento posicional
         # ou se 'data' for uma string JSON.
@@ -21,6 +26,7 @@ def save_to_file(data=None, file_path=None, **kwargs):
                 parsed_json = json.loads(data)
                 if isinstance(parsed_json, dict):
                     file_path = parsed_json.get("file_path", file_path)
+                    source_path = parsed_json.get("source_path", source_path)
                     # Não substitua 'data' se não houver o campo 'data' ou se for None
                     if "data" in parsed_json and parsed_json["data"] is not None:
                         data = parsed_json["data"]
@@ -36,6 +42,8 @@ def save_to_file(data=None, file_path=None, **kwargs):
                 data = kwargs["data"]
             if file_path is None and "file_path" in kwargs:
                 file_path = kwargs["file_path"]
+            if source_path is None and "source_path" in kwargs:
+                source_path = kwargs["source_path"]
         
         # Verificar se os parâmetros estão presentes
         if data is None:
@@ -61,17 +69,20 @@ def save_to_file(data=None, file_path=None, **kwargs):
                 logger.error(f"file_path deve ser uma string, recebido: {type(file_path)}")
                 return {"success": False, "error": "file_path deve ser uma string"}
         
-        # Criar diretório se não existir
-        directory = os.path.dirname(file_path)
-        if directory:  # Verificar se o caminho tem um diretório pai
-            os.makedirs(directory, exist_ok=True)
-        
-        # Salvar dados no arquivo
-        with open(file_path, "w", encoding="utf-8") as f:
-            if isinstance(data, (dict, list)):
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                # Se não for dict ou list, salvar como texto
+        # JSON vai para o store de artigos quando o caminho é de uma etapa
+        if isinstance(data, (dict, list)) and source_path and stage_of(str(source_path)) and stage_of(file_path):
+            # Avanço de etapa: grava no destino e tira da origem numa única transição
+            move(str(source_path), file_path, data=data)
+        elif isinstance(data, (dict, list)):
+            save_json(file_path, data)
+        else:
+            # Criar diretório se não existir
+            directory = os.path.dirname(file_path)
+            if directory:  # Verificar se o caminho tem um diretório pai
+                os.makedirs(directory, exist_ok=True)
+            
+            # Se não for dict ou list, salvar como texto
+            with open(file_path, "w", encoding="utf-8") as f:
                 f.write(str(data))
         
         logger.info(f"Arquivo salvo com sucesso: {file_path}")
@@ -119,19 +130,28 @@ def read_from_file(file_path=None, **kwargs):
                 return {"success": False, "error": "file_path deve ser uma string"}
         
         # Verificar se o arquivo existe
-        if not os.path.exists(file_path):
+        if not exists(file_path):
             logger.error(f"Arquivo não encontrado: {file_path}")
             return {"success": False, "error": f"Arquivo não encontrado: {file_path}"}
         
-        # Ler o arquivo
-        with open(file_path, "r", encoding="utf-8") as f:
+        if stage_of(file_path):
+            # Artigo de uma etapa: store de artigos ou arquivo JSON
             try:
-                # Tentar carregar como JSON
-                data = json.load(f)
+                data = load_json(file_path)
             except json.JSONDecodeError:
-                # Se não for JSON válido, ler como texto
-                f.seek(0)  # Voltar ao início do arquivo
-                data = f.read()
+                # Arquivo de etapa que não é JSON válido: lido como texto
+                with open(file_path, "r", encoding="utf-8") as f:
+                    data = f.read()
+        else:
+            # Ler o arquivo
+            with open(file_path, "r", encoding="utf-8") as f:
+                try:
+                    # Tentar carregar como JSON
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    # Se não for JSON válido, ler como texto
+                    f.seek(0)  # Voltar ao início do arquivo
+                    data = f.read()
         
         logger.info(f"Arquivo lido com sucesso: {file_path}")
         return {"success": True, "data": data, "path": file_path}
@@ -9,6 +9,11 @@ from pathlib import Path
 from datetime import datetime
 from crewai.tools import tool
 
+try:
+    from ..utils.article_store import list_stage, save_json
+except ImportError:
+    from utils.article_store import list_stage, save_json
+
 logger = logging.getLogger("file_tools_simple")
 
 @tool
@@ -25,9 +30,7 @@ def save_json_file(content: str, filename: str, directory: str = "posts_para_tra
         Caminho do arquivo salvo ou mensagem de erro
     """
     try:
-        # Garantir que o diretório existe
         dir_path = Path(directory)
-        dir_path.mkdir(exist_ok=True)
         
         # Adicionar .json se não tiver
         if not filename.endswith('.json'):
@@ -42,9 +45,8 @@ def save_json_file(content: str, filename: str, directory: str = "posts_para_tra
         else:
             data = content
             
-        # Salvar arquivo
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Salvar (store de artigos ou arquivo)
+        save_json(file_path, data)
             
         logger.info(f"✅ Arquivo salvo: {file_path}")
         return f"Arquivo salvo com sucesso: {file_path}"
@@ -114,18 +116,15 @@ def list_json_files(directory: str = "posts_para_traduzir") -> str:
         Lista de arquivos ou mensagem de erro
     """
     try:
-        dir_path = Path(directory)
-        if not dir_path.exists():
+        files = list_stage(directory)
+        if not files and not Path(directory).exists():
             return f"Diretório {directory} não existe"
-            
-        files = list(dir_path.glob("*.json"))
         
         if not files:
             return f"Nenhum arquivo JSON encontrado em {directory}"
             
-        file_list = []
-        for f in sorted(files)[:10]:  # Máximo 10 arquivos
-            file_list.append(f.name)
+        # Máximo 10 arquivos
+        file_list = sorted(entry["filename"] for entry in files)[:10]
             
         return f"Arquivos em {directory}: " + ", ".join(file_list)
         
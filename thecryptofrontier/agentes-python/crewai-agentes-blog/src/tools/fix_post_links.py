@@ -11,13 +11,10 @@ import uuid
 # Adicionar o diretório pai ao path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Importar o cliente Strapi do projeto
-try:
-    from logic.strapi_client import client
-except:
-    # Fallback para importação direta
-    from strapi_client import get_strapi_client
-    client = get_strapi_client()
+# Cliente de conteúdo: envia só os blocos alterados (patch por _key)
+from core.content_api_client import get_content_client
+
+client = get_content_client()
 
 def convert_markdown_links_in_text(text):
     """Detecta e marca posições de links markdown no texto"""
@@ -104,20 +101,8 @@ def convert_block_with_markdown_links(block):
     
     return new_block
 
-def fix_post_links(slug):
-    """Corrige links markdown em um post específico"""
-    # Buscar o post
-    query = f'*[_type == "post" && slug.current == "{slug}"][0]'
-    post = client.fetch(query)
-    
-    if not post:
-        print(f"Post com slug '{slug}' não encontrado")
-        return False
-    
-    print(f"Post encontrado: {post.get('title')}")
-    
-    # Processar o conteúdo
-    content = post.get('content', [])
+def fix_content_links(content, verbose=False):
+    """Converte os links markdown do conteúdo; retorna (novo conteúdo, links corrigidos)"""
     new_content = []
     links_fixed = 0
     
@@ -133,22 +118,43 @@ def fix_post_links(slug):
                 new_block = convert_block_with_markdown_links(block)
                 if new_block.get('markDefs'):
                     links_fixed += len(new_block['markDefs'])
-                    print(f"  ✅ Corrigido bloco com {len(new_block['markDefs'])} link(s)")
+                    if verbose:
+                        print(f"  ✅ Corrigido bloco com {len(new_block['markDefs'])} link(s)")
                 new_content.append(new_block)
             else:
                 new_content.append(block)
         else:
             new_content.append(block)
     
+    return new_content, links_fixed
+
+def fix_post_links(slug):
+    """Corrige links markdown em um post específico"""
+    # Buscar o post
+    found = client.get_post(slug=slug)
+    
+    if not found.get('success'):
+        print(f"Post com slug '{slug}' não encontrado")
+        return False
+    
+    post = found['post']
+    print(f"Post encontrado: {post.get('title')}")
+    
+    # Processar o conteúdo
+    _, links_fixed = fix_content_links(post.get('content', []), verbose=True)
+    
     if links_fixed > 0:
-        # Atualizar o post
-        try:
-            result = client.patch(post['_id']).set({'content': new_content}).commit()
-            print(f"\n✅ Post atualizado com sucesso! {links_fixed} links corrigidos.")
+        # Atualizar o post (a correção é refeita sobre o post relido se houver conflito)
+        result = client.patch_post(
+            post['_id'],
+            lambda current: {'content': fix_content_links(current.get('content', []))[0]}
+        )
+        if result.get('success'):
+            print(f"\n✅ Post atualizado com sucesso! {links_fixed} links corrigidos "
+                  f"({result.get('operations')} operações, {result.get('payload_bytes')} bytes).")
             return True
-        except Exception as e:
-            print(f"\n❌ Erro ao atualizar post: {e}")
-            return False
+        print(f"\n❌ Erro ao atualizar post: {result.get('error')}")
+        return False
     else:
         print("\n📝 Nenhum link markdown encontrado para corrigir.")
         return True
@@ -14,6 +14,13 @@ from typing import Dict, List, Optional
 from crewai.tools import tool
 import logging
 
+try:
+    from ..monitoring.metrics_registry import get_registry
+    from ..utils.json_codec import dump_file, load_file
+except ImportError:
+    from monitoring.metrics_registry import get_registry
+    from utils.json_codec import dump_file, load_file
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,14 +71,12 @@ class ImageGenerationQueue:
     def load_queue(self) -> List[Dict]:
         """Carrega a fila do arquivo"""
         if self.queue_file.exists():
-            with open(self.queue_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.queue_file)
         return []
         
     def save_queue(self, queue: List[Dict]):
         """Salva a fila no arquivo"""
-        with open(self.queue_file, 'w') as f:
-            json.dump(queue, f, indent=2)
+        dump_file(self.queue_file, queue)
             
     def get_next_batch(self, size: int = 3) -> List[Dict]:
         """Pega o próximo lote para processar"""
@@ -125,30 +130,54 @@ class ImageGenerationQueue:
     def load_processed(self) -> List[Dict]:
         """Carrega lista de processados"""
         if self.processed_file.exists():
-            with open(self.processed_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.processed_file)
         return []
         
     def save_processed(self, processed: List[Dict]):
         """Salva lista de processados"""
-        with open(self.processed_file, 'w') as f:
-            json.dump(processed, f, indent=2)
+        dump_file(self.processed_file, processed)
             
     def load_failed(self) -> List[Dict]:
         """Carrega lista de falhos"""
         if self.failed_file.exists():
-            with open(self.failed_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.failed_file)
         return []
         
     def save_failed(self, failed: List[Dict]):
         """Salva lista de falhos"""
-        with open(self.failed_file, 'w') as f:
-            json.dump(failed, f, indent=2)
+        dump_file(self.failed_file, failed)
+    
+    def get_status(self) -> Dict:
+        """Retorna tamanhos da fila, processados e falhos"""
+        queue = self.load_queue()
+        pending = [item for item in queue if item['status'] == 'pending']
+        
+        return {
+            "queue_size": len(queue),
+            "pending": len(pending),
+            "processed": len(self.load_processed()),
+            "failed": len(self.load_failed()),
+            "next_batch": [Path(item['file']).name for item in pending[:3]]
+        }
+    
+    def to_prometheus(self) -> str:
+        """Exporta o estado da fila no formato do Prometheus"""
+        status = self.get_status()
+        lines = [
+            "# HELP image_queue_items Itens da fila de geração de imagens por estado",
+            "# TYPE image_queue_items gauge",
+        ]
+        for state in ("queue_size", "pending", "processed", "failed"):
+            lines.append(f'image_queue_items{{state="{state}"}} {status[state]}')
+        return "\n".join(lines) + "\n"
 
 # Instância global
 queue_manager = ImageGenerationQueue()
 
+def register_metrics(registry=None):
+    """Registra a fila global no registro de métricas (profundidade calculada apenas no momento da coleta)"""
+    (registry or get_registry()).register_collector("image_generation_queue", queue_manager.to_prometheus)
+
 @tool
 def add_posts_to_image_queue() -> dict:
     """
@@ -267,21 +296,17 @@ def get_queue_status() -> dict:
         dict: Estatísticas da fila
     """
     try:
-        queue = queue_manager.load_queue()
-        processed = queue_manager.load_processed()
-        failed = queue_manager.load_failed()
-        
-        pending = [item for item in queue if item['status'] == 'pending']
+        status = queue_manager.get_status()
         
         return {
             "success": True,
-            "queue_size": len(queue),
-            "pending": len(pending),
-            "processed": len(processed),
-            "failed": len(failed),
+            "queue_size": status["queue_size"],
+            "pending": status["pending"],
+            "processed": status["processed"],
+            "failed": status["failed"],
             "details": {
-                "next_batch": [Path(item['file']).name for item in pending[:3]],
-                "estimated_time": f"{len(pending) * 15 / 60:.1f} minutos"
+                "next_batch": status["next_batch"],
+                "estimated_time": f"{status['pending'] * 15 / 60:.1f} minutos"
             }
         }
         
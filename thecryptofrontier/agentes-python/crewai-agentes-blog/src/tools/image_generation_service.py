@@ -16,6 +16,13 @@ from crewai.tools import tool
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from ..utils.json_codec import dump_file, load_file
+    from ..utils.keyword_matcher import KeywordMatcher
+except ImportError:
+    from utils.json_codec import dump_file, load_file
+    from utils.keyword_matcher import KeywordMatcher
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -199,6 +206,7 @@ class ImageGenerationService:
     def __init__(self, config: Optional[ServiceConfig] = None):
         self.config = config or ServiceConfig()
         self.visual_config = CryptoVisualConfig()
+        self._crypto_matcher: Optional[KeywordMatcher] = None
         
         # Validar configurações
         if not self.config.validate():
@@ -213,17 +221,15 @@ class ImageGenerationService:
     
     def detect_cryptocurrencies(self, text: str) -> List[str]:
         """Detecta criptomoedas mencionadas no texto com lógica avançada"""
-        text_lower = text.lower()
-        detected = []
-        
-        # Verificar cada crypto e suas keywords
-        for crypto_id, crypto_info in self.visual_config.CRYPTO_TEMPLATES.items():
-            for keyword in crypto_info["keywords"]:
-                if keyword in text_lower and crypto_id not in detected:
-                    detected.append(crypto_id)
-                    break
-        
-        return detected
+        if self._crypto_matcher is None:
+            # Compilado uma vez a partir das keywords dos templates visuais
+            self._crypto_matcher = KeywordMatcher({
+                "crypto": {
+                    crypto_id: crypto_info["keywords"]
+                    for crypto_id, crypto_info in self.visual_config.CRYPTO_TEMPLATES.items()
+                }
+            })
+        return self._crypto_matcher.scan(text)["crypto"]
     
     def build_crypto_prompt(self, cryptos: List[str], title: str) -> str:
         """Constrói prompt otimizado para DALL-E baseado nas cryptos detectadas"""
@@ -502,38 +508,32 @@ class ImageGenerationQueue:
     def load_queue(self) -> List[Dict]:
         """Carrega a fila"""
         if self.queue_file.exists():
-            with open(self.queue_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.queue_file)
         return []
     
     def save_queue(self, queue: List[Dict]):
         """Salva a fila"""
-        with open(self.queue_file, 'w') as f:
-            json.dump(queue, f, indent=2)
+        dump_file(self.queue_file, queue)
     
     def load_processed(self) -> List[Dict]:
         """Carrega lista de processados"""
         if self.processed_file.exists():
-            with open(self.processed_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.processed_file)
         return []
     
     def save_processed(self, processed: List[Dict]):
         """Salva lista de processados"""
-        with open(self.processed_file, 'w') as f:
-            json.dump(processed, f, indent=2)
+        dump_file(self.processed_file, processed)
     
     def load_failed(self) -> List[Dict]:
         """Carrega lista de falhos"""
         if self.failed_file.exists():
-            with open(self.failed_file, 'r') as f:
-                return json.load(f)
+            return load_file(self.failed_file)
         return []
     
     def save_failed(self, failed: List[Dict]):
         """Salva lista de falhos"""
-        with open(self.failed_file, 'w') as f:
-            json.dump(failed, f, indent=2)
+        dump_file(self.failed_file, failed)
     
     def get_next_batch(self, size: int = 3) -> List[Dict]:
         """Pega próximo lote para processar"""
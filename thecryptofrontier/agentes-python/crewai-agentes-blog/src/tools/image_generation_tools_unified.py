@@ -13,6 +13,16 @@ from crewai.tools import tool
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    from ..utils.article_store import list_stage, load_json, move
+except ImportError:
+    from utils.article_store import list_stage, load_json, move
+
+try:
+    from ..utils.keyword_matcher import detect_cryptocurrencies
+except ImportError:
+    from utils.keyword_matcher import detect_cryptocurrencies
+
 logger = logging.getLogger("image_generation_tools")
 
 # Importar configurações visuais centralizadas
@@ -82,32 +92,7 @@ CRYPTO_TEMPLATES = {
 
 def detect_crypto_in_text(text: str) -> List[str]:
     """Detecta criptomoedas mencionadas no texto"""
-    text_lower = text.lower()
-    detected = []
-    
-    # Mapeamento de palavras-chave para criptos
-    crypto_keywords = {
-        "bitcoin": ["bitcoin", "btc"],
-        "ethereum": ["ethereum", "eth"],
-        "xrp": ["xrp", "ripple"],
-        "bnb": ["bnb", "binance"],
-        "dogecoin": ["dogecoin", "doge"],
-        "solana": ["solana", "sol"],
-        "chainlink": ["chainlink", "link"],
-        "shiba": ["shiba", "shib"],
-        "sui": ["sui"],
-        "usdt": ["usdt", "tether"],
-        "tron": ["tron", "trx"],
-        "pepe": ["pepe"]
-    }
-    
-    for crypto, keywords in crypto_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower and crypto not in detected:
-                detected.append(crypto)
-                break
-    
-    return detected
+    return detect_cryptocurrencies(text)
 
 def build_crypto_prompt(cryptos: List[str], title: str) -> str:
     """Constrói prompt otimizado para criptomoedas detectadas"""
@@ -331,7 +316,7 @@ def generate_image_for_post(post_data: str) -> str:
 def process_all_posts_with_images() -> str:
     """
     Processa TODOS os posts formatados, gerando imagens e fazendo upload para o Strapi.
-    Lê arquivos de 'posts_formatados' e salva com imagens em 'posts_com_imagem'.
+    Lê arquivos de 'posts_formatados' e move os posts com imagem para 'posts_com_imagem'.
     
     Returns:
         Relatório completo do processamento
@@ -340,11 +325,8 @@ def process_all_posts_with_images() -> str:
         formatted_dir = Path("posts_formatados")
         output_dir = Path("posts_com_imagem")
         
-        # Criar diretório de saída
-        output_dir.mkdir(exist_ok=True)
-        
-        # Listar arquivos
-        json_files = list(formatted_dir.glob("*.json"))
+        # Listar artigos (store de artigos ou arquivos)
+        json_files = [Path(entry["full_path"]) for entry in list_stage(formatted_dir)]
         
         if not json_files:
             return json.dumps({
@@ -365,8 +347,7 @@ def process_all_posts_with_images() -> str:
         for json_file in json_files:
             try:
                 # Ler post
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    post_data = json.load(f)
+                post_data = load_json(json_file)
                 
                 title = post_data.get("title", "")
                 excerpt = post_data.get("excerpt", "")
@@ -397,10 +378,9 @@ def process_all_posts_with_images() -> str:
                         # Atualizar post com mainImage
                         post_data["mainImage"] = upload_result["mainImage"]
                         
-                        # Salvar post atualizado
+                        # Avançar o post para a próxima etapa (uma transição no store)
                         output_file = output_dir / json_file.name.replace("formatado_", "com_imagem_")
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            json.dump(post_data, f, ensure_ascii=False, indent=2)
+                        move(json_file, output_file, data=post_data)
                         
                         results["success"] += 1
                         results["details"].append({
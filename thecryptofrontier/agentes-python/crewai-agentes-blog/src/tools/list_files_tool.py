@@ -7,6 +7,11 @@ import json
 from pathlib import Path
 from crewai.tools import tool
 
+try:
+    from ..utils.article_store import STAGES, get_article_store, list_stage
+except ImportError:
+    from utils.article_store import STAGES, get_article_store, list_stage
+
 @tool
 def list_directory_files(directory_path: str, extension: str = ".json") -> dict:
     """
@@ -22,6 +27,16 @@ def list_directory_files(directory_path: str, extension: str = ".json") -> dict:
     try:
         dir_path = Path(directory_path)
         
+        # Diretório de etapa com o store de artigos ativo: consulta indexada
+        if extension == ".json" and dir_path.name in STAGES and get_article_store():
+            file_list = list_stage(dir_path)
+            return {
+                "success": True,
+                "directory": directory_path,
+                "count": len(file_list),
+                "files": file_list
+            }
+        
         if not dir_path.exists():
             return {
                 "success": False,
@@ -18,6 +18,11 @@ import unicodedata
 import asyncio
 import shutil
 
+try:
+    from ..utils.portable_text import text_to_portable_text
+except ImportError:
+    from utils.portable_text import text_to_portable_text
+
 logger = logging.getLogger("strapi_tools")
 
 # Adicionar diretório de schemas ao path
@@ -79,49 +84,12 @@ def remover_todas_tags_html(texto):
 # Função para converter texto em formato Portable Text do Strapi
 def texto_para_portable_text(texto):
     """Converte texto em formato Portable Text do Strapi"""
-    # Remover todas as tags HTML do texto
-    texto = remover_todas_tags_html(texto)
-    
-    # Dividir o texto em parágrafos
-    paragrafos = [p.strip() for p in texto.split("\n\n") if p.strip()]
-    
-    # Criar blocos no formato do Strapi
-    blocos = []
-    for paragrafo in paragrafos:
-        bloco = {
-            "_type": "block",
-            "_key": gerar_chave(),
-            "style": "normal",
-            "markDefs": [],
-            "children": [
-                {
-                    "_type": "span",
-                    "_key": gerar_chave(),
-                    "text": paragrafo,
-                    "marks": []
-                }
-            ]
-        }
-        blocos.append(bloco)
-    
-    return blocos
+    return text_to_portable_text(texto)
 
 # Função para converter HTML em formato Portable Text do Strapi
 def html_para_portable_text(html):
-    """Converte HTML em formato Portable Text do Strapi"""
-    # Primeiro remover todas as tags HTML
-    html = remover_todas_tags_html(html)
-    
-    # Abordagem simplificada: remover tags HTML e converter para blocos de texto
-    limpo = re.sub(r'<p>', '', html)
-    limpo = re.sub(r'</p>', '\n\n', limpo)
-    limpo = re.sub(r'<[^>]*>', '', limpo)
-    
-    # Dividir em parágrafos e filtrar vazios
-    paragrafos = [p.strip() for p in re.split(r'\n\n+', limpo) if p.strip()]
-    
-    # Criar blocos no formato do Strapi
-    return texto_para_portable_text('\n\n'.join(paragrafos))
+    """Converte HTML em formato Portable Text do Strapi (somente o texto, sem tags)"""
+    return text_to_portable_text(html)
 
 def load_schema(schema_name):
     """Carrega um schema do Strapi dinamicamente"""
@@ -12,6 +12,11 @@ from crewai.tools import tool
 from pathlib import Path
 import uuid
 
+try:
+    from ..utils.keyword_matcher import analyze_text, get_matcher
+except ImportError:
+    from utils.keyword_matcher import analyze_text, get_matcher
+
 logger = logging.getLogger("strapi_tools_enhanced")
 
 # Importar configurações do Strapi
@@ -248,70 +253,11 @@ def ensure_tags_exist(tags):
 
 def detect_crypto_categories(title, content):
     """Detecta categorias baseadas no conteúdo"""
-    text = f"{title} {content}".lower()
-    
-    categories = []
-    
-    # Mapeamento de palavras-chave para categorias
-    category_mappings = {
-        "Bitcoin": ["bitcoin", "btc", "satoshi"],
-        "Ethereum": ["ethereum", "eth", "vitalik"],
-        "DeFi": ["defi", "decentralized finance", "yield", "liquidity"],
-        "NFT": ["nft", "non-fungible", "opensea", "digital art"],
-        "Análise de Mercado": ["price", "market", "trading", "análise", "preço"],
-        "Regulação": ["regulation", "sec", "government", "regulação", "governo"],
-        "Tecnologia": ["blockchain", "smart contract", "technology", "tecnologia"],
-        "Altcoins": ["altcoin", "xrp", "ada", "dot", "bnb", "sol"]
-    }
-    
-    for category, keywords in category_mappings.items():
-        for keyword in keywords:
-            if keyword in text:
-                if category not in categories:
-                    categories.append(category)
-                break
-    
-    # Se nenhuma categoria específica, usar "Criptomoedas"
-    if not categories:
-        categories.append("Criptomoedas")
-    
-    return categories[:3]  # Máximo 3 categorias
+    return analyze_text(title, content, get_matcher("sanity"))["categories"]
 
 def extract_crypto_tags(title, content):
     """Extrai tags relevantes do conteúdo"""
-    text = f"{title} {content}".lower()
-    
-    tags = []
-    
-    # Lista de criptomoedas populares
-    crypto_tags = [
-        "bitcoin", "ethereum", "xrp", "bnb", "solana", "cardano",
-        "dogecoin", "shiba", "polygon", "avalanche", "chainlink",
-        "tron", "usdt", "usdc", "dai", "maker", "aave", "uniswap"
-    ]
-    
-    # Verificar menções de criptomoedas
-    for crypto in crypto_tags:
-        if crypto in text and crypto not in tags:
-            tags.append(crypto)
-    
-    # Adicionar tags temáticas
-    theme_tags = {
-        "trading": ["trade", "trading", "exchange"],
-        "defi": ["defi", "yield", "staking"],
-        "nft": ["nft", "opensea", "digital art"],
-        "web3": ["web3", "metaverse", "dao"],
-        "mining": ["mining", "miner", "hashrate"],
-        "wallet": ["wallet", "ledger", "metamask"]
-    }
-    
-    for tag, keywords in theme_tags.items():
-        for keyword in keywords:
-            if keyword in text and tag not in tags:
-                tags.append(tag)
-                break
-    
-    return tags[:5]  # Máximo 5 tags
+    return analyze_text(title, content, get_matcher("sanity"))["tags"]
 
 @tool("Publish to Strapi with full metadata")
 def publish_to_strapi_enhanced(post_data: str) -> str:
@@ -349,8 +295,8 @@ def publish_to_strapi_enhanced(post_data: str) -> str:
                             content_text += child["text"] + " "
         
         # Detectar categorias e tags automaticamente
-        categories = detect_crypto_categories(data["title"], content_text)
-        tags = extract_crypto_tags(data["title"], content_text)
+        detected = analyze_text(data["title"], content_text, get_matcher("sanity"))
+        categories, tags = detected["categories"], detected["tags"]
         
         logger.info(f"Categorias detectadas: {categories}")
         logger.info(f"Tags detectadas: {tags}")
@@ -0,0 +1,479 @@
+"""
+Limitador de Concorrência Adaptativo (AIMD) e Orçamento de Retries
+
+Cada serviço externo (OpenAI, Gemini, Sanity, Strapi) tem um limitador
+compartilhado pelo retry decorator e pelo circuit breaker. O limite de
+chamadas simultâneas cresce de forma aditiva a cada sucesso e cai pela
+metade quando o provedor sinaliza throttling (429/503), respeitando os
+cabeçalhos `Retry-After` e `x-ratelimit-*` enviados pelo servidor.
+
+A espera por uma vaga tem prazo (`ACQUIRE_TIMEOUT`): se nenhuma vaga é
+liberada a tempo, `enter` levanta `LimiterTimeout`, que o retry decorator
+trata como erro retentável (com backoff). Pausas pedidas pelo servidor são
+sempre esperadas por inteiro, sem contar no prazo. Uma chamada aninhada em
+outra do mesmo serviço reaproveita a vaga de fora em vez de bloquear.
+"""
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, Token
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, FrozenSet, Optional
+
+try:
+    from ..monitoring.metrics_registry import get_registry
+except ImportError:
+    from monitoring.metrics_registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Espera máxima (s) por uma vaga antes de seguir sem o limitador
+ACQUIRE_TIMEOUT = float(os.getenv("LIMITER_ACQUIRE_TIMEOUT", "30"))
+
+# Serviços cuja vaga o contexto atual (thread ou tarefa asyncio) já ocupa
+_held_slots: ContextVar[FrozenSet[str]] = ContextVar("adaptive_limiter_held_slots", default=frozenset())
+
+class LimiterTimeout(TimeoutError):
+    """Nenhuma vaga do serviço foi liberada dentro do prazo"""
+
+_THROTTLE_MARKERS = ("429", "rate limit", "ratelimit", "too many requests", "quota", "resource_exhausted")
+
+# Limites iniciais por serviço; serviços não listados usam DEFAULT_LIMITS
+SERVICE_LIMITS: Dict[str, Dict[str, float]] = {
+    "openai": {"initial_limit": 4, "max_limit": 16},
+    "google_ai": {"initial_limit": 4, "max_limit": 32},
+    "sanity": {"initial_limit": 8, "max_limit": 32},
+    "strapi": {"initial_limit": 8, "max_limit": 32},
+}
+DEFAULT_LIMITS: Dict[str, float] = {"initial_limit": 4, "max_limit": 32}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def _parse_duration(value: Any) -> Optional[float]:
+    """
+    Converte um valor de cabeçalho em segundos.
+
+    Aceita segundos ("30", "1.5"), durações no formato da OpenAI
+    ("6m0s", "20ms") e datas HTTP ("Wed, 21 Oct 2015 07:28:00 GMT").
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(text)
+    if parts and "".join(n + u for n, u in parts) == text:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    try:
+        return max(0.0, parsedate_to_datetime(text).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def _get_headers(source: Any) -> Optional[Any]:
+    """Localiza os cabeçalhos HTTP em uma exceção ou resposta"""
+    headers = getattr(source, "headers", None)
+    if headers is None:
+        response = getattr(source, "response", None)
+        headers = getattr(response, "headers", None)
+    return headers
+
+def get_status_code(source: Any) -> Optional[int]:
+    """Código HTTP de uma exceção ou resposta (requests, httpx, SDKs)"""
+    for obj in (source, getattr(source, "response", None)):
+        if obj is None:
+            continue
+        for attr in ("status_code", "status", "code"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+def extract_retry_after(source: Any) -> Optional[float]:
+    """
+    Tempo de espera sugerido pelo servidor, em segundos.
+
+    Lê `Retry-After`, `retry-after-ms` e os cabeçalhos de reset
+    `x-ratelimit-*`, além de um atributo `retry_after` na exceção.
+    """
+    value = getattr(source, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+
+    headers = _get_headers(source)
+    if not headers:
+        return None
+
+    try:
+        get = headers.get
+    except AttributeError:
+        return None
+
+    retry_after_ms = _parse_duration(get("retry-after-ms") or get("Retry-After-Ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0
+
+    retry_after = _parse_duration(get("Retry-After") or get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+
+    resets = [
+        _parse_duration(get(name))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens", "x-ratelimit-reset")
+    ]
+    resets = [r for r in resets if r is not None]
+    if not resets:
+        return None
+
+    reset = max(resets)
+    # Alguns provedores enviam o reset como epoch em vez de duração
+    if reset > 10 ** 9:
+        reset = max(0.0, reset - time.time())
+    return reset
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Indica se a exceção representa throttling do provedor (e não uma falha)"""
+    status = get_status_code(exc)
+    if status is not None:
+        return status in THROTTLE_STATUS_CODES
+    message = str(exc).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+def compute_backoff(
+    attempt: int,
+    initial_delay: float,
+    backoff_factor: float,
+    max_delay: float,
+    retry_after: Optional[float] = None
+) -> float:
+    """
+    Backoff exponencial com full jitter: um valor uniforme entre zero e o
+    teto exponencial, para que workers não retentem em sincronia. Quando o
+    servidor informa um tempo de espera, ele é o mínimo.
+    """
+    ceiling = min(max_delay, initial_delay * (backoff_factor ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class RetryBudget:
+    """
+    Orçamento de retries em janela deslizante.
+
+    Permite no máximo `ratio` retries por requisição original, mais
+    `min_per_second` retries por segundo, para que uma degradação do
+    provedor não multiplique a carga enviada a ele.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 0.5, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window_seconds = window_seconds
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self):
+        """Registra uma requisição original (não retry)"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_withdraw(self) -> bool:
+        """Consome um retry do orçamento; retorna False se esgotado"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            allowed = self.min_per_second * self.window_seconds + self.ratio * len(self._requests)
+            if len(self._retries) + 1 > allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "exhausted": self.exhausted,
+            }
+
+class AdaptiveLimiter:
+    """
+    Limite de concorrência AIMD para um serviço.
+
+    Cada sucesso soma `1/limit` ao limite (cerca de +1 por janela de
+    chamadas); cada sinal de throttling multiplica o limite por
+    `backoff_ratio`, no máximo uma vez a cada `cooldown` segundos, para que
+    uma rajada de 429 simultâneos conte como um único evento.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        backoff_ratio: float = 0.5,
+        cooldown: float = 1.0,
+        budget: Optional[RetryBudget] = None
+    ):
+        self.name = name
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.limit = float(initial_limit)
+        self.backoff_ratio = backoff_ratio
+        self.cooldown = cooldown
+        self.budget = budget or RetryBudget()
+
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _wait_time(self, now: float) -> Optional[float]:
+        """0 se há vaga agora; senão, segundos até tentar de novo (None = até um release)"""
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.in_flight < max(1, int(self.limit)):
+            return 0.0
+        return None
+
+    def try_acquire(self) -> Optional[float]:
+        """Tenta ocupar uma vaga sem bloquear; retorna 0 em caso de sucesso"""
+        with self._cond:
+            wait = self._wait_time(time.monotonic())
+            if wait == 0.0:
+                self.in_flight += 1
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até haver vaga. `timeout` limita só a espera por um release;
+        uma pausa pedida pelo servidor (`blocked_until`) é esperada por inteiro.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(now)
+                if wait == 0.0:
+                    self.in_flight += 1
+                    return True
+                if self.blocked_until > now:
+                    # O prazo recomeça quando a pausa do servidor termina
+                    if deadline is not None:
+                        deadline = max(deadline, self.blocked_until + timeout)
+                elif deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    async def async_acquire(self, timeout: Optional[float] = None) -> bool:
+        """Versão assíncrona de acquire (não bloqueia o event loop)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if wait is not None:
+                # Pausa do servidor: esperada por inteiro, o prazo recomeça depois
+                if deadline is not None:
+                    deadline = max(deadline, self.blocked_until + timeout)
+                await asyncio.sleep(wait)
+                continue
+            wait = 0.05
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def _timeout_error(self, timeout: float) -> LimiterTimeout:
+        return LimiterTimeout(
+            f"Sem vaga em {self.name} após {timeout:g}s "
+            f"(limite {self.limit:.1f}, em uso {self.in_flight})"
+        )
+
+    def enter(self, timeout: float = ACQUIRE_TIMEOUT) -> Optional[Token]:
+        """
+        Ocupa uma vaga para a chamada atual, com prazo (`LimiterTimeout` se
+        acabar). Retorna None (sem vaga a liberar) se o contexto já ocupa
+        uma vaga deste serviço (chamada aninhada). Libere com `leave`.
+        """
+        held = _held_slots.get()
+        if self.name in held:
+            return None
+        if not self.acquire(timeout):
+            raise self._timeout_error(timeout)
+        return _held_slots.set(held | {self.name})
+
+    async def async_enter(self, timeout: float = ACQUIRE_TIMEOUT) -> Optional[Token]:
+        """Versão assíncrona de enter"""
+        held = _held_slots.get()
+        if self.name in held:
+            return None
+        if not await self.async_acquire(timeout):
+            raise self._timeout_error(timeout)
+        return _held_slots.set(held | {self.name})
+
+    def leave(self, token: Optional[Token]):
+        """Libera a vaga ocupada por `enter`/`async_enter` (no-op para None)"""
+        if token is None:
+            return
+        _held_slots.reset(token)
+        self.release()
+
+    def release(self):
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, timeout: float = ACQUIRE_TIMEOUT):
+        if not self.acquire(timeout):
+            raise self._timeout_error(timeout)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self, timeout: float = ACQUIRE_TIMEOUT):
+        if not await self.async_acquire(timeout):
+            raise self._timeout_error(timeout)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def on_success(self):
+        """
+        Aumento aditivo, chamado após o release da vaga. Só cresce quando
+        ao menos metade do limite estava em uso, para que um serviço pouco
+        exigido não acumule um limite que nunca foi testado.
+        """
+        with self._cond:
+            if self.in_flight + 1 < self.limit / 2:
+                return
+            previous = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if int(self.limit) > previous:
+                self._cond.notify()
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Redução multiplicativa e pausa sugerida pelo servidor"""
+        now = time.monotonic()
+        with self._cond:
+            self.throttled += 1
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                logger.warning(
+                    f"Throttling em {self.name}: limite de concorrência reduzido para {self.limit:.1f}"
+                )
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def observe_response(self, response: Any):
+        """
+        Lê cabeçalhos de rate limit de uma resposta bem-sucedida: se a cota
+        restante chegou a zero, pausa o serviço até o reset informado.
+        """
+        headers = _get_headers(response)
+        if not headers or not hasattr(headers, "get"):
+            return
+        remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("x-ratelimit-remaining")
+        if remaining is None or str(remaining).strip() != "0":
+            return
+        reset = extract_retry_after(response)
+        if reset:
+            with self._cond:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + reset)
+
+    def reset_to_min(self):
+        """Volta ao limite mínimo (usado quando o circuit breaker abre)"""
+        with self._cond:
+            self.limit = self.min_limit
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            stats = {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+            }
+        stats["retry_budget"] = self.budget.get_stats()
+        return stats
+
+# Limitadores por serviço
+limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(service_name: str) -> AdaptiveLimiter:
+    """Obtém ou cria o limitador de um serviço"""
+    limiter = limiters.get(service_name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = limiters.get(service_name)
+            if limiter is None:
+                options = SERVICE_LIMITS.get(service_name, DEFAULT_LIMITS)
+                limiter = limiters[service_name] = AdaptiveLimiter(service_name, **options)
+                get_registry().register_collector("adaptive_limiters", limiters_to_prometheus)
+    return limiter
+
+def limiters_to_prometheus() -> str:
+    """Exporta o estado dos limitadores no formato do Prometheus"""
+    families = [
+        ("service_concurrency_limit", "gauge", "Limite de concorrência adaptativo", "limit"),
+        ("service_in_flight_requests", "gauge", "Chamadas em andamento", "in_flight"),
+        ("service_throttled_total", "counter", "Respostas de throttling recebidas", "throttled"),
+    ]
+    stats = {name: limiter.get_stats() for name, limiter in sorted(limiters.items())}
+    lines = []
+    for metric, metric_type, help_text, key in families:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for service, values in stats.items():
+            lines.append(f'{metric}{{service="{service}"}} {values[key]:g}')
+
+    lines.append("# HELP service_retry_budget_exhausted_total Retries negados pelo orçamento")
+    lines.append("# TYPE service_retry_budget_exhausted_total counter")
+    for service, values in stats.items():
+        lines.append(
+            f'service_retry_budget_exhausted_total{{service="{service}"}} {values["retry_budget"]["exhausted"]}'
+        )
+    return "\n".join(lines) + "\n"
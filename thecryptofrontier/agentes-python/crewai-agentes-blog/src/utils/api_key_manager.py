@@ -1,11 +1,17 @@
 import os
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import google.generativeai as genai
 from pathlib import Path
 
+try:
+    from ..monitoring.metrics_registry import get_registry
+    from .json_codec import dump_file, load_file
+except ImportError:
+    from monitoring.metrics_registry import get_registry
+    from utils.json_codec import dump_file, load_file
+
 class GeminiAPIKeyManager:
     """
     Gerenciador de chaves API do Gemini com rotação automática
@@ -31,6 +37,9 @@ class GeminiAPIKeyManager:
         # Cliente Gemini configurado
         self.configured_key = None
         
+        # Expor uso das chaves no registro de métricas
+        get_registry().register_collector("gemini_api_keys", self.to_prometheus)
+        
     def _load_api_keys(self) -> List[str]:
         """Carrega as chaves API do ambiente"""
         keys = []
@@ -63,8 +72,7 @@ class GeminiAPIKeyManager:
         """Carrega dados de uso das chaves"""
         if self.data_file.exists():
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
+                data = load_file(self.data_file)
                 # Verificar se os dados são do dia atual
                 if data.get('date') == datetime.now().strftime('%Y-%m-%d'):
                     return data
@@ -80,8 +88,8 @@ class GeminiAPIKeyManager:
     def _save_usage_data(self):
         """Salva dados de uso das chaves"""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.usage_data, f, indent=2)
+            # Salvo a cada request contabilizado: compacto e atômico
+            dump_file(self.data_file, self.usage_data)
         except Exception as e:
             self.logger.error(f"Erro ao salvar dados de uso: {e}")
     
@@ -205,6 +213,35 @@ class GeminiAPIKeyManager:
         
         return status
     
+    def to_prometheus(self) -> str:
+        """Exporta o uso das chaves no formato do Prometheus"""
+        status = self.get_status()
+        lines = [
+            "# HELP gemini_api_key_requests_used Requests usados hoje por chave",
+            "# TYPE gemini_api_key_requests_used gauge",
+        ]
+        lines += [
+            f'gemini_api_key_requests_used{{key="{k["index"]}"}} {k["requests_used"]}'
+            for k in status['keys_status']
+        ]
+        lines += [
+            "# HELP gemini_api_key_exhausted Chave esgotada (1) ou disponível (0)",
+            "# TYPE gemini_api_key_exhausted gauge",
+        ]
+        lines += [
+            f'gemini_api_key_exhausted{{key="{k["index"]}"}} {int(k["exhausted"])}'
+            for k in status['keys_status']
+        ]
+        lines += [
+            "# HELP gemini_api_requests_today Requests usados hoje (todas as chaves)",
+            "# TYPE gemini_api_requests_today gauge",
+            f"gemini_api_requests_today {status['total_requests_today']}",
+            "# HELP gemini_api_requests_capacity Capacidade diária de requests",
+            "# TYPE gemini_api_requests_capacity gauge",
+            f"gemini_api_requests_capacity {status['max_requests_today']}",
+        ]
+        return "\n".join(lines) + "\n"
+    
     def add_api_key(self, new_key: str):
         """Adiciona uma nova chave API ao sistema"""
         if new_key not in self.api_keys:
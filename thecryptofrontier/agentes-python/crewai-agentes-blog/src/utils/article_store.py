@@ -0,0 +1,448 @@
+"""
+Armazenamento embutido dos artigos do pipeline (SQLite + JSON1)
+
+Substitui os diretórios por etapa (posts_para_traduzir/, posts_traduzidos/,
+posts_formatados/, posts_com_imagem/, posts_publicados/) por uma tabela em
+que cada artigo é uma linha com a etapa na coluna `state`. O JSON fica em
+`blobs`, endereçado pelo SHA-256 do conteúdo canônico, então a mesma versão
+de um artigo em duas etapas é gravada uma única vez.
+
+- descoberta: `SELECT ... WHERE state = ? ORDER BY updated_at` usa o índice
+  (state, updated_at) em vez de glob + parse de cada arquivo;
+- transição de etapa: um UPDATE dentro de uma transação (`transition`),
+  usado por `move` (save_to_file com `source_path` e a etapa de imagens);
+- retenção: um DELETE indexado (`purge`).
+
+Blobs órfãos são removidos na mesma transação, checando só os hashes que a
+operação substituiu ou removeu (busca pelo índice de `articles.blob`).
+
+As ferramentas continuam falando em caminhos: "posts_traduzidos/x.json" é
+a linha (state="posts_traduzidos", name="x.json"). As funções `save_json`,
+`load_json`, `list_stage`, `move` e `remove` fazem essa tradução quando a
+variável ARTICLE_STORE_DB aponta para o banco; sem ela, tudo continua em
+arquivos como antes. Arquivos de etapa ainda não importados continuam
+visíveis em `list_stage` e legíveis em `load_json`.
+
+Uso:
+    from utils.article_store import save_json, load_json, list_stage
+
+    save_json("posts_traduzidos/artigo_1.json", article)
+    for entry in list_stage("posts_traduzidos"):
+        article = load_json(entry["full_path"])
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from .json_codec import dump_file, load_file, loads
+except ImportError:
+    from utils.json_codec import dump_file, load_file, loads
+
+logger = logging.getLogger(__name__)
+
+# Diretórios de etapa que o store assume
+STAGES = (
+    "posts_para_traduzir",
+    "posts_traduzidos",
+    "posts_formatados",
+    "posts_com_imagem",
+    "posts_publicados",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data TEXT NOT NULL CHECK (json_valid(data))
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    name TEXT NOT NULL,
+    blob TEXT NOT NULL REFERENCES blobs(hash),
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (state, name)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_state_updated ON articles (state, updated_at);
+CREATE INDEX IF NOT EXISTS idx_articles_blob ON articles (blob);
+"""
+
+PathLike = Union[str, Path]
+
+@dataclass
+class StoredArticle:
+    """Metadados de um artigo no store (sem o conteúdo)"""
+    state: str
+    name: str
+    size: int
+    created_at: float
+    updated_at: float
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.state, self.name)
+
+def _encode(data: Any) -> Tuple[str, str]:
+    """JSON canônico (chaves ordenadas, compacto) e seu SHA-256"""
+    # Sempre stdlib: o hash não pode mudar com o backend do json_codec
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ArticleStore:
+    """
+    Store de artigos em um arquivo SQLite.
+
+    Uma conexão por thread; o banco usa WAL, então leitores não bloqueiam o
+    escritor e vários pipelines podem usar o mesmo arquivo.
+    """
+
+    def __init__(self, db_path: PathLike):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        # executescript faz o próprio COMMIT; o schema é idempotente
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # isolation_level=None: as transações são abertas explicitamente
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    class _Transaction:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            # IMMEDIATE: pega o lock de escrita já no início (sem deadlock de upgrade)
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _transaction(self) -> "_Transaction":
+        return self._Transaction(self._connect())
+
+    @staticmethod
+    def _put_blob(conn: sqlite3.Connection, data: Any) -> str:
+        text, digest = _encode(data)
+        conn.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (digest, text))
+        return digest
+
+    @staticmethod
+    def _collect_blobs(conn: sqlite3.Connection, digests: Iterable[str]) -> None:
+        """Remove, dentre `digests`, os blobs que nenhuma linha referencia mais"""
+        conn.executemany(
+            "DELETE FROM blobs WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM articles WHERE blob = ?)",
+            [(digest, digest) for digest in set(digests)],
+        )
+
+    @classmethod
+    def _upsert(cls, conn: sqlite3.Connection, state: str, name: str, data: Any,
+                created_at: float, updated_at: float) -> None:
+        row = conn.execute("SELECT blob FROM articles WHERE state = ? AND name = ?", (state, name)).fetchone()
+        digest = cls._put_blob(conn, data)
+        conn.execute(
+            """
+            INSERT INTO articles (state, name, blob, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (state, name) DO UPDATE SET blob = excluded.blob, updated_at = excluded.updated_at
+            """,
+            (state, name, digest, created_at, updated_at),
+        )
+        if row and row[0] != digest:
+            cls._collect_blobs(conn, [row[0]])
+
+    # ---- escrita ----
+
+    def put(self, state: str, name: str, data: Any) -> None:
+        """Grava (ou substitui) o artigo `name` na etapa `state`"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._upsert(conn, state, name, data, now, now)
+
+    def transition(self, state: str, name: str, new_state: str,
+                   new_name: Optional[str] = None, data: Any = None) -> None:
+        """
+        Move o artigo para outra etapa (e opcionalmente renomeia/atualiza o
+        conteúdo) numa única transação. Um artigo já existente no destino é
+        substituído.
+
+        Raises:
+            KeyError: se o artigo não existir na etapa de origem
+        """
+        new_name = new_name or name
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, blob FROM articles WHERE state = ? AND name = ?", (state, name)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"{state}/{name}")
+            digest = self._put_blob(conn, data) if data is not None else row[1]
+            replaced = conn.execute(
+                "DELETE FROM articles WHERE state = ? AND name = ? AND id != ? RETURNING blob",
+                (new_state, new_name, row[0]),
+            ).fetchall()
+            conn.execute(
+                "UPDATE articles SET state = ?, name = ?, blob = ?, updated_at = ? WHERE id = ?",
+                (new_state, new_name, digest, time.time(), row[0]),
+            )
+            self._collect_blobs(conn, [row[1]] + [blob for blob, in replaced])
+
+    def delete(self, state: str, name: str) -> bool:
+        with self._transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM articles WHERE state = ? AND name = ? RETURNING blob", (state, name)
+            ).fetchall()
+            self._collect_blobs(conn, [blob for blob, in deleted])
+        return bool(deleted)
+
+    def purge(self, states: Iterable[str] = STAGES, before: Optional[float] = None,
+              after: Optional[float] = None) -> int:
+        """
+        Remove os artigos das etapas dadas com updated_at < `before` e/ou
+        > `after` (epoch). Um único DELETE coberto pelo índice (state, updated_at).
+        """
+        states = list(states)
+        conditions = [f"state IN ({','.join('?' * len(states))})"]
+        params: List[Any] = list(states)
+        if before is not None:
+            conditions.append("updated_at < ?")
+            params.append(before)
+        if after is not None:
+            conditions.append("updated_at > ?")
+            params.append(after)
+
+        with self._transaction() as conn:
+            removed = conn.execute(
+                f"DELETE FROM articles WHERE {' AND '.join(conditions)} RETURNING blob", params
+            ).fetchall()
+            self._collect_blobs(conn, [blob for blob, in removed])
+        return len(removed)
+
+    # ---- leitura ----
+
+    def get(self, state: str, name: str) -> Optional[Any]:
+        row = self._connect().execute(
+            """
+            SELECT b.data FROM articles a JOIN blobs b ON b.hash = a.blob
+            WHERE a.state = ? AND a.name = ?
+            """,
+            (state, name),
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def list(self, state: str, limit: Optional[int] = None, newest_first: bool = True) -> List[StoredArticle]:
+        order = "DESC" if newest_first else "ASC"
+        rows = self._connect().execute(
+            f"""
+            SELECT a.state, a.name, length(b.data), a.created_at, a.updated_at
+            FROM articles a JOIN blobs b ON b.hash = a.blob
+            WHERE a.state = ? ORDER BY a.updated_at {order} LIMIT ?
+            """,
+            (state, -1 if limit is None else limit),
+        ).fetchall()
+        return [StoredArticle(*row) for row in rows]
+
+    def names(self, state: str) -> Set[str]:
+        """Nomes dos artigos da etapa (só o índice único, sem ler os blobs)"""
+        rows = self._connect().execute("SELECT name FROM articles WHERE state = ?", (state,)).fetchall()
+        return {name for name, in rows}
+
+    def counts(self) -> Dict[str, int]:
+        """Quantidade de artigos por etapa"""
+        rows = self._connect().execute("SELECT state, COUNT(*) FROM articles GROUP BY state").fetchall()
+        return dict(rows)
+
+    def find(self, field: str, value: Any, state: Optional[str] = None) -> List[StoredArticle]:
+        """Artigos cujo campo JSON `field` (ex.: "link") é igual a `value`"""
+        query = """
+            SELECT a.state, a.name, length(b.data), a.created_at, a.updated_at
+            FROM articles a JOIN blobs b ON b.hash = a.blob
+            WHERE json_extract(b.data, ?) = ?
+        """
+        params: List[Any] = [f"$.{field}", value]
+        if state:
+            query += " AND a.state = ?"
+            params.append(state)
+        rows = self._connect().execute(query + " ORDER BY a.updated_at DESC", params).fetchall()
+        return [StoredArticle(*row) for row in rows]
+
+    # ---- migração ----
+
+    def import_directory(self, directory: PathLike, state: Optional[str] = None) -> int:
+        """Importa os *.json de um diretório de etapa (mantendo o mtime como updated_at)"""
+        directory = Path(directory)
+        state = state or directory.name
+        imported = 0
+        for file_path in sorted(directory.glob("*.json")):
+            try:
+                data = load_file(file_path)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignorando {file_path}: {e}")
+                continue
+            mtime = file_path.stat().st_mtime
+            with self._transaction() as conn:
+                self._upsert(conn, state, file_path.name, data, mtime, mtime)
+            imported += 1
+        return imported
+
+_store: Optional[ArticleStore] = None
+_store_lock = threading.Lock()
+
+def get_article_store() -> Optional[ArticleStore]:
+    """Store configurado por ARTICLE_STORE_DB, ou None (modo arquivos)"""
+    global _store
+    db_path = os.getenv("ARTICLE_STORE_DB")
+    if not db_path:
+        return None
+    with _store_lock:
+        if _store is None or _store.db_path != db_path:
+            _store = ArticleStore(db_path)
+        return _store
+
+# ---- adaptador de caminhos ----
+
+def stage_of(path: PathLike) -> Optional[Tuple[str, str]]:
+    """(etapa, nome) de um caminho dentro de um diretório de etapa, senão None"""
+    path = Path(path)
+    if path.parent.name in STAGES and path.suffix == ".json":
+        return path.parent.name, path.name
+    return None
+
+def _routed(path: PathLike) -> Optional[Tuple[ArticleStore, str, str]]:
+    stage = stage_of(path)
+    if stage is None:
+        return None
+    store = get_article_store()
+    return (store, *stage) if store else None
+
+def save_json(path: PathLike, data: Any) -> str:
+    """Grava `data` no store (caminho de etapa) ou em arquivo JSON"""
+    routed = _routed(path)
+    if routed:
+        store, state, name = routed
+        store.put(state, name, data)
+        return str(path)
+
+    # Arquivos de etapa são lidos à mão: indentados
+    dump_file(path, data, pretty=True)
+    return str(path)
+
+def load_json(path: PathLike) -> Any:
+    """
+    Lê do store (caminho de etapa) ou do arquivo. Arquivos que ainda não
+    foram importados continuam legíveis.
+
+    Raises:
+        FileNotFoundError: se não estiver em nenhum dos dois
+    """
+    routed = _routed(path)
+    if routed:
+        store, state, name = routed
+        data = store.get(state, name)
+        if data is not None:
+            return data
+    return load_file(path)
+
+def exists(path: PathLike) -> bool:
+    routed = _routed(path)
+    if routed:
+        store, state, name = routed
+        if store.get(state, name) is not None:
+            return True
+    return os.path.exists(path)
+
+def _file_entries(directory: Path) -> List[Dict[str, Any]]:
+    if not directory.is_dir():
+        return []
+    entries = []
+    for file_path in directory.glob("*.json"):
+        stat = file_path.stat()
+        entries.append({
+            "filename": file_path.name,
+            "full_path": str(file_path),
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+        })
+    return entries
+
+def list_stage(directory: PathLike, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Artigos de um diretório de etapa, mais recentes primeiro, no formato
+    {filename, full_path, size, modified}. Com o store, os arquivos ainda
+    não importados entram na mesma listagem.
+    """
+    directory = Path(directory)
+    entries = _file_entries(directory)
+    store = get_article_store() if directory.name in STAGES else None
+    if store:
+        stored = store.names(directory.name)
+        entries = [entry for entry in entries if entry["filename"] not in stored]
+        entries += [
+            {
+                "filename": article.name,
+                "full_path": str(directory / article.name),
+                "size": article.size,
+                "modified": article.updated_at,
+            }
+            for article in store.list(directory.name, limit=limit)
+        ]
+
+    entries.sort(key=lambda entry: entry["modified"], reverse=True)
+    return entries[:limit] if limit is not None else entries
+
+def move(source: PathLike, destination: PathLike, data: Any = None) -> str:
+    """
+    Move um artigo entre etapas, opcionalmente gravando `data` como novo
+    conteúdo (transição atômica no store; arquivo novo + remoção sem ele).
+    """
+    source_routed, destination_stage = _routed(source), stage_of(destination)
+    if source_routed and destination_stage:
+        store, state, name = source_routed
+        try:
+            store.transition(state, name, *destination_stage, data=data)
+            return str(destination)
+        except KeyError:
+            # Ainda em arquivo: importa já no destino
+            store.put(*destination_stage, load_json(source) if data is None else data)
+            os.remove(source)
+            return str(destination)
+
+    if data is not None:
+        save_json(destination, data)
+        if os.path.abspath(source) != os.path.abspath(destination):
+            remove(source)
+        return str(destination)
+    os.makedirs(os.path.dirname(str(destination)) or ".", exist_ok=True)
+    os.replace(source, destination)
+    return str(destination)
+
+def remove(path: PathLike) -> bool:
+    routed = _routed(path)
+    if routed:
+        store, state, name = routed
+        if store.delete(state, name):
+            return True
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
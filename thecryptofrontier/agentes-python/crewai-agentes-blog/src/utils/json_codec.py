@@ -0,0 +1,193 @@
+"""
+Codec JSON compartilhado para filas, caches e arquivos de etapa
+
+Usa o backend mais rápido instalado, nesta ordem: orjson, msgspec, json
+(stdlib). A variável JSON_CODEC força um deles (ex.: JSON_CODEC=json).
+
+- `dumps`/`loads` trabalham com bytes UTF-8 (sem escapes \\uXXXX);
+- modo compacto por padrão; `pretty=True` indenta com 2 espaços, para
+  arquivos que alguém lê à mão;
+- `dump_file` grava de forma atômica (arquivo temporário + rename), então
+  quem lê nunca vê um JSON pela metade;
+- compressão opcional para arquivos de arquivo morto: "gzip" (stdlib) ou
+  "zstd" (pacote zstandard). `load_file` reconhece a compressão pelos
+  bytes iniciais, então o leitor não precisa saber como foi gravado.
+
+Uso:
+    from utils.json_codec import dump_file, load_file
+
+    dump_file("job_queue.json", jobs)
+    dump_file("arquivo/posts.json.zst", posts, compression="zstd")
+    jobs = load_file("job_queue.json")
+"""
+import gzip
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PathLike = Union[str, Path]
+Default = Optional[Callable[[Any], Any]]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+def _select_backend() -> str:
+    available = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    forced = os.getenv("JSON_CODEC", "").strip().lower()
+    if forced:
+        if not available.get(forced):
+            raise ImportError(f"JSON_CODEC={forced} não está disponível")
+        return forced
+    return next(name for name, ok in available.items() if ok)
+
+BACKEND = _select_backend()
+
+def _read_umask() -> int:
+    """
+    Umask do processo, lida uma vez na importação: /proc/self/status quando
+    existe; senão troca e restaura a umask, ainda sem outras threads usando
+    este módulo.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+_UMASK = _read_umask()
+
+# ---- serialização ----
+
+def _dumps_orjson(obj: Any, pretty: bool, default: Default) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=default, option=option)
+
+def _dumps_msgspec(obj: Any, pretty: bool, default: Default) -> bytes:
+    data = msgspec.json.encode(obj, enc_hook=default)
+    return msgspec.json.format(data, indent=2) if pretty else data
+
+def _dumps_json(obj: Any, pretty: bool, default: Default) -> bytes:
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+    return text.encode("utf-8")
+
+def _loads_msgspec(data: Union[bytes, str]) -> Any:
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as e:
+        # Mesmo tipo de erro que json/orjson, para os `except` existentes
+        raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+_DUMPS = {"orjson": _dumps_orjson, "msgspec": _dumps_msgspec, "json": _dumps_json}
+_LOADS = {
+    "orjson": lambda data: orjson.loads(data),
+    "msgspec": _loads_msgspec,
+    "json": lambda data: json.loads(data),
+}
+
+def dumps(obj: Any, pretty: bool = False, default: Default = None) -> bytes:
+    """
+    Serializa `obj` em bytes UTF-8.
+
+    Args:
+        pretty: indentação de 2 espaços (senão, compacto)
+        default: conversão de tipos não suportados (ex.: `str`)
+    """
+    return _DUMPS[BACKEND](obj, pretty, default)
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Desserializa bytes ou str (levanta json.JSONDecodeError se inválido)"""
+    return _LOADS[BACKEND](data)
+
+# ---- compressão ----
+
+def compress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return data
+    if compression == "gzip":
+        # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("Compressão zstd requer o pacote zstandard")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    raise ValueError(f"Compressão desconhecida: {compression}")
+
+def decompress(data: bytes) -> bytes:
+    """Descomprime gzip/zstd (detectados pelos bytes iniciais); outros passam direto"""
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError("Arquivo zstd requer o pacote zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+# ---- arquivos ----
+
+def _file_mode(path: Path) -> int:
+    """Permissões do arquivo existente ou, para um novo, as padrão (0o666 menos a umask)"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def dump_file(path: PathLike, obj: Any, pretty: bool = False,
+              compression: Optional[str] = None, default: Default = None) -> None:
+    """
+    Grava `obj` em `path` de forma atômica. Sem `compression` explícita, ela
+    é deduzida da extensão (.gz / .zst).
+    """
+    path = Path(path)
+    if compression is None:
+        compression = COMPRESSION_SUFFIXES.get(path.suffix)
+    data = compress(dumps(obj, pretty=pretty, default=default), compression)
+
+    directory = path.parent
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp cria com 0600; o rename não pode deixar o arquivo só para o dono
+        os.fchmod(fd, _file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def load_file(path: PathLike) -> Any:
+    """Lê um arquivo gravado por `dump_file` (ou qualquer JSON, comprimido ou não)"""
+    with open(path, "rb") as f:
+        return loads(decompress(f.read()))
@@ -0,0 +1,276 @@
+"""
+Matcher de palavras-chave em passada única
+
+Compila uma tabela declarativa (grupo -> rótulo -> palavras-chave) em uma
+única regex de alternância com limites de palavra. Uma varredura linear do
+texto devolve os rótulos de todos os grupos de uma vez, em vez de um
+`keyword in text` por palavra-chave.
+
+Uso:
+    from utils.keyword_matcher import detect_categories, extract_tags
+
+    detect_categories(title, content)   # ["Bitcoin", "Regulação"]
+    extract_tags(title, content)        # ["bitcoin", "trading"]
+
+Benchmark:
+    python src/utils/keyword_matcher.py
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Tabela declarativa: grupo -> rótulo -> palavras-chave. A ordem dos
+# rótulos define a prioridade quando o resultado é truncado (ex.: máximo
+# de 3 categorias).
+KEYWORD_TABLE = {
+    # Categorias do post
+    "category": {
+        "Bitcoin": ["bitcoin", "btc", "satoshi", "lightning network"],
+        "Ethereum": ["ethereum", "eth", "vitalik", "smart contract", "erc-20"],
+        "DeFi": ["defi", "decentralized finance", "yield", "liquidity", "amm", "dex"],
+        "NFT": ["nft", "non-fungible", "opensea", "digital art", "erc-721"],
+        "Análise de Mercado": ["price", "market", "trading", "análise", "preço", "chart"],
+        "Regulação": ["regulation", "sec", "government", "regulação", "governo", "compliance"],
+        "Tecnologia": ["blockchain", "consensus", "technology", "tecnologia", "protocol"],
+        "Altcoins": ["altcoin", "xrp", "ada", "dot", "bnb", "sol", "avax", "matic"],
+    },
+
+    # Tags de criptomoedas (o rótulo é a própria tag)
+    "crypto_tag": {
+        name: [name] for name in [
+            "bitcoin", "ethereum", "xrp", "bnb", "solana", "cardano",
+            "dogecoin", "shiba", "polygon", "avalanche", "chainlink",
+            "tron", "usdt", "usdc", "dai", "maker", "aave", "uniswap",
+            "compound", "sushiswap", "pancakeswap", "curve", "convex",
+        ]
+    },
+
+    # Tags temáticas
+    "theme_tag": {
+        "trading": ["trade", "trading", "exchange", "order book"],
+        "defi": ["defi", "yield", "staking", "farming", "liquidity"],
+        "nft": ["nft", "opensea", "digital art", "collectible"],
+        "web3": ["web3", "metaverse", "dao", "governance"],
+        "mining": ["mining", "miner", "hashrate", "proof of work"],
+        "wallet": ["wallet", "ledger", "metamask", "custody"],
+    },
+
+    # Criptomoedas com template visual (geração de imagens)
+    "crypto": {
+        "bitcoin": ["bitcoin", "btc"],
+        "ethereum": ["ethereum", "eth"],
+        "xrp": ["xrp", "ripple"],
+        "bnb": ["bnb", "binance"],
+        "dogecoin": ["dogecoin", "doge"],
+        "solana": ["solana", "sol"],
+        "chainlink": ["chainlink", "link"],
+        "shiba": ["shiba", "shib"],
+        "sui": ["sui"],
+        "usdt": ["usdt", "tether"],
+        "tron": ["tron", "trx"],
+        "pepe": ["pepe"],
+    },
+}
+
+# Mapeamentos históricos das ferramentas do Sanity (sanity_tools_enhanced),
+# mantidos como estavam antes da tabela unificada
+SANITY_KEYWORD_TABLE = {
+    "category": {
+        "Bitcoin": ["bitcoin", "btc", "satoshi"],
+        "Ethereum": ["ethereum", "eth", "vitalik"],
+        "DeFi": ["defi", "decentralized finance", "yield", "liquidity"],
+        "NFT": ["nft", "non-fungible", "opensea", "digital art"],
+        "Análise de Mercado": ["price", "market", "trading", "análise", "preço"],
+        "Regulação": ["regulation", "sec", "government", "regulação", "governo"],
+        "Tecnologia": ["blockchain", "smart contract", "technology", "tecnologia"],
+        "Altcoins": ["altcoin", "xrp", "ada", "dot", "bnb", "sol"],
+    },
+    "crypto_tag": {
+        name: [name] for name in [
+            "bitcoin", "ethereum", "xrp", "bnb", "solana", "cardano",
+            "dogecoin", "shiba", "polygon", "avalanche", "chainlink",
+            "tron", "usdt", "usdc", "dai", "maker", "aave", "uniswap",
+        ]
+    },
+    "theme_tag": {
+        "trading": ["trade", "trading", "exchange"],
+        "defi": ["defi", "yield", "staking"],
+        "nft": ["nft", "opensea", "digital art"],
+        "web3": ["web3", "metaverse", "dao"],
+        "mining": ["mining", "miner", "hashrate"],
+        "wallet": ["wallet", "ledger", "metamask"],
+    },
+}
+
+# Tags em português do BrazilianCryptoWriter (claude-agentes-blog): o
+# conteúdo e o título são varridos separadamente
+PT_TAG_TABLE = {
+    "coin_tag": {
+        "bitcoin": ["bitcoin"],
+        "ethereum": ["ethereum"],
+        "defi": ["defi"],
+        "nft": ["nft"],
+    },
+    "title_tag": {
+        "análise-de-preço": ["previsão", "previsões", "preço"],
+    },
+    "market_tag": {
+        "análise-mercado": ["mercado"],
+        "mercado-brasileiro": ["brasil", "brasileiro", "brasileira"],
+    },
+}
+
+KEYWORD_TABLES = {
+    "default": KEYWORD_TABLE,
+    "sanity": SANITY_KEYWORD_TABLE,
+    "pt_tags": PT_TAG_TABLE,
+}
+
+# Categoria usada quando nenhuma outra é detectada
+DEFAULT_CATEGORY = "Criptomoedas"
+
+KeywordTable = Mapping[str, Mapping[str, Sequence[str]]]
+
+def _trie_pattern(keywords: Sequence[str]) -> str:
+    """
+    Alternância em forma de trie: prefixos comuns são fatorados
+    ("e(?:th(?:ereum)?|xchange)"), o que evita testar cada palavra-chave
+    em cada posição do texto.
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        alternatives = [
+            # Espaços na palavra-chave casam com qualquer sequência de espaços
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Matcher compilado a partir de uma tabela de palavras-chave.
+
+    O texto é convertido para minúsculas e percorrido uma única vez; cada
+    casamento exige limite de palavra dos dois lados (plural em "s"
+    opcional), então "eth" não casa com "method" nem "sol" com "solution".
+    """
+
+    def __init__(self, table: KeywordTable):
+        self.table = table
+        # palavra-chave -> [(grupo, rótulo)]
+        self._owners: Dict[str, List[Tuple[str, str]]] = {}
+        for group, labels in table.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    normalized = " ".join(keyword.lower().split())
+                    self._owners.setdefault(normalized, []).append((group, label))
+
+        self._regex = re.compile(r"\b(" + _trie_pattern(list(self._owners)) + r")s?\b")
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Palavras-chave presentes no texto (normalizadas em minúsculas)"""
+        found = set()
+        for keyword in set(self._regex.findall(text.lower())):
+            found.add(" ".join(keyword.split()))
+        return found
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        Rótulos encontrados em cada grupo, na ordem da tabela.
+
+        Grupos sem nenhum rótulo aparecem com lista vazia.
+        """
+        hits: Set[Tuple[str, str]] = set()
+        for keyword in self.find_keywords(text):
+            hits.update(self._owners.get(keyword, ()))
+
+        return {
+            group: [label for label in labels if (group, label) in hits]
+            for group, labels in self.table.items()
+        }
+
+@lru_cache(maxsize=None)
+def get_matcher(name: str = "default") -> KeywordMatcher:
+    """Matcher de uma tabela de `KEYWORD_TABLES` (compilado uma única vez por processo)"""
+    return KeywordMatcher(KEYWORD_TABLES[name])
+
+def get_default_matcher() -> KeywordMatcher:
+    """Matcher da tabela padrão"""
+    return get_matcher("default")
+
+def analyze_text(title: str, content: str, matcher: Optional[KeywordMatcher] = None) -> Dict[str, List[str]]:
+    """Categorias, tags e criptomoedas do artigo em uma única varredura"""
+    matcher = matcher or get_default_matcher()
+    hits = matcher.scan(f"{title} {content}")
+
+    categories = hits.get("category", [])[:3] or [DEFAULT_CATEGORY]
+    tags: List[str] = []
+    for tag in hits.get("crypto_tag", []) + hits.get("theme_tag", []):
+        if tag not in tags:
+            tags.append(tag)
+
+    return {
+        "categories": categories,
+        "tags": tags[:5],
+        "cryptos": hits.get("crypto", []),
+    }
+
+def detect_categories(title: str, content: str) -> List[str]:
+    """Até 3 categorias do artigo (ou a categoria padrão)"""
+    return analyze_text(title, content)["categories"]
+
+def extract_tags(title: str, content: str) -> List[str]:
+    """Até 5 tags: criptomoedas mencionadas primeiro, depois temas"""
+    return analyze_text(title, content)["tags"]
+
+def detect_cryptocurrencies(text: str) -> List[str]:
+    """Criptomoedas com template visual mencionadas no texto"""
+    return get_default_matcher().scan(text).get("crypto", [])
+
+# Benchmark: varredura legada (substring por palavra-chave) x matcher compilado
+if __name__ == "__main__":
+    import random
+    import timeit
+
+    def legacy_scan(text: str) -> Dict[str, List[str]]:
+        text = text.lower()
+        return {
+            group: [
+                label for label, keywords in labels.items()
+                if any(keyword in text for keyword in keywords)
+            ]
+            for group, labels in KEYWORD_TABLE.items()
+        }
+
+    vocabulary = (
+        "the method for this solution relies on a protocol that secures "
+        "market data while bitcoin miners adjust hashrate and ethereum "
+        "developers ship smart contracts to the network again today "
+        "analysts said investors were watching closely as institutional "
+        "demand returned after several weeks of consolidation"
+    ).split()
+    random.seed(42)
+    matcher = get_default_matcher()
+
+    print(f"{'palavras':>10} {'legado (ms)':>12} {'matcher (ms)':>13} {'ganho':>7}")
+    for words in (1_000, 5_000, 20_000, 100_000):
+        article = " ".join(random.choice(vocabulary) for _ in range(words))
+        runs = max(3, 200_000 // words)
+        legacy = timeit.timeit(lambda: legacy_scan(article), number=runs) / runs * 1000
+        compiled = timeit.timeit(lambda: matcher.scan(article), number=runs) / runs * 1000
+        print(f"{words:>10} {legacy:>12.3f} {compiled:>13.3f} {legacy / compiled:>6.1f}x")
+
+    sample = "A new method offers a solution for securing assets"
+    print("\nFalsos positivos do legado:", legacy_scan(sample)["crypto"], legacy_scan(sample)["category"])
+    print("Matcher compilado:          ", matcher.scan(sample)["crypto"], matcher.scan(sample)["category"])
@@ -8,12 +8,16 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime
 import time
-import json
 import os
 from pathlib import Path
 import hashlib
 from functools import lru_cache
 
+try:
+    from .json_codec import dump_file, load_file
+except ImportError:
+    from utils.json_codec import dump_file, load_file
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -42,16 +46,14 @@ class ImageCache:
         """Carrega índice do cache"""
         if self.cache_index_file.exists():
             try:
-                with open(self.cache_index_file, 'r') as f:
-                    return json.load(f)
+                return load_file(self.cache_index_file)
             except:
                 return {}
         return {}
     
     def _save_cache_index(self):
         """Salva índice do cache"""
-        with open(self.cache_index_file, 'w') as f:
-            json.dump(self.cache_index, f, indent=2)
+        dump_file(self.cache_index_file, self.cache_index)
     
     def get_cache_key(self, prompt: str, style: str = "default") -> str:
         """Gera chave única para o cache baseada no prompt"""
@@ -0,0 +1,395 @@
+"""
+Conversor HTML -> Portable Text em passada única
+
+Tokenizador por eventos (html.parser, estilo SAX): cada tag e cada trecho
+de texto é visto uma única vez e os blocos, spans e markDefs são montados
+enquanto o documento é lido, sem construir árvore. A chave de cada bloco
+é derivada do seu conteúdo (hash), então o mesmo bloco mantém a chave
+quando outro parágrafo é inserido, removido ou editado e o diff por `_key`
+(portable_text_diff) envia só o que mudou. Spans e markDefs usam chaves
+posicionais dentro do bloco (`span{n}`, `link{n}`).
+
+Uso:
+    from utils.portable_text import html_to_portable_text, text_to_portable_text
+
+    html_to_portable_text(article["content_pt"])   # Markdown leve + HTML
+    text_to_portable_text(texto)                   # texto simples (tags removidas)
+
+    parser = PortableTextParser()                  # HTML recebido em pedaços
+    for chunk in response.iter_content(decode_unicode=True):
+        parser.feed(chunk)
+    blocks = parser.blocks()
+"""
+import hashlib
+import json
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+
+# Elementos que viram blocos (os mesmos que o pipeline sempre considerou)
+TEXT_BLOCK_TAGS = {"p": "normal", "blockquote": "blockquote"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4"}
+
+# Tags de formatação -> marca do span
+DECORATOR_MARKS = {"strong": "strong", "b": "strong", "em": "em", "i": "em", "code": "code"}
+
+# Elementos sem tag de fechamento (fechados no próprio start tag)
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+}
+
+DEFAULT_IMAGE_ALT = "Imagem do artigo"
+
+# Parágrafos do fallback: descarta fragmentos curtos (créditos, legendas soltas)
+FALLBACK_MIN_LENGTH = 50
+FALLBACK_MAX_BLOCKS = 15
+
+# (marcador que precisa estar no texto, padrão, substituição)
+_MARKDOWN_RULES = [
+    # Código inline primeiro para proteger de outras conversões
+    ('`', re.compile(r'`([^`]+)`'), r'<code>\1</code>'),
+    # Negrito: **texto** ou __texto__
+    ('**', re.compile(r'\*\*([^\*]+)\*\*'), r'<strong>\1</strong>'),
+    ('__', re.compile(r'__([^_]+)__'), r'<strong>\1</strong>'),
+    # Itálico: *texto* ou _texto_ (evitar conflito com negrito)
+    ('*', re.compile(r'(?<!\*)\*([^\*]+)\*(?!\*)'), r'<em>\1</em>'),
+    ('_', re.compile(r'(?<!_)_([^_]+)_(?!_)'), r'<em>\1</em>'),
+]
+
+_HTML_TAG = re.compile(r'<[^>]*>')
+
+# Hex do hash usado como chave de bloco
+BLOCK_KEY_LENGTH = 12
+
+def _without_keys(value):
+    if isinstance(value, dict):
+        return {k: _without_keys(v) for k, v in value.items() if k != "_key"}
+    if isinstance(value, list):
+        return [_without_keys(v) for v in value]
+    return value
+
+def content_key(block: Dict) -> str:
+    """Chave derivada do conteúdo do bloco (ignora as chaves internas)"""
+    data = json.dumps(_without_keys(block), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:BLOCK_KEY_LENGTH]
+
+def assign_block_keys(blocks: List[Dict]) -> List[Dict]:
+    """Define o `_key` de cada bloco pelo conteúdo; blocos repetidos ganham sufixo"""
+    seen: Dict[str, int] = {}
+    for block in blocks:
+        key = content_key(block)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        block["_key"] = key if count == 0 else f"{key}-{count}"
+    return blocks
+
+def convert_markdown_to_html(text: str) -> str:
+    """
+    Converte sintaxe Markdown básica para HTML
+    Suporta: negrito (**texto**), itálico (*texto*), código (`código`)
+    """
+    for marker, pattern, replacement in _MARKDOWN_RULES:
+        # A maioria dos parágrafos não tem marcação: evita varrer o texto à toa
+        if marker in text:
+            text = pattern.sub(replacement, text)
+    return text
+
+class _TextCapture:
+    """Bloco de texto em construção (p, blockquote ou título)"""
+    __slots__ = ("style", "children", "mark_defs", "marks", "mark_count", "text_parts", "has_text")
+
+    def __init__(self, style: str):
+        self.style = style
+        self.children: List[Dict] = []
+        self.mark_defs: List[Dict] = []
+        # Pilha de marcas: uma entrada por elemento aberto dentro do bloco
+        self.marks: List[tuple] = [((), False)]
+        self.mark_count = 0
+        self.text_parts: List[str] = []
+        self.has_text = False
+
+    def open(self, tag: str, attrs: Dict[str, str]):
+        current = self.marks[-1][0]
+        if tag == "a":
+            href = attrs.get("href", "")
+            if href:
+                mark_key = f"link{self.mark_count}"
+                mark_def = {"_type": "link", "_key": mark_key, "href": href}
+                # Adicionar target blank se presente
+                if attrs.get("target") == "_blank":
+                    mark_def["blank"] = True
+                self.mark_defs.append(mark_def)
+                self.marks.append((current + (mark_key,), True))
+                return
+        elif tag in DECORATOR_MARKS:
+            self.marks.append((current + (DECORATOR_MARKS[tag],), False))
+            return
+        self.marks.append((current, False))
+
+    def close(self):
+        _, is_link = self.marks.pop()
+        if is_link:
+            self.mark_count += 1
+
+    def text(self, text: str, visible: bool = True):
+        stripped = text.strip()
+        if not stripped:
+            return
+        self.children.append({
+            "_type": "span",
+            "_key": f"span{len(self.children)}",
+            "text": text,
+            "marks": list(self.marks[-1][0])
+        })
+        if visible:
+            self.has_text = True
+            self.text_parts.append(stripped)
+
+class _FigureCapture:
+    """Figure em construção: primeira img e primeira figcaption"""
+    __slots__ = ("img", "caption_parts", "caption_depth")
+
+    def __init__(self):
+        self.img: Optional[Dict[str, str]] = None
+        self.caption_parts: Optional[List[str]] = None
+        # Profundidade (na pilha de elementos) da figcaption em leitura
+        self.caption_depth: Optional[int] = None
+
+class PortableTextParser(HTMLParser):
+    """
+    Tokenizador que emite blocos Portable Text à medida que lê o HTML.
+
+    Cada elemento de bloco reserva sua posição no documento quando abre e
+    é preenchido quando fecha, então elementos aninhados (um <p> dentro de
+    <blockquote>, uma <img> dentro de <figure>) saem na ordem em que
+    aparecem. Aceita `feed()` incremental; `blocks()` finaliza o documento.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Pilha de elementos abertos: (tag, captura iniciada por ele ou None)
+        self._stack: List[tuple] = []
+        self._text_captures: List[_TextCapture] = []
+        self._figures: List[_FigureCapture] = []
+        # Slots na ordem dos start tags: (tipo, captura ou atributos)
+        self._slots: List[tuple] = []
+        # Textos visíveis do documento inteiro, para o fallback
+        self._texts: List[str] = []
+        self._raw_text_depth = 0
+        # O tokenizador pode entregar um mesmo trecho de texto em vários
+        # eventos (ex.: "<" solto); os pedaços formam um único nó de texto
+        self._pending: List[str] = []
+
+    # Eventos do tokenizador
+
+    def handle_starttag(self, tag: str, attrs):
+        self._flush_text()
+        attributes = {name: "" if value is None else value for name, value in attrs}
+        for capture in self._text_captures:
+            capture.open(tag, attributes)
+
+        if tag in VOID_TAGS:
+            if tag == "img":
+                self._image(attributes)
+            for capture in self._text_captures:
+                capture.close()
+            return
+
+        started = None
+        if tag in TEXT_BLOCK_TAGS or tag in HEADING_TAGS:
+            started = _TextCapture(TEXT_BLOCK_TAGS.get(tag, tag))
+            self._text_captures.append(started)
+            self._slots.append(("heading" if tag in HEADING_TAGS else "text", started))
+        elif tag == "figure":
+            started = _FigureCapture()
+            self._figures.append(started)
+            self._slots.append(("figure", started))
+        elif tag == "figcaption":
+            for figure in self._figures:
+                if figure.caption_parts is None:
+                    figure.caption_parts = []
+                    figure.caption_depth = len(self._stack)
+        elif tag in ("script", "style"):
+            self._raw_text_depth += 1
+
+        self._stack.append((tag, started))
+
+    def handle_startendtag(self, tag: str, attrs):
+        # <tag/>: abre e fecha no mesmo evento
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        self._flush_text()
+        if tag in VOID_TAGS:
+            return
+        # Fecha até a ocorrência mais recente da tag (tags sem par são ignoradas)
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                while len(self._stack) > index:
+                    self._pop()
+                return
+
+    def handle_data(self, data: str):
+        self._pending.append(data)
+
+    def handle_comment(self, data: str):
+        self._flush_text()
+        # Comentários dentro de um bloco viram spans, mas não contam como texto
+        for capture in self._text_captures:
+            capture.text(data, visible=False)
+
+    def _flush_text(self):
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+
+        visible = self._raw_text_depth == 0
+        for capture in self._text_captures:
+            capture.text(data, visible)
+        if not visible:
+            return
+
+        stripped = data.strip()
+        if stripped:
+            self._texts.append(stripped)
+            for figure in self._figures:
+                if figure.caption_depth is not None:
+                    figure.caption_parts.append(stripped)
+
+    def _pop(self):
+        tag, started = self._stack.pop()
+        depth = len(self._stack)
+
+        if tag in ("script", "style"):
+            self._raw_text_depth -= 1
+        for figure in self._figures:
+            if figure.caption_depth == depth:
+                figure.caption_depth = None
+
+        if isinstance(started, _TextCapture):
+            self._text_captures.remove(started)
+        elif isinstance(started, _FigureCapture):
+            self._figures.remove(started)
+
+        for capture in self._text_captures:
+            capture.close()
+
+    def _image(self, attributes: Dict[str, str]):
+        for figure in self._figures:
+            if figure.img is None:
+                figure.img = attributes
+        self._slots.append(("img", attributes))
+
+    # Montagem do documento
+
+    def blocks(self) -> List[Dict]:
+        """Finaliza a leitura e devolve os blocos Portable Text"""
+        self.close()
+        self._flush_text()
+        while self._stack:
+            self._pop()
+
+        blocks: List[Dict] = []
+        processed_images: Set[str] = set()  # Para evitar duplicatas
+
+        for kind, item in self._slots:
+            if kind == "text":
+                if item.has_text:
+                    blocks.append({
+                        "_type": "block",
+                        "_key": "",
+                        "style": item.style,
+                        "markDefs": item.mark_defs,
+                        "children": item.children
+                    })
+
+            elif kind == "heading":
+                text = "".join(item.text_parts)
+                if text:
+                    blocks.append({
+                        "_type": "block",
+                        "_key": "",
+                        "style": item.style,
+                        "markDefs": [],
+                        "children": [{
+                            "_type": "span",
+                            "_key": "span0",
+                            "text": text,
+                            "marks": []
+                        }]
+                    })
+
+            elif kind == "figure":
+                img_url = item.img.get("src") if item.img else None
+                if img_url and img_url not in processed_images:
+                    processed_images.add(img_url)
+                    caption = "".join(item.caption_parts or [])
+                    blocks.append({
+                        "_type": "image",
+                        "_key": "",
+                        "url": img_url,
+                        "alt": item.img.get("alt", "") or caption or DEFAULT_IMAGE_ALT,
+                        "caption": caption if caption else None
+                    })
+
+            else:
+                img_url = item.get("src")
+                if img_url and img_url not in processed_images:
+                    processed_images.add(img_url)
+                    blocks.append({
+                        "_type": "image",
+                        "_key": "",
+                        "url": img_url,
+                        "alt": item.get("alt", "") or DEFAULT_IMAGE_ALT,
+                        "caption": None
+                    })
+
+        # Fallback se não houver elementos de bloco: parágrafos do texto puro
+        if not blocks:
+            text_content = "\n\n".join(self._texts)
+            paragraphs = [
+                p.strip() for p in text_content.split("\n\n")
+                if p.strip() and len(p.strip()) > FALLBACK_MIN_LENGTH
+            ]
+            blocks = [
+                _text_block(para) for para in paragraphs[:FALLBACK_MAX_BLOCKS]
+            ]
+
+        return assign_block_keys(blocks)
+
+def _text_block(text: str) -> Dict:
+    return {
+        "_type": "block",
+        "_key": "",
+        "style": "normal",
+        "markDefs": [],
+        "children": [{
+            "_type": "span",
+            "_key": "span0",
+            "text": text,
+            "marks": []
+        }]
+    }
+
+def html_to_portable_text(content: str, markdown: bool = True) -> List[Dict]:
+    """
+    Converte o conteúdo do artigo (Markdown leve + HTML) em blocos
+    Portable Text, preservando links, formatação inline e imagens.
+    """
+    if markdown:
+        content = convert_markdown_to_html(content)
+    parser = PortableTextParser()
+    parser.feed(content)
+    return parser.blocks()
+
+def text_to_portable_text(text: str) -> List[Dict]:
+    """Converte texto simples em blocos (tags HTML removidas, um bloco por parágrafo)"""
+    text = _HTML_TAG.sub("", text)
+    paragraphs = (p.strip() for p in text.split("\n\n"))
+    return assign_block_keys([_text_block(para) for para in paragraphs if para])
@@ -0,0 +1,226 @@
+"""
+Diff de documentos Portable Text em operações de patch do Sanity
+
+Compara a versão atual e a nova de um documento e gera só as operações
+necessárias (`set`, `unset`, `insert`) em caminhos específicos, usando o
+`_key` para localizar blocos, spans e markDefs:
+
+    content[_key=="a1b2"].markDefs[_key=="link0"].href
+
+Assim uma correção de link envia só o href alterado em vez do array
+`content` inteiro. Antes do diff, os blocos novos herdam a chave do bloco
+atual de mesmo conteúdo ou, se editados, do bloco que ocupava a mesma
+posição entre dois blocos mantidos (documentos publicados com chaves
+antigas também recebem patches pequenos). As mutações levam `ifRevisionID`, então a escrita falha
+(HTTP 409) se o documento mudou desde a leitura.
+
+Uso:
+    from utils.portable_text_diff import diff_document, build_patch_mutations
+
+    ops = diff_document(current_post, {"content": new_blocks})
+    mutations = build_patch_mutations(post_id, ops, if_revision_id=current_post["_rev"])
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Campos de sistema que nunca entram no patch
+SYSTEM_FIELDS = {"_id", "_rev", "_type", "_createdAt", "_updatedAt"}
+
+@dataclass
+class PatchOperations:
+    """Operações de patch acumuladas para um documento"""
+    set: Dict[str, Any] = field(default_factory=dict)
+    unset: List[str] = field(default_factory=list)
+    # Cada item: {"after" | "before": caminho, "items": [...]}
+    insert: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.set or self.unset or self.insert)
+
+    def count(self) -> int:
+        return len(self.set) + len(self.unset) + len(self.insert)
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+def _keyed(items: Any) -> bool:
+    """Lista em que todo item é um objeto com `_key` único"""
+    if not isinstance(items, list):
+        return False
+    keys = [item.get("_key") for item in items if isinstance(item, dict)]
+    return len(keys) == len(items) and all(keys) and len(set(keys)) == len(keys)
+
+def _item_path(path: str, key: str) -> str:
+    return f'{path}[_key=="{key}"]'
+
+def _diff_value(path: str, old: Any, new: Any, ops: PatchOperations):
+    """Acumula em `ops` as operações que levam `old` a `new` no caminho dado"""
+    if old == new:
+        return
+
+    if _keyed(old) and _keyed(new) and old and new:
+        _diff_keyed_list(path, old, new, ops)
+    elif isinstance(old, dict) and isinstance(new, dict) and old.get("_type") == new.get("_type"):
+        partial = PatchOperations()
+        for name, value in new.items():
+            if name not in old or old[name] != value:
+                _diff_value(f"{path}.{name}", old.get(name), value, partial)
+        for name in old:
+            if name not in new:
+                partial.unset.append(f"{path}.{name}")
+
+        # Muitas mudanças pequenas custam mais que substituir o objeto inteiro
+        if _size([partial.set, partial.unset, partial.insert]) < _size(new):
+            ops.set.update(partial.set)
+            ops.unset.extend(partial.unset)
+            ops.insert.extend(partial.insert)
+        else:
+            ops.set[path] = new
+    else:
+        ops.set[path] = new
+
+def _content(item: Dict) -> str:
+    return json.dumps({k: v for k, v in item.items() if k != "_key"}, sort_keys=True, ensure_ascii=False)
+
+def adopt_keys(old: Any, new: Any) -> Any:
+    """
+    Cópia de `new` com as chaves dos itens correspondentes de `old`: primeiro
+    os de conteúdo idêntico, depois cada item sem par herda a chave do item
+    antigo seguinte ao último par (edição no lugar), se for do mesmo tipo.
+    """
+    if not (_keyed(old) and isinstance(new, list) and new
+            and all(isinstance(item, dict) for item in new)):
+        return new
+
+    by_content: Dict[str, List[int]] = {}
+    for index, item in enumerate(old):
+        by_content.setdefault(_content(item), []).append(index)
+
+    matched: List[Optional[int]] = [None] * len(new)
+    used = set()
+    for index, item in enumerate(new):
+        candidates = by_content.get(_content(item))
+        if candidates:
+            matched[index] = candidates.pop(0)
+            used.add(matched[index])
+
+    previous = -1
+    for index, item in enumerate(new):
+        if matched[index] is None:
+            candidate = previous + 1
+            if candidate < len(old) and candidate not in used and old[candidate].get("_type") == item.get("_type"):
+                matched[index] = candidate
+                used.add(candidate)
+        if matched[index] is not None:
+            previous = matched[index]
+
+    taken = {old[index]["_key"] for index in used}
+    result = []
+    for index, item in enumerate(new):
+        if matched[index] is not None:
+            key = old[matched[index]]["_key"]
+        else:
+            key = base = item.get("_key") or "item"
+            suffix = 1
+            while key in taken:
+                key = f"{base}-{suffix}"
+                suffix += 1
+            taken.add(key)
+        result.append({**item, "_key": key})
+    return result
+
+def _diff_keyed_list(path: str, old: List[Dict], new: List[Dict], ops: PatchOperations):
+    old_by_key = {item["_key"]: item for item in old}
+    new_keys = {item["_key"] for item in new}
+
+    # Itens mantidos precisam estar na mesma ordem relativa; reordenação
+    # não tem operação mínima segura, então o array é substituído
+    kept_old = [item["_key"] for item in old if item["_key"] in new_keys]
+    kept_new = [item["_key"] for item in new if item["_key"] in old_by_key]
+    if kept_old != kept_new or not kept_new:
+        ops.set[path] = new
+        return
+
+    partial = PatchOperations()
+    partial.unset.extend(
+        _item_path(path, item["_key"]) for item in old if item["_key"] not in new_keys
+    )
+
+    anchor: Optional[str] = None
+    pending: List[Dict] = []
+
+    def flush(before: Optional[str] = None):
+        if not pending:
+            return
+        if anchor is not None:
+            partial.insert.append({"after": _item_path(path, anchor), "items": list(pending)})
+        else:
+            partial.insert.append({"before": _item_path(path, before), "items": list(pending)})
+        pending.clear()
+
+    for item in new:
+        key = item["_key"]
+        if key in old_by_key:
+            flush(before=key)
+            _diff_value(_item_path(path, key), old_by_key[key], item, partial)
+            anchor = key
+        else:
+            pending.append(item)
+    flush()
+
+    if _size([partial.set, partial.unset, partial.insert]) < _size(new):
+        ops.set.update(partial.set)
+        ops.unset.extend(partial.unset)
+        ops.insert.extend(partial.insert)
+    else:
+        ops.set[path] = new
+
+def diff_portable_text(old: Optional[List[Dict]], new: List[Dict], path: str = "content") -> PatchOperations:
+    """Operações que transformam o array Portable Text `old` em `new`"""
+    ops = PatchOperations()
+    if not old:
+        ops.set[path] = new
+    else:
+        _diff_value(path, old, adopt_keys(old, new), ops)
+    return ops
+
+def diff_document(current: Dict[str, Any], updates: Dict[str, Any]) -> PatchOperations:
+    """Operações para aplicar `updates` sobre o documento `current` (só campos alterados)"""
+    ops = PatchOperations()
+    for name, value in updates.items():
+        if name in SYSTEM_FIELDS:
+            continue
+        if name not in current:
+            ops.set[name] = value
+        else:
+            _diff_value(name, current[name], adopt_keys(current[name], value), ops)
+    return ops
+
+def build_patch_mutations(
+    document_id: str,
+    ops: PatchOperations,
+    if_revision_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Converte as operações em mutações `patch` para o endpoint /mutate.
+
+    Cada `insert` vai em um patch próprio (o Sanity aceita um por patch).
+    As mutações seguem na mesma transação; `ifRevisionID` no primeiro patch
+    basta para que a transação inteira seja rejeitada se houver conflito.
+    """
+    patches: List[Dict[str, Any]] = []
+    if ops.set:
+        patches.append({"set": ops.set})
+    if ops.unset:
+        patches.append({"unset": ops.unset})
+    for insert in ops.insert:
+        patches.append({"insert": insert})
+
+    mutations = []
+    for index, patch in enumerate(patches):
+        patch = {"id": document_id, **patch}
+        if index == 0 and if_revision_id:
+            patch["ifRevisionID"] = if_revision_id
+        mutations.append({"patch": patch})
+    return mutations
@@ -0,0 +1,289 @@
+"""
+Registro de IDs já processados (deduplicação do RSS)
+
+Os pipelines guardavam o conjunto inteiro de GUIDs em um JSON reescrito a
+cada artigo. Aqui o registro é dividido em dois arquivos:
+
+- snapshot (`processed_articles.json`): `{"timestamps": {id: instante}}`,
+  reescrito só na compactação, via arquivo temporário + fsync + rename.
+  Snapshots antigos (lista pura, `{"ids": [...]}` ou `{"guids": [...]}`)
+  continuam sendo lidos; o monitor e os pipelines compartilham o arquivo e
+  todos passam por esta classe;
+- log (`processed_articles.json.log`): uma linha JSON `[id, timestamp]` por
+  artigo, só com append + fsync. O custo de marcar um artigo não depende
+  do tamanho do histórico.
+
+A compactação junta o log no snapshot quando o log fica maior que o
+snapshot (custo amortizado constante por artigo) e descarta os IDs expirados
+quando há `expire_after`. A consulta é feita em um dict em memória.
+
+Vários pipelines podem usar o mesmo registro: toda escrita acontece sob
+um `flock` exclusivo em `<snapshot>.lock` e relê antes o que os outros
+processos anexaram, então `add` devolve False se o ID já foi marcado por
+outro processo.
+
+Uso:
+    ledger = ProcessedLedger("processed_articles.json")
+    if article_id not in ledger:
+        ...
+        ledger.add(article_id)
+
+O claude-agentes-blog usa este mesmo módulo (via crewai_src.add_to_path),
+já que os dois projetos compartilham o registro.
+"""
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+PathLike = Union[str, Path]
+
+# O log só é compactado acima deste número de linhas
+COMPACT_MIN_LINES = 1024
+
+# Chaves da lista de IDs dos snapshots no formato antigo
+LEGACY_KEYS = ("ids", "guids")
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _file_id(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class ProcessedLedger:
+    """
+    Conjunto persistente de IDs processados.
+
+    Args:
+        path: arquivo de snapshot (o log e o lock ficam ao lado)
+        expire_after: segundos até um ID expirar (None = nunca)
+        compact_min: linhas mínimas no log antes de compactar
+    """
+
+    def __init__(self, path: PathLike, expire_after: Optional[float] = None,
+                 compact_min: int = COMPACT_MIN_LINES):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + ".log")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.expire_after = expire_after
+        self.compact_min = compact_min
+
+        self._entries: Dict[str, float] = {}
+        self._snapshot_id: Optional[tuple] = None
+        self._snapshot_size = 0
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._log_lines = 0
+        self.refresh()
+
+    # ---- lock e leitura ----
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_snapshot(self) -> None:
+        self._entries = {}
+        self._snapshot_size = 0
+        self._snapshot_id = _file_id(self.path)
+        if self._snapshot_id is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._entries = {str(item): ts for item, ts in data.get("timestamps", {}).items()}
+        # Formato legado: lista pura ou {"ids"/"guids": [...]} sem timestamps
+        if isinstance(data, list):
+            legacy = data
+        else:
+            legacy = [item for key in LEGACY_KEYS for item in data.get(key, [])]
+        loaded_at = self.path.stat().st_mtime
+        for item in legacy:
+            self._entries.setdefault(str(item), loaded_at)
+        self._snapshot_size = len(self._entries)
+
+    def _read_log(self) -> None:
+        """Aplica as linhas completas anexadas ao log desde a última leitura"""
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            self._log_inode, self._log_offset, self._log_lines = None, 0, 0
+            return
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._log_inode:
+                # Log novo (primeira leitura ou compactado por outro processo)
+                self._log_inode, self._log_offset, self._log_lines = inode, 0, 0
+            f.seek(self._log_offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                item, timestamp = json.loads(line)
+            except (ValueError, TypeError):
+                continue  # linha corrompida por uma queda no meio do append
+            # Um ID expirado e marcado de novo vale pela marcação mais recente
+            if timestamp > self._entries.get(item, 0):
+                self._entries[item] = timestamp
+            self._log_lines += 1
+        self._log_offset += end
+
+    def _sync(self) -> None:
+        if _file_id(self.path) != self._snapshot_id:
+            # Snapshot reescrito por uma compactação: recarrega tudo
+            self._load_snapshot()
+            self._log_inode = None
+        self._read_log()
+
+    def refresh(self) -> None:
+        """Incorpora o que outros processos gravaram"""
+        with self._locked(exclusive=False):
+            self._sync()
+
+    # ---- consulta ----
+
+    def _alive(self, timestamp: float, now: float) -> bool:
+        return self.expire_after is None or now - timestamp < self.expire_after
+
+    def __contains__(self, item: object) -> bool:
+        timestamp = self._entries.get(item)
+        return timestamp is not None and self._alive(timestamp, time.time())
+
+    def __len__(self) -> int:
+        now = time.time()
+        return sum(1 for timestamp in self._entries.values() if self._alive(timestamp, now))
+
+    def __iter__(self) -> Iterator[str]:
+        now = time.time()
+        return iter([item for item, timestamp in self._entries.items() if self._alive(timestamp, now)])
+
+    # ---- escrita ----
+
+    def _append(self, items: Iterable[str]) -> int:
+        now = time.time()
+        lines = []
+        for item in items:
+            item = str(item)
+            if item in self:
+                continue
+            self._entries[item] = now
+            lines.append(json.dumps([item, now], ensure_ascii=False) + "\n")
+        if not lines:
+            return 0
+
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+            os.fsync(fd)
+            inode, size = os.fstat(fd).st_ino, os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if self._log_inode is None:
+            _fsync_directory(self.path.parent)
+        # Sob o lock exclusivo ninguém mais escreveu: o log já foi todo lido
+        self._log_inode, self._log_offset = inode, size
+        self._log_lines += len(lines)
+        return len(lines)
+
+    def add(self, item: str) -> bool:
+        """Marca `item` como processado; False se já estava (inclusive por outro processo)"""
+        return self.update([item]) == 1
+
+    def update(self, items: Iterable[str]) -> int:
+        """Marca vários IDs de uma vez (um único append + fsync); devolve quantos eram novos"""
+        with self._locked(exclusive=True):
+            self._sync()
+            added = self._append(items)
+            if self._log_lines > max(self.compact_min, self._snapshot_size):
+                self._compact()
+        return added
+
+    def _write_snapshot(self, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.replace(tmp_path, self.path)
+            except OSError:
+                # Arquivo montado diretamente (bind mount do Docker) não pode ser
+                # substituído: reescreve no lugar, ainda sob o lock exclusivo
+                with open(self.path, "r+b") as f:
+                    f.write(data)
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.unlink(tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        _fsync_directory(self.path.parent)
+
+    def _compact(self) -> None:
+        now = time.time()
+        self._entries = {item: ts for item, ts in self._entries.items() if self._alive(ts, now)}
+        # A lista de IDs é derivada das chaves de "timestamps" na leitura
+        snapshot = {
+            "timestamps": self._entries,
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self._write_snapshot(json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+        # Snapshot já contém tudo; uma queda antes daqui só deixa linhas repetidas no log
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.fsync(fd)
+            self._log_inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+        self._snapshot_id = _file_id(self.path)
+        self._snapshot_size = len(self._entries)
+        self._log_offset = self._log_lines = 0
+
+    def compact(self) -> None:
+        """Junta o log no snapshot e descarta IDs expirados"""
+        with self._locked(exclusive=True):
+            self._sync()
+            self._compact()
+
+    def clear(self) -> None:
+        """Esquece todos os IDs (para todos os processos que usam o registro)"""
+        with self._locked(exclusive=True):
+            self._entries = {}
+            self._compact()
@@ -9,9 +9,17 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
-import json
 import os
 
+try:
+    from .adaptive_limiter import AdaptiveLimiter, LimiterTimeout, compute_backoff, extract_retry_after, get_limiter, is_throttle_error
+    from .json_codec import dump_file, load_file
+    from ..monitoring.passive_health import record_call
+except ImportError:
+    from utils.adaptive_limiter import AdaptiveLimiter, LimiterTimeout, compute_backoff, extract_retry_after, get_limiter, is_throttle_error
+    from utils.json_codec import dump_file, load_file
+    from monitoring.passive_health import record_call
+
 logger = logging.getLogger(__name__)
 
 class CircuitState(Enum):
@@ -19,63 +27,74 @@ class CircuitState(Enum):
     OPEN = "open"      # Failing, reject calls
     HALF_OPEN = "half_open"  # Testing if service recovered
 
+class CircuitOpenError(Exception):
+    """Chamada rejeitada porque o circuit breaker está aberto"""
+
 @dataclass
 class CircuitBreakerStats:
     failure_count: int = 0
     success_count: int = 0
+    throttle_count: int = 0
     last_failure_time: Optional[datetime] = None
     last_success_time: Optional[datetime] = None
     state: CircuitState = CircuitState.CLOSED
     state_changed_at: datetime = field(default_factory=datetime.now)
 
 class CircuitBreaker:
-    """Circuit Breaker para prevenir sobrecarga em serviços falhos"""
+    """
+    Circuit Breaker para prevenir sobrecarga em serviços falhos.
+    
+    Throttling (429/503) não conta como falha: é repassado ao limitador
+    adaptativo do serviço, que reduz a concorrência. Ao abrir, o limitador
+    volta ao mínimo, e após a recuperação a vazão cresce gradualmente.
+    """
     
     def __init__(
         self,
         failure_threshold: int = 5,
         recovery_timeout: int = 60,
-        expected_exception: Type[Exception] = Exception
+        expected_exception: Type[Exception] = Exception,
+        limiter: Optional[AdaptiveLimiter] = None
     ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.expected_exception = expected_exception
+        self.limiter = limiter
         self.stats = CircuitBreakerStats()
-        self._lock = asyncio.Lock() if asyncio.get_event_loop().is_running() else None
+        self._lock = asyncio.Lock()
     
-    def call(self, func: Callable, *args, **kwargs) -> Any:
-        """Executa função através do circuit breaker"""
+    def _before_call(self):
         if self.stats.state == CircuitState.OPEN:
             if self._should_attempt_reset():
                 self.stats.state = CircuitState.HALF_OPEN
                 logger.info(f"Circuit breaker entering HALF_OPEN state")
             else:
-                raise Exception(f"Circuit breaker is OPEN. Service unavailable.")
+                raise CircuitOpenError(f"Circuit breaker is OPEN. Service unavailable.")
+    
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa função através do circuit breaker"""
+        self._before_call()
         
         try:
             result = func(*args, **kwargs)
             self._on_success()
             return result
         except self.expected_exception as e:
-            self._on_failure()
+            self._on_error(e)
             raise e
     
     async def async_call(self, func: Callable, *args, **kwargs) -> Any:
         """Versão assíncrona do circuit breaker"""
         async with self._lock:
-            if self.stats.state == CircuitState.OPEN:
-                if self._should_attempt_reset():
-                    self.stats.state = CircuitState.HALF_OPEN
-                    logger.info(f"Circuit breaker entering HALF_OPEN state")
-                else:
-                    raise Exception(f"Circuit breaker is OPEN. Service unavailable.")
+            self._before_call()
         
         try:
             result = await func(*args, **kwargs)
             await self._async_on_success()
             return result
         except self.expected_exception as e:
-            await self._async_on_failure()
+            async with self._lock:
+                self._on_error(e)
             raise e
     
     def _should_attempt_reset(self) -> bool:
@@ -100,14 +119,27 @@ class CircuitBreaker:
         async with self._lock:
             self._on_success()
     
+    def _on_error(self, error: Exception):
+        """Separa throttling (capacidade) de falhas (indisponibilidade)"""
+        if is_throttle_error(error):
+            self.stats.throttle_count += 1
+            if self.stats.state == CircuitState.HALF_OPEN:
+                # O serviço respondeu: está de pé, apenas sem capacidade
+                self.stats.state = CircuitState.CLOSED
+                self.stats.failure_count = 0
+        else:
+            self._on_failure()
+    
     def _on_failure(self):
         """Registra falha"""
         self.stats.failure_count += 1
         self.stats.last_failure_time = datetime.now()
         
-        if self.stats.failure_count >= self.failure_threshold:
+        if self.stats.failure_count >= self.failure_threshold or self.stats.state == CircuitState.HALF_OPEN:
             self.stats.state = CircuitState.OPEN
             self.stats.state_changed_at = datetime.now()
+            if self.limiter:
+                self.limiter.reset_to_min()
             logger.error(f"Circuit breaker opened after {self.stats.failure_count} failures")
     
     async def _async_on_failure(self):
@@ -121,9 +153,55 @@ circuit_breakers: Dict[str, CircuitBreaker] = {}
 def get_circuit_breaker(service_name: str) -> CircuitBreaker:
     """Obtém ou cria circuit breaker para um serviço"""
     if service_name not in circuit_breakers:
-        circuit_breakers[service_name] = CircuitBreaker()
+        circuit_breakers[service_name] = CircuitBreaker(limiter=get_limiter(service_name))
     return circuit_breakers[service_name]
 
+def _after_error(
+    func_name: str,
+    error: Exception,
+    attempt: int,
+    max_retries: int,
+    limiter: Optional[AdaptiveLimiter],
+    initial_delay: float,
+    backoff_factor: float,
+    max_delay: float
+) -> Optional[float]:
+    """
+    Decide se a chamada deve ser retentada e com qual delay.
+    Retorna None quando a exceção deve ser propagada.
+    """
+    if isinstance(error, CircuitOpenError):
+        logger.error(f"{func_name}: {error}")
+        return None
+    
+    retry_after = extract_retry_after(error)
+    if limiter and is_throttle_error(error):
+        limiter.on_throttle(retry_after)
+    
+    if attempt == max_retries - 1:
+        logger.error(
+            f"Failed after {max_retries} attempts. "
+            f"Function: {func_name}, Error: {error}"
+        )
+        return None
+    
+    if limiter and not limiter.budget.try_withdraw():
+        logger.error(
+            f"Retry budget exhausted for {limiter.name}. "
+            f"Function: {func_name}, Error: {error}"
+        )
+        return None
+    
+    delay = compute_backoff(attempt, initial_delay, backoff_factor, max_delay, retry_after)
+    
+    # Log retry attempt
+    logger.warning(
+        f"Attempt {attempt + 1}/{max_retries} failed for {func_name}. "
+        f"Error: {error}. Retrying in {delay:.1f}s"
+        + (f" (server asked for {retry_after:.1f}s)" if retry_after is not None else "...")
+    )
+    return delay
+
 def retry_with_backoff(
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -134,7 +212,12 @@ def retry_with_backoff(
     use_circuit_breaker: bool = True
 ) -> Callable:
     """
-    Decorator para retry com backoff exponencial
+    Decorator para retry com backoff exponencial (full jitter)
+    
+    Quando `service_name` é informado, as chamadas passam pelo limitador
+    adaptativo do serviço: a concorrência acompanha a capacidade real do
+    provedor, pausas pedidas via `Retry-After`/`x-ratelimit-*` são
+    respeitadas e os retries ficam limitados a um orçamento por serviço.
     
     Args:
         max_retries: Número máximo de tentativas
@@ -142,91 +225,113 @@ def retry_with_backoff(
         backoff_factor: Fator multiplicador do delay
         max_delay: Delay máximo em segundos
         exceptions: Tupla de exceções para retry
-        service_name: Nome do serviço (para circuit breaker)
+        service_name: Nome do serviço (para limitador e circuit breaker)
         use_circuit_breaker: Se deve usar circuit breaker
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
+            limiter = get_limiter(service_name) if service_name else None
             if use_circuit_breaker and service_name:
                 cb = get_circuit_breaker(service_name)
             else:
                 cb = None
             
-            delay = initial_delay
-            last_exception = None
+            if limiter:
+                limiter.budget.record_request()
             
             for attempt in range(max_retries):
+                started = time.perf_counter()
                 try:
-                    # Usar circuit breaker se disponível
-                    if cb:
-                        return cb.call(func, *args, **kwargs)
-                    else:
-                        return func(*args, **kwargs)
-                    
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries - 1:
-                        logger.error(
-                            f"Failed after {max_retries} attempts. "
-                            f"Function: {func.__name__}, Error: {e}"
-                        )
-                        raise
+                    # Prazo esgotado vira LimiterTimeout (retentável); chamada aninhada reusa a vaga
+                    slot = limiter.enter() if limiter else None
+                    started = time.perf_counter()
+                    try:
+                        # Usar circuit breaker se disponível
+                        if cb:
+                            result = cb.call(func, *args, **kwargs)
+                        else:
+                            result = func(*args, **kwargs)
+                    finally:
+                        if limiter:
+                            limiter.leave(slot)
                     
-                    # Log retry attempt
-                    logger.warning(
-                        f"Attempt {attempt + 1}/{max_retries} failed for {func.__name__}. "
-                        f"Error: {e}. Retrying in {delay:.1f}s..."
+                except exceptions + (LimiterTimeout,) as e:
+                    delay = _after_error(
+                        func.__name__, e, attempt, max_retries, limiter,
+                        initial_delay, backoff_factor, max_delay
                     )
+                    if delay is None:
+                        # Uma amostra por chamada lógica: só a falha definitiva conta
+                        if service_name and not isinstance(e, (CircuitOpenError, LimiterTimeout)):
+                            record_call(
+                                service_name, False, time.perf_counter() - started,
+                                throttled=is_throttle_error(e), error=str(e)
+                            )
+                        raise
                     
                     # Sleep with backoff
                     time.sleep(delay)
-                    delay = min(delay * backoff_factor, max_delay)
-            
-            # Should not reach here
-            raise last_exception
+                
+                else:
+                    if service_name:
+                        record_call(service_name, True, time.perf_counter() - started)
+                    if limiter:
+                        limiter.on_success()
+                        limiter.observe_response(result)
+                    return result
         
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
+            limiter = get_limiter(service_name) if service_name else None
             if use_circuit_breaker and service_name:
                 cb = get_circuit_breaker(service_name)
             else:
                 cb = None
             
-            delay = initial_delay
-            last_exception = None
+            if limiter:
+                limiter.budget.record_request()
             
             for attempt in range(max_retries):
+                started = time.perf_counter()
                 try:
-                    # Usar circuit breaker se disponível
-                    if cb:
-                        return await cb.async_call(func, *args, **kwargs)
-                    else:
-                        return await func(*args, **kwargs)
-                    
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_retries - 1:
-                        logger.error(
-                            f"Failed after {max_retries} attempts. "
-                            f"Function: {func.__name__}, Error: {e}"
-                        )
-                        raise
+                    # Prazo esgotado vira LimiterTimeout (retentável); chamada aninhada reusa a vaga
+                    slot = await limiter.async_enter() if limiter else None
+                    started = time.perf_counter()
+                    try:
+                        # Usar circuit breaker se disponível
+                        if cb:
+                            result = await cb.async_call(func, *args, **kwargs)
+                        else:
+                            result = await func(*args, **kwargs)
+                    finally:
+                        if limiter:
+                            limiter.leave(slot)
                     
-                    # Log retry attempt
-                    logger.warning(
-                        f"Attempt {attempt + 1}/{max_retries} failed for {func.__name__}. "
-                        f"Error: {e}. Retrying in {delay:.1f}s..."
+                except exceptions + (LimiterTimeout,) as e:
+                    delay = _after_error(
+                        func.__name__, e, attempt, max_retries, limiter,
+                        initial_delay, backoff_factor, max_delay
                     )
+                    if delay is None:
+                        # Uma amostra por chamada lógica: só a falha definitiva conta
+                        if service_name and not isinstance(e, (CircuitOpenError, LimiterTimeout)):
+                            record_call(
+                                service_name, False, time.perf_counter() - started,
+                                throttled=is_throttle_error(e), error=str(e)
+                            )
+                        raise
                     
                     # Async sleep with backoff
                     await asyncio.sleep(delay)
-                    delay = min(delay * backoff_factor, max_delay)
-            
-            # Should not reach here
-            raise last_exception
+                
+                else:
+                    if service_name:
+                        record_call(service_name, True, time.perf_counter() - started)
+                    if limiter:
+                        limiter.on_success()
+                        limiter.observe_response(result)
+                    return result
         
         # Return appropriate wrapper based on function type
         if asyncio.iscoroutinefunction(func):
@@ -267,6 +372,16 @@ def retry_strapi(func: Callable) -> Callable:
         service_name="strapi"
     )(func)
 
+def retry_sanity(func: Callable) -> Callable:
+    """Retry decorator específico para Sanity"""
+    return retry_with_backoff(
+        max_retries=5,
+        initial_delay=1.0,
+        backoff_factor=2.0,
+        exceptions=(Exception,),
+        service_name="sanity"
+    )(func)
+
 # Queue persistente para reprocessamento
 class PersistentJobQueue:
     """Fila persistente para jobs falhados"""
@@ -279,16 +394,15 @@ class PersistentJobQueue:
         """Carrega jobs do arquivo"""
         if os.path.exists(self.db_path):
             try:
-                with open(self.db_path, 'r') as f:
-                    return json.load(f)
+                return load_file(self.db_path)
             except:
                 return []
         return []
     
     def _save_jobs(self):
         """Salva jobs no arquivo"""
-        with open(self.db_path, 'w') as f:
-            json.dump(self.jobs, f, indent=2, default=str)
+        # Reescrito a cada mudança de estado: compacto e atômico
+        dump_file(self.db_path, self.jobs, default=str)
     
     def add_job(self, job_type: str, data: dict, priority: int = 0):
         """Adiciona job à fila"""
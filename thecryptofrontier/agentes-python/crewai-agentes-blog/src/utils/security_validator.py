@@ -4,13 +4,18 @@ Sistema de Validação de Segurança para Feeds RSS
 import re
 import bleach
 from urllib.parse import urlparse, urljoin
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 import feedparser
 import requests
 from bs4 import BeautifulSoup
 import logging
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
+from functools import lru_cache
 import hashlib
 import json
 
@@ -24,6 +29,54 @@ class ValidationResult:
     sanitized_data: Optional[Dict] = None
     risk_score: float = 0.0
 
+    def copy(self) -> "ValidationResult":
+        """Cópia independente (resultados em cache não podem ser alterados por quem os recebe)"""
+        return replace(
+            self,
+            errors=list(self.errors),
+            warnings=list(self.warnings),
+            sanitized_data=dict(self.sanitized_data) if self.sanitized_data is not None else None
+        )
+
+@lru_cache(maxsize=8)
+def _compile_scanner(patterns: Tuple[str, ...]) -> "re.Pattern":
+    """Une os padrões em uma única regex (uma varredura do texto em vez de uma por padrão)"""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE | re.DOTALL)
+
+class _TTLCache:
+    """Cache LRU com expiração por item, seguro entre threads"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 class FeedSecurityValidator:
     """Validador de segurança para feeds RSS"""
     
@@ -68,8 +121,49 @@ class FeedSecurityValidator:
         'blockquote': ['cite']
     }
     
-    def __init__(self):
-        self.validation_cache = {}
+    # Extensões aceitas sem verificar o Content-Type
+    IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
+    
+    def __init__(
+        self,
+        cache_ttl: float = 3600.0,
+        head_ttl: float = 3600.0,
+        head_failure_ttl: float = 60.0,
+        max_workers: int = 8
+    ):
+        # Resultados por hash do conteúdo exato: re-polls do feed não revalidam
+        # entradas que não mudaram
+        self.validation_cache = _TTLCache()
+        self.cache_ttl = cache_ttl
+        
+        # Content-Type por URL de imagem (falhas expiram mais cedo)
+        self._head_cache = _TTLCache()
+        self.head_ttl = head_ttl
+        self.head_failure_ttl = head_failure_ttl
+        self._head_inflight: Dict[str, Future] = {}
+        self._head_lock = threading.Lock()
+        self._session = requests.Session()
+        
+        self.max_workers = max_workers
+        self._scanner = _compile_scanner(tuple(self.SUSPICIOUS_PATTERNS))
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "head_requests": 0}
+    
+    def _cache_key(self, kind: str, *parts: Any) -> str:
+        """Hash dos valores exatos que influenciam o resultado"""
+        payload = json.dumps([kind, *parts], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _memoized(self, key: str, compute: Callable[[], Any],
+                  ttl: Optional[Callable[[Any], float]] = None) -> Any:
+        """`ttl` recebe o valor calculado e devolve por quanto tempo guardá-lo"""
+        found, value = self.validation_cache.get(key)
+        if found:
+            self.stats["cache_hits"] += 1
+            return value
+        self.stats["cache_misses"] += 1
+        value = compute()
+        self.validation_cache.set(key, value, ttl(value) if ttl else self.cache_ttl)
+        return value
     
     def validate_feed_url(self, feed_url: str) -> ValidationResult:
         """Valida URL do feed"""
@@ -151,45 +245,52 @@ class FeedSecurityValidator:
     
     def _validate_entry(self, entry: Dict, index: int) -> Tuple[List[str], List[str]]:
         """Valida uma entrada do feed"""
+        title = entry.title if hasattr(entry, 'title') else None
+        link = entry.link if hasattr(entry, 'link') else None
+        
+        content = ""
+        if hasattr(entry, 'content'):
+            content = entry.content[0].value if entry.content else ""
+        elif hasattr(entry, 'summary'):
+            content = entry.summary
+        
+        errors, warnings = self._memoized(
+            self._cache_key("entry", title, link, content),
+            lambda: self._check_entry(title, link, content)
+        )
+        prefix = f"Entrada {index}: "
+        return [prefix + e for e in errors], [prefix + w for w in warnings]
+    
+    def _check_entry(self, title: Optional[str], link: Optional[str], content: str) -> Tuple[List[str], List[str]]:
         errors = []
         warnings = []
         
         # Verificar campos obrigatórios
-        if not hasattr(entry, 'title') or not entry.title:
-            errors.append(f"Entrada {index}: sem título")
+        if not title:
+            errors.append("sem título")
         
-        if not hasattr(entry, 'link') or not entry.link:
-            errors.append(f"Entrada {index}: sem link")
+        if not link:
+            errors.append("sem link")
         else:
             # Validar URL do artigo
-            link_result = self.validate_url(entry.link)
+            link_result = self.validate_url(link)
             if not link_result.is_valid:
-                errors.extend([f"Entrada {index}: {e}" for e in link_result.errors])
-        
-        # Verificar conteúdo
-        content = ""
-        if hasattr(entry, 'content'):
-            content = entry.content[0].value if entry.content else ""
-        elif hasattr(entry, 'summary'):
-            content = entry.summary
+                errors.extend(link_result.errors)
         
         if content:
             # Verificar padrões suspeitos
             if self._contains_suspicious_content(content):
-                warnings.append(f"Entrada {index}: conteúdo potencialmente suspeito")
+                warnings.append("conteúdo potencialmente suspeito")
             
             # Verificar tamanho
             if len(content) > 100000:
-                warnings.append(f"Entrada {index}: conteúdo muito grande ({len(content)} chars)")
+                warnings.append(f"conteúdo muito grande ({len(content)} chars)")
         
         return errors, warnings
     
     def _contains_suspicious_content(self, content: str) -> bool:
         """Verifica se conteúdo contém padrões suspeitos"""
-        for pattern in self.SUSPICIOUS_PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE | re.DOTALL):
-                return True
-        return False
+        return self._scanner.search(content) is not None
     
     def sanitize_content(self, content: str) -> str:
         """Sanitiza conteúdo HTML"""
@@ -241,25 +342,56 @@ class FeedSecurityValidator:
         # Primeiro validar como URL normal
         result = self.validate_url(image_url)
         
-        if result.is_valid:
-            # Verificar extensão
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg']
-            has_valid_ext = any(image_url.lower().endswith(ext) for ext in valid_extensions)
-            
-            if not has_valid_ext:
-                # Tentar verificar Content-Type
-                try:
-                    response = requests.head(image_url, timeout=5)
-                    content_type = response.headers.get('Content-Type', '')
-                    
-                    if not content_type.startswith('image/'):
-                        result.errors.append(f"Content-Type inválido: {content_type}")
-                        result.is_valid = False
-                except:
-                    result.warnings.append("Não foi possível verificar tipo da imagem")
+        if result.is_valid and self._needs_head_check(image_url):
+            # Tentar verificar Content-Type
+            content_type = self._head_content_type(image_url)
+            if content_type is None:
+                result.warnings.append("Não foi possível verificar tipo da imagem")
+            elif not content_type.startswith('image/'):
+                result.errors.append(f"Content-Type inválido: {content_type}")
+                result.is_valid = False
         
         return result
     
+    def _needs_head_check(self, image_url: str) -> bool:
+        lowered = image_url.lower()
+        return not any(lowered.endswith(ext) for ext in self.IMAGE_EXTENSIONS)
+    
+    def _head_content_type(self, image_url: str) -> Optional[str]:
+        """
+        Content-Type da URL via HEAD, em cache por URL. Chamadas simultâneas
+        para a mesma URL compartilham uma única requisição. None se a
+        verificação falhou.
+        """
+        found, content_type = self._head_cache.get(image_url)
+        if found:
+            return content_type
+        
+        with self._head_lock:
+            future = self._head_inflight.get(image_url)
+            owner = future is None
+            if owner:
+                future = self._head_inflight[image_url] = Future()
+        
+        if not owner:
+            return future.result()
+        
+        content_type = None
+        try:
+            self.stats["head_requests"] += 1
+            response = self._session.head(image_url, timeout=5)
+            content_type = response.headers.get('Content-Type', '')
+        except Exception as e:
+            logger.debug(f"HEAD falhou para {image_url}: {e}")
+        finally:
+            ttl = self.head_ttl if content_type is not None else self.head_failure_ttl
+            self._head_cache.set(image_url, content_type, ttl)
+            with self._head_lock:
+                self._head_inflight.pop(image_url, None)
+            future.set_result(content_type)
+        
+        return content_type
+    
     def calculate_content_hash(self, content: str) -> str:
         """Calcula hash do conteúdo para detectar duplicatas"""
         # Normalizar conteúdo
@@ -268,6 +400,51 @@ class FeedSecurityValidator:
     
     def validate_and_sanitize_article(self, article: Dict) -> ValidationResult:
         """Valida e sanitiza artigo completo"""
+        fields = {
+            name: article[name]
+            for name in ('title', 'content', 'link', 'published', 'image')
+            if name in article
+        }
+        image = fields.get('image')
+        
+        def ttl(_result: ValidationResult) -> float:
+            # Resultado que dependeu de um HEAD que falhou vale só até a nova tentativa
+            if image and self._needs_head_check(image) and self._head_cache.get(image) == (True, None):
+                return min(self.cache_ttl, self.head_failure_ttl)
+            return self.cache_ttl
+        
+        result = self._memoized(
+            self._cache_key("article", fields),
+            lambda: self._validate_article(article),
+            ttl
+        )
+        return result.copy()
+    
+    def validate_articles(self, articles: Sequence[Dict], max_workers: Optional[int] = None) -> List[ValidationResult]:
+        """
+        Valida um lote de artigos (ex.: todas as entradas de um poll do feed).
+        
+        As verificações de imagem via HEAD são deduplicadas e feitas em
+        paralelo antes da validação; artigos sem mudança desde o último
+        poll saem do cache sem nenhum trabalho. A ordem dos resultados é a
+        mesma dos artigos.
+        """
+        image_urls = {
+            article['image'] for article in articles
+            if article.get('image')
+            and self._needs_head_check(article['image'])
+            and self.validate_url(article['image']).is_valid
+        }
+        pending = [url for url in image_urls if not self._head_cache.get(url)[0]]
+        
+        if pending:
+            workers = min(max_workers or self.max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self._head_content_type, pending))
+        
+        return [self.validate_and_sanitize_article(article) for article in articles]
+    
+    def _validate_article(self, article: Dict) -> ValidationResult:
         errors = []
         warnings = []
         sanitized = {}
@@ -12,6 +12,11 @@ from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 from pythonjsonlogger import jsonlogger
 import os
 
+try:
+    from ..monitoring.tracing import current_trace_ids
+except ImportError:
+    from monitoring.tracing import current_trace_ids
+
 class ContextFilter(logging.Filter):
     """Filtro para adicionar contexto aos logs"""
     
@@ -161,6 +166,9 @@ class StructuredLogger:
         if hasattr(self.context_filter, 'context'):
             extra.update(self.context_filter.context)
         
+        # Correlacionar com o span ativo (trace_id/span_id)
+        extra.update(current_trace_ids())
+        
         return extra
     
     def log_performance(self, operation: str, duration: float, **kwargs):
@@ -5,33 +5,204 @@ Coordenado pelo Guardian para supervisão e monitoramento
 """
 
 import json
+import hashlib
+import random
+import threading
+import time
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import logging
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Respostas que justificam nova tentativa (a criação pode ou não ter ocorrido)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """Sessão HTTP com pool de conexões keep-alive para envios concorrentes"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def idempotency_key(slug: str, locale: str) -> str:
+    """Chave estável por (locale, slug): o mesmo post sempre gera a mesma chave"""
+    return hashlib.sha256(f"{locale}:{slug}".encode('utf-8')).hexdigest()[:32]
+
+
+def find_post_by_slug(
+    session: requests.Session,
+    base_url: str,
+    headers: Dict[str, str],
+    slug: str,
+    locale: str
+) -> Optional[Dict]:
+    """Busca um post existente pelo slug no locale informado"""
+    try:
+        response = session.get(
+            f"{base_url}/api/posts",
+            params={'filters[slug][$eq]': slug, 'locale': locale},
+            headers=headers,
+            timeout=15
+        )
+        if response.status_code == 200:
+            items = response.json().get('data') or []
+            return items[0] if items else None
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Erro ao buscar post '{slug}' ({locale}): {e}")
+    return None
+
+
+def post_idempotent(
+    session: requests.Session,
+    base_url: str,
+    headers: Dict[str, str],
+    payload: Dict,
+    slug: str,
+    locale: str,
+    max_retries: int = 3
+) -> Tuple[Optional[requests.Response], Optional[Dict]]:
+    """
+    Cria um post de forma idempotente.
+    
+    Envia o header Idempotency-Key derivado do slug e, antes de cada nova
+    tentativa (ou quando o Strapi recusa um slug duplicado), consulta se o
+    post já existe. Assim um timeout seguido de retry nunca gera duplicatas.
+    
+    Returns:
+        (resposta da criação, post já existente) - apenas um dos dois é preenchido
+    """
+    request_headers = dict(headers)
+    request_headers['Idempotency-Key'] = idempotency_key(slug, locale)
+    url = f"{base_url}/api/posts?locale={locale}"
+    
+    response = None
+    last_error = None
+    for attempt in range(max_retries):
+        if attempt > 0:
+            existing = find_post_by_slug(session, base_url, headers, slug, locale)
+            if existing:
+                return None, existing
+        
+        try:
+            response = session.post(url, json=payload, headers=request_headers, timeout=30)
+        except requests.RequestException as e:
+            last_error = e
+            response = None
+        else:
+            if response.status_code == 400 and 'unique' in response.text.lower():
+                existing = find_post_by_slug(session, base_url, headers, slug, locale)
+                if existing:
+                    return None, existing
+            if response.status_code not in RETRYABLE_STATUS:
+                return response, None
+        
+        if attempt < max_retries - 1:
+            # Full jitter para não sincronizar os workers
+            time.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+    
+    if response is None and last_error is not None:
+        raise last_error
+    return response, None
+
+
+def run_bulk(
+    items: List[Tuple[Dict, str]],
+    create_one: Callable[[Dict], Dict],
+    max_workers: int = 8,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict:
+    """
+    Executa create_one para cada (post, chave) com concorrência limitada.
+    
+    Itens com a mesma chave de idempotência são enviados uma única vez e
+    recebem o mesmo resultado. Os resultados seguem a ordem da entrada.
+    """
+    first_index: Dict[str, int] = {}
+    for index, (_, key) in enumerate(items):
+        first_index.setdefault(key, index)
+    
+    results: List[Optional[Dict]] = [None] * len(items)
+    total = len(first_index)
+    done = 0
+    lock = threading.Lock()
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(create_one, items[index][0]): index
+            for index in first_index.values()
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            results[index] = result
+            
+            with lock:
+                done += 1
+                current = done
+            if on_progress:
+                on_progress(current, total)
+    
+    for index, (_, key) in enumerate(items):
+        original = first_index[key]
+        if original != index:
+            results[index] = dict(results[original], duplicate_of=original)
+        results[index] = dict(results[index], index=index, idempotency_key=key)
+    
+    created = sum(1 for r in results if r.get('success') and not r.get('existing') and 'duplicate_of' not in r)
+    existing = sum(1 for r in results if r.get('success') and r.get('existing') and 'duplicate_of' not in r)
+    failed = [r for r in results if not r.get('success')]
+    
+    return {
+        'total': len(items),
+        'created': created,
+        'existing': existing,
+        'failed': len(failed),
+        'partial_failure': bool(failed) and len(failed) < len(items),
+        'results': results
+    }
+
 
 class StrapiIntegration:
     """Cliente para integração com Strapi v5"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 10):
         self.base_url = os.getenv('STRAPI_URL', 'http://localhost:1337')
         self.api_token = os.getenv('STRAPI_API_TOKEN', '')
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_token}'
         }
+        self.session = build_session(pool_size)
         self.stats = {
             'created': 0,
+            'existing': 0,
             'failed': 0,
             'errors': []
         }
+        self._stats_lock = threading.Lock()
+    
+    def _record_success(self, existing: bool = False):
+        with self._stats_lock:
+            self.stats['existing' if existing else 'created'] += 1
+    
+    def _record_failure(self, title: str, error: str):
+        with self._stats_lock:
+            self.stats['failed'] += 1
+            self.stats['errors'].append({'title': title, 'error': error})
     
     def validate_post_data(self, data: Dict) -> List[str]:
         """Valida os dados do post antes de enviar"""
@@ -110,16 +281,25 @@ class StrapiIntegration:
             
             # IMPORTANTE: Adiciona locale aos dados
             post_data['data']['locale'] = locale
+            slug = post_data['data']['slug']
             
-            # Envia para o Strapi com parâmetro locale
-            response = requests.post(
-                f"{self.base_url}/api/posts?locale={locale}",
-                json=post_data,
-                headers=self.headers
+            # Envia para o Strapi com parâmetro locale (idempotente por slug)
+            response, existing = post_idempotent(
+                self.session, self.base_url, self.headers, post_data, slug, locale
             )
             
+            if existing is not None:
+                self._record_success(existing=True)
+                return {
+                    'success': True,
+                    'existing': True,
+                    'id': existing.get('id'),
+                    'slug': slug,
+                    'url': f"/blog/{slug}"
+                }
+            
             if response.status_code in [200, 201]:
-                self.stats['created'] += 1
+                self._record_success()
                 data = response.json()
                 return {
                     'success': True,
@@ -132,11 +312,7 @@ class StrapiIntegration:
                 raise Exception(f"Erro do Strapi: {error_msg}")
                 
         except Exception as e:
-            self.stats['failed'] += 1
-            self.stats['errors'].append({
-                'title': raw_data.get('title', 'Sem título'),
-                'error': str(e)
-            })
+            self._record_failure(raw_data.get('title', 'Sem título'), str(e))
             
             return {
                 'success': False,
@@ -165,14 +341,14 @@ class StrapiIntegration:
             formatted = {'data': article_data}
             
             # Envia para o Strapi
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/articles",
                 json=formatted,
                 headers=self.headers
             )
             
             if response.status_code in [200, 201]:
-                self.stats['created'] += 1
+                self._record_success()
                 data = response.json()
                 return {
                     'success': True,
@@ -185,33 +361,51 @@ class StrapiIntegration:
                 raise Exception(f"Erro do Strapi: {error_msg}")
                 
         except Exception as e:
-            self.stats['failed'] += 1
-            self.stats['errors'].append({
-                'title': raw_data.get('title', 'Sem título'),
-                'error': str(e)
-            })
+            self._record_failure(raw_data.get('title', 'Sem título'), str(e))
             
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def create_multiple_posts(self, posts: List[Dict]) -> List[Dict]:
-        """Cria múltiplos posts"""
-        results = []
+    def create_posts_bulk(
+        self,
+        posts: List[Dict],
+        locale: str = 'pt-BR',
+        max_workers: int = 8,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Cria vários posts em paralelo (concorrência limitada, sessão compartilhada)
         
-        for i, post in enumerate(posts):
-            logger.info(f"[{i+1}/{len(posts)}] Criando: {post.get('title', 'Sem título')}")
-            
-            result = self.create_post(post)
-            results.append(result)
-            
+        Cada post recebe uma chave de idempotência derivada do slug; posts
+        repetidos no lote são enviados uma vez e retries nunca duplicam.
+        Retorna contadores e um resultado por item, na ordem da entrada.
+        """
+        items = []
+        for index, post in enumerate(posts):
+            slug = post.get('slug') or (self._generate_slug(post['title']) if post.get('title') else f"item-{index}")
+            items.append((post, idempotency_key(slug, locale)))
+        
+        def create_one(post: Dict) -> Dict:
+            result = self.create_post(post, locale=locale)
             if result['success']:
-                logger.info(f"✅ Sucesso! URL: {result['url']}")
+                logger.info(f"✅ {post.get('title', 'Sem título')}: {result['url']}")
             else:
-                logger.error(f"❌ Erro: {result['error']}")
+                logger.error(f"❌ {post.get('title', 'Sem título')}: {result['error']}")
+            return result
         
-        return results
+        summary = run_bulk(items, create_one, max_workers=max_workers, on_progress=on_progress)
+        
+        logger.info(
+            f"Lote concluído: {summary['created']} criados, {summary['existing']} já existentes, "
+            f"{summary['failed']} falhas de {summary['total']}"
+        )
+        return summary
+    
+    def create_multiple_posts(self, posts: List[Dict], max_workers: int = 8) -> List[Dict]:
+        """Cria múltiplos posts"""
+        return self.create_posts_bulk(posts, max_workers=max_workers)['results']
     
     def _generate_slug(self, text: str) -> str:
         """Gera slug a partir do texto"""
@@ -232,6 +426,7 @@ class StrapiIntegration:
         """Exibe estatísticas"""
         logger.info("\n📊 Estatísticas:")
         logger.info(f"✅ Posts criados: {self.stats['created']}")
+        logger.info(f"♻️ Já existentes: {self.stats['existing']}")
         logger.info(f"❌ Falhas: {self.stats['failed']}")
         
         if self.stats['errors']:
@@ -301,7 +496,7 @@ class CrewAIAdapter:
         self.strapi = StrapiIntegration()
         self.guardian = GuardianMonitor(self.strapi)
     
-    def process_crew_output(self, crew_output: Dict) -> List[Dict]:
+    def process_crew_output(self, crew_output: Dict, max_workers: int = 8) -> List[Dict]:
         """Processa saída do CrewAI e cria posts no Strapi"""
         posts = []
         
@@ -319,21 +514,18 @@ class CrewAIAdapter:
         # Notifica Guardian
         self.guardian.notify_start('crew_ai_import', len(posts))
         
-        # Processa posts
-        results = []
-        for i, post in enumerate(posts):
-            # Adapta formato do CrewAI para Strapi
-            adapted_post = self._adapt_crew_post(post)
-            
-            # Cria post
-            result = self.strapi.create_post(adapted_post)
-            results.append(result)
-            
-            # Notifica progresso
-            self.guardian.notify_progress('crew_ai_import', i + 1, len(posts))
+        # Adapta formato do CrewAI para Strapi e cria em lote
+        adapted_posts = [self._adapt_crew_post(post) for post in posts]
+        summary = self.strapi.create_posts_bulk(
+            adapted_posts,
+            max_workers=max_workers,
+            on_progress=lambda done, total: self.guardian.notify_progress('crew_ai_import', done, total)
+        )
+        results = summary['results']
         
         # Notifica conclusão
-        self.guardian.notify_complete('crew_ai_import', self.strapi.stats)
+        stats = dict(self.strapi.stats, partial_failure=summary['partial_failure'])
+        self.guardian.notify_complete('crew_ai_import', stats)
         
         # Exibe estatísticas
         self.strapi.show_stats()
@@ -3,19 +3,18 @@
 Integração Strapi com schema correto - apenas campos que existem
 """
 
-import json
-import requests
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Callable, Dict, List, Optional
 import logging
-from pathlib import Path
 import re
 import unicodedata
 
 from dotenv import load_dotenv
 load_dotenv()
 
+from strapi_integration import build_session, idempotency_key, post_idempotent, run_bulk
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +22,7 @@ logger = logging.getLogger(__name__)
 class StrapiI18nIntegration:
     """Integração com Strapi v5 usando apenas campos do schema real"""
     
-    def __init__(self, locale: str = 'pt-BR'):
+    def __init__(self, locale: str = 'pt-BR', pool_size: int = 10):
         self.base_url = os.getenv('STRAPI_URL', 'http://localhost:1337')
         self.api_token = os.getenv('STRAPI_API_TOKEN', '')
         self.locale = locale
@@ -31,11 +30,14 @@ class StrapiI18nIntegration:
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_token}'
         }
+        self.session = build_session(pool_size)
         self.stats = {
             'created': 0,
+            'existing': 0,
             'failed': 0,
             'errors': []
         }
+        self._stats_lock = threading.Lock()
         
         # Configuração de locales disponíveis
         self.available_locales = ['en', 'pt-BR', 'es']
@@ -52,7 +54,7 @@ class StrapiI18nIntegration:
     def get_available_locales(self) -> List[str]:
         """Retorna lista de locales disponíveis"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/i18n/locales",
                 headers=self.headers
             )
@@ -131,14 +133,29 @@ class StrapiI18nIntegration:
             # Formata dados com locale
             post_data = self.format_post_data(raw_data, target_locale)
             
-            # Adiciona parâmetro locale na URL
-            url = f"{self.base_url}/api/posts?locale={target_locale}"
+            slug = post_data['data']['slug']
+            
+            # Envia para o Strapi (idempotente por slug + locale)
+            response, existing = post_idempotent(
+                self.session, self.base_url, self.headers, post_data, slug, target_locale
+            )
             
-            # Envia para o Strapi
-            response = requests.post(url, json=post_data, headers=self.headers)
+            if existing is not None:
+                with self._stats_lock:
+                    self.stats['existing'] += 1
+                logger.info(f"Post já existia em {target_locale}: {slug}")
+                return {
+                    'success': True,
+                    'existing': True,
+                    'id': existing.get('id'),
+                    'locale': target_locale,
+                    'slug': slug,
+                    'url': f"/{target_locale}/post/{slug}"
+                }
             
             if response.status_code in [200, 201]:
-                self.stats['created'] += 1
+                with self._stats_lock:
+                    self.stats['created'] += 1
                 data = response.json()
                 logger.info(f"Post criado com sucesso em {target_locale}: {data['data']['title']}")
                 return {
@@ -153,12 +170,13 @@ class StrapiI18nIntegration:
                 raise Exception(f"Erro do Strapi: {error_msg}")
                 
         except Exception as e:
-            self.stats['failed'] += 1
-            self.stats['errors'].append({
-                'title': raw_data.get('title', 'Sem título'),
-                'locale': target_locale,
-                'error': str(e)
-            })
+            with self._stats_lock:
+                self.stats['failed'] += 1
+                self.stats['errors'].append({
+                    'title': raw_data.get('title', 'Sem título'),
+                    'locale': target_locale,
+                    'error': str(e)
+                })
             
             logger.error(f"Erro ao criar post em {target_locale}: {e}")
             return {
@@ -167,13 +185,47 @@ class StrapiI18nIntegration:
                 'locale': target_locale
             }
     
+    def create_posts_bulk(
+        self,
+        posts: List[Dict],
+        locale: Optional[str] = None,
+        max_workers: int = 8,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Cria vários posts em paralelo no mesmo locale
+        
+        Usa a mesma chave de idempotência por slug de StrapiIntegration:
+        duplicatas no lote são enviadas uma vez e retries nunca duplicam.
+        Retorna contadores e um resultado por item, na ordem da entrada.
+        """
+        target_locale = locale or self.locale
+        items = []
+        for index, post in enumerate(posts):
+            slug = post.get('slug') or (self._generate_slug(post['title']) if post.get('title') else f"item-{index}")
+            items.append((post, idempotency_key(slug, target_locale)))
+        
+        summary = run_bulk(
+            items,
+            lambda post: self.create_post(post, target_locale),
+            max_workers=max_workers,
+            on_progress=on_progress
+        )
+        
+        logger.info(
+            f"Lote {target_locale}: {summary['created']} criados, {summary['existing']} já existentes, "
+            f"{summary['failed']} falhas de {summary['total']}"
+        )
+        return summary
+    
     def show_stats(self):
         """Mostra estatísticas de operações"""
-        print(f"\n📊 Estatísticas:")
+        print("\n📊 Estatísticas:")
         print(f"   ✅ Criados: {self.stats['created']}")
+        print(f"   ♻️ Já existentes: {self.stats['existing']}")
         print(f"   ❌ Falharam: {self.stats['failed']}")
         if self.stats['errors']:
-            print(f"   🔍 Erros:")
+            print("   🔍 Erros:")
             for error in self.stats['errors']:
                 print(f"      - {error['title']} ({error['locale']}): {error['error']}")
 
@@ -4,18 +4,25 @@ Servidor de Webhook para receber notificações do Strapi v5
 Roda na porta 8000 e está configurado no Caddy para webhook-crewai.agentesintegrados.com
 """
 import os
+import sys
 import json
+import time
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, Request, HTTPException, Header, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 from dotenv import load_dotenv
 import logging
 import httpx
 from pathlib import Path
 
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from monitoring.metrics_registry import get_registry, CONTENT_TYPE
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,6 +38,18 @@ WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', 'crew-ai-webhook-secret-2025')
 # Armazenar eventos recebidos (para debug)
 events_received = []
 
+# Métricas do servidor
+metrics_registry = get_registry()
+webhook_events_total = metrics_registry.counter(
+    "webhook_events_total", "Eventos de webhook recebidos", ["event"]
+)
+webhook_processing_seconds = metrics_registry.histogram(
+    "webhook_processing_duration_seconds", "Duração do processamento de eventos", ["event"]
+)
+posts_created_total = metrics_registry.counter(
+    "webhook_posts_created_total", "Posts criados via webhook", ["result"]
+)
+
 @app.get("/")
 async def root():
     """Endpoint de saúde"""
@@ -46,6 +65,13 @@ async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    """Métricas no formato de exposição do Prometheus"""
+    # Collectors podem ler arquivos/SQLite; não bloquear o event loop
+    content = await asyncio.to_thread(metrics_registry.render)
+    return PlainTextResponse(content, media_type=CONTENT_TYPE)
+
 @app.post("/webhook/strapi")
 async def handle_strapi_webhook(
     request: Request,
@@ -80,6 +106,7 @@ async def handle_strapi_webhook(
     }
     
     logger.info(f"Webhook received: {x_strapi_event} for {payload.get('model')}")
+    webhook_events_total.inc(event=x_strapi_event or "unknown")
     
     # Armazenar evento (limitar a últimos 100)
     events_received.append(event_data)
@@ -100,6 +127,7 @@ async def handle_strapi_webhook(
 
 async def process_webhook_event(event: str, payload: Dict[str, Any]):
     """Processa o evento do webhook de forma assíncrona"""
+    start_time = time.perf_counter()
     
     try:
         if event == 'entry.create':
@@ -116,6 +144,10 @@ async def process_webhook_event(event: str, payload: Dict[str, Any]):
             logger.info(f"Unhandled event type: {event}")
     except Exception as e:
         logger.error(f"Error processing webhook: {e}")
+    finally:
+        webhook_processing_seconds.observe(
+            time.perf_counter() - start_time, event=event or "unknown"
+        )
 
 async def handle_entry_create(payload: Dict[str, Any]):
     """Processa criação de entrada"""
@@ -250,6 +282,7 @@ async def create_post_webhook(
             result = resp.json()
             post_id = result.get('data', {}).get('id')
             logger.info(f"Post created successfully: ID {post_id}")
+            posts_created_total.inc(result="created")
             
             return JSONResponse(
                 content={
@@ -285,6 +318,7 @@ async def create_post_webhook(
                 }, f, indent=2)
             
             logger.info(f"Post saved to pending queue: {filepath}")
+            posts_created_total.inc(result="queued")
             
             return JSONResponse(
                 content={
@@ -298,6 +332,7 @@ async def create_post_webhook(
             
     except Exception as e:
         logger.error(f"Error creating post: {e}")
+        posts_created_total.inc(result="error")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -5,12 +5,18 @@ Agent Log Flask Dashboard - Dados Reais do Mem0 + Docker Agents
 
 import os
 import json
+import atexit
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from flask_cors import CORS
-from collections import defaultdict
+from collections import defaultdict, deque
 import re
+import bisect
+import queue
 import subprocess
+import threading
+import time
+import uuid
 import requests
 
 app = Flask(__name__)
@@ -19,42 +25,331 @@ CORS(app)
 # Configurar conexão com Mem0 Bridge local
 MEM0_BRIDGE_URL = os.environ.get('MEM0_BRIDGE_URL', 'http://localhost:3002')
 
-# Cache de dados
-cache = {
-    'last_update': None,
-    'data': None
-}
+# Intervalo do produtor que atualiza o estado compartilhado (logs, containers, tarefas)
+DASHBOARD_REFRESH_SECONDS = float(os.environ.get('DASHBOARD_REFRESH_SECONDS', 10))
 
-def register_agent_execution(agent_name, status, task, duration=None, error=None):
-    """Registra uma execução de agente no Mem0 Bridge"""
-    try:
-        execution_data = {
-            "user_id": "agent-log",
-            "content": json.dumps({
-                "agentName": agent_name,
-                "status": status,
-                "task": task,
-                "timestamp": datetime.now().isoformat(),
-                "duration": duration,
-                "error": error
-            }),
-            "metadata": {
-                "agentName": agent_name,
-                "status": status,
-                "task": task,
-                "duration": duration,
-                "error": error,
-                "timestamp": datetime.now().isoformat()
-            },
-            "category": "agent-execution",
-            "tags": ["execution", agent_name.lower().replace(" ", "-"), status]
+# Visão materializada dos logs de agentes
+AGENT_LOG_FETCH_LIMIT = int(os.environ.get('AGENT_LOG_FETCH_LIMIT', 1000))
+AGENT_LOG_MAX_ENTRIES = int(os.environ.get('AGENT_LOG_MAX_ENTRIES', 5000))
+# Janela dos totais de /api/tasks (execuções e tarefas rodando)
+AGENT_LOG_WINDOW_HOURS = float(os.environ.get('AGENT_LOG_WINDOW_HOURS', 48))
+# Limites superiores (ms) dos baldes do histograma de duração
+DURATION_BUCKETS_MS = (1000, 5000, 30000, 60000, 300000, 900000)
+
+# Server-sent events
+SSE_HEARTBEAT_SECONDS = 15
+# Eventos guardados para quem reconecta com Last-Event-ID
+SSE_BACKLOG = 500
+# Eventos pendentes por assinante; quem ficar para trás é desconectado
+SSE_QUEUE_SIZE = 100
+
+# Write-behind das execuções registradas
+EXECUTION_BATCH_SIZE = int(os.environ.get('EXECUTION_BATCH_SIZE', 50))
+EXECUTION_FLUSH_SECONDS = float(os.environ.get('EXECUTION_FLUSH_SECONDS', 2))
+# Eventos em memória; o excesso vai para o arquivo de spill
+EXECUTION_BUFFER_SIZE = int(os.environ.get('EXECUTION_BUFFER_SIZE', 1000))
+EXECUTION_SPILL_FILE = os.environ.get(
+    'EXECUTION_SPILL_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pending-executions.jsonl')
+)
+# Acima disso (eventos em disco) novos registros são recusados
+EXECUTION_SPILL_MAX = int(os.environ.get('EXECUTION_SPILL_MAX', 100000))
+EXECUTION_RETRY_MAX_SECONDS = 60
+# Na saída do processo, quanto esperar o lote em envio antes de gravar o buffer em disco
+EXECUTION_CLOSE_TIMEOUT_SECONDS = float(os.environ.get('EXECUTION_CLOSE_TIMEOUT_SECONDS', 10))
+
+def build_execution_memory(agent_name, status, task, duration=None, error=None, execution_id=None):
+    """Memória do Mem0 Bridge para uma execução de agente"""
+    timestamp = datetime.now().isoformat()
+    memory = {
+        "user_id": "agent-log",
+        "content": json.dumps({
+            "agentName": agent_name,
+            "status": status,
+            "task": task,
+            "timestamp": timestamp,
+            "duration": duration,
+            "error": error
+        }),
+        "metadata": {
+            "agentName": agent_name,
+            "status": status,
+            "task": task,
+            "duration": duration,
+            "error": error,
+            "timestamp": timestamp
+        },
+        "category": "agent-execution",
+        "tags": ["execution", agent_name.lower().replace(" ", "-"), status]
+    }
+    # Identifica o evento: um reenvio (spill, nova tentativa) não conta duas vezes
+    memory["metadata"]["eventId"] = uuid.uuid4().hex
+    if execution_id:
+        # Liga o início ao término da mesma execução (ver AgentLogView)
+        memory["metadata"]["executionId"] = execution_id
+    return memory
+
+class ExecutionWriter:
+    """
+    Write-behind das execuções registradas.
+
+    `enqueue` só coloca o evento num buffer em memória e retorna; uma thread
+    envia lotes de até `batch_size` para /mcp/add_memories, tentando de novo
+    com backoff exponencial enquanto o bridge falhar. Quando o buffer enche,
+    os eventos seguintes vão para um arquivo JSONL em disco (mantendo a
+    ordem) e voltam para a memória conforme o buffer esvazia, lidos a partir
+    de um offset (o arquivo não é relido nem reescrito a cada recarga);
+    acima de `spill_max` eventos em disco, novos eventos são recusados.
+
+    Na saída, `close` espera o lote em envio terminar antes de gravar o
+    buffer em disco. Se o tempo acabar, o lote vai para o disco também; o
+    `eventId` de cada evento deixa a AgentLogView descartar a cópia.
+    """
+
+    def __init__(self, bridge_url, spill_path=EXECUTION_SPILL_FILE,
+                 batch_size=EXECUTION_BATCH_SIZE, flush_interval=EXECUTION_FLUSH_SECONDS,
+                 buffer_size=EXECUTION_BUFFER_SIZE, spill_max=EXECUTION_SPILL_MAX):
+        self.bridge_url = bridge_url
+        self.spill_path = spill_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.buffer_size = max(self.batch_size, buffer_size)
+        self.spill_max = spill_max
+        self._cond = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        # Entradas: {'enqueued_at': epoch, 'memory': {...}}
+        self._buffer = deque()
+        # Eventos do início do buffer sendo enviados agora (só saem após a entrega)
+        self._in_flight = 0
+        self._closed = False
+        # Bytes do arquivo de spill já movidos para o buffer
+        self._spill_offset = 0
+        # Bridges antigos não têm /mcp/add_memories; cai para um POST por evento
+        self._batch_endpoint = True
+        self.metrics = {
+            'accepted': 0,
+            'sent': 0,
+            'batches': 0,
+            'retries': 0,
+            'spilled': 0,
+            'rejected': 0,
+            'last_flush': None,
+            'last_batch_seconds': 0,
+            'last_delivery_lag_seconds': 0,
+            'last_error': None
         }
-        
-        response = requests.post(f"{MEM0_BRIDGE_URL}/mcp/add_memory", json=execution_data)
-        return response.status_code == 200
-    except Exception as e:
-        print(f"Erro ao registrar execução: {e}")
-        return False
+        # Eventos deixados em disco por uma execução anterior
+        self._spilled = self._count_spill()
+        atexit.register(self.close)
+
+    # ---- disco ----
+
+    def _count_spill(self):
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    def _write_spill(self, entries, mode='a'):
+        os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+        with open(self.spill_path, mode, encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+
+    def _refill(self):
+        """Move eventos do disco para o buffer (chamado com o lock)"""
+        if not self._spilled:
+            return
+        room = self.buffer_size - len(self._buffer)
+        if room <= 0:
+            return
+        try:
+            with open(self.spill_path, 'rb') as f:
+                f.seek(self._spill_offset)
+                while room > 0:
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        break  # fim do arquivo (ou linha ainda sendo escrita)
+                    self._spill_offset = f.tell()
+                    if not line.strip():
+                        continue
+                    self._spilled -= 1
+                    try:
+                        self._buffer.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                    room -= 1
+        except FileNotFoundError:
+            self._spilled = 0
+
+        if self._spilled <= 0:
+            # Tudo já está na memória: o arquivo recomeça vazio
+            self._spilled = 0
+            self._spill_offset = 0
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+
+    # ---- produtor ----
+
+    def enqueue(self, memory):
+        """Aceita o evento para envio; False se o buffer e o disco estiverem cheios"""
+        entry = {'enqueued_at': time.time(), 'memory': memory}
+        with self._cond:
+            if not self._spilled and len(self._buffer) < self.buffer_size:
+                self._buffer.append(entry)
+            elif self._spilled < self.spill_max:
+                # Enquanto houver eventos em disco, os novos entram depois deles
+                self._write_spill([entry])
+                self._spilled += 1
+                self.metrics['spilled'] += 1
+            else:
+                self.metrics['rejected'] += 1
+                return False
+            self.metrics['accepted'] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        self.ensure_started()
+        return True
+
+    # ---- envio ----
+
+    def _deliver(self, memories):
+        """Envia um lote; retorna quantos eventos (a partir do primeiro) foram aceitos"""
+        if self._batch_endpoint:
+            response = requests.post(
+                f"{self.bridge_url}/mcp/add_memories", json={'memories': memories}, timeout=30
+            )
+            if response.status_code == 200:
+                return len(memories)
+            if response.status_code != 404:
+                raise RuntimeError(f"Mem0 Bridge respondeu {response.status_code} em add_memories")
+            self._batch_endpoint = False
+
+        delivered = 0
+        for memory in memories:
+            try:
+                response = requests.post(f"{self.bridge_url}/mcp/add_memory", json=memory, timeout=10)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Mem0 Bridge respondeu {response.status_code} em add_memory")
+            except Exception:
+                if delivered:
+                    return delivered
+                raise
+            delivered += 1
+        return delivered
+
+    def _next_batch(self):
+        with self._cond:
+            if self._closed:
+                return None
+            if not self._buffer:
+                self._refill()
+            if len(self._buffer) < self.batch_size:
+                self._cond.wait(timeout=self.flush_interval)
+                if len(self._buffer) < self.buffer_size:
+                    self._refill()
+            if self._closed:
+                return None
+            # Os eventos só saem do buffer depois de entregues
+            self._in_flight = min(self.batch_size, len(self._buffer))
+            return [self._buffer[i] for i in range(self._in_flight)]
+
+    def _run(self):
+        backoff = 0
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+
+            started = time.time()
+            try:
+                delivered = self._deliver([entry['memory'] for entry in batch])
+            except Exception as e:
+                backoff = min(EXECUTION_RETRY_MAX_SECONDS, max(1, backoff * 2))
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+                    self.metrics['retries'] += 1
+                    self.metrics['last_error'] = str(e)
+                print(f"Erro ao enviar execuções ao Mem0 Bridge (nova tentativa em {backoff}s): {e}")
+                time.sleep(backoff)
+                continue
+
+            backoff = 0
+            finished = time.time()
+            with self._cond:
+                # close() pode ter esvaziado o buffer durante o envio
+                for _ in range(min(delivered, len(self._buffer))):
+                    self._buffer.popleft()
+                self._in_flight = 0
+                self._cond.notify_all()
+                self.metrics['sent'] += delivered
+                self.metrics['batches'] += 1
+                self.metrics['last_flush'] = datetime.fromtimestamp(finished).isoformat()
+                self.metrics['last_batch_seconds'] = round(finished - started, 3)
+                self.metrics['last_delivery_lag_seconds'] = round(finished - batch[0]['enqueued_at'], 3)
+                self.metrics['last_error'] = None
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='execution-writer', daemon=True)
+                self._thread.start()
+
+    def close(self, timeout=EXECUTION_CLOSE_TIMEOUT_SECONDS):
+        """Na saída do processo, o que ainda está em memória vai para o início do arquivo"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            # O lote em envio sai do buffer quando for entregue; gravá-lo
+            # antes disso o reenviaria no próximo início
+            deadline = time.monotonic() + timeout
+            while self._in_flight and time.monotonic() < deadline:
+                self._cond.wait(timeout=deadline - time.monotonic())
+            if not self._buffer:
+                return
+            pending = list(self._buffer)
+            self._buffer.clear()
+            try:
+                with open(self.spill_path, 'rb') as f:
+                    f.seek(self._spill_offset)
+                    tail = f.read()
+            except FileNotFoundError:
+                tail = b''
+            self._write_spill(pending, mode='w')
+            with open(self.spill_path, 'ab') as f:
+                f.write(tail)
+            self._spill_offset = 0
+            self._spilled += len(pending)
+
+    def stats(self):
+        """Métricas do write-behind (lag = idade do evento pendente mais antigo)"""
+        with self._cond:
+            oldest = self._buffer[0]['enqueued_at'] if self._buffer else None
+            return {
+                'buffered': len(self._buffer),
+                'in_flight': self._in_flight,
+                'spilled_pending': self._spilled,
+                'flush_lag_seconds': round(time.time() - oldest, 3) if oldest else 0,
+                'batch_endpoint': self._batch_endpoint,
+                **self.metrics
+            }
+
+execution_writer = ExecutionWriter(MEM0_BRIDGE_URL)
+
+def register_agent_execution(agent_name, status, task, duration=None, error=None, execution_id=None):
+    """Registra uma execução de agente (enviada ao Mem0 Bridge em segundo plano)"""
+    return execution_writer.enqueue(
+        build_execution_memory(agent_name, status, task, duration, error, execution_id)
+    )
 
 def format_duration(seconds):
     """Formata duração em segundos para formato legível (seg, min, horas, dias)"""
@@ -133,117 +428,526 @@ def get_docker_agents():
         print(f"Erro ao buscar agentes Docker: {e}")
         return []
 
-def get_agent_logs(hours=24):
-    """Busca logs reais do Mem0 Bridge local"""
+def memory_to_log(memory):
+    """Converte uma memória do Mem0 Bridge em entrada de log de execução"""
+    # Extrair dados do log
+    metadata = dict(memory.get('metadata') or {})
+    content = memory.get('content', '')
+
+    # Tentar parsear o JSON do conteúdo se for um log estruturado
     try:
-        # Buscar memórias do AgentLog no Mem0 Bridge usando list ao invés de search
-        response = requests.get(f"{MEM0_BRIDGE_URL}/mcp/list_memories/agent-log")
-        
-        if response.status_code != 200:
-            print(f"Erro ao buscar logs do Mem0 Bridge: {response.status_code}")
-            return []
-        
-        data = response.json()
-        memories = data.get('memories', [])
-        
-        logs = []
-        for memory in memories:
-            # Extrair dados do log
-            metadata = memory.get('metadata', {})
-            content = memory.get('content', '')
-            
-            # Tentar parsear o JSON do conteúdo se for um log estruturado
-            try:
-                if content.startswith('{'):
-                    log_data = json.loads(content)
-                    metadata.update(log_data)
-            except:
-                pass
-            
-            log_entry = {
-                'id': memory.get('id'),
-                'agentName': metadata.get('agentName', metadata.get('agent', 'unknown')),
-                'agentType': metadata.get('agentType', metadata.get('type', 'custom')),
-                'status': metadata.get('status', 'unknown'),
-                'timestamp': memory.get('created_at', ''),
-                'duration': metadata.get('duration', 0),
-                'taskDescription': metadata.get('taskDescription', metadata.get('task', content[:100])),
-                'error': metadata.get('error', None)
-            }
-            
-            logs.append(log_entry)
-        
-        return logs
-    except Exception as e:
-        print(f"Erro ao buscar logs do Mem0 Bridge: {e}")
-        return []
+        if content.startswith('{'):
+            log_data = json.loads(content)
+            metadata.update(log_data)
+    except:
+        pass
+
+    return {
+        'id': memory.get('id'),
+        'executionId': metadata.get('executionId', metadata.get('taskId')),
+        'agentName': metadata.get('agentName', metadata.get('agent', 'unknown')),
+        'agentType': metadata.get('agentType', metadata.get('type', 'custom')),
+        'status': metadata.get('status', 'unknown'),
+        # Hora do evento (quem registrou), não a da entrega ao Mem0
+        'timestamp': metadata.get('timestamp') or memory.get('created_at') or '',
+        'eventId': metadata.get('eventId'),
+        'duration': metadata.get('duration') or 0,
+        'taskDescription': metadata.get('taskDescription', metadata.get('task', content[:100])),
+        'error': metadata.get('error', None)
+    }
+
+def log_epoch(timestamp):
+    """Timestamp ISO em segundos desde a época (sem fuso = hora local), ou None"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+def execution_key(log):
+    """Identifica a execução de um log: executionId/taskId, ou agente + tarefa"""
+    return log.get('executionId') or f"{log['agentName']}|{log['taskDescription']}"
+
+def log_date(timestamp):
+    """Data (dia) de um timestamp ISO, ou None se não for parseável"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).date()
+    except (AttributeError, ValueError):
+        return None
 
-def calculate_stats(logs):
-    """Calcula estatísticas dos logs"""
-    if not logs:
+class AgentAggregate:
+    """Agregados de um agente, atualizados a cada execução nova"""
+
+    def __init__(self, name):
+        self.name = name
+        self.executions = 0
+        self.successes = 0
+        self.errors = 0
+        self.total_duration = 0
+        self.duration_count = 0
+        self.min_duration = 0
+        self.max_duration = 0
+        # Um balde por limite de DURATION_BUCKETS_MS + um para o que passar do último
+        self.histogram = [0] * (len(DURATION_BUCKETS_MS) + 1)
+
+    def add(self, log):
+        self.executions += 1
+        status = log['status']
+        if status == 'completed':
+            self.successes += 1
+            duration = log['duration']
+            if isinstance(duration, (int, float)) and duration > 0:
+                if not self.duration_count or duration < self.min_duration:
+                    self.min_duration = duration
+                self.max_duration = max(self.max_duration, duration)
+                self.total_duration += duration
+                self.duration_count += 1
+                self.histogram[bisect.bisect_left(DURATION_BUCKETS_MS, duration)] += 1
+        elif status == 'error':
+            self.errors += 1
+
+    def to_dict(self):
+        bounds = list(DURATION_BUCKETS_MS) + [None]
         return {
-            'total_agents': 0,
-            'total_executions': 0,
-            'success_rate': 0,
-            'avg_duration': 0,
-            'agents': {}
+            'name': self.name,
+            'executions': self.executions,
+            'success_rate': (self.successes / self.executions * 100) if self.executions > 0 else 0,
+            'error_count': self.errors,
+            'avg_duration': (self.total_duration / self.duration_count) if self.duration_count else 0,
+            'min_duration': self.min_duration,
+            'max_duration': self.max_duration,
+            # le = limite superior em ms (None = acima do último limite)
+            'duration_histogram': [
+                {'le': bound, 'count': count} for bound, count in zip(bounds, self.histogram)
+            ]
         }
-    
-    # Agrupar por agente
-    agent_stats = defaultdict(lambda: {
-        'executions': 0,
-        'successes': 0,
-        'errors': 0,
-        'total_duration': 0,
-        'durations': []
-    })
-    
-    for log in logs:
-        agent_name = log['agentName']
-        stats = agent_stats[agent_name]
-        
-        stats['executions'] += 1
-        
-        if log['status'] == 'completed':
-            stats['successes'] += 1
-            if log['duration'] > 0:
-                stats['durations'].append(log['duration'])
-                stats['total_duration'] += log['duration']
-        elif log['status'] == 'error':
-            stats['errors'] += 1
-    
-    # Calcular estatísticas finais
-    total_executions = sum(s['executions'] for s in agent_stats.values())
-    total_successes = sum(s['successes'] for s in agent_stats.values())
-    
-    # Formatar dados para resposta
-    agents = {}
-    for agent_name, stats in agent_stats.items():
-        agents[agent_name] = {
-            'name': agent_name,
-            'executions': stats['executions'],
-            'success_rate': (stats['successes'] / stats['executions'] * 100) if stats['executions'] > 0 else 0,
-            'error_count': stats['errors'],
-            'avg_duration': (stats['total_duration'] / len(stats['durations'])) if stats['durations'] else 0,
-            'min_duration': min(stats['durations']) if stats['durations'] else 0,
-            'max_duration': max(stats['durations']) if stats['durations'] else 0
+
+class AgentLogView:
+    """
+    Visão materializada dos logs de execução (memórias do usuário agent-log).
+
+    Cada `refresh` (chamado pelo LiveFeed) busca no Mem0 Bridge só as
+    memórias a partir do último `created_at` visto e incorpora as novas
+    (deduplicadas por id) aos agregados por agente. Os endpoints leem desta
+    visão, sem baixar o histórico inteiro nem recalcular estatísticas a cada
+    requisição.
+
+    Os totais de /api/tasks cobrem só a janela de `window_hours`: cada
+    execução guarda o último status visto, então "rodando" é quem começou e
+    ainda não terminou dentro da janela. Os ids vistos e as execuções
+    saem junto com a janela.
+    """
+
+    def __init__(self, bridge_url, user_id='agent-log', max_entries=AGENT_LOG_MAX_ENTRIES,
+                 window_hours=AGENT_LOG_WINDOW_HOURS):
+        self.bridge_url = bridge_url
+        self.user_id = user_id
+        self.max_entries = max_entries
+        self.window_seconds = window_hours * 3600
+        self._lock = threading.Lock()
+        # eventId (ou id da memória) -> instante da entrega, para podar com a janela
+        self._seen = {}
+        # Instantes dos logs dentro da janela (ordenados)
+        self._window = []
+        # Chave da execução -> (instante, status, agente) do último log visto
+        self._executions = {}
+        # (epoch do evento, entrada) ordenados pela hora do evento (as mais antigas
+        # saem do começo ao passar de max_entries; os agregados continuam completos)
+        self._logs = []
+        self._agents = {}
+        self._completed_by_day = defaultdict(int)
+        self._last_created_at = None
+        self.last_refresh = None
+        self.last_error = None
+
+    def _fetch(self):
+        params = {'limit': AGENT_LOG_FETCH_LIMIT}
+        if self._last_created_at:
+            # Inclusivo: memórias com o mesmo created_at são descartadas pelo id
+            params['since'] = self._last_created_at
+        response = requests.get(
+            f"{self.bridge_url}/mcp/list_memories/{self.user_id}", params=params, timeout=10
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Mem0 Bridge respondeu {response.status_code}")
+        return response.json().get('memories', [])
+
+    def refresh(self):
+        """Incorpora as memórias novas; retorna as entradas que entraram na visão"""
+        try:
+            memories = self._fetch()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+
+        added = []
+        now = time.time()
+        cutoff = now - self.window_seconds
+        with self._lock:
+            for memory in memories:
+                log = memory_to_log(memory)
+                # Um evento reenviado (spill, nova tentativa) vira outra memória
+                # com o mesmo eventId: conta uma vez só
+                seen_key = log['eventId'] or memory.get('id')
+                if seen_key is None or seen_key in self._seen:
+                    continue
+                created_at = memory.get('created_at')
+                delivered = log_epoch(created_at) or now
+                if delivered < cutoff and self._last_created_at is not None:
+                    # Já incorporado antes (o id saiu de _seen com a janela)
+                    continue
+                self._seen[seen_key] = delivered
+                # Janela e ordenação pela hora do evento, não da entrega
+                epoch = log_epoch(log['timestamp']) or delivered
+                self._track_execution(log, epoch, cutoff)
+
+                aggregate = self._agents.get(log['agentName'])
+                if aggregate is None:
+                    aggregate = self._agents[log['agentName']] = AgentAggregate(log['agentName'])
+                aggregate.add(log)
+                if log['status'] == 'completed':
+                    day = log_date(log['timestamp'])
+                    if day:
+                        self._completed_by_day[day] += 1
+
+                bisect.insort(self._logs, (epoch, log), key=lambda item: item[0])
+                if created_at and (self._last_created_at is None or created_at > self._last_created_at):
+                    self._last_created_at = created_at
+                added.append(log)
+
+            if len(self._logs) > self.max_entries:
+                del self._logs[:len(self._logs) - self.max_entries]
+            self._prune(cutoff)
+            self.last_refresh = datetime.now()
+            self.last_error = None
+        return added
+
+    def _track_execution(self, log, epoch, cutoff):
+        """Atualiza a janela e o último status da execução (chamado com o lock)"""
+        if epoch < cutoff:
+            return
+        bisect.insort(self._window, epoch)
+        key = execution_key(log)
+        current = self._executions.get(key)
+        # Logs fora de ordem: vale o mais recente da execução
+        if current is None or epoch >= current[0]:
+            self._executions[key] = (epoch, log['status'], log['agentName'])
+
+    def _prune(self, cutoff):
+        """Descarta da janela, das execuções e dos ids vistos o que ficou antes de `cutoff`"""
+        del self._window[:bisect.bisect_left(self._window, cutoff)]
+        for key in [key for key, (epoch, _, _) in self._executions.items() if epoch < cutoff]:
+            del self._executions[key]
+        for memory_id in [mid for mid, epoch in self._seen.items() if epoch < cutoff]:
+            del self._seen[memory_id]
+
+    def stats(self):
+        """Estatísticas gerais e por agente (mesmo formato de sempre + histograma)"""
+        with self._lock:
+            agents = {name: aggregate.to_dict() for name, aggregate in self._agents.items()}
+            total_executions = sum(a.executions for a in self._agents.values())
+            total_successes = sum(a.successes for a in self._agents.values())
+
+        return {
+            'total_agents': len(agents),
+            'total_executions': total_executions,
+            'success_rate': (total_successes / total_executions * 100) if total_executions > 0 else 0,
+            'avg_duration': sum(a['avg_duration'] for a in agents.values()) / len(agents) if agents else 0,
+            'agents': agents
         }
-    
+
+    def agent_stats(self, agent_name):
+        with self._lock:
+            aggregate = self._agents.get(agent_name)
+            return aggregate.to_dict() if aggregate else None
+
+    def recent(self, limit=20, agent_name=None, status=None):
+        """Entradas mais recentes primeiro, opcionalmente filtradas por agente/status"""
+        result = []
+        with self._lock:
+            for _, log in reversed(self._logs):
+                if agent_name is not None and log['agentName'] != agent_name:
+                    continue
+                if status is not None and log['status'] != status:
+                    continue
+                result.append(dict(log))
+                if len(result) >= limit:
+                    break
+        return result
+
+    def running_count(self, agent_names):
+        """Execuções da janela cujo último status é 'started', dos agentes dados"""
+        agent_names = set(agent_names)
+        with self._lock:
+            self._prune(time.time() - self.window_seconds)
+            return sum(
+                1 for _, status, agent in self._executions.values()
+                if status == 'started' and agent in agent_names
+            )
+
+    def window_total(self):
+        """Logs de execução dentro da janela"""
+        with self._lock:
+            self._prune(time.time() - self.window_seconds)
+            return len(self._window)
+
+    def completed_on(self, day):
+        with self._lock:
+            return self._completed_by_day.get(day, 0)
+
+agent_log_view = AgentLogView(MEM0_BRIDGE_URL)
+
+def empty_task_lifecycle():
     return {
-        'total_agents': len(agent_stats),
-        'total_executions': total_executions,
-        'success_rate': (total_successes / total_executions * 100) if total_executions > 0 else 0,
-        'avg_duration': sum(a['avg_duration'] for a in agents.values()) / len(agents) if agents else 0,
-        'agents': agents
+        'in_progress': [],
+        'interrupted': [],
+        'recent_completed': [],
+        'total': 0
     }
 
-def get_recent_executions(logs, limit=20):
-    """Obtém execuções recentes"""
-    # Ordenar por timestamp
-    sorted_logs = sorted(logs, key=lambda x: x['timestamp'], reverse=True)
-    return sorted_logs[:limit]
+def build_task_lifecycle(memories):
+    """Classifica as memórias de tarefas em andamento/interrompidas/concluídas (24h)"""
+    tasks = empty_task_lifecycle()
+
+    for memory in memories:
+        content = memory.get('content', '')
+        metadata = memory.get('metadata') or {}
+
+        # Identificar tarefas por categoria ou tags
+        tags = memory.get('tags', [])
+
+        # Tarefas em andamento
+        if 'task-in-progress' in tags or 'in_progress' in metadata.get('status', ''):
+            tasks['in_progress'].append({
+                'id': memory.get('id'),
+                'task': metadata.get('task', content[:100]),
+                'agent': metadata.get('agent', 'guardian'),
+                'started_at': memory.get('created_at'),
+                'context': metadata
+            })
+
+        # Tarefas interrompidas
+        elif 'interrupted' in tags or 'error' in metadata.get('status', ''):
+            tasks['interrupted'].append({
+                'id': memory.get('id'),
+                'task': metadata.get('task', content[:100]),
+                'agent': metadata.get('agent', 'guardian'),
+                'error': metadata.get('error', 'Task was interrupted'),
+                'stopped_at': memory.get('updated_at'),
+                'context': metadata
+            })
+
+        # Tarefas completadas recentemente
+        elif 'completed' in metadata.get('status', ''):
+            # Pegar apenas as últimas 24h
+            try:
+                created = datetime.fromisoformat(memory.get('created_at', '').replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                continue
+            if (datetime.now(created.tzinfo) - created).total_seconds() < 86400:
+                tasks['recent_completed'].append({
+                    'id': memory.get('id'),
+                    'task': metadata.get('task', content[:100]),
+                    'agent': metadata.get('agent', 'guardian'),
+                    'completed_at': memory.get('updated_at'),
+                    'duration': metadata.get('duration', 0)
+                })
+
+    tasks['total'] = len(tasks['in_progress']) + len(tasks['interrupted'])
+    return tasks
+
+def fetch_task_lifecycle():
+    """Busca as tarefas do Guardian e outros agentes no Mem0 Bridge"""
+    response = requests.get(f"{MEM0_BRIDGE_URL}/mcp/list_memories/guardian-orchestrator", timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"Mem0 Bridge respondeu {response.status_code}")
+    return build_task_lifecycle(response.json().get('memories', []))
+
+def task_states(lifecycle):
+    """id da tarefa -> (grupo, tarefa)"""
+    states = {}
+    for group in ('in_progress', 'interrupted', 'recent_completed'):
+        for task in lifecycle[group]:
+            states[task['id']] = (group, task)
+    return states
+
+def format_sse(event_id, event_type, data):
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+class Subscriber:
+    """Fila de eventos de um cliente SSE"""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        # Marcado quando a fila enche: o cliente reconecta e recebe um snapshot
+        self.dropped = False
 
-def generate_pipeline_report(logs, stats, docker_agents):
+class LiveFeed:
+    """
+    Produtor único do estado compartilhado do dashboard.
+
+    Uma thread atualiza a cada DASHBOARD_REFRESH_SECONDS a visão de logs, o
+    snapshot dos containers (um único `docker ps`) e o ciclo de vida das
+    tarefas, e publica só as diferenças como eventos para os assinantes de
+    /api/stream. Os endpoints de polling leem o mesmo estado, então N abas
+    abertas não multiplicam as chamadas ao Docker e ao Mem0 Bridge.
+    """
+
+    def __init__(self, view, interval=DASHBOARD_REFRESH_SECONDS):
+        self.view = view
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._subscribers = set()
+        self._backlog = deque(maxlen=SSE_BACKLOG)
+        self._last_id = 0
+        self.docker_agents = []
+        self.task_lifecycle = empty_task_lifecycle()
+
+    # ---- produtor ----
+
+    def _refresh_executions(self):
+        added = self.view.refresh()
+        if added:
+            executions = sorted(added, key=lambda log: log['timestamp'], reverse=True)
+            self.publish('execution', {'executions': executions, 'stats': self.stats()})
+
+    def _refresh_containers(self):
+        agents = get_docker_agents()
+        previous = {agent['id']: agent for agent in self.docker_agents}
+        current = {agent['id']: agent for agent in agents}
+        self.docker_agents = agents
+
+        changed = [agent for agent_id, agent in current.items() if previous.get(agent_id) != agent]
+        removed = [agent_id for agent_id in previous if agent_id not in current]
+        if changed or removed:
+            self.publish('container', {
+                'changed': changed,
+                'removed': removed,
+                'running_containers': len([a for a in agents if 'running' in a['status'].lower()])
+            })
+
+    def _refresh_tasks(self):
+        lifecycle = fetch_task_lifecycle()
+        previous = task_states(self.task_lifecycle)
+        current = task_states(lifecycle)
+        self.task_lifecycle = lifecycle
+
+        transitions = []
+        for task_id, (group, task) in current.items():
+            before = previous.get(task_id)
+            if before is None or before != (group, task):
+                transitions.append({'id': task_id, 'from': before[0] if before else None, 'to': group, 'task': task})
+        for task_id, (group, _) in previous.items():
+            if task_id not in current:
+                transitions.append({'id': task_id, 'from': group, 'to': None, 'task': None})
+        if transitions:
+            self.publish('task', {'transitions': transitions})
+
+    def tick(self):
+        for name, refresh in (('logs do Mem0 Bridge', self._refresh_executions),
+                              ('agentes Docker', self._refresh_containers),
+                              ('task lifecycle', self._refresh_tasks)):
+            try:
+                refresh()
+            except Exception as e:
+                print(f"Erro ao atualizar {name}: {e}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.tick()
+
+    def ensure_started(self):
+        """Na primeira chamada carrega o estado e inicia o produtor em segundo plano"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self.tick()
+            self._thread = threading.Thread(target=self._run, name='dashboard-live-feed', daemon=True)
+            self._thread.start()
+
+    # ---- assinantes ----
+
+    def publish(self, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, event_type, json.dumps(data, default=str))
+            self._backlog.append(event)
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.queue.put_nowait(event)
+                except queue.Full:
+                    subscriber.dropped = True
+                    self._subscribers.discard(subscriber)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Registra um assinante. Retorna (assinante, eventos a reenviar, id atual);
+        eventos é None quando o cliente precisa de um snapshot completo.
+        """
+        subscriber = Subscriber()
+        with self._lock:
+            self._subscribers.add(subscriber)
+            replay = None
+            # Um id maior que o atual vem de antes de um restart do servidor
+            if last_event_id is not None and last_event_id <= self._last_id:
+                oldest = self._backlog[0][0] if self._backlog else self._last_id + 1
+                if oldest <= last_event_id + 1:
+                    replay = [event for event in self._backlog if event[0] > last_event_id]
+            return subscriber, replay, self._last_id
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    # ---- leituras (SSE e polling) ----
+
+    def stats(self):
+        """Estatísticas da visão + agentes Docker (formato de /api/stats)"""
+        stats = self.view.stats()
+        docker_agents = self.docker_agents
+
+        # Se não houver dados do Mem0, usar dados dos containers
+        if stats['total_agents'] == 0:
+            stats['total_agents'] = len(docker_agents)
+
+            # Criar estatísticas básicas dos containers
+            for agent in docker_agents:
+                agent_name = agent['name']
+                stats['agents'][agent_name] = {
+                    'name': agent_name,
+                    'executions': 0,
+                    'success_rate': 0,
+                    'error_count': 0,
+                    'avg_duration': 0,
+                    'min_duration': 0,
+                    'max_duration': 0,
+                    'status': agent['status']
+                }
+
+        # Adicionar informação de containers em execução
+        stats['docker_agents'] = docker_agents
+        stats['running_containers'] = len([a for a in docker_agents if 'running' in a['status'].lower()])
+        return stats
+
+    def snapshot(self):
+        return {
+            'stats': self.stats(),
+            'docker_agents': self.docker_agents,
+            'executions': self.view.recent(limit=20),
+            'task_lifecycle': self.task_lifecycle
+        }
+
+live_feed = LiveFeed(agent_log_view)
+
+def generate_pipeline_report(stats, recent_errors, docker_agents):
     """Gera relatório do pipeline com dados reais e agentes Docker"""
     report = """
 ╔════════════════════════════════════════╗
@@ -258,7 +962,7 @@ def generate_pipeline_report(logs, stats, docker_agents):
         for agent in docker_agents:
             report += f"  • {agent['name']} ({agent['type']}) - {agent['status']}\n"
     
-    if not logs:
+    if not stats['total_executions']:
         report += """
 ⚠️  Nenhum dado de execução disponível no Mem0
 
@@ -293,11 +997,10 @@ Status: Aguardando dados reais do Mem0...
         report += f"(✅ {agent_stats['success_rate']:.1f}% | ⏱️ {agent_stats['avg_duration']:.0f}ms)\n"
     
     # Adicionar problemas recentes
-    recent_errors = [log for log in logs if log['status'] == 'error'][:5]
     if recent_errors:
         report += "\n⚠️ Erros Recentes:\n"
         for error in recent_errors:
-            report += f"  • {error['agentName']}: {error.get('error', 'Erro desconhecido')[:50]}...\n"
+            report += f"  • {error['agentName']}: {(error.get('error') or 'Erro desconhecido')[:50]}...\n"
     
     report += f"\n🕐 Última atualização: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
     
@@ -323,162 +1026,96 @@ def register_execution():
     """Registra uma execução de agente"""
     data = request.json
     
-    success = register_agent_execution(
+    queued = register_agent_execution(
         agent_name=data.get('agentName', 'Unknown'),
         status=data.get('status', 'unknown'),
         task=data.get('task', 'No description'),
         duration=data.get('duration'),
-        error=data.get('error')
+        error=data.get('error'),
+        execution_id=data.get('executionId')
     )
     
-    return jsonify({'success': success})
+    # 202: aceito para envio em segundo plano; 503: buffer e disco cheios
+    if not queued:
+        return jsonify({'success': False, 'error': 'Execution buffer full'}), 503, {'Retry-After': '30'}
+    return jsonify({'success': True, 'queued': True}), 202
+
+@app.route('/api/register-execution/metrics')
+def register_execution_metrics():
+    """Métricas do envio em lote das execuções (buffer, disco, lag, tentativas)"""
+    return jsonify(execution_writer.stats())
 
 @app.route('/api/stats')
 def api_stats():
     """API endpoint para estatísticas gerais"""
-    # Cache de 30 segundos
-    if cache['last_update'] and (datetime.now() - cache['last_update']).seconds < 30:
-        logs = cache['data']
-    else:
-        logs = get_agent_logs()
-        cache['data'] = logs
-        cache['last_update'] = datetime.now()
-    
-    stats = calculate_stats(logs)
-    
-    # Sempre incluir agentes Docker
-    docker_agents = get_docker_agents()
-    
-    # Se não houver dados do Mem0, usar dados dos containers
-    if stats['total_agents'] == 0:
-        stats['total_agents'] = len(docker_agents)
-        
-        # Criar estatísticas básicas dos containers
-        for agent in docker_agents:
-            agent_name = agent['name']
-            stats['agents'][agent_name] = {
-                'name': agent_name,
-                'executions': 0,
-                'success_rate': 0,
-                'error_count': 0,
-                'avg_duration': 0,
-                'min_duration': 0,
-                'max_duration': 0,
-                'status': agent['status']
-            }
-    
-    # Adicionar informação de containers em execução
-    stats['docker_agents'] = docker_agents
-    stats['running_containers'] = len([a for a in docker_agents if 'running' in a['status'].lower()])
-    
-    return jsonify(stats)
+    live_feed.ensure_started()
+    return jsonify(live_feed.stats())
 
 @app.route('/api/task-lifecycle')
 def api_task_lifecycle():
     """API endpoint para tarefas em andamento/interrompidas (Task Lifecycle Memory)"""
-    try:
-        # Buscar tarefas do Guardian e outros agentes
-        response = requests.get(f"{MEM0_BRIDGE_URL}/mcp/list_memories/guardian-orchestrator")
-        
-        tasks = {
-            'in_progress': [],
-            'interrupted': [],
-            'recent_completed': [],
-            'total': 0
-        }
-        
-        if response.status_code == 200:
-            data = response.json()
-            memories = data.get('memories', [])
-            
-            for memory in memories:
-                content = memory.get('content', '')
-                metadata = memory.get('metadata', {})
-                
-                # Identificar tarefas por categoria ou tags
-                category = memory.get('category', '')
-                tags = memory.get('tags', [])
-                
-                # Tarefas em andamento
-                if 'task-in-progress' in tags or 'in_progress' in metadata.get('status', ''):
-                    tasks['in_progress'].append({
-                        'id': memory.get('id'),
-                        'task': metadata.get('task', content[:100]),
-                        'agent': metadata.get('agent', 'guardian'),
-                        'started_at': memory.get('created_at'),
-                        'context': metadata
-                    })
-                
-                # Tarefas interrompidas
-                elif 'interrupted' in tags or 'error' in metadata.get('status', ''):
-                    tasks['interrupted'].append({
-                        'id': memory.get('id'),
-                        'task': metadata.get('task', content[:100]),
-                        'agent': metadata.get('agent', 'guardian'),
-                        'error': metadata.get('error', 'Task was interrupted'),
-                        'stopped_at': memory.get('updated_at'),
-                        'context': metadata
-                    })
-                
-                # Tarefas completadas recentemente
-                elif 'completed' in metadata.get('status', ''):
-                    # Pegar apenas as últimas 24h
-                    created = datetime.fromisoformat(memory.get('created_at', '').replace('Z', '+00:00'))
-                    if (datetime.now(created.tzinfo) - created).total_seconds() < 86400:
-                        tasks['recent_completed'].append({
-                            'id': memory.get('id'),
-                            'task': metadata.get('task', content[:100]),
-                            'agent': metadata.get('agent', 'guardian'),
-                            'completed_at': memory.get('updated_at'),
-                            'duration': metadata.get('duration', 0)
-                        })
-        
-        tasks['total'] = len(tasks['in_progress']) + len(tasks['interrupted'])
-        return jsonify(tasks)
-        
-    except Exception as e:
-        print(f"Erro ao buscar task lifecycle: {e}")
-        return jsonify({
-            'in_progress': [],
-            'interrupted': [],
-            'recent_completed': [],
-            'total': 0,
-            'error': str(e)
-        })
+    live_feed.ensure_started()
+    return jsonify(live_feed.task_lifecycle)
+
+@app.route('/api/stream')
+def api_stream():
+    """Canal SSE: snapshot inicial e depois só os deltas do produtor compartilhado"""
+    live_feed.ensure_started()
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscriber, replay, current_id = live_feed.subscribe(last_event_id)
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            if replay is None:
+                yield format_sse(current_id, 'snapshot', json.dumps(live_feed.snapshot(), default=str))
+            else:
+                for event in replay:
+                    yield format_sse(*event)
+
+            while not subscriber.dropped or not subscriber.queue.empty():
+                try:
+                    event = subscriber.queue.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comentário SSE: mantém proxies abertos e detecta clientes que saíram
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(*event)
+        finally:
+            live_feed.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/executions')
 def api_executions():
     """API endpoint para execuções recentes"""
-    logs = get_agent_logs()
-    recent = get_recent_executions(logs)
-    return jsonify(recent)
+    live_feed.ensure_started()
+    return jsonify(agent_log_view.recent(limit=20))
 
 @app.route('/api/pipeline-report')
 def api_pipeline_report():
     """API endpoint para relatório do pipeline"""
-    logs = get_agent_logs()
-    stats = calculate_stats(logs)
-    docker_agents = get_docker_agents()
-    report = generate_pipeline_report(logs, stats, docker_agents)
+    live_feed.ensure_started()
+    stats = agent_log_view.stats()
+    recent_errors = agent_log_view.recent(limit=5, status='error')
+    docker_agents = live_feed.docker_agents
+    report = generate_pipeline_report(stats, recent_errors, docker_agents)
     return jsonify({'report': report})
 
 @app.route('/api/agent/<agent_name>')
 def api_agent_details(agent_name):
     """API endpoint para detalhes de um agente específico"""
-    logs = get_agent_logs()
-    
-    # Filtrar logs do agente
-    agent_logs = [log for log in logs if log['agentName'] == agent_name]
+    live_feed.ensure_started()
+    agent_stats = agent_log_view.agent_stats(agent_name)
     
-    if not agent_logs:
+    if agent_stats is None:
         return jsonify({'error': 'Agent not found'}), 404
     
-    # Calcular estatísticas específicas
-    stats = calculate_stats(agent_logs)
-    agent_stats = stats['agents'].get(agent_name, {})
-    
     # Histórico recente
-    recent_executions = sorted(agent_logs, key=lambda x: x['timestamp'], reverse=True)[:10]
+    recent_executions = agent_log_view.recent(limit=10, agent_name=agent_name)
     
     return jsonify({
         'name': agent_name,
@@ -489,7 +1126,8 @@ def api_agent_details(agent_name):
 @app.route('/api/docker-agents')
 def api_docker_agents():
     """API endpoint para agentes rodando no Docker"""
-    agents = get_docker_agents()
+    live_feed.ensure_started()
+    agents = live_feed.docker_agents
     return jsonify({
         'agents': agents,
         'total': len(agents),
@@ -499,11 +1137,12 @@ def api_docker_agents():
 @app.route('/api/tasks')
 def api_tasks():
     """API endpoint para dados de tarefas em tempo real"""
-    # Buscar dados reais do Mem0
-    real_logs = get_agent_logs(hours=48)  # Últimas 48 horas
+    # Execuções mais recentes da visão materializada (os totais vêm dos agregados)
+    live_feed.ensure_started()
+    real_logs = agent_log_view.recent(limit=50)
     
-    # Buscar agentes rodando no Docker
-    docker_agents = get_docker_agents()
+    # Agentes rodando no Docker (snapshot do produtor compartilhado)
+    docker_agents = live_feed.docker_agents
     running_agents = [a['name'] for a in docker_agents if 'running' in a['status'].lower()]
     
     # Mapear logs reais para formato de tarefas
@@ -651,21 +1290,16 @@ def api_tasks():
                 tasks.append(task)
                 task_id += 1
     
-    # Calcular estatísticas
-    total_tasks = len(tasks)
-    running_tasks = len([t for t in tasks if t['status'] == 'running'])
+    # Calcular estatísticas (janela de AGENT_LOG_WINDOW_HOURS da visão)
+    if real_logs:
+        total_tasks = agent_log_view.window_total()
+        running_tasks = agent_log_view.running_count(running_agents)
+    else:
+        total_tasks = len(tasks)
+        running_tasks = len([t for t in tasks if t['status'] == 'running'])
     
     # Tarefas completadas hoje
-    today = datetime.now().date()
-    completed_today = 0
-    for task in tasks:
-        if task['status'] == 'completed':
-            try:
-                task_date = datetime.fromisoformat(task['startTime'].replace('Z', '+00:00')).date()
-                if task_date == today:
-                    completed_today += 1
-            except:
-                pass
+    completed_today = agent_log_view.completed_on(datetime.now().date())
     
     # Ordenar tarefas por tempo (mais recentes primeiro)
     tasks.sort(key=lambda x: x['startTime'], reverse=True)
@@ -696,6 +1330,12 @@ def health():
         'mem0_connected': mem0_connected,
         'mem0_bridge_url': MEM0_BRIDGE_URL,
         'using_mock_data': False,
+        'agent_log_view': {
+            'last_refresh': agent_log_view.last_refresh.isoformat() if agent_log_view.last_refresh else None,
+            'last_error': agent_log_view.last_error
+        },
+        'stream_subscribers': live_feed.subscriber_count(),
+        'execution_writer': execution_writer.stats(),
         'timestamp': datetime.now().isoformat()
     })
 
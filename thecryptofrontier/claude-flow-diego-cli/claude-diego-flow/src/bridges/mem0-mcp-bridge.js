@@ -7,6 +7,8 @@
 import express from 'express';
 import cors from 'cors';
 import axios from 'axios';
+// list_memories com `since`: máximo de páginas lidas do Mem0 por chamada
+const LIST_SINCE_MAX_PAGES = 20;
 export class Mem0MCPBridge {
     constructor(chromaUrl = 'http://localhost:8000', port = 3002) {
         this.app = express();
@@ -26,6 +28,28 @@ export class Mem0MCPBridge {
             next();
         });
     }
+    /**
+     * Garante a coleção do usuário no ChromaDB (criada com embedding dummy)
+     */
+    async ensureUserCollection(user_id) {
+        const collectionName = `user_${user_id.replace(/[^a-zA-Z0-9]/g, '_')}`;
+        try {
+            // Verificar se coleção existe
+            await axios.get(`${this.chromaUrl}/api/v2/collections/${collectionName}`);
+        }
+        catch (_a) {
+            // Criar coleção com embedding function dummy (sem embeddings)
+            await axios.post(`${this.chromaUrl}/api/v2/collections`, {
+                name: collectionName,
+                metadata: { user_id, description: 'MCP Memory Collection' },
+                embedding_function: {
+                    name: 'dummy',
+                    dimension: 1
+                }
+            });
+        }
+        return collectionName;
+    }
     setupRoutes() {
         // Health check
         this.app.get('/health', async (req, res) => {
@@ -57,22 +81,7 @@ export class Mem0MCPBridge {
             try {
                 const { content, user_id, metadata, category, tags } = req.body;
                 // Usar ChromaDB diretamente - criar coleção se não existir
-                const collectionName = `user_${user_id.replace(/[^a-zA-Z0-9]/g, '_')}`;
-                try {
-                    // Verificar se coleção existe
-                    await axios.get(`${this.chromaUrl}/api/v2/collections/${collectionName}`);
-                }
-                catch (_a) {
-                    // Criar coleção com embedding function dummy (sem embeddings)
-                    await axios.post(`${this.chromaUrl}/api/v2/collections`, {
-                        name: collectionName,
-                        metadata: { user_id, description: 'MCP Memory Collection' },
-                        embedding_function: {
-                            name: 'dummy',
-                            dimension: 1
-                        }
-                    });
-                }
+                const collectionName = await this.ensureUserCollection(user_id);
                 // Adicionar documento à coleção com embedding dummy
                 const documentId = `doc_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
                 const response = await axios.post(`${this.chromaUrl}/api/v2/collections/${collectionName}/add`, {
@@ -85,7 +94,8 @@ export class Mem0MCPBridge {
                             category,
                             tags: (tags === null || tags === void 0 ? void 0 : tags.join(',')) || '',
                             user_id,
-                            timestamp: new Date().toISOString()
+                            // Hora do evento informada por quem registrou; senão, a do recebimento
+                            timestamp: (metadata === null || metadata === void 0 ? void 0 : metadata.timestamp) || new Date().toISOString()
                         }]
                 });
                 // Converter resposta para formato MCP
@@ -105,6 +115,45 @@ export class Mem0MCPBridge {
                 });
             }
         });
+        // MCP Memory Add em lote: um `add` no ChromaDB por usuário em vez de um por memória
+        this.app.post('/mcp/add_memories', async (req, res) => {
+            try {
+                const memories = req.body.memories || [];
+                const byUser = new Map();
+                for (const memory of memories) {
+                    byUser.set(memory.user_id, [...(byUser.get(memory.user_id) || []), memory]);
+                }
+                const ids = [];
+                for (const [user_id, userMemories] of byUser) {
+                    const collectionName = await this.ensureUserCollection(user_id);
+                    const timestamp = new Date().toISOString();
+                    const documentIds = userMemories.map(() => `doc_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`);
+                    await axios.post(`${this.chromaUrl}/api/v2/collections/${collectionName}/add`, {
+                        ids: documentIds,
+                        documents: userMemories.map(memory => memory.content),
+                        embeddings: userMemories.map(() => [0.1]), // Embedding dummy para satisfazer a API
+                        metadatas: userMemories.map(({ metadata, category, tags }) => ({
+                            ...metadata,
+                            source: 'mcp-bridge',
+                            category,
+                            tags: (tags === null || tags === void 0 ? void 0 : tags.join(',')) || '',
+                            user_id,
+                            // Eventos reenviados (spill/retry) mantêm a hora em que aconteceram
+                            timestamp: (metadata === null || metadata === void 0 ? void 0 : metadata.timestamp) || timestamp
+                        }))
+                    });
+                    ids.push(...documentIds);
+                }
+                res.json({ added: ids.length, ids });
+            }
+            catch (error) {
+                console.error('Erro no add_memories:', error);
+                res.status(500).json({
+                    error: 'Failed to add memories',
+                    details: error.message
+                });
+            }
+        });
         // MCP Memory Search (compatibilidade com mcp__DiegoTools__mem0_search_memory)
         this.app.post('/mcp/search_memory', async (req, res) => {
             var _a;
@@ -143,17 +192,53 @@ export class Mem0MCPBridge {
             var _a;
             try {
                 const { user_id } = req.params;
-                const { limit = 50 } = req.query;
-                const response = await axios.get(`${this.mem0OSSUrl}/v1/memories`, {
-                    params: { user_id, limit }
-                });
-                // Converter para formato MCP
-                const mcpMemories = ((_a = response.data.memories) === null || _a === void 0 ? void 0 : _a.map((memory) => ({
+                const { limit = 50, since } = req.query;
+                const toMcp = (memory) => ({
                     id: memory.id,
                     content: memory.memory || memory.content,
                     created_at: memory.created_at,
                     metadata: memory.metadata
-                }))) || [];
+                });
+                let mcpMemories;
+                if (!since) {
+                    const response = await axios.get(`${this.mem0OSSUrl}/v1/memories`, {
+                        params: { user_id, limit }
+                    });
+                    // Converter para formato MCP
+                    mcpMemories = ((_a = response.data.memories) === null || _a === void 0 ? void 0 : _a.map(toMcp)) || [];
+                }
+                else {
+                    // Leitura incremental: só memórias a partir de `since` (inclusivo).
+                    // O filtro vai para o Mem0; se ele ignorar `since`, as páginas são
+                    // percorridas até uma sem nada novo (ou curta), para não perder
+                    // memórias novas que ficariam além da primeira página
+                    const pageSize = Number(limit) || 50;
+                    const seen = new Set();
+                    mcpMemories = [];
+                    for (let page = 1; page <= LIST_SINCE_MAX_PAGES; page++) {
+                        const response = await axios.get(`${this.mem0OSSUrl}/v1/memories`, {
+                            params: { user_id, limit: pageSize, page, page_size: pageSize, since }
+                        });
+                        const batch = response.data.memories || [];
+                        let fresh = 0;
+                        let repeated = 0;
+                        for (const memory of batch) {
+                            if (seen.has(memory.id)) {
+                                repeated++;
+                                continue;
+                            }
+                            seen.add(memory.id);
+                            if (memory.created_at && memory.created_at >= String(since)) {
+                                mcpMemories.push(toMcp(memory));
+                                fresh++;
+                            }
+                        }
+                        // Página curta, sem nada novo ou repetida (Mem0 sem paginação): fim
+                        if (batch.length < pageSize || fresh === 0 || repeated === batch.length) {
+                            break;
+                        }
+                    }
+                }
                 res.json({
                     memories: mcpMemories,
                     total: mcpMemories.length,
@@ -305,6 +390,7 @@ export class Mem0MCPBridge {
                 error: 'Endpoint not found',
                 available_endpoints: [
                     'POST /mcp/add_memory',
+                    'POST /mcp/add_memories',
                     'POST /mcp/search_memory',
                     'GET /mcp/list_memories/:user_id',
                     'DELETE /mcp/delete_memories',
@@ -0,0 +1,344 @@
+"""In-memory container snapshot kept current by the `docker events` stream.
+
+python-on-whales `Container` objects re-run `docker inspect` on almost every
+attribute access, so listing N containers used to cost several subprocesses
+per container. The cache primes itself with one `docker container list` plus
+one batched `docker container inspect`, then a background thread follows
+`docker events` and re-inspects only the container an event refers to.
+Handlers read immutable `ContainerRecord`s through name/label/network/status
+indexes.
+"""
+import json
+import logging
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Container actions that do not change anything the cache exposes
+IGNORED_ACTIONS = (
+    "exec_", "attach", "detach", "resize", "top", "export", "copy",
+    "archive-path", "extract-to-dir", "commit",
+)
+
+# Containers per `docker container inspect` call while priming
+INSPECT_BATCH_SIZE = 100
+
+# Seconds to wait before restarting a dead event stream
+RECONNECT_DELAY = 2.0
+
+# The watcher reuses a snapshot primed this recently (e.g. by ensure_ready)
+PRIME_REUSE_SECONDS = 5.0
+
+# stdout carries the MCP JSON-RPC stream: diagnostics go to logging (stderr)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ContainerRecord:
+    id: str
+    name: str
+    image: str
+    status: str
+    created: str
+    exit_code: Optional[int]
+    health: Optional[str]
+    labels: Dict[str, str] = field(default_factory=dict)
+    networks: Tuple[str, ...] = ()
+    # (host_ip, host_port, container_port)
+    ports: Tuple[Tuple[str, str, str], ...] = ()
+
+    @classmethod
+    def from_inspect(cls, data: Dict[str, Any]) -> "ContainerRecord":
+        config = data.get("Config") or {}
+        state = data.get("State") or {}
+        settings = data.get("NetworkSettings") or {}
+
+        ports = []
+        for container_port, bindings in (settings.get("Ports") or {}).items():
+            for binding in bindings or []:
+                host_port = binding.get("HostPort", "")
+                if host_port:
+                    ports.append((binding.get("HostIp") or "0.0.0.0", host_port, container_port))
+
+        return cls(
+            id=data["Id"],
+            name=data.get("Name", "").lstrip("/"),
+            image=config.get("Image", ""),
+            status=state.get("Status", "unknown"),
+            created=data.get("Created", ""),
+            exit_code=state.get("ExitCode"),
+            health=(state.get("Health") or {}).get("Status"),
+            labels=dict(config.get("Labels") or {}),
+            networks=tuple(settings.get("Networks") or {}),
+            ports=tuple(ports),
+        )
+
+
+class ContainerCache:
+    def __init__(self, docker_cmd: Iterable[str] = ("docker",)):
+        self.docker_cmd = list(docker_cmd)
+        self._lock = threading.RLock()
+        self._prime_lock = threading.Lock()
+        self._records: Dict[str, ContainerRecord] = {}
+        self._by_name: Dict[str, str] = {}
+        self._by_label: Dict[str, Dict[str, Set[str]]] = {}
+        self._by_network: Dict[str, Set[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        self._primed = False
+        # time.monotonic() when the last prime finished, wall-clock time it listed at
+        self._primed_at = 0.0
+        self._snapshot_time = 0.0
+        self._watching = False
+        self._watcher: Optional[threading.Thread] = None
+        self._events_process: Optional[subprocess.Popen] = None
+        self.stats = {"primes": 0, "events": 0, "refreshes": 0}
+
+    # ---- docker CLI -------------------------------------------------------
+
+    def _run(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(self.docker_cmd + list(args), capture_output=True, text=True)
+
+    def _inspect(self, references: List[str]) -> List[Dict[str, Any]]:
+        """Batched inspect. Containers that vanished in the meantime are skipped."""
+        if not references:
+            return []
+        result = self._run("container", "inspect", *references)
+        try:
+            return json.loads(result.stdout) if result.stdout.strip() else []
+        except json.JSONDecodeError:
+            raise RuntimeError(f"Unexpected docker inspect output: {result.stderr or result.stdout}")
+
+    # ---- indexes ----------------------------------------------------------
+
+    def _index(self, record: ContainerRecord) -> None:
+        self._records[record.id] = record
+        self._by_name[record.name] = record.id
+        for key, value in record.labels.items():
+            self._by_label.setdefault(key, {}).setdefault(value, set()).add(record.id)
+        for network in record.networks:
+            self._by_network.setdefault(network, set()).add(record.id)
+        self._by_status.setdefault(record.status, set()).add(record.id)
+
+    def _unindex(self, container_id: str) -> None:
+        record = self._records.pop(container_id, None)
+        if record is None:
+            return
+        if self._by_name.get(record.name) == container_id:
+            del self._by_name[record.name]
+        for key, value in record.labels.items():
+            self._by_label.get(key, {}).get(value, set()).discard(container_id)
+        for network in record.networks:
+            self._by_network.get(network, set()).discard(container_id)
+        self._by_status.get(record.status, set()).discard(container_id)
+
+    def _store(self, data: Dict[str, Any]) -> ContainerRecord:
+        record = ContainerRecord.from_inspect(data)
+        with self._lock:
+            self._unindex(record.id)
+            self._index(record)
+        return record
+
+    # ---- priming and events -----------------------------------------------
+
+    def prime(self, force: bool = True, max_age: Optional[float] = None) -> float:
+        """Rebuild the whole snapshot (one list + batched inspects).
+
+        With `max_age`, a forced prime is skipped when the current snapshot
+        finished priming less than `max_age` seconds ago. Returns the
+        wall-clock time the snapshot was listed at.
+        """
+        with self._prime_lock:
+            fresh = (
+                self._primed and max_age is not None
+                and time.monotonic() - self._primed_at < max_age
+            )
+            if not self._primed or (force and not fresh):
+                self._prime()
+            return self._snapshot_time
+
+    def _prime(self) -> None:
+        snapshot_time = time.time()
+        listed = self._run("container", "list", "--all", "--quiet", "--no-trunc")
+        if listed.returncode != 0:
+            raise RuntimeError(f"docker container list failed: {listed.stderr.strip()}")
+        ids = listed.stdout.split()
+
+        records = []
+        for start in range(0, len(ids), INSPECT_BATCH_SIZE):
+            records.extend(ContainerRecord.from_inspect(d) for d in self._inspect(ids[start:start + INSPECT_BATCH_SIZE]))
+
+        with self._lock:
+            self._records.clear()
+            self._by_name.clear()
+            self._by_label.clear()
+            self._by_network.clear()
+            self._by_status.clear()
+            for record in records:
+                self._index(record)
+            self._primed = True
+            self._primed_at = time.monotonic()
+            self._snapshot_time = snapshot_time
+            self.stats["primes"] += 1
+
+    def refresh(self, reference: str) -> Optional[ContainerRecord]:
+        """Re-inspect one container (by id or name) and update the snapshot."""
+        self.stats["refreshes"] += 1
+        data = self._inspect([reference])
+        if data:
+            return self._store(data[0])
+        with self._lock:
+            container_id = self._by_name.get(reference) or (reference if reference in self._records else None)
+            if container_id:
+                self._unindex(container_id)
+        return None
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        self.stats["events"] += 1
+        event_type = event.get("Type")
+        action = event.get("Action", "")
+        actor = event.get("Actor") or {}
+
+        if event_type == "network":
+            # connect/disconnect carry the container id in the attributes
+            container_id = (actor.get("Attributes") or {}).get("container")
+            if container_id and action in ("connect", "disconnect"):
+                self.refresh(container_id)
+            return
+        if event_type != "container" or action.startswith(IGNORED_ACTIONS):
+            return
+
+        container_id = actor.get("ID") or event.get("id")
+        if not container_id:
+            return
+        if action == "destroy":
+            with self._lock:
+                self._unindex(container_id)
+        else:
+            self.refresh(container_id)
+
+    def _watch(self) -> None:
+        while self._watching:
+            try:
+                # ensure_ready() may have primed a moment ago; no need to do it twice
+                since = self.prime(max_age=PRIME_REUSE_SECONDS)
+                # Events since the list started are replayed, so nothing is lost
+                # between priming and the stream being attached
+                self._events_process = subprocess.Popen(
+                    self.docker_cmd + [
+                        "system", "events", "--format", "{{json .}}",
+                        "--since", str(int(since) - 1),
+                    ],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                for line in self._events_process.stdout:
+                    if not self._watching:
+                        break
+                    try:
+                        self.handle_event(json.loads(line))
+                    except (json.JSONDecodeError, RuntimeError):
+                        continue
+            except Exception as e:
+                logger.warning("Container cache: event stream error: %s", e)
+            finally:
+                with self._lock:
+                    # Without the stream the snapshot can go stale
+                    self._primed = False
+                if self._events_process and self._events_process.poll() is None:
+                    self._events_process.kill()
+            if self._watching:
+                time.sleep(RECONNECT_DELAY)
+
+    def start(self) -> None:
+        """Start following docker events in a daemon thread (idempotent)."""
+        with self._lock:
+            if self._watching:
+                return
+            self._watching = True
+            self._watcher = threading.Thread(target=self._watch, name="docker-events", daemon=True)
+            self._watcher.start()
+
+    def stop(self) -> None:
+        self._watching = False
+        if self._events_process and self._events_process.poll() is None:
+            self._events_process.kill()
+
+    def ensure_ready(self) -> None:
+        """Make sure the snapshot is usable; primes synchronously when the stream is down."""
+        self.start()
+        if not self._primed:
+            self.prime(force=False)
+
+    # ---- queries ----------------------------------------------------------
+
+    def get(self, reference: str) -> Optional[ContainerRecord]:
+        """Record by exact name, full id or unique id prefix."""
+        with self._lock:
+            container_id = self._by_name.get(reference.lstrip("/"))
+            if container_id:
+                return self._records.get(container_id)
+            if reference in self._records:
+                return self._records[reference]
+            matches = [cid for cid in self._records if cid.startswith(reference)] if len(reference) >= 4 else []
+            return self._records[matches[0]] if len(matches) == 1 else None
+
+    def with_label(self, key: str, value: Optional[str] = None) -> Set[str]:
+        with self._lock:
+            values = self._by_label.get(key, {})
+            if value is not None:
+                return set(values.get(value, ()))
+            return set().union(*values.values()) if values else set()
+
+    def query(
+        self,
+        all: bool = True,
+        status: Optional[str] = None,
+        name: Optional[str] = None,
+        id_prefix: Optional[str] = None,
+        label: Optional[str] = None,
+        network: Optional[str] = None,
+    ) -> List[ContainerRecord]:
+        """Containers matching every given filter, newest first (like `docker ps`).
+
+        Indexed filters (status, label, network, running-only) narrow the
+        candidate set first; name substring and id prefix are then checked
+        on the candidates only.
+        """
+        with self._lock:
+            candidates: Optional[Set[str]] = None
+
+            def narrow(ids: Iterable[str]) -> None:
+                nonlocal candidates
+                ids = set(ids)
+                candidates = ids if candidates is None else candidates & ids
+
+            if not all:
+                narrow(self._by_status.get("running", ()))
+            if status:
+                narrow(self._by_status.get(status, ()))
+            if label:
+                key, _, value = label.partition("=")
+                narrow(self.with_label(key, value if "=" in label else None))
+            if network:
+                narrow(self._by_network.get(network, ()))
+
+            records = [self._records[cid] for cid in (self._records if candidates is None else candidates)]
+
+        if name:
+            records = [r for r in records if name in r.name]
+        if id_prefix:
+            records = [r for r in records if r.id.startswith(id_prefix)]
+        return sorted(records, key=lambda r: r.created, reverse=True)
+
+
+_container_cache: Optional[ContainerCache] = None
+
+
+def get_container_cache(docker_cmd: Iterable[str] = ("docker",)) -> ContainerCache:
+    global _container_cache
+    if _container_cache is None:
+        _container_cache = ContainerCache(docker_cmd)
+    return _container_cache
@@ -6,6 +6,11 @@ import platform
 from python_on_whales import DockerClient
 from mcp.types import TextContent, Tool, Prompt, PromptArgument, GetPromptResult, PromptMessage
 from .docker_executor import DockerComposeExecutor
+from .container_cache import ContainerRecord, get_container_cache
+from . import log_stream
+from .log_stream import Budget, LogPage, ProgressCallback
+from .stats_sampler import COUNTERS, get_stats_sampler
+from .operations import get_operations
 
 # Ensure docker is in PATH
 if '/usr/bin' not in os.environ.get('PATH', ''):
@@ -14,6 +19,62 @@ if '/usr/bin' not in os.environ.get('PATH', ''):
 docker_client = DockerClient()
 
 
+def operations():
+    """Bounded, single-flight executor for every blocking docker call."""
+    return get_operations(docker_client.client_config.docker_cmd)
+
+
+async def container_cache():
+    """Container snapshot, primed on first use and then kept current by docker events."""
+    cache = get_container_cache(docker_client.client_config.docker_cmd)
+    # Concurrent first calls share one prime
+    await operations().run("cache.ensure_ready", cache.ensure_ready, key="snapshot")
+    return cache
+
+
+async def lookup_container(reference: str) -> ContainerRecord | None:
+    """Snapshot record by name or id; on a miss, inspect once in case the event hasn't arrived yet."""
+    cache = await container_cache()
+    record = cache.get(reference)
+    if record is None:
+        record = await operations().run("container.inspect", cache.refresh, reference, key=reference)
+    return record
+
+
+async def refresh_container(reference: str) -> None:
+    """Re-inspect a container we just changed so the next read sees it (read-your-writes)."""
+    try:
+        cache = get_container_cache(docker_client.client_config.docker_cmd)
+        await operations().run("container.inspect", cache.refresh, reference)
+    except Exception:
+        pass  # The event stream will catch up
+
+
+async def resync_containers() -> None:
+    """Rebuild the snapshot after operations that touch many containers (compose)."""
+    try:
+        cache = get_container_cache(docker_client.client_config.docker_cmd)
+        await operations().run("cache.prime", cache.prime, key="snapshot")
+    except Exception:
+        pass
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def format_ports(record: ContainerRecord, with_host_ip: bool = True) -> str:
+    if with_host_ip:
+        ports = [f"{host_ip}:{host_port}->{container_port}" for host_ip, host_port, container_port in record.ports]
+    else:
+        ports = [f"{host_port}->{container_port}" for _, host_port, container_port in record.ports]
+    return ", ".join(ports) if ports else "No ports"
+
+
 async def parse_port_mapping(host_key: str, container_port: str | int) -> tuple[str, str] | tuple[str, str, str]:
     if '/' in str(host_key):
         host_port, protocol = host_key.split('/')
@@ -50,10 +111,14 @@ class DockerHandlers:
                 port_mappings.append(mapping)
 
             async def pull_and_run():
-                if not docker_client.image.exists(image):
-                    await asyncio.to_thread(docker_client.image.pull, image)
-
-                container = await asyncio.to_thread(
+                # Off the event loop; concurrent creates of the same image share one check and one pull
+                exists = await operations().run("image.exists", docker_client.image.exists, image, key=image, ttl=30)
+                if not exists:
+                    await operations().run("image.pull", docker_client.image.pull, image, key=image)
+                    operations().invalidate("image.exists", "image.list")
+
+                container = await operations().run(
+                    "container.run",
                     docker_client.container.run,
                     image,
                     name=container_name,
@@ -64,7 +129,11 @@ class DockerHandlers:
                 return container
 
             container = await asyncio.wait_for(pull_and_run(), timeout=DockerHandlers.TIMEOUT_AMOUNT)
-            return [TextContent(type="text", text=f"Created container '{container.name}' (ID: {container.id})")]
+            container_id = container.id
+            await refresh_container(container_id)
+            record = (await container_cache()).get(container_id)
+            name = record.name if record else container_name
+            return [TextContent(type="text", text=f"Created container '{name}' (ID: {container_id})")]
         except asyncio.TimeoutError:
             return [TextContent(type="text", text=f"Operation timed out after {DockerHandlers.TIMEOUT_AMOUNT} seconds")]
         except Exception as e:
@@ -103,6 +172,7 @@ class DockerHandlers:
                 result = await DockerHandlers._deploy_stack(compose_path, project_name, debug_info)
                 return [TextContent(type="text", text=result)]
             finally:
+                await resync_containers()
                 if cleanup_needed:
                     DockerHandlers._cleanup_files(compose_path)
 
@@ -181,7 +251,7 @@ class DockerHandlers:
             print(f"Warning during cleanup: {str(e)}")
 
     @staticmethod
-    async def handle_get_logs(arguments: Dict[str, Any]) -> List[TextContent]:
+    async def handle_get_logs(arguments: Dict[str, Any], progress: ProgressCallback | None = None) -> List[TextContent]:
         debug_info = []
         try:
             container_name = arguments.get("container_name")
@@ -194,40 +264,48 @@ class DockerHandlers:
             timestamps = arguments.get("timestamps", False)
             since = arguments.get("since", None)
             until = arguments.get("until", None)
+            budget, cursors, pattern = DockerHandlers._log_paging(arguments)
 
             debug_info.append(f"Fetching logs for container '{container_name}' (tail={tail}, follow={follow}, timestamps={timestamps})")
             
             # First, check if container exists and get its current state
             try:
-                container_info = await asyncio.to_thread(docker_client.container.inspect, container_name)
-                container_state = container_info.state.status
-                debug_info.append(f"Container state: {container_state}")
-                
-                if container_state in ["dead", "removing"]:
-                    return [TextContent(type="text", text=f"Container '{container_name}' is {container_state} and cannot provide logs")]
+                record = await lookup_container(container_name)
+                if record:
+                    debug_info.append(f"Container state: {record.status}")
+                    
+                    if record.status in ["dead", "removing"]:
+                        return [TextContent(type="text", text=f"Container '{container_name}' is {record.status} and cannot provide logs")]
             except Exception as inspect_error:
                 debug_info.append(f"Could not inspect container: {str(inspect_error)}")
                 # Continue anyway, the logs command might still work
             
-            # Build kwargs for logs command
-            log_kwargs = {
-                "tail": tail,
-                "follow": follow,
-                "timestamps": timestamps
-            }
-            if since:
-                log_kwargs["since"] = since
-            if until:
-                log_kwargs["until"] = until
-            
-            # Get logs
-            logs = await asyncio.to_thread(docker_client.container.logs, container_name, **log_kwargs)
-            
-            # Format the output
-            output = f"Logs for container '{container_name}'"
-            if since or until:
-                output += f" (from {since or 'start'} to {until or 'now'})"
-            output += f":\n{logs}"
+            # Read at most one page (max_lines/max_bytes); docker logs is killed once it is full
+            docker_cmd = docker_client.client_config.docker_cmd
+            page = LogPage()
+            if follow:
+                follow_seconds = arguments.get("follow_seconds", log_stream.DEFAULT_FOLLOW_SECONDS)
+                streamed = await DockerHandlers._follow(
+                    docker_cmd, [(container_name, "", cursors.get(container_name))],
+                    budget, page, progress, tail, since, pattern, timestamps, follow_seconds
+                )
+                if page.errors and not page.streamed:
+                    raise RuntimeError("\n".join(page.errors))
+                output = f"Followed logs for container '{container_name}' for up to {follow_seconds}s"
+                output += f":\n{streamed}" if streamed else " (sent as progress updates)"
+            else:
+                await log_stream.read_page(
+                    docker_cmd, container_name, budget, page,
+                    cursor=cursors.get(container_name), tail=tail, since=since, until=until, pattern=pattern
+                )
+                logs = "\n".join(line.render(timestamps) for line in page.lines)
+                
+                # Format the output
+                output = f"Logs for container '{container_name}'"
+                if since or until:
+                    output += f" (from {since or 'start'} to {until or 'now'})"
+                output += f":\n{logs}"
+            output += f"\n{page.footer(budget)}"
 
             return [TextContent(type="text", text=output)]
         except Exception as e:
@@ -241,6 +319,31 @@ class DockerHandlers:
                 debug_output = "\n".join(debug_info)
                 return [TextContent(type="text", text=f"Error retrieving logs: {error_msg}\n\nDebug Information:\n{debug_output}")]
 
+    @staticmethod
+    def _log_paging(arguments: Dict[str, Any]) -> tuple[Budget, Dict[str, log_stream.Cursor], Any]:
+        budget = Budget(
+            max_lines=max(1, int(arguments.get("max_lines", log_stream.DEFAULT_MAX_LINES))),
+            max_bytes=max(1, int(arguments.get("max_bytes", log_stream.DEFAULT_MAX_BYTES)))
+        )
+        cursors = log_stream.decode_cursor(arguments.get("cursor"))
+        pattern = log_stream.compile_filter(arguments.get("grep"))
+        return budget, cursors, pattern
+
+    @staticmethod
+    async def _follow(docker_cmd, containers, budget, page, progress, tail, since, pattern, timestamps, follow_seconds) -> str:
+        """Follow logs as progress chunks; without a progress channel, return what was collected."""
+        collected: List[str] = []
+
+        async def collect(chunk: str):
+            collected.append(chunk)
+
+        await log_stream.follow_logs(
+            docker_cmd, containers, budget, page, progress or collect,
+            tail=tail, since=since, pattern=pattern, timestamps=timestamps,
+            follow_seconds=float(follow_seconds)
+        )
+        return "\n".join(collected)
+
     @staticmethod
     async def handle_list_containers(arguments: Dict[str, Any] | None) -> List[TextContent]:
         debug_info = []
@@ -250,93 +353,32 @@ class DockerHandlers:
             
             debug_info.append(f"Listing Docker containers (all={show_all}, filters={filters})")
             
-            # Get all containers first
-            containers = await asyncio.to_thread(docker_client.container.list, all=show_all)
-            
-            # Apply filters manually if needed
-            if filters:
-                filtered_containers = []
-                for c in containers:
-                    # Status filter
-                    if filters.get("status") and c.state.status != filters["status"]:
-                        continue
-                    
-                    # Name filter (pattern matching)
-                    if filters.get("name") and filters["name"] not in c.name:
-                        continue
-                    
-                    # ID filter (prefix matching)
-                    if filters.get("id") and not c.id.startswith(filters["id"]):
-                        continue
-                    
-                    # Label filter
-                    if filters.get("label"):
-                        label_match = False
-                        if "=" in filters["label"]:
-                            key, value = filters["label"].split("=", 1)
-                            if c.config.labels.get(key) == value:
-                                label_match = True
-                        else:
-                            # Just check if label key exists
-                            if filters["label"] in c.config.labels:
-                                label_match = True
-                        if not label_match:
-                            continue
-                    
-                    # Network filter
-                    if filters.get("network"):
-                        try:
-                            inspect_data = await asyncio.to_thread(docker_client.container.inspect, c.name)
-                            if filters["network"] not in inspect_data.network_settings.networks:
-                                continue
-                        except:
-                            continue
-                    
-                    filtered_containers.append(c)
-                containers = filtered_containers
+            # Answer from the snapshot: indexed filters narrow the candidates,
+            # no per-container docker calls
+            cache = await container_cache()
+            containers = cache.query(
+                all=show_all,
+                status=filters.get("status"),
+                name=filters.get("name"),
+                id_prefix=filters.get("id"),
+                label=filters.get("label"),
+                network=filters.get("network"),
+            )
             
             container_info = []
             for c in containers:
-                ports = []
-                
-                # Try to get port bindings from inspect data
-                try:
-                    inspect_data = await asyncio.to_thread(docker_client.container.inspect, c.name)
-                    port_bindings = inspect_data.network_settings.ports
-                    
-                    if port_bindings:
-                        for container_port, host_bindings in port_bindings.items():
-                            if host_bindings:
-                                for binding in host_bindings:
-                                    host_ip = binding.get('HostIp', '0.0.0.0')
-                                    host_port = binding.get('HostPort', '')
-                                    if host_port:
-                                        ports.append(f"{host_ip}:{host_port}->{container_port}")
-                except:
-                    # Fallback to basic port info
-                    if hasattr(c, 'ports') and c.ports:
-                        for port_mapping in c.ports.items():
-                            ports.append(f"{port_mapping[0]}->{port_mapping[1]}")
-                
-                ports_str = ", ".join(ports) if ports else "No ports"
-                
-                status = c.state.status
-                if status == "running" and hasattr(c.state, 'started_at'):
-                    status = f"Up {c.state.running_for}" if hasattr(c.state, 'running_for') else "Running"
+                status = c.status
+                if status == "running":
+                    status = "Running"
                     
                     # Check health status
-                    try:
-                        if hasattr(inspect_data.state, 'health') and inspect_data.state.health:
-                            health_status = inspect_data.state.health.status
-                            if health_status:
-                                status = f"{status} ({health_status})"
-                    except:
-                        pass
+                    if c.health:
+                        status = f"{status} ({c.health})"
                         
                 elif status == "exited":
-                    status = f"Exited ({c.state.exit_code})"
+                    status = f"Exited ({c.exit_code})"
                 
-                info = f"• {c.name} ({c.id[:12]})\n  Image: {c.config.image}\n  Status: {status}\n  Ports: {ports_str}"
+                info = f"• {c.name} ({c.id[:12]})\n  Image: {c.image}\n  Status: {status}\n  Ports: {format_ports(c)}"
                 container_info.append(info)
             
             result = "\n\n".join(container_info) if container_info else "No containers found"
@@ -366,7 +408,8 @@ class DockerHandlers:
             if not container_name:
                 raise ValueError("Missing required container_name")
             
-            await asyncio.to_thread(docker_client.container.stop, container_name)
+            await operations().run("container.stop", docker_client.container.stop, container_name)
+            await refresh_container(container_name)
             
             return [TextContent(type="text", text=f"Successfully stopped container '{container_name}'")]
         except Exception as e:
@@ -379,7 +422,8 @@ class DockerHandlers:
             if not container_name:
                 raise ValueError("Missing required container_name")
             
-            await asyncio.to_thread(docker_client.container.start, container_name)
+            await operations().run("container.start", docker_client.container.start, container_name)
+            await refresh_container(container_name)
             
             return [TextContent(type="text", text=f"Successfully started container '{container_name}'")]
         except Exception as e:
@@ -397,13 +441,14 @@ class DockerHandlers:
             # Check if container is running and force is not set
             if not force:
                 try:
-                    container_info = await asyncio.to_thread(docker_client.container.inspect, container_name)
-                    if container_info.state.status == "running":
+                    record = await lookup_container(container_name)
+                    if record and record.status == "running":
                         return [TextContent(type="text", text=f"Container '{container_name}' is running. Use force=true to remove it, or stop it first.")]
                 except:
                     pass
             
-            await asyncio.to_thread(docker_client.container.remove, container_name, force=force)
+            await operations().run("container.remove", docker_client.container.remove, container_name, force=force)
+            await refresh_container(container_name)
             
             return [TextContent(type="text", text=f"Successfully removed container '{container_name}'")]
         except Exception as e:
@@ -412,22 +457,25 @@ class DockerHandlers:
     @staticmethod
     async def handle_list_images(arguments: Dict[str, Any] | None) -> List[TextContent]:
         try:
-            images = await asyncio.to_thread(docker_client.image.list)
+            # One list + one batched inspect, reused for a few seconds
+            ops = operations()
+            images = await ops.run("image.list", ops.list_images, key="all", ttl=5)
             
             image_info = []
             for img in images:
                 # Get tags
-                tags = img.repo_tags if hasattr(img, 'repo_tags') else []
+                tags = img.get("RepoTags") or []
                 tag_str = ", ".join(tags) if tags else "<none>"
                 
                 # Get size
-                size_mb = img.size / (1024 * 1024) if hasattr(img, 'size') else 0
+                size_mb = img.get("Size", 0) / (1024 * 1024)
                 size_str = f"{size_mb:.1f}MB"
                 
                 # Get created time
-                created = img.attrs.get('Created', 'Unknown') if hasattr(img, 'attrs') else 'Unknown'
+                created = img.get("Created", "Unknown")
                 
-                info = f"• {tag_str}\n  ID: {img.id[:12]}\n  Size: {size_str}\n  Created: {created}"
+                image_id = img.get("Id", "").removeprefix("sha256:")
+                info = f"• {tag_str}\n  ID: {image_id[:12]}\n  Size: {size_str}\n  Created: {created}"
                 image_info.append(info)
             
             result = "\n\n".join(image_info) if image_info else "No images found"
@@ -444,7 +492,8 @@ class DockerHandlers:
                 raise ValueError("Missing required image name")
             
             # Pull the image
-            result = await asyncio.to_thread(docker_client.image.pull, image)
+            result = await operations().run("image.pull", docker_client.image.pull, image, key=image)
+            operations().invalidate("image.exists", "image.list")
             
             return [TextContent(type="text", text=f"Successfully pulled image '{image}'")]
         except Exception as e:
@@ -460,7 +509,8 @@ class DockerHandlers:
                 raise ValueError("Missing required image name or ID")
             
             # Remove the image
-            await asyncio.to_thread(docker_client.image.remove, image, force=force)
+            await operations().run("image.remove", docker_client.image.remove, image, force=force)
+            operations().invalidate("image.exists", "image.list")
             
             return [TextContent(type="text", text=f"Successfully removed image '{image}'")]
         except Exception as e:
@@ -471,21 +521,26 @@ class DockerHandlers:
         try:
             filters = arguments.get("filters", {}) if arguments else {}
             
-            volumes = await asyncio.to_thread(docker_client.volume.list, filters=filters)
+            # One list + one batched inspect, reused for a few seconds
+            ops = operations()
+            volumes = await ops.run(
+                "volume.list", ops.list_volumes, filters,
+                key=tuple(sorted((k, str(v)) for k, v in filters.items())), ttl=5
+            )
             
             volume_info = []
             for vol in volumes:
                 # Get volume details
-                name = vol.name if hasattr(vol, 'name') else 'Unknown'
-                driver = vol.driver if hasattr(vol, 'driver') else 'local'
-                mountpoint = vol.mountpoint if hasattr(vol, 'mountpoint') else 'Unknown'
+                name = vol.get("Name", "Unknown")
+                driver = vol.get("Driver", "local")
+                mountpoint = vol.get("Mountpoint", "Unknown")
                 
                 # Get labels
-                labels = vol.labels if hasattr(vol, 'labels') else {}
+                labels = vol.get("Labels") or {}
                 label_str = ", ".join([f"{k}={v}" for k, v in labels.items()]) if labels else "No labels"
                 
                 # Get scope
-                scope = vol.scope if hasattr(vol, 'scope') else 'local'
+                scope = vol.get("Scope", "local")
                 
                 info = f"• {name}\n  Driver: {driver}\n  Scope: {scope}\n  Mountpoint: {mountpoint}\n  Labels: {label_str}"
                 volume_info.append(info)
@@ -506,7 +561,8 @@ class DockerHandlers:
                 raise ValueError("Missing required volume_name")
             
             # Remove the volume
-            await asyncio.to_thread(docker_client.volume.remove, volume_name, force=force)
+            await operations().run("volume.remove", docker_client.volume.remove, volume_name, force=force)
+            operations().invalidate("volume.list")
             
             return [TextContent(type="text", text=f"Successfully removed volume '{volume_name}'")]
         except Exception as e:
@@ -567,6 +623,9 @@ class DockerHandlers:
                 return process.returncode, stdout.decode(), stderr.decode()
             
             code, out, err = await down_with_options()
+            await resync_containers()
+            if remove_volumes or remove_images:
+                operations().invalidate("volume.list", "image.list", "image.exists")
             
             debug_info.extend([
                 f"\n=== Docker Compose Down ===",
@@ -598,8 +657,15 @@ class DockerHandlers:
             if not container_name:
                 raise ValueError("Missing required container_name")
             
+            # Resolve the container from the snapshot; only running containers have stats
+            record = await lookup_container(container_name)
+            if record is None:
+                return [TextContent(type="text", text=f"Container '{container_name}' not found. Please use 'list-containers' to see available containers.")]
+            if record.status != "running":
+                return [TextContent(type="text", text=f"Container '{container_name}' is {record.status}; stats are only available for running containers")]
+            
             # Get stats directly from docker_client.container.stats
-            stats_list = await asyncio.to_thread(docker_client.container.stats, container_name)
+            stats_list = await operations().run("container.stats", docker_client.container.stats, record.id, key=record.id)
             
             # python-on-whales returns a list of ContainerStats objects
             if not stats_list or len(stats_list) == 0:
@@ -619,13 +685,13 @@ class DockerHandlers:
                 memory_limit = stats.memory_limit if hasattr(stats, 'memory_limit') else 0
                 memory_percent = stats.memory_percentage if hasattr(stats, 'memory_percentage') else 0
                 
-                # Network I/O (might be aggregated)
-                network_rx = stats.network_rx_bytes if hasattr(stats, 'network_rx_bytes') else 0
-                network_tx = stats.network_tx_bytes if hasattr(stats, 'network_tx_bytes') else 0
+                # Network I/O (python-on-whales maps the "RX / TX" column to net_upload / net_download)
+                network_rx = stats.net_upload if hasattr(stats, 'net_upload') else 0
+                network_tx = stats.net_download if hasattr(stats, 'net_download') else 0
                 
                 # Block I/O
-                block_read = stats.blkio_read_bytes if hasattr(stats, 'blkio_read_bytes') else 0
-                block_write = stats.blkio_write_bytes if hasattr(stats, 'blkio_write_bytes') else 0
+                block_read = stats.block_read if hasattr(stats, 'block_read') else 0
+                block_write = stats.block_write if hasattr(stats, 'block_write') else 0
                 
                 # Format the stats
                 stats_info = f"""Container Stats for '{container_name}':
@@ -645,6 +711,62 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
         except Exception as e:
             return [TextContent(type="text", text=f"Error getting container stats: {str(e)}")]
     
+    @staticmethod
+    async def handle_get_fleet_stats(arguments: Dict[str, Any] | None) -> List[TextContent]:
+        try:
+            arguments = arguments or {}
+            label = arguments.get("label")
+            name = arguments.get("name")
+            window = float(arguments.get("window_seconds", 300))
+            
+            # Answered from the sampler's ring buffers; only the first call waits for a sample
+            cache = await container_cache()
+            sampler = get_stats_sampler(
+                cache,
+                lambda ids: docker_client.container.stats(ids),
+                offload=operations().run
+            )
+            await sampler.ensure_running()
+            
+            records = cache.query(label=label, name=name)
+            summaries = sampler.summaries([r.id for r in records], window)
+            if not summaries:
+                message = "No stats collected for the selected containers yet"
+                if sampler.last_error:
+                    message += f" (last sampling error: {sampler.last_error})"
+                return [TextContent(type="text", text=message)]
+            
+            output_lines = [
+                f"Container stats over the last {window:.0f}s "
+                f"(sampled every {sampler.interval:.0f}s, {sampler.history} samples kept per container):",
+                ""
+            ]
+            for summary in sorted(summaries, key=lambda s: s.current.cpu_percent, reverse=True):
+                current = summary.current
+                cpu_min, cpu_avg, cpu_max = summary.ranges["cpu_percent"]
+                mem_min, mem_avg, mem_max = summary.ranges["memory_used"]
+                rx, tx, read, write = (summary.rates[counter] for counter in COUNTERS)
+                output_lines.append(
+                    f"• {summary.name} ({summary.samples} samples over {summary.span:.0f}s)\n"
+                    f"  CPU: {current.cpu_percent:.2f}% (min {cpu_min:.2f} / avg {cpu_avg:.2f} / max {cpu_max:.2f})\n"
+                    f"  Memory: {format_bytes(current.memory_used)} / {format_bytes(current.memory_limit)} ({current.memory_percent:.2f}%) "
+                    f"(min {format_bytes(mem_min)} / avg {format_bytes(mem_avg)} / max {format_bytes(mem_max)})\n"
+                    f"  Network: RX {format_bytes(rx)}/s / TX {format_bytes(tx)}/s\n"
+                    f"  Block I/O: Read {format_bytes(read)}/s / Write {format_bytes(write)}/s"
+                )
+            output_lines.append(f"\nTotal: {len(summaries)} container(s)")
+            
+            return [TextContent(type="text", text="\n".join(output_lines))]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting fleet stats: {str(e)}")]
+    
+    @staticmethod
+    async def handle_get_operation_metrics(arguments: Dict[str, Any] | None) -> List[TextContent]:
+        try:
+            return [TextContent(type="text", text=operations().metrics_report())]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting operation metrics: {str(e)}")]
+    
     @staticmethod
     async def handle_exec_container(arguments: Dict[str, Any]) -> List[TextContent]:
         try:
@@ -682,7 +804,8 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
             else:
                 command_list = command
             
-            result = await asyncio.to_thread(
+            result = await operations().run(
+                "container.execute",
                 docker_client.container.execute,
                 container_name,
                 command_list,
@@ -719,15 +842,11 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
             
             show_all = arguments.get("all", False)
             
-            # Get containers with compose project label
-            containers = await asyncio.to_thread(docker_client.container.list, all=show_all)
-            
-            # Filter by compose project
-            compose_containers = []
-            for c in containers:
-                labels = c.config.labels
-                if labels.get("com.docker.compose.project") == project_name:
-                    compose_containers.append(c)
+            # Get containers with compose project label (label index lookup)
+            compose_containers = (await container_cache()).query(
+                all=show_all,
+                label=f"com.docker.compose.project={project_name}"
+            )
             
             if not compose_containers:
                 return [TextContent(type="text", text=f"No containers found for project '{project_name}'")]
@@ -738,25 +857,9 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
             output_lines.append("-" * 70)
             
             for c in compose_containers:
-                service_name = c.config.labels.get("com.docker.compose.service", "unknown")
-                status = c.state.status
-                
-                # Get ports
-                ports = []
-                try:
-                    inspect_data = await asyncio.to_thread(docker_client.container.inspect, c.name)
-                    port_bindings = inspect_data.network_settings.ports
-                    if port_bindings:
-                        for container_port, host_bindings in port_bindings.items():
-                            if host_bindings:
-                                for binding in host_bindings:
-                                    host_port = binding.get('HostPort', '')
-                                    if host_port:
-                                        ports.append(f"{host_port}->{container_port}")
-                except:
-                    pass
-                
-                ports_str = ", ".join(ports) if ports else "No ports"
+                service_name = c.labels.get("com.docker.compose.service", "unknown")
+                status = c.status
+                ports_str = format_ports(c, with_host_ip=False)
                 output_lines.append(f"{service_name:<20} {status:<20} {ports_str}")
             
             output_lines.append(f"\nTotal: {len(compose_containers)} container(s)")
@@ -767,7 +870,7 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
             return [TextContent(type="text", text=f"Error listing compose containers: {str(e)}")]
     
     @staticmethod
-    async def handle_compose_logs(arguments: Dict[str, Any]) -> List[TextContent]:
+    async def handle_compose_logs(arguments: Dict[str, Any], progress: ProgressCallback | None = None) -> List[TextContent]:
         try:
             project_name = arguments.get("project_name")
             if not project_name:
@@ -777,17 +880,17 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
             tail = arguments.get("tail", 100)
             follow = arguments.get("follow", False)
             timestamps = arguments.get("timestamps", False)
+            budget, cursors, pattern = DockerHandlers._log_paging(arguments)
             
-            # Get containers for the project
-            containers = await asyncio.to_thread(docker_client.container.list, all=True)
-            
-            # Filter by compose project and optionally by service
-            target_containers = []
-            for c in containers:
-                labels = c.config.labels
-                if labels.get("com.docker.compose.project") == project_name:
-                    if not service or labels.get("com.docker.compose.service") == service:
-                        target_containers.append(c)
+            # Get containers for the project, and optionally the service
+            target_containers = (await container_cache()).query(
+                label=f"com.docker.compose.project={project_name}"
+            )
+            if service:
+                target_containers = [
+                    c for c in target_containers
+                    if c.labels.get("com.docker.compose.service") == service
+                ]
             
             if not target_containers:
                 if service:
@@ -801,27 +904,47 @@ Block I/O: Read {block_read / (1024*1024):.2f} MB / Write {block_write / (1024*1
                 output_lines[0] += f" (service: {service})"
             output_lines.append("=" * 60)
             
-            for c in target_containers:
-                service_name = c.config.labels.get("com.docker.compose.service", "unknown")
-                container_num = c.config.labels.get("com.docker.compose.container-number", "1")
-                
-                # Build log kwargs
-                log_kwargs = {
-                    "tail": tail,
-                    "follow": follow,
-                    "timestamps": timestamps
+            # One prefix per container: [service_number]
+            sources = {
+                c.name: f"{c.labels.get('com.docker.compose.service', 'unknown')}_{c.labels.get('com.docker.compose.container-number', '1')}"
+                for c in target_containers
+            }
+            docker_cmd = docker_client.client_config.docker_cmd
+            page = LogPage()
+            
+            if follow:
+                follow_seconds = arguments.get("follow_seconds", log_stream.DEFAULT_FOLLOW_SECONDS)
+                streamed = await DockerHandlers._follow(
+                    docker_cmd, [(name, source, cursors.get(name)) for name, source in sources.items()],
+                    budget, page, progress, tail, None, pattern, timestamps, follow_seconds
+                )
+                output_lines.append(streamed if streamed else f"(followed for up to {follow_seconds}s, sent as progress updates)")
+                output_lines.extend(page.errors)
+            else:
+                # Each container gets an equal share of the page; lines are merged in time order
+                shares = {
+                    name: Budget(max(1, budget.max_lines // len(sources)), max(1, budget.max_bytes // len(sources)))
+                    for name in sources
                 }
                 
-                try:
-                    logs = await asyncio.to_thread(docker_client.container.logs, c.name, **log_kwargs)
-                    
-                    # Add service prefix to each log line
-                    if logs:
-                        log_lines = logs.strip().split('\n')
-                        for line in log_lines:
-                            output_lines.append(f"[{service_name}_{container_num}] {line}")
-                except Exception as e:
-                    output_lines.append(f"[{service_name}_{container_num}] Error getting logs: {str(e)}")
+                async def read(name: str):
+                    try:
+                        await log_stream.read_page(
+                            docker_cmd, name, shares[name], page,
+                            cursor=cursors.get(name), tail=tail, pattern=pattern, source=sources[name]
+                        )
+                    except Exception as e:
+                        page.errors.append(f"[{sources[name]}] Error getting logs: {str(e)}")
+                
+                await asyncio.gather(*(read(name) for name in sources))
+                budget.lines = sum(share.lines for share in shares.values())
+                budget.bytes = sum(share.bytes for share in shares.values())
+                
+                page.lines.sort(key=lambda line: line.sort_key)
+                output_lines.extend(line.render(timestamps) for line in page.lines)
+                output_lines.extend(page.errors)
+            
+            output_lines.append(page.footer(budget))
             
             return [TextContent(type="text", text="\n".join(output_lines))]
             
@@ -0,0 +1,321 @@
+"""Bounded, cursor-paginated `docker logs` reading.
+
+Logs are always requested with `--timestamps` and read line by line from the
+`docker logs` process, which is killed as soon as the line/byte budget is
+spent, so a huge tail never sits in memory. Every page ends with a cursor
+(the last timestamp plus how many lines carrying that exact timestamp were
+already returned); passing it back resumes right after the last line.
+"""
+import asyncio
+import base64
+import binascii
+import json
+import re
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_LINES = 500
+DEFAULT_MAX_BYTES = 256 * 1024
+# Longest single line kept; longer lines are cut
+MAX_LINE_BYTES = 16 * 1024
+# Follow mode: flush a progress chunk at this many lines or seconds
+CHUNK_LINES = 50
+CHUNK_SECONDS = 1.0
+DEFAULT_FOLLOW_SECONDS = 30
+MAX_FOLLOW_SECONDS = 600
+
+# docker logs --timestamps prefix (RFC3339Nano)
+TIMESTAMP_RE = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:\d\d)) ?")
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class LogLine:
+    timestamp: str
+    text: str
+    source: str = ""
+
+    @property
+    def sort_key(self) -> str:
+        """Timestamp with the fraction padded to 9 digits (docker trims trailing zeros)."""
+        head, _, rest = self.timestamp.partition(".")
+        if not rest:
+            return f"{head[:19]}.000000000{head[19:]}"
+        digits = len(rest) - len(rest.lstrip("0123456789"))
+        return f"{head}.{rest[:digits].ljust(9, '0')}{rest[digits:]}"
+
+    def render(self, timestamps: bool) -> str:
+        prefix = f"[{self.source}] " if self.source else ""
+        return f"{prefix}{self.timestamp} {self.text}" if timestamps else f"{prefix}{self.text}"
+
+
+@dataclass
+class Cursor:
+    """Position right after the last returned line of one container."""
+    since: str
+    skip: int = 0
+
+    def advance(self, timestamp: str) -> "Cursor":
+        if timestamp == self.since:
+            return Cursor(self.since, self.skip + 1)
+        return Cursor(timestamp, 1)
+
+
+def encode_cursor(cursors: Dict[str, Cursor]) -> str:
+    payload = {name: [c.since, c.skip] for name, c in cursors.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(token: Optional[str]) -> Dict[str, Cursor]:
+    if not token:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return {name: Cursor(since, int(skip)) for name, (since, skip) in payload.items()}
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor; pass the next_cursor value from a previous page")
+
+
+def compile_filter(pattern: Optional[str]) -> Optional[re.Pattern]:
+    if not pattern:
+        return None
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid grep pattern: {e}")
+
+
+@dataclass
+class Budget:
+    """Lines/bytes still allowed on this page (shared by every container)."""
+    max_lines: int = DEFAULT_MAX_LINES
+    max_bytes: int = DEFAULT_MAX_BYTES
+    lines: int = 0
+    bytes: int = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.lines >= self.max_lines or self.bytes >= self.max_bytes
+
+    def take(self, line: LogLine) -> bool:
+        size = len(line.text.encode("utf-8", "replace")) + 1
+        if self.exhausted or (self.lines and self.bytes + size > self.max_bytes):
+            return False
+        self.lines += 1
+        self.bytes += size
+        return True
+
+
+@dataclass
+class LogPage:
+    lines: List[LogLine] = field(default_factory=list)
+    cursors: Dict[str, Cursor] = field(default_factory=dict)
+    truncated: bool = False
+    streamed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def footer(self, budget: Budget) -> str:
+        parts = [f"{self.streamed or len(self.lines)} line(s), {budget.bytes} bytes"]
+        if self.truncated:
+            parts.append(f"truncated at max_lines={budget.max_lines}/max_bytes={budget.max_bytes}")
+        if self.cursors:
+            parts.append(f"next_cursor: {encode_cursor(self.cursors)}")
+        return "--- " + " | ".join(parts)
+
+
+def build_logs_command(
+    docker_cmd: Iterable[str],
+    container: str,
+    tail: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    follow: bool = False,
+) -> List[str]:
+    cmd = list(docker_cmd) + ["container", "logs", "--timestamps"]
+    if since:
+        cmd += ["--since", since]
+    if tail is not None:
+        cmd += ["--tail", str(tail)]
+    if until:
+        cmd += ["--until", until]
+    if follow:
+        cmd.append("--follow")
+    return cmd + [container]
+
+
+async def _read_line(stream: asyncio.StreamReader) -> bytes:
+    """Next line, cut to MAX_LINE_BYTES; the rest of an over-long line is discarded.
+
+    `readline()` throws away the buffered data when a line overruns the
+    stream limit, so the separator search is done with `readuntil()`, which
+    leaves the buffer untouched on `LimitOverrunError`.
+    """
+    try:
+        return await stream.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial  # last line without a trailing newline
+    except asyncio.LimitOverrunError as e:
+        head = await stream.readexactly(e.consumed)
+    # Skip to the end of the over-long line
+    while True:
+        try:
+            await stream.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            break
+        except asyncio.LimitOverrunError as e:
+            await stream.readexactly(e.consumed)
+    return head[:MAX_LINE_BYTES]
+
+
+async def read_log_lines(cmd: List[str], source: str = "") -> AsyncIterator[LogLine]:
+    """Yield timestamped lines from a `docker logs` process; killed when the consumer stops."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=4 * MAX_LINE_BYTES,
+    )
+    errors: List[str] = []
+    try:
+        while True:
+            raw = await _read_line(process.stdout)
+            if not raw:
+                break
+            text = raw[:MAX_LINE_BYTES].decode("utf-8", "replace").rstrip("\n")
+            match = TIMESTAMP_RE.match(text)
+            if match:
+                yield LogLine(match.group(1), text[match.end():], source)
+            elif text:
+                # Daemon messages ("No such container") carry no timestamp
+                errors.append(text)
+        if await process.wait() != 0 and errors:
+            raise RuntimeError("\n".join(errors[:5]))
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def read_page(
+    docker_cmd: Iterable[str],
+    container: str,
+    budget: Budget,
+    page: LogPage,
+    key: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+    tail: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    pattern: Optional[re.Pattern] = None,
+    source: str = "",
+) -> None:
+    """Append one container's lines to `page` until the budget runs out."""
+    key = key or container
+    skip = 0
+    if cursor:
+        since, skip = cursor.since, cursor.skip
+    position = cursor
+
+    # A cursor resumes forward from its timestamp, so the tail no longer applies
+    cmd = build_logs_command(docker_cmd, container, tail=None if cursor else tail, since=since, until=until)
+    async with aclosing(read_log_lines(cmd, source)) as lines:
+        async for line in lines:
+            if skip and position and line.timestamp == position.since:
+                skip -= 1
+                continue
+            skip = 0
+            if pattern and not pattern.search(line.text):
+                # Filtered lines still move the cursor, so they are not re-read
+                position = position.advance(line.timestamp) if position else Cursor(line.timestamp, 1)
+                continue
+            if not budget.take(line):
+                page.truncated = True
+                break
+            page.lines.append(line)
+            position = position.advance(line.timestamp) if position else Cursor(line.timestamp, 1)
+
+    if position:
+        page.cursors[key] = position
+
+
+async def follow_logs(
+    docker_cmd: Iterable[str],
+    containers: List[Tuple[str, str, Optional[Cursor]]],
+    budget: Budget,
+    page: LogPage,
+    progress: ProgressCallback,
+    tail: Optional[int] = None,
+    since: Optional[str] = None,
+    pattern: Optional[re.Pattern] = None,
+    timestamps: bool = False,
+    follow_seconds: float = DEFAULT_FOLLOW_SECONDS,
+) -> None:
+    """Stream lines from every (key, source, cursor) container as progress chunks.
+
+    Stops when `follow_seconds` elapse or the budget is spent; only the
+    pending chunk is ever held in memory.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CHUNK_LINES * 4)
+
+    async def pump(key: str, source: str, cursor: Optional[Cursor]):
+        skip = cursor.skip if cursor else 0
+        position = cursor
+        cmd = build_logs_command(
+            docker_cmd, key,
+            tail=None if cursor else tail,
+            since=cursor.since if cursor else since,
+            follow=True
+        )
+        try:
+            async with aclosing(read_log_lines(cmd, source)) as lines:
+                async for line in lines:
+                    if skip and position and line.timestamp == position.since:
+                        skip -= 1
+                        continue
+                    skip = 0
+                    position = position.advance(line.timestamp) if position else Cursor(line.timestamp, 1)
+                    if pattern is None or pattern.search(line.text):
+                        # The cursor moves when the line is sent, not when it is read
+                        await queue.put((key, position, line))
+        except RuntimeError as e:
+            page.errors.append(f"[{source or key}] Error getting logs: {e}")
+
+    tasks = [asyncio.create_task(pump(key, source, cursor)) for key, source, cursor in containers]
+    deadline = time.monotonic() + min(follow_seconds, MAX_FOLLOW_SECONDS)
+    chunk: List[str] = []
+    last_flush = time.monotonic()
+
+    async def flush():
+        nonlocal last_flush
+        if chunk:
+            await progress("\n".join(chunk))
+            chunk.clear()
+        last_flush = time.monotonic()
+
+    try:
+        while time.monotonic() < deadline:
+            if queue.empty() and all(t.done() for t in tasks):
+                break
+            timeout = max(0.0, min(deadline - time.monotonic(), CHUNK_SECONDS))
+            try:
+                key, position, line = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await flush()
+                continue
+            if not budget.take(line):
+                page.truncated = True
+                break
+            page.cursors[key] = position
+            page.streamed += 1
+            chunk.append(line.render(timestamps))
+            if len(chunk) >= CHUNK_LINES or time.monotonic() - last_flush >= CHUNK_SECONDS:
+                await flush()
+        await flush()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
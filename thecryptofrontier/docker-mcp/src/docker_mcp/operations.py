@@ -0,0 +1,173 @@
+"""Async layer for blocking Docker calls.
+
+Every python-on-whales call spawns a `docker` CLI subprocess and blocks the
+calling thread. Handlers go through `DockerOperations.run`, which:
+
+- runs the call on a bounded thread pool (DOCKER_MCP_MAX_WORKERS, default 8)
+  instead of the event loop or an unbounded number of threads;
+- coalesces identical in-flight calls that share a `key` (single-flight), so
+  ten concurrent creates of the same image trigger one pull;
+- keeps read results for `ttl` seconds, dropped early by `invalidate`;
+- records per-operation latency, errors, coalesced calls and cache hits.
+"""
+import asyncio
+import functools
+import json
+import math
+import os
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("DOCKER_MCP_MAX_WORKERS", 8))
+
+# Latencies kept per operation for percentiles
+LATENCY_SAMPLES = 512
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    coalesced: int = 0
+    cache_hits: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * fraction) - 1)]
+
+
+class DockerOperations:
+    def __init__(self, docker_cmd: Iterable[str] = ("docker",), max_workers: int = DEFAULT_MAX_WORKERS):
+        self.docker_cmd = list(docker_cmd)
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="docker-op")
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._results: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self.stats: Dict[str, OperationStats] = {}
+
+    def _stats(self, name: str) -> OperationStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = OperationStats()
+        return stats
+
+    async def _execute(self, name: str, call: Callable[[], Any]) -> Any:
+        stats = self._stats(name)
+        stats.calls += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Hashable = None,
+        ttl: float = 0.0,
+        **kwargs: Any
+    ) -> Any:
+        """Run a blocking call off the event loop.
+
+        With a `key`, concurrent calls with the same (name, key) share one
+        execution; with a `ttl` as well, the result is reused for that long.
+        """
+        call = functools.partial(fn, *args, **kwargs)
+        if key is None:
+            return await self._execute(name, call)
+
+        slot = (name, key)
+        if ttl:
+            cached = self._results.get(slot)
+            if cached and time.monotonic() - cached[0] < ttl:
+                self._stats(name).cache_hits += 1
+                return cached[1]
+
+        task = self._inflight.get(slot)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(name, call))
+            self._inflight[slot] = task
+
+            def done(finished: asyncio.Task):
+                self._inflight.pop(slot, None)
+                if ttl and not finished.cancelled() and finished.exception() is None:
+                    self._results[slot] = (time.monotonic(), finished.result())
+
+            task.add_done_callback(done)
+        else:
+            self._stats(name).coalesced += 1
+
+        # A caller that times out must not cancel the work other callers share
+        return await asyncio.shield(task)
+
+    def invalidate(self, *names: str) -> None:
+        """Drop cached results of these operations (after a write that changes them)."""
+        for slot in [slot for slot in self._results if slot[0] in names]:
+            del self._results[slot]
+
+    # ---- raw CLI reads ----------------------------------------------------
+
+    def cli_json(self, *args: str) -> List[Dict[str, Any]]:
+        """Run a docker command that prints a JSON array (inspect) and parse it."""
+        result = subprocess.run(self.docker_cmd + list(args), capture_output=True, text=True)
+        if result.returncode != 0 and not result.stdout.strip():
+            raise RuntimeError(result.stderr.strip() or f"docker {' '.join(args)} failed")
+        return json.loads(result.stdout) if result.stdout.strip() else []
+
+    def cli_lines(self, *args: str) -> List[str]:
+        result = subprocess.run(self.docker_cmd + list(args), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"docker {' '.join(args)} failed")
+        return result.stdout.split()
+
+    def list_images(self) -> List[Dict[str, Any]]:
+        """All images in one list + one batched inspect."""
+        ids = list(dict.fromkeys(self.cli_lines("image", "list", "--quiet", "--no-trunc")))
+        return self.cli_json("image", "inspect", *ids) if ids else []
+
+    def list_volumes(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Volumes in one list + one batched inspect."""
+        args = ["volume", "list", "--quiet"]
+        for key, value in (filters or {}).items():
+            args += ["--filter", f"{key}={value}"]
+        names = self.cli_lines(*args)
+        return self.cli_json("volume", "inspect", *names) if names else []
+
+    def metrics_report(self) -> str:
+        lines = [
+            f"Docker operations (pool of {self.max_workers} workers, {len(self._inflight)} in flight):",
+            "",
+            f"{'OPERATION':<24} {'CALLS':>6} {'ERRORS':>6} {'COALESCED':>9} {'CACHED':>6} {'P50 ms':>8} {'P95 ms':>8} {'MAX ms':>8}",
+        ]
+        for name in sorted(self.stats):
+            stats = self.stats[name]
+            worst = max(stats.latencies) if stats.latencies else 0.0
+            lines.append(
+                f"{name:<24} {stats.calls:>6} {stats.errors:>6} {stats.coalesced:>9} {stats.cache_hits:>6} "
+                f"{stats.percentile(0.5) * 1000:>8.1f} {stats.percentile(0.95) * 1000:>8.1f} {worst * 1000:>8.1f}"
+            )
+        if not self.stats:
+            lines.append("(no operations yet)")
+        return "\n".join(lines)
+
+
+_operations: Optional[DockerOperations] = None
+
+
+def get_operations(docker_cmd: Iterable[str] = ("docker",)) -> DockerOperations:
+    global _operations
+    if _operations is None:
+        _operations = DockerOperations(docker_cmd)
+    return _operations
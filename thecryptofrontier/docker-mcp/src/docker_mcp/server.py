@@ -134,10 +134,15 @@ async def handle_list_tools() -> List[types.Tool]:
                 "properties": {
                     "container_name": {"type": "string", "description": "Container name or ID"},
                     "tail": {"type": "integer", "description": "Number of lines to show from the end (default: 100)", "default": 100},
-                    "follow": {"type": "boolean", "description": "Follow log output (default: false)", "default": False},
+                    "follow": {"type": "boolean", "description": "Stream new log lines as progress notifications for follow_seconds (default: false)", "default": False},
                     "timestamps": {"type": "boolean", "description": "Show timestamps (default: false)", "default": False},
                     "since": {"type": "string", "description": "Show logs since timestamp (e.g., '2h', '2023-01-01T00:00:00')"},
-                    "until": {"type": "string", "description": "Show logs until timestamp"}
+                    "until": {"type": "string", "description": "Show logs until timestamp"},
+                    "max_lines": {"type": "integer", "description": "Maximum lines returned per page (default: 500)", "default": 500},
+                    "max_bytes": {"type": "integer", "description": "Maximum bytes returned per page (default: 262144)", "default": 262144},
+                    "cursor": {"type": "string", "description": "next_cursor from a previous page; continues right after its last line"},
+                    "grep": {"type": "string", "description": "Only return lines matching this regular expression"},
+                    "follow_seconds": {"type": "integer", "description": "With follow=true, how long to stream (default: 30, max: 600)", "default": 30}
                 },
                 "required": ["container_name"]
             }
@@ -303,6 +308,26 @@ async def handle_list_tools() -> List[types.Tool]:
                 "required": ["container_name"]
             }
         ),
+        types.Tool(
+            name="get-fleet-stats",
+            description="Resource usage of many containers at once: current values, I/O rates per second and min/avg/max over a time window, from a background sampler",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "label": {"type": "string", "description": "Only containers with this label (e.g., 'com.docker.compose.project=web' or just 'app')"},
+                    "name": {"type": "string", "description": "Only containers whose name contains this text"},
+                    "window_seconds": {"type": "integer", "description": "Window for rates and min/avg/max (default: 300)", "default": 300}
+                }
+            }
+        ),
+        types.Tool(
+            name="get-operation-metrics",
+            description="Latency (p50/p95/max), errors, coalesced calls and cache hits of the server's Docker operations",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
         types.Tool(
             name="exec-container",
             description="Execute a command inside a running container",
@@ -345,8 +370,13 @@ async def handle_list_tools() -> List[types.Tool]:
                     "project_name": {"type": "string", "description": "Name of the Docker Compose project"},
                     "service": {"type": "string", "description": "Specific service name (optional, shows all if not specified)"},
                     "tail": {"type": "integer", "description": "Number of lines to show from the end", "default": 100},
-                    "follow": {"type": "boolean", "description": "Follow log output", "default": False},
-                    "timestamps": {"type": "boolean", "description": "Show timestamps", "default": False}
+                    "follow": {"type": "boolean", "description": "Stream new log lines as progress notifications for follow_seconds", "default": False},
+                    "timestamps": {"type": "boolean", "description": "Show timestamps", "default": False},
+                    "max_lines": {"type": "integer", "description": "Maximum lines returned per page (default: 500)", "default": 500},
+                    "max_bytes": {"type": "integer", "description": "Maximum bytes returned per page (default: 262144)", "default": 262144},
+                    "cursor": {"type": "string", "description": "next_cursor from a previous page; continues right after its last line"},
+                    "grep": {"type": "string", "description": "Only return lines matching this regular expression"},
+                    "follow_seconds": {"type": "integer", "description": "With follow=true, how long to stream (default: 30, max: 600)", "default": 30}
                 },
                 "required": ["project_name"]
             }
@@ -354,9 +384,26 @@ async def handle_list_tools() -> List[types.Tool]:
     ]
 
 
+def progress_reporter():
+    """Send log chunks as progress notifications, if the client asked for progress."""
+    ctx = server.request_context
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return None
+
+    sent = 0
+
+    async def report(chunk: str):
+        nonlocal sent
+        sent += 1
+        await ctx.session.send_progress_notification(token, sent, message=chunk, related_request_id=ctx.request_id)
+
+    return report
+
+
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any] | None) -> List[types.TextContent]:
-    if not arguments and name not in ["list-containers", "list-images", "list-volumes"]:
+    if not arguments and name not in ["list-containers", "list-images", "list-volumes", "get-fleet-stats", "get-operation-metrics"]:
         raise ValueError("Missing arguments")
 
     try:
@@ -365,7 +412,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any] | None) -> List[
         elif name == "deploy-compose":
             return await DockerHandlers.handle_deploy_compose(arguments)
         elif name == "get-logs":
-            return await DockerHandlers.handle_get_logs(arguments)
+            return await DockerHandlers.handle_get_logs(arguments, progress_reporter())
         elif name == "list-containers":
             return await DockerHandlers.handle_list_containers(arguments)
         elif name == "stop-container":
@@ -388,12 +435,16 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any] | None) -> List[
             return await DockerHandlers.handle_compose_down(arguments)
         elif name == "get-container-stats":
             return await DockerHandlers.handle_get_container_stats(arguments)
+        elif name == "get-fleet-stats":
+            return await DockerHandlers.handle_get_fleet_stats(arguments)
+        elif name == "get-operation-metrics":
+            return await DockerHandlers.handle_get_operation_metrics(arguments)
         elif name == "exec-container":
             return await DockerHandlers.handle_exec_container(arguments)
         elif name == "compose-ps":
             return await DockerHandlers.handle_compose_ps(arguments)
         elif name == "compose-logs":
-            return await DockerHandlers.handle_compose_logs(arguments)
+            return await DockerHandlers.handle_compose_logs(arguments, progress_reporter())
         else:
             raise ValueError(f"Unknown tool: {name}")
     except Exception as e:
@@ -0,0 +1,205 @@
+"""Background stats sampler with per-container ring buffers.
+
+Every `interval` seconds one `docker container stats --no-stream` call
+samples all selected running containers at once (the CLI collects them
+concurrently). Samples go into a fixed-size deque per container, so memory
+is bounded by `history` no matter how long the server runs. Queries compute
+current values, per-second rates of the I/O counters and min/avg/max over a
+window from memory only.
+
+Configuration (environment):
+    DOCKER_MCP_STATS_INTERVAL       seconds between samples (default 10)
+    DOCKER_MCP_STATS_HISTORY        samples kept per container (default 360)
+    DOCKER_MCP_STATS_LABEL          only sample containers with this label ("key" or "key=value")
+    DOCKER_MCP_STATS_IDLE_TIMEOUT   stop sampling after this many seconds without queries (default 900)
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .container_cache import ContainerCache
+
+DEFAULT_INTERVAL = float(os.environ.get("DOCKER_MCP_STATS_INTERVAL", 10))
+DEFAULT_HISTORY = int(os.environ.get("DOCKER_MCP_STATS_HISTORY", 360))
+DEFAULT_LABEL = os.environ.get("DOCKER_MCP_STATS_LABEL") or None
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("DOCKER_MCP_STATS_IDLE_TIMEOUT", 900))
+
+
+@dataclass(frozen=True)
+class StatsSample:
+    timestamp: float
+    cpu_percent: float
+    memory_used: int
+    memory_limit: int
+    memory_percent: float
+    net_rx: int
+    net_tx: int
+    block_read: int
+    block_write: int
+
+    @classmethod
+    def from_stats(cls, stats: Any, timestamp: float) -> "StatsSample":
+        """From a python-on-whales ContainerStats. Its NetIO column is "RX / TX",
+        which the library exposes as net_upload / net_download."""
+        return cls(
+            timestamp=timestamp,
+            cpu_percent=stats.cpu_percentage,
+            memory_used=stats.memory_used,
+            memory_limit=stats.memory_limit,
+            memory_percent=stats.memory_percentage,
+            net_rx=stats.net_upload,
+            net_tx=stats.net_download,
+            block_read=stats.block_read,
+            block_write=stats.block_write,
+        )
+
+
+COUNTERS = ("net_rx", "net_tx", "block_read", "block_write")
+
+
+@dataclass
+class WindowSummary:
+    name: str
+    samples: int
+    span: float
+    current: StatsSample
+    # metric -> (min, avg, max)
+    ranges: Dict[str, tuple]
+    # counter -> bytes per second over the window
+    rates: Dict[str, float]
+
+
+# (operation name, blocking fn, *args) -> awaitable result
+Offload = Callable[..., Awaitable[Any]]
+
+
+async def _to_thread(name: str, fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.to_thread(fn, *args)
+
+
+def _range(values: List[float]) -> tuple:
+    return (min(values), sum(values) / len(values), max(values))
+
+
+class StatsSampler:
+    def __init__(
+        self,
+        cache: ContainerCache,
+        fetch: Callable[[List[str]], List[Any]],
+        interval: float = DEFAULT_INTERVAL,
+        history: int = DEFAULT_HISTORY,
+        label: Optional[str] = DEFAULT_LABEL,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        offload: Offload = _to_thread,
+    ):
+        self.cache = cache
+        self.fetch = fetch
+        self.offload = offload
+        self.interval = max(1.0, interval)
+        self.history = max(2, history)
+        self.label = label
+        self.idle_timeout = idle_timeout
+        self._buffers: Dict[str, Deque[StatsSample]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_query = time.monotonic()
+        self.last_error: Optional[str] = None
+
+    def _targets(self) -> List[str]:
+        return [record.id for record in self.cache.query(all=False, label=self.label)]
+
+    async def sample_once(self) -> int:
+        """Take one sample of every selected running container."""
+        ids = self._targets()
+        if not ids:
+            return 0
+        stats_list = await self.offload("stats.sample", self.fetch, ids)
+        now = time.time()
+        for stats in stats_list:
+            buffer = self._buffers.get(stats.container_id)
+            if buffer is None:
+                buffer = self._buffers[stats.container_id] = deque(maxlen=self.history)
+            buffer.append(StatsSample.from_stats(stats, now))
+
+        # Forget containers that no longer exist; stopped ones keep their history
+        for container_id in list(self._buffers):
+            if self.cache.get(container_id) is None:
+                del self._buffers[container_id]
+        return len(stats_list)
+
+    async def _run(self, delay: float = 0.0) -> None:
+        await asyncio.sleep(delay)
+        while time.monotonic() - self._last_query < self.idle_timeout:
+            started = time.monotonic()
+            try:
+                await self.offload("cache.ensure_ready", self.cache.ensure_ready)
+                await self.sample_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        self._task = None
+
+    async def ensure_running(self) -> None:
+        """Start the background loop; the first call also samples right away."""
+        self._last_query = time.monotonic()
+        if self._task is None or self._task.done():
+            delay = 0.0
+            if not self._buffers:
+                await self.sample_once()
+                delay = self.interval
+            self._task = asyncio.create_task(self._run(delay))
+
+    def summarize(self, container_id: str, window: float) -> Optional[WindowSummary]:
+        buffer = self._buffers.get(container_id)
+        if not buffer:
+            return None
+        cutoff = buffer[-1].timestamp - window
+        samples = [s for s in buffer if s.timestamp >= cutoff]
+        first, last = samples[0], samples[-1]
+        span = last.timestamp - first.timestamp
+
+        rates = {}
+        for counter in COUNTERS:
+            delta = getattr(last, counter) - getattr(first, counter)
+            # A restart resets the counters; a negative delta is not a rate
+            rates[counter] = delta / span if span > 0 and delta >= 0 else 0.0
+
+        ranges = {
+            "cpu_percent": _range([s.cpu_percent for s in samples]),
+            "memory_used": _range([s.memory_used for s in samples]),
+            "memory_percent": _range([s.memory_percent for s in samples]),
+        }
+        record = self.cache.get(container_id)
+        return WindowSummary(
+            name=record.name if record else container_id[:12],
+            samples=len(samples),
+            span=span,
+            current=last,
+            ranges=ranges,
+            rates=rates,
+        )
+
+    def summaries(self, container_ids: List[str], window: float) -> List[WindowSummary]:
+        results = []
+        for container_id in container_ids:
+            summary = self.summarize(container_id, window)
+            if summary:
+                results.append(summary)
+        return results
+
+
+_stats_sampler: Optional[StatsSampler] = None
+
+
+def get_stats_sampler(
+    cache: ContainerCache,
+    fetch: Callable[[List[str]], List[Any]],
+    offload: Offload = _to_thread
+) -> StatsSampler:
+    global _stats_sampler
+    if _stats_sampler is None:
+        _stats_sampler = StatsSampler(cache, fetch, offload=offload)
+    return _stats_sampler
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Checks log_stream line reading without a Docker daemon.
+
+A small Python process stands in for `docker logs --timestamps`.
+Run with `python test_log_stream.py` or `pytest test_log_stream.py`.
+"""
+import asyncio
+import sys
+from contextlib import aclosing
+
+sys.path.insert(0, 'src')
+from docker_mcp.log_stream import MAX_LINE_BYTES, Cursor, read_log_lines
+
+TS = "2024-01-01T00:00:0{}.000000000Z"
+
+
+def fake_logs(*lines: str) -> list:
+    """Command that prints `lines` the way `docker logs --timestamps` would."""
+    script = "import sys\nfor line in sys.argv[1:]:\n    sys.stdout.write(line + '\\n')\n"
+    return [sys.executable, "-c", script, *lines]
+
+
+async def collect(cmd: list) -> list:
+    async with aclosing(read_log_lines(cmd, "web")) as lines:
+        return [line async for line in lines]
+
+
+def test_long_line_is_cut_and_following_lines_survive():
+    long_text = "x" * (100 * 1024)
+    cmd = fake_logs(f"{TS.format(1)} {long_text}", f"{TS.format(2)} after1", f"{TS.format(3)} after2")
+
+    lines = asyncio.run(collect(cmd))
+
+    assert [line.timestamp for line in lines] == [TS.format(1), TS.format(2), TS.format(3)]
+    assert lines[0].text == long_text[:MAX_LINE_BYTES - len(TS.format(1)) - 1]
+    assert [line.text for line in lines[1:]] == ["after1", "after2"]
+    assert all(line.source == "web" for line in lines)
+
+    # The cursor built from these lines resumes after the last one
+    cursor = None
+    for line in lines:
+        cursor = cursor.advance(line.timestamp) if cursor else Cursor(line.timestamp, 1)
+    assert cursor == Cursor(TS.format(3), 1)
+
+
+def test_last_line_without_newline():
+    script = f"import sys; sys.stdout.write('{TS.format(1)} one\\n{TS.format(2)} two')"
+    lines = asyncio.run(collect([sys.executable, "-c", script]))
+    assert [line.text for line in lines] == ["one", "two"]
+
+
+if __name__ == "__main__":
+    test_long_line_is_cut_and_following_lines_survive()
+    test_last_line_without_newline()
+    print("✓ log_stream OK")